@@ -109,6 +109,7 @@ from galaxy.objectstore import (
 from galaxy.objectstore.templates import ConfiguredObjectStoreTemplates
 from galaxy.queue_worker import (
     GalaxyQueueWorker,
+    publish_object_store_metadata_invalidations,
     reload_toolbox,
     send_local_control_task,
 )
@@ -139,7 +140,10 @@ from galaxy.tool_util.deps.dependencies import AppInfo
 from galaxy.tool_util.deps.views import DependencyResolversView
 from galaxy.tool_util.verify.test_data import TestDataResolver
 from galaxy.tools.biotools import get_galaxy_biotools_metadata_source
-from galaxy.tools.cache import ToolCache
+from galaxy.tools.cache import (
+    ToolCache,
+    ToolSourceCache,
+)
 from galaxy.tools.data import ToolDataTableManager
 from galaxy.tools.data_manager.manager import DataManagers
 from galaxy.tools.error_reports import ErrorReports
@@ -261,6 +265,7 @@ class MinimalGalaxyApplication(BasicSharedApp, HaltableContainer, SentryClientMi
     model: GalaxyModelMapping
     config: GalaxyAppConfiguration
     tool_cache: ToolCache
+    tool_source_cache: Optional[ToolSourceCache]
     job_config: jobs.JobConfiguration
     toolbox_search: ToolBoxSearch
     container_finder: containers.ContainerFinder
@@ -761,6 +766,7 @@ class UniverseApplication(StructuredApp, GalaxyManagerApplication, InstallationT
         # queue_worker *can* be initialized with a queue, but here we don't
         # want to and we'll allow postfork to bind and start it.
         self.queue_worker = self._register_singleton(GalaxyQueueWorker, GalaxyQueueWorker(self))
+        publish_object_store_metadata_invalidations(self)
 
         self.dependency_resolvers_view = self._register_singleton(
             DependencyResolversView, DependencyResolversView(self)
@@ -782,6 +788,9 @@ class UniverseApplication(StructuredApp, GalaxyManagerApplication, InstallationT
 
         # Setup a Tool Cache
         self.tool_cache = self._register_singleton(ToolCache)
+        self.tool_source_cache = None
+        if self.config.enable_tool_source_cache:
+            self.tool_source_cache = ToolSourceCache(self.config.tool_source_cache_dir)
         self.tool_shed_repository_cache = self._register_singleton(ToolShedRepositoryCache)
         # Watch various config files for immediate reload
         self.watchers = self._register_singleton(ConfigWatchers)
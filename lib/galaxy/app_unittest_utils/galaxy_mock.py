@@ -292,6 +292,7 @@ class MockAppConfig(GalaxyDataTestConfig, CommonConfigurationMixin):
         self.integrated_tool_panel_config = None
         self.vault_config_file = kwargs.get("vault_config_file")
         self.max_discovered_files = 10000
+        self.discovered_outputs_workers = 1
         self.display_builtin_converters = True
         self.enable_notification_system = True
         self.config_dict = self.dict()
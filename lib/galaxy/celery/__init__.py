@@ -236,6 +236,7 @@ def setup_periodic_tasks(config, celery_app):
 
     beat_schedule: dict[str, dict[str, Any]] = {}
     schedule_task("prune_history_audit_table", config.history_audit_table_prune_interval)
+    schedule_task("check_job_state_counts", config.job_state_counts_check_interval)
     schedule_task("cleanup_short_term_storage", config.short_term_storage_cleanup_interval)
 
     if config.enable_notification_system:
@@ -31,7 +31,10 @@ from galaxy.managers.datasets import (
     DatasetManager,
 )
 from galaxy.managers.hdas import HDAManager
-from galaxy.managers.jobs import JobSubmitter
+from galaxy.managers.jobs import (
+    JobSubmitter,
+    recount_job_state_counts,
+)
 from galaxy.managers.lddas import LDDAManager
 from galaxy.managers.markdown_util import generate_branded_pdf
 from galaxy.managers.model_stores import ModelStoreManager
@@ -497,6 +500,16 @@ def prune_history_audit_table(sa_session: galaxy_scoped_session):
     model.HistoryAudit.prune(sa_session)
 
 
+@galaxy_task(action="checking job state counts")
+def check_job_state_counts(sa_session: galaxy_scoped_session, config: GalaxyAppConfiguration):
+    """Correct the job state counters of implicit collection jobs and invocations with recently updated jobs."""
+    # check twice the interval, so jobs updated while the previous check ran are not missed
+    since = datetime.datetime.utcnow() - datetime.timedelta(seconds=2 * config.job_state_counts_check_interval)
+    corrected = recount_job_state_counts(sa_session, since)
+    if corrected:
+        log.warning("Corrected %s job state counters", corrected)
+
+
 @galaxy_task(action="clean up short term storage")
 def cleanup_short_term_storage(storage_monitor: ShortTermStorageMonitor):
     """Cleanup short term storage."""
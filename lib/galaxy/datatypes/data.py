@@ -1,3 +1,4 @@
+import io
 import json
 import logging
 import mimetypes
@@ -16,6 +17,7 @@ from typing import (
     IO,
     Literal,
     Optional,
+    overload,
     TYPE_CHECKING,
     Union,
 )
@@ -54,7 +56,11 @@ from galaxy.util import (
     UNKNOWN,
 )
 from galaxy.util.bunch import Bunch
-from galaxy.util.compression_utils import FileObjType
+from galaxy.util.compression_utils import (
+    FileObjType,
+    FileObjTypeBytes,
+    FileObjTypeStr,
+)
 from galaxy.util.markdown import (
     indicate_data_truncated,
     literal_via_fence,
@@ -84,6 +90,7 @@ valid_strand = ["+", "-", "."]
 DOWNLOAD_FILENAME_PATTERN_DATASET = "Galaxy${hid}-[${name}].${ext}"
 DOWNLOAD_FILENAME_PATTERN_COLLECTION_ELEMENT = "Galaxy${hdca_hid}-[${hdca_name}__${element_identifier}].${ext}"
 DEFAULT_MAX_PEEK_SIZE = 1000000  # 1 MB
+ZIP_MAGIC = b"PK\x03\x04"
 
 Headers = dict[str, Any]
 
@@ -187,6 +194,55 @@ def _get_file_size(data):
     return file_size
 
 
+def open_dataset_file(data) -> IO[bytes]:
+    """Open the file of the dataset instance ``data`` for binary reading.
+
+    Unlike ``open(data.get_file_name(), "rb")`` this does not pull the file of a dataset in a
+    caching object store into the cache, reads are served with byte-range requests instead.
+    """
+    dataset = getattr(data, "dataset", None)
+    object_store = getattr(dataset, "object_store", None)
+    if object_store is None or getattr(dataset, "external_filename", None):
+        return open(data.get_file_name(), "rb")
+    return object_store.open_data(dataset)
+
+
+@overload
+def get_dataset_fileobj(data, mode: Literal["r"] = "r") -> FileObjTypeStr: ...
+
+
+@overload
+def get_dataset_fileobj(data, mode: Literal["rb"]) -> FileObjTypeBytes: ...
+
+
+def get_dataset_fileobj(data, mode: str = "r") -> FileObjType:
+    """Like ``compression_utils.get_fileobj(data.get_file_name(), mode)``, opening uncompressed
+    files with :func:`open_dataset_file`.
+    """
+    fh = open_dataset_file(data)
+    try:
+        header = fh.read(len(util.xz_magic))
+        fh.seek(0)
+    except Exception:
+        fh.close()
+        raise
+    if header.startswith((util.gzip_magic, util.bz2_magic, util.xz_magic, ZIP_MAGIC)):
+        # compressed files are read sequentially anyway
+        fh.close()
+        return compression_utils.get_fileobj(data.get_file_name(), mode)
+    if "b" in mode:
+        return fh
+    return io.TextIOWrapper(fh, encoding="utf-8")
+
+
+def _dataset_file_exists(data) -> bool:
+    dataset = getattr(data, "dataset", None)
+    object_store = getattr(dataset, "object_store", None)
+    if object_store is None or getattr(dataset, "external_filename", None):
+        return os.path.exists(data.get_file_name())
+    return object_store.exists(dataset)
+
+
 @p_dataproviders.decorators.has_dataproviders
 class Data(metaclass=DataMeta):
     """
@@ -511,7 +567,7 @@ class Data(metaclass=DataMeta):
         headers["content-type"] = "text/html"
         if file_size > max_peek_size:
             headers["x-content-truncated"] = max_peek_size
-        with open(data.get_file_name(), "rb") as fh:
+        with open_dataset_file(data) as fh:
             return unicodify(fh.read(max_peek_size)), headers
 
     def _serve_file_contents(self, trans, data, headers, preview, file_size, max_peek_size):
@@ -521,7 +577,7 @@ class Data(metaclass=DataMeta):
         if not preview or isinstance(data.datatype, images.Image) or file_size < max_peek_size:
             return self._yield_user_file_content(trans, data, data.get_file_name(), headers), headers
 
-        with compression_utils.get_fileobj(data.get_file_name(), "rb") as fh:
+        with get_dataset_fileobj(data, "rb") as fh:
             # preview large text file
             headers["content-type"] = "text/html"
             headers["x-content-truncated"] = max_peek_size
@@ -596,8 +652,8 @@ class Data(metaclass=DataMeta):
         downloading = to_ext is not None
         file_size = _get_file_size(dataset)
 
-        if not os.path.exists(dataset.get_file_name()):
-            raise ObjectNotFound(f"File Not Found ({dataset.get_file_name()}).")
+        if not _dataset_file_exists(dataset):
+            raise ObjectNotFound(f"File Not Found ({dataset.get_file_name(sync_cache=False)}).")
 
         if downloading:
             trans.log_event(f"Download dataset id: {str(dataset.id)}")
@@ -130,7 +130,7 @@ class Interval(Tabular):
         self, dataset: DatasetProtocol, *, overwrite: bool = True, first_line_is_header: bool = False, **kwd
     ) -> None:
         """Tries to guess from the line the location number of the column for the chromosome, region start-end and strand"""
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=0)
+        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=0, **kwd)
         if dataset.has_data():
             empty_line_count = 0
             num_check_lines = 100  # only check up to this many non empty lines
@@ -512,7 +512,7 @@ class Bed(Interval):
                             if overwrite or not dataset.metadata.element_is_set("strandCol"):
                                 dataset.metadata.strandCol = 6
                         break
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i)
+        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i, **kwd)
 
     def as_ucsc_display_file(self, dataset: DatasetProtocol, **kwd) -> Union[FileObjType, str]:
         """Returns file contents with only the bed data. If bed 6+, treat as interval."""
@@ -869,7 +869,7 @@ class Gff(Tabular, _RemoteCallMixin):
                             break
                         except Exception:
                             pass
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i)
+        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i, **kwd)
 
     def display_peek(self, dataset: DatasetProtocol) -> str:
         """Returns formated html of peek"""
@@ -1105,7 +1105,7 @@ class Gff3(Gff):
                             and phase in self.valid_gff3_phase
                         ):
                             break
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i)
+        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=i, **kwd)
 
     def sniff_prefix(self, file_prefix: FilePrefix) -> bool:
         """
@@ -1466,7 +1466,7 @@ class CustomTrack(Tabular):
         self.add_display_app("ucsc", "display at UCSC", "as_ucsc_display_file", "ucsc_links")
 
     def set_meta(self, dataset: DatasetProtocol, overwrite: bool = True, **kwd) -> None:
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=1)
+        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=1, **kwd)
 
     def display_peek(self, dataset: DatasetProtocol) -> str:
         """Returns formated html of peek"""
@@ -1785,7 +1785,9 @@ class IntervalTabix(Interval):
         **kwd,
     ) -> None:
         # We don't use the method Interval.set_meta as we don't want to guess the columns for chr start end
-        Tabular.set_meta(self, dataset, overwrite=overwrite, skip=0)
+        Tabular.set_meta(
+            self, dataset, overwrite=overwrite, skip=0, metadata_tmp_files_dir=metadata_tmp_files_dir, **kwd
+        )
         # Try to create the index for the Tabix file.
         # These metadata values are not accessible by users, always overwrite
         index_file = dataset.metadata.tabix_index
@@ -41,6 +41,7 @@ from . import (
     xml,
 )
 from .display_applications.application import DisplayApplication
+from .sniff import SnifferIndex
 
 if TYPE_CHECKING:
     from galaxy.datatypes.data import Data
@@ -84,6 +85,7 @@ class Registry:
         self.available_tracks = []
         self.set_external_metadata_tool = None
         self.sniff_order: list[Data] = []
+        self._sniffer_index: Optional[SnifferIndex] = None
         self.upload_file_formats = []
         # Datatype elements defined in local datatypes_conf.xml that contain display applications.
         self.display_app_containers = []
@@ -463,6 +465,7 @@ class Registry:
                     self.sniff_order.append(datatype)
 
         append_to_sniff_order()
+        self._sniffer_index = None
 
     def _load_build_sites(self, root):
         def load_build_site(build_site_config):
@@ -647,6 +650,13 @@ class Registry:
             self.log.warning(f"unknown mimetype in data factory {str(ext)}")
         return mimetype
 
+    @property
+    def sniffer_index(self) -> SnifferIndex:
+        """The sniff order grouped by the kind of files each datatype can match."""
+        if self._sniffer_index is None or len(self._sniffer_index) != len(self.sniff_order):
+            self._sniffer_index = SnifferIndex(self.sniff_order)
+        return self._sniffer_index
+
     def get_datatype_by_extension(self, ext) -> Optional["Data"]:
         """Returns a datatype object based on an extension"""
         return self.datatypes_by_extension.get(ext, None)
@@ -6,6 +6,7 @@ import bz2
 import gzip
 import io
 import logging
+import multiprocessing
 import os
 import re
 import shutil
@@ -16,6 +17,7 @@ from collections.abc import (
     Callable,
     Iterable,
 )
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 from typing import (
     IO,
@@ -244,6 +246,16 @@ def get_headers(fname_or_file_prefix, sep, count=60, comment_designator=None):
     >>> get_headers(fname, '\\t', count=5, comment_designator='#') == [[''], ['chr7', 'bed2gff', 'AR', '26731313', '26731437', '.', '+', '.', 'score'], ['chr7', 'bed2gff', 'AR', '26731491', '26731536', '.', '+', '.', 'score'], ['chr7', 'bed2gff', 'AR', '26731541', '26731649', '.', '+', '.', 'score'], ['chr7', 'bed2gff', 'AR', '26731659', '26731841', '.', '+', '.', 'score']]
     True
     """
+    if isinstance(fname_or_file_prefix, FilePrefix):
+        # many sniffers look at the same headers, split them once per file
+        key = (sep, count, comment_designator)
+        headers = fname_or_file_prefix._headers.get(key)
+        if headers is None:
+            headers = list(
+                iter_headers(fname_or_file_prefix, sep=sep, count=count, comment_designator=comment_designator)
+            )
+            fname_or_file_prefix._headers[key] = headers
+        return [list(row) for row in headers]
     return list(
         iter_headers(
             fname_or_file_prefix=fname_or_file_prefix, sep=sep, count=count, comment_designator=comment_designator
@@ -579,6 +591,47 @@ def guess_ext(fname_or_file_prefix: Union[str, "FilePrefix"], sniff_order, is_bi
     return "txt"  # default text data type file extension
 
 
+_worker_sniff_order: Optional[Union[Iterable["Data"], "SnifferIndex"]] = None
+_worker_auto_decompress = True
+
+
+def _init_sniff_worker(sniff_order, auto_decompress: bool) -> None:
+    global _worker_sniff_order, _worker_auto_decompress
+    _worker_sniff_order = sniff_order
+    _worker_auto_decompress = auto_decompress
+
+
+def _guess_ext_in_worker(fname: str) -> str:
+    assert _worker_sniff_order is not None
+    return guess_ext(fname, _worker_sniff_order, auto_decompress=_worker_auto_decompress)
+
+
+def guess_ext_many(
+    fnames: list[str], sniff_order, processes: Optional[int] = None, auto_decompress: bool = True
+) -> list[str]:
+    """
+    Returns the extensions guessed by :func:`guess_ext` for each of ``fnames``.
+
+    Files are sniffed in parallel in ``processes`` worker processes (by default one per CPU).
+    Workers are forked so the datatypes in ``sniff_order`` do not need to be picklable, this
+    is meant for single threaded processes like the data fetch tool. Files are sniffed in this
+    process if forking is not available.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(fnames))
+    if processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [guess_ext(fname, sniff_order, auto_decompress=auto_decompress) for fname in fnames]
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_sniff_worker,
+        initargs=(sniff_order, auto_decompress),
+    ) as executor:
+        chunksize = max(1, len(fnames) // (processes * 4))
+        return list(executor.map(_guess_ext_in_worker, fnames, chunksize=chunksize))
+
+
 def guess_ext_from_file_name(fname, registry, requested_ext="auto"):
     if requested_ext != "auto":
         return requested_ext
@@ -626,6 +679,8 @@ class FilePrefix:
         self.contents_header_bytes = contents_header_bytes
         self._is_binary = None
         self._file_size = None
+        self._lines: Optional[list[str]] = None
+        self._headers: dict[tuple, list[list[str]]] = {}
 
     @property
     def binary(self):
@@ -664,14 +719,18 @@ class FilePrefix:
         return self.string_io().read(len(prefix)) == prefix
 
     def line_iterator(self):
-        s = self.string_io()
-        s_len = len(s.getvalue())
-        for line in iter(s.readline, ""):
-            if line.endswith("\n") or line.endswith("\r"):
-                yield line
-            elif s.tell() == s_len and not self.truncated:
+        if self._lines is None:
+            if self.non_utf8_error is not None:
+                raise self.non_utf8_error
+            # split once, most sniffers iterate over the same lines
+            lines = self.contents_header.split("\n")
+            last_line = lines.pop()
+            lines = [f"{line}\n" for line in lines]
+            if last_line and (last_line.endswith("\r") or not self.truncated):
                 # At the end, return the last line if it wasn't truncated when reading it in.
-                yield line
+                lines.append(last_line)
+            self._lines = lines
+        return iter(self._lines)
 
     # Convenience wrappers around contents_header, shielding contents_header means we can
     # potentially do a better job lazy loading this data later on.
@@ -701,11 +760,71 @@ def _get_file_prefix(filename_or_file_prefix: Union[str, FilePrefix], auto_decom
     return filename_or_file_prefix
 
 
-def run_sniffers_raw(file_prefix: FilePrefix, sniff_order: Iterable["Data"]):
+def _may_sniff(datatype: "Data", binary: bool, compressed_format: Optional[str]) -> bool:
+    """Whether ``datatype`` can match a file that is ``binary`` and compressed with ``compressed_format``."""
+    datatype_compressed = getattr(datatype, "compressed", False)
+    if datatype_compressed and not compressed_format and not datatype.file_ext.endswith(".tar"):
+        # we don't auto-detect tar as compressed
+        return False
+    if not datatype_compressed and compressed_format:
+        return False
+    if binary != datatype.is_binary and not datatype.is_binary == "maybe":
+        # Binary detection doesn't match datatype ...
+        compressed_data_for_compressed_text_datatype = (
+            binary and compressed_format and datatype_compressed and not datatype.is_binary
+        )
+        if not compressed_data_for_compressed_text_datatype:
+            # ... and mismatch is not due to compressed text data for a compressed text datatype
+            return False
+    if hasattr(datatype, "sniff_prefix"):
+        datatype_compressed_format = getattr(datatype, "compressed_format", None)
+        if compressed_format and datatype_compressed_format and compressed_format != datatype_compressed_format:
+            # Compare the compressed format detected to the expected.
+            return False
+    return True
+
+
+class SnifferIndex:
+    """Datatypes of a sniff order grouped by the kind of file they can match.
+
+    Whether a datatype's sniffer needs to run at all only depends on whether the file is
+    binary and on its compression format, so the candidate sniffers for each combination
+    are computed once and reused for every file sniffed with this index. Iterating over the
+    index yields the full sniff order, so it can be used wherever a sniff order is expected.
+    """
+
+    def __init__(self, sniff_order: Iterable["Data"]):
+        self.sniff_order = list(sniff_order)
+        self._candidates: dict[tuple[bool, Optional[str]], list[Data]] = {}
+
+    def __iter__(self):
+        return iter(self.sniff_order)
+
+    def __len__(self) -> int:
+        return len(self.sniff_order)
+
+    def candidates(self, file_prefix: "FilePrefix") -> list["Data"]:
+        key = (bool(file_prefix.binary), file_prefix.compressed_format)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = [datatype for datatype in self.sniff_order if _may_sniff(datatype, *key)]
+            self._candidates[key] = candidates
+        return candidates
+
+
+def run_sniffers_raw(file_prefix: FilePrefix, sniff_order: Union[Iterable["Data"], SnifferIndex]):
     """Run through sniffers specified by sniff_order, return None of None match."""
     fname = file_prefix.filename
     file_ext = None
-    for datatype in sniff_order:
+    if isinstance(sniff_order, SnifferIndex):
+        candidates: Iterable[Data] = sniff_order.candidates(file_prefix)
+    else:
+        candidates = (
+            datatype
+            for datatype in sniff_order
+            if _may_sniff(datatype, file_prefix.binary, file_prefix.compressed_format)
+        )
+    for datatype in candidates:
         """
         Some classes may not have a sniff function, which is ok.  In fact,
         Binary, Data, Tabular and Text are examples of classes that should never
@@ -714,28 +833,8 @@ def run_sniffers_raw(file_prefix: FilePrefix, sniff_order: Iterable["Data"]):
         from this function after all other datatypes in sniff_order have not been
         successfully discovered.
         """
-        datatype_compressed = getattr(datatype, "compressed", False)
-        if datatype_compressed and not file_prefix.compressed_format and not datatype.file_ext.endswith(".tar"):
-            # we don't auto-detect tar as compressed
-            continue
-        if not datatype_compressed and file_prefix.compressed_format:
-            continue
-        if file_prefix.binary != datatype.is_binary and not datatype.is_binary == "maybe":
-            # Binary detection doesn't match datatype ...
-            compressed_data_for_compressed_text_datatype = (
-                file_prefix.binary and file_prefix.compressed_format and datatype_compressed and not datatype.is_binary
-            )
-            if not compressed_data_for_compressed_text_datatype:
-                # ... and mismatch is not due to compressed text data for a compressed text datatype
-                continue
         try:
             if hasattr(datatype, "sniff_prefix"):
-                datatype_compressed_format = getattr(datatype, "compressed_format", None)
-                if file_prefix.compressed_format and datatype_compressed_format:
-                    # Compare the compressed format detected
-                    # to the expected.
-                    if file_prefix.compressed_format != datatype_compressed_format:
-                        continue
                 if datatype.sniff_prefix(file_prefix):
                     file_ext = datatype.file_ext
                     break
@@ -928,8 +1027,9 @@ def handle_uploaded_dataset_file_internal(
         if ext in AUTO_DETECT_EXTENSIONS:
             # TODO: skip this if we haven't actually converted the dataset
             guessed_ext = guess_ext(
-                converted_path,
-                sniff_order=datatypes_registry.sniff_order,
+                # reuse the prefix already read unless the file was decompressed
+                file_prefix if converted_path == file_prefix.filename else converted_path,
+                sniff_order=datatypes_registry.sniffer_index,
                 auto_decompress=file_prefix.auto_decompress,
             )
 
@@ -945,7 +1045,7 @@ def handle_uploaded_dataset_file_internal(
                 assert _converted_path
                 converted_path = _converted_path
             if ext in AUTO_DETECT_EXTENSIONS:
-                ext = guess_ext(converted_path, sniff_order=datatypes_registry.sniff_order)
+                ext = guess_ext(converted_path, sniff_order=datatypes_registry.sniffer_index)
         else:
             ext = guessed_ext
 
@@ -5,12 +5,21 @@ Tabular datatype
 import abc
 import binascii
 import csv
+import io
+import itertools
 import logging
 import os
 import re
 import shutil
+import struct
 import subprocess
+import sys
 import tempfile
+from array import array
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
 from json import dumps
 from typing import (
     cast,
@@ -63,10 +72,14 @@ from galaxy.datatypes.sniff import (
     iter_headers,
     validate_tabular,
 )
-from galaxy.exceptions import InvalidFileFormatError
+from galaxy.exceptions import (
+    InvalidFileFormatError,
+    RequestParameterInvalidException,
+)
 from galaxy.util import compression_utils
 from galaxy.util.compression_utils import (
     FileObjType,
+    FileObjTypeBytes,
     FileObjTypeStr,
 )
 from galaxy.util.markdown import (
@@ -78,6 +91,217 @@ from . import dataproviders
 log = logging.getLogger(__name__)
 
 MAX_DATA_LINES = 100000
+# Column types of data lines are guessed in chunks of this many lines
+GUESS_TYPE_CHUNK_LINES = 1000
+# Size of the blocks of lines read when metadata is set from a sample of a dataset
+SAMPLE_BLOCK_SIZE = 1024 * 1024
+# Line index files are the interval followed by the offsets of every interval-th line
+LINE_INDEX_ENTRY = struct.Struct("<Q")
+
+COLUMN_TYPE_SET_ORDER = ["int", "float", "list", "str"]  # Order to set column types in
+DEFAULT_COLUMN_TYPE = COLUMN_TYPE_SET_ORDER[-1]  # Default column type is lowest in list
+# Values matching these are of the column type for sure, anything else is checked by the is_<type> function
+COLUMN_TYPE_FAST_RE = {
+    "int": re.compile(r"[+-]?\d+"),
+    "float": re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"),
+}
+
+
+def is_int(column_text: str) -> bool:
+    # Don't allow underscores in numeric literals (PEP 515)
+    if "_" in column_text:
+        return False
+    try:
+        int(column_text)
+        return True
+    except ValueError:
+        return False
+
+
+def is_float(column_text: str) -> bool:
+    # Don't allow underscores in numeric literals (PEP 515)
+    if "_" in column_text:
+        return False
+    try:
+        float(column_text)
+        return True
+    except ValueError:
+        if column_text.strip().lower() == "na":
+            return True  # na is special cased to be a float
+        return False
+
+
+def is_list(column_text: str) -> bool:
+    return "," in column_text
+
+
+def is_str(column_text: str) -> bool:
+    # anything, except an empty string, is True
+    if column_text == "":
+        return False
+    return True
+
+
+IS_COLUMN_TYPE = {"int": is_int, "float": is_float, "list": is_list, "str": is_str}
+
+
+def guess_column_type(column_text: str) -> Optional[str]:
+    for column_type in COLUMN_TYPE_SET_ORDER:
+        if IS_COLUMN_TYPE[column_type](column_text):
+            return column_type
+    return None
+
+
+def widen_column_type(column_type: Optional[str], values: Iterable[str]) -> Optional[str]:
+    """Return the column type of a column of type ``column_type`` that also contains ``values``.
+
+    This is the type guessed for the value that comes last in ``COLUMN_TYPE_SET_ORDER``, so
+    only values that are not of ``column_type`` or an earlier type can change the column type.
+    Most columns keep their type, for these all values are usually checked by a single regular
+    expression each.
+    """
+    if column_type == DEFAULT_COLUMN_TYPE:
+        return column_type
+    values = list(values)
+    fast_re = COLUMN_TYPE_FAST_RE.get(column_type) if column_type else None
+    if fast_re is not None and all(map(fast_re.fullmatch, values)):
+        return column_type
+    checks = _column_type_checks(column_type)
+    for value in values:
+        if any(check(value) for check in checks):
+            continue
+        new_column_type = guess_column_type(value)
+        if new_column_type is None:
+            # empty values don't tell us anything
+            continue
+        column_type = new_column_type
+        if column_type == DEFAULT_COLUMN_TYPE:
+            break
+        checks = _column_type_checks(column_type)
+    return column_type
+
+
+def _column_type_checks(column_type: Optional[str]) -> list:
+    if column_type is None:
+        return []
+    return [IS_COLUMN_TYPE[t] for t in COLUMN_TYPE_SET_ORDER[: COLUMN_TYPE_SET_ORDER.index(column_type) + 1]]
+
+
+def guess_column_types(column_types: list, rows: list[list[str]]) -> None:
+    """Update ``column_types`` in place with the fields of ``rows``, adding columns as needed."""
+    if not rows:
+        return
+    num_columns = max(len(fields) for fields in rows)
+    if num_columns > len(column_types):
+        column_types.extend([None] * (num_columns - len(column_types)))
+    # rows with fewer fields are padded with empty values, which never change a column type
+    for i, values in enumerate(itertools.zip_longest(*rows, fillvalue="")):
+        column_types[i] = widen_column_type(column_types[i], values)
+
+
+def iter_sampled_lines(
+    file_name: str, file_size: int, sample_size: int, block_size: int = SAMPLE_BLOCK_SIZE
+) -> Iterator[str]:
+    """Yield the lines of evenly spaced blocks of a file that add up to about ``sample_size`` bytes.
+
+    The first block starts at the beginning and the last block ends at the end of the file.
+    Lines cut by the boundary of a block are skipped, so the same lines are yielded every
+    time and only the first block starts with the first line of the file.
+    """
+    block_size = max(min(block_size, sample_size // 2), 1)
+    num_blocks = max(sample_size // block_size, 2)
+    stride = max(file_size - block_size, 0) / (num_blocks - 1)
+    with open(file_name, "rb") as fh:
+        for block in range(num_blocks):
+            fh.seek(round(block * stride))
+            data = fh.read(block_size)
+            if block > 0:
+                data = data[data.find(b"\n") + 1 :] if b"\n" in data else b""
+            if block < num_blocks - 1:
+                data = data[: data.rfind(b"\n") + 1]
+            # universal newlines like the file objects returned by compression_utils.get_fileobj
+            yield from io.StringIO(data.decode("utf-8"), newline=None)
+
+
+def build_line_index(file_name: str, interval: int, block_size: int = SAMPLE_BLOCK_SIZE) -> "array[int]":
+    """Return the interval followed by the byte offsets of lines 0, interval, 2 * interval, ... of a file."""
+    file_size = os.path.getsize(file_name)
+    line_index = array("Q", [interval])
+    if file_size:
+        line_index.append(0)
+    # number of the line starting after the next newline, and the byte offset of the block
+    line = 1
+    position = 0
+    next_line = interval
+    with open(file_name, "rb") as fh:
+        while block := fh.read(block_size):
+            newlines = block.count(b"\n")
+            if line + newlines > next_line:
+                # lengths of the lines in the block up to each newline, the last one is an incomplete line
+                ends = list(itertools.accumulate(map(len, block.split(b"\n"))))
+                for j in range(next_line - line, newlines, interval):
+                    offset = position + ends[j] + j + 1
+                    if offset < file_size:
+                        line_index.append(offset)
+                    next_line += interval
+            line += newlines
+            position += len(block)
+    return line_index
+
+
+def write_line_index(line_index: "array[int]", path: str) -> None:
+    if sys.byteorder != "little":
+        line_index = array("Q", line_index)
+        line_index.byteswap()
+    with open(path, "wb") as fh:
+        line_index.tofile(fh)
+
+
+def skip_lines(fh: FileObjTypeBytes, lines: int, block_size: int = SAMPLE_BLOCK_SIZE) -> int:
+    """Advance a binary file object by ``lines`` lines and return its new position.
+
+    Stops at the end of the file if it has fewer lines.
+    """
+    position = fh.tell()
+    while lines > 0 and (block := fh.read(block_size)):
+        newlines = block.count(b"\n")
+        if newlines < lines:
+            lines -= newlines
+            position += len(block)
+            continue
+        end = -1
+        for _ in range(lines):
+            end = block.find(b"\n", end + 1)
+        position += end + 1
+        lines = 0
+    fh.seek(position)
+    return position
+
+
+def line_offset(file_name: str, line: int, line_index_file_name: Optional[str] = None) -> int:
+    """Return the byte offset of the ``line``-th line (counting from 0) of a possibly compressed file.
+
+    Lines are skipped from the closest line stored in the line index file (see
+    :func:`build_line_index`) if it is given, and from the start of the file otherwise.
+    """
+    with compression_utils.get_fileobj(file_name, "rb") as fh:
+        return _line_offset(fh, line, line_index_file_name)
+
+
+def _line_offset(fh: FileObjTypeBytes, line: int, line_index_file_name: Optional[str] = None) -> int:
+    start_line = 0
+    start = 0
+    if line_index_file_name:
+        with open(line_index_file_name, "rb") as index_fh:
+            (interval,) = LINE_INDEX_ENTRY.unpack(index_fh.read(LINE_INDEX_ENTRY.size))
+            indexed_lines = os.path.getsize(line_index_file_name) // LINE_INDEX_ENTRY.size - 1
+            entry = min(line // interval, indexed_lines - 1)
+            if entry >= 0:
+                index_fh.seek(LINE_INDEX_ENTRY.size * (1 + entry))
+                (start,) = LINE_INDEX_ENTRY.unpack(index_fh.read(LINE_INDEX_ENTRY.size))
+                start_line = entry * interval
+    fh.seek(start)
+    return skip_lines(fh, line - start_line)
 
 
 @dataproviders.decorators.has_dataproviders
@@ -153,8 +377,20 @@ class TabularData(Text):
             }
         )
 
+    def get_row_offset(self, dataset: DatasetProtocol, row: int) -> int:
+        """Return the offset to pass to :meth:`get_chunk` to display ``dataset`` from its ``row``-th line.
+
+        Lines (including header and comment lines) are counted from 0, the line_index
+        metadata file is used to find the offset if the dataset has one.
+        """
+        if row < 0:
+            raise RequestParameterInvalidException("row must not be negative")
+        index_file = dataset.metadata.line_index
+        with data.get_dataset_fileobj(dataset, "rb") as fh:
+            return _line_offset(fh, row, index_file.get_file_name() if index_file else None)
+
     def _read_chunk(self, trans, dataset: HasFileName, offset: int, ck_size: Optional[int] = None):
-        with compression_utils.get_fileobj(dataset.get_file_name()) as f:
+        with data.get_dataset_fileobj(dataset) as f:
             f.seek(offset)
             try:
                 ck_data = f.read(ck_size or trans.app.config.display_chunk_size)
@@ -181,6 +417,13 @@ class TabularData(Text):
     ):
         headers = kwd.pop("headers", {})
         preview = util.string_as_bool(preview)
+        row = kwd.pop("row", None)
+        if offset is None and row is not None:
+            try:
+                row = int(row)
+            except ValueError:
+                raise RequestParameterInvalidException(f"row must be an integer, got '{row}'")
+            offset = self.get_row_offset(dataset, row)
         if offset is not None:
             return self.get_chunk(trans, dataset, offset, ck_size), headers
         elif to_ext or not preview:
@@ -191,13 +434,13 @@ class TabularData(Text):
             # We should add a new datatype 'matrix', with its own draw method, suitable for this kind of data.
             # For now, default to the old behavior, ugly as it is.  Remove this after adding 'matrix'.
             max_peek_size = 1000000  # 1 MB
-            if os.stat(dataset.get_file_name()).st_size < max_peek_size:
+            if dataset.get_size() < max_peek_size:
                 self._clean_and_set_mime_type(trans, dataset.get_mime(), headers)
-                return open(dataset.get_file_name(), mode="rb"), headers
+                return data.open_dataset_file(dataset), headers
             else:
                 headers["content-type"] = "text/html"
                 headers["x-content-truncated"] = max_peek_size
-                with compression_utils.get_fileobj(dataset.get_file_name(), "rb") as fh:
+                with data.get_dataset_fileobj(dataset, "rb") as fh:
                     return util.unicodify(fh.read(max_peek_size)), headers
         else:
             headers["x-content-chunked"] = "true"
@@ -383,6 +626,26 @@ class Tabular(TabularData):
 
     file_ext = "tabular"
 
+    MetadataElement(
+        name="column_types_sampled",
+        default=False,
+        desc="Column types were guessed from a sample of the data lines",
+        param=MetadataParameter,
+        readonly=True,
+        visible=False,
+        optional=True,
+        no_value=False,
+    )
+    MetadataElement(
+        name="line_index",
+        desc="Byte offsets of every n-th line",
+        param=metadata.FileParameter,
+        file_ext="line_index",
+        readonly=True,
+        visible=False,
+        optional=True,
+    )
+
     def get_column_names(self, first_line: str) -> Optional[list[str]]:
         return None
 
@@ -394,6 +657,8 @@ class Tabular(TabularData):
         skip: Optional[int] = None,
         max_data_lines: Optional[int] = MAX_DATA_LINES,
         max_guess_type_data_lines: Optional[int] = None,
+        sample_size: int = 0,
+        line_index_interval: int = 0,
         **kwd,
     ) -> None:
         """
@@ -409,7 +674,15 @@ class Tabular(TabularData):
         non-optional metadata parameters are properly set; if used, optional
         metadata parameters will be set to None, unless the entire file has
         already been read. Using None for max_data_lines will process all data
-        lines.
+        lines. A positive sample_size (in bytes) makes uncompressed files
+        larger than that be read only partially, in evenly spaced blocks of
+        lines adding up to about sample_size bytes (see iter_sampled_lines);
+        max_data_lines is then ignored and data_lines and comment_lines are
+        set to None. The column_types_sampled metadata element records
+        whether column types were guessed from part of the data lines only.
+        A positive line_index_interval makes the byte offsets of every
+        line_index_interval-th line of uncompressed files be stored in the
+        line_index metadata file, so display can start at any line quickly.
 
         Items of interest:
 
@@ -424,75 +697,30 @@ class Tabular(TabularData):
         requested_skip = skip
         if skip is None:
             skip = 0
-        column_type_set_order = ["int", "float", "list", "str"]  # Order to set column types in
-        default_column_type = column_type_set_order[-1]  # Default column type is lowest in list
-        column_type_compare_order = list(column_type_set_order)  # Order to compare column types
-        column_type_compare_order.reverse()
-
-        def type_overrules_type(new_column_type, old_column_type):
-            if new_column_type is None or new_column_type == old_column_type:
-                return False
-            if old_column_type is None:
-                return True
-            for column_type in column_type_compare_order:
-                if new_column_type == column_type:
-                    return True
-                if old_column_type == column_type:
-                    return False
-            # neither column type was found in our ordered list, this cannot happen
-            raise ValueError(f"Tried to compare unknown column types: {new_column_type} and {old_column_type}")
-
-        def is_int(column_text):
-            # Don't allow underscores in numeric literals (PEP 515)
-            if "_" in column_text:
-                return False
-            try:
-                int(column_text)
-                return True
-            except ValueError:
-                return False
-
-        def is_float(column_text):
-            # Don't allow underscores in numeric literals (PEP 515)
-            if "_" in column_text:
-                return False
-            try:
-                float(column_text)
-                return True
-            except ValueError:
-                if column_text.strip().lower() == "na":
-                    return True  # na is special cased to be a float
-                return False
-
-        def is_list(column_text):
-            return "," in column_text
-
-        def is_str(column_text):
-            # anything, except an empty string, is True
-            if column_text == "":
-                return False
-            return True
-
-        is_column_type = {}  # Dict to store column type string to checking function
-        for column_type in column_type_set_order:
-            is_column_type[column_type] = locals()[f"is_{column_type}"]
-
-        def guess_column_type(column_text):
-            for column_type in column_type_set_order:
-                if is_column_type[column_type](column_text):
-                    return column_type
-            return None
 
         data_lines = 0
         comment_lines = 0
         column_names = None
         column_types: list = []
-        first_line_column_types = []
+        first_line_column_types: list = []
+        # data lines whose column types have not been guessed yet
+        rows: list[list[str]] = []
+        # whether column types are guessed from part of the data lines only
+        sampled = False
+        compressed_format = None
         if dataset.has_data():
+            file_name = dataset.get_file_name()
             # NOTE: if skip > num_check_lines, we won't detect any metadata, and will use default
-            with compression_utils.get_fileobj(dataset.get_file_name()) as dataset_fh:
-                i = 0
-                for line in iter(dataset_fh.readline, ""):
+            compressed_format, dataset_fh = compression_utils.get_fileobj_raw(file_name)
+            with dataset_fh:
+                file_size = os.path.getsize(file_name)
+                reading_sample = bool(sample_size) and compressed_format is None and file_size > sample_size
+                if reading_sample:
+                    sampled = True
+                    lines: Iterable[str] = iter_sampled_lines(file_name, file_size, sample_size)
+                else:
+                    lines = iter(dataset_fh.readline, "")
+                for i, line in enumerate(lines):
                     line = line.rstrip("\r\n")
                     if i == 0:
                         column_names = self.get_column_names(first_line=line)
@@ -503,38 +731,44 @@ class Tabular(TabularData):
                         data_lines += 1
                         if max_guess_type_data_lines is None or data_lines <= max_guess_type_data_lines:
                             fields = line.split("\t")
-                            for field_count, field in enumerate(fields):
-                                if field_count >= len(
-                                    column_types
-                                ):  # found a previously unknown column, we append None
-                                    column_types.append(None)
-                                column_type = guess_column_type(field)
-                                if type_overrules_type(column_type, column_types[field_count]):
-                                    column_types[field_count] = column_type
-                        if i == 0 and requested_skip is None:
-                            # This is our first line, people seem to like to upload files that have a header line, but do not
-                            # start with '#' (i.e. all column types would then most likely be detected as str).  We will assume
-                            # that the first line is always a header (this was previous behavior - it was always skipped).  When
-                            # the requested skip is None, we only use the data from the first line if we have no other data for
-                            # a column.  This is far from perfect, as
-                            # 1,2,3	1.1	2.2	qwerty
-                            # 0	0		1,2,3
-                            # will be detected as
-                            # "column_types": ["int", "int", "float", "list"]
-                            # instead of
-                            # "column_types": ["list", "float", "float", "str"]  *** would seem to be the 'Truth' by manual
-                            # observation that the first line should be included as data.  The old method would have detected as
-                            # "column_types": ["int", "int", "str", "list"]
-                            first_line_column_types = column_types
-                            column_types = [None for col in first_line_column_types]
-                    if max_data_lines is not None and data_lines >= max_data_lines:
+                            if i == 0 and requested_skip is None:
+                                # This is our first line, people seem to like to upload files that have a header line,
+                                # but do not start with '#' (i.e. all column types would then most likely be detected
+                                # as str). We will assume that the first line is always a header (this was previous
+                                # behavior - it was always skipped).  When the requested skip is None, we only use the
+                                # data from the first line if we have no other data for a column.  This is far from
+                                # perfect, as
+                                # 1,2,3	1.1	2.2	qwerty
+                                # 0	0		1,2,3
+                                # will be detected as
+                                # "column_types": ["int", "int", "float", "list"]
+                                # instead of
+                                # "column_types": ["list", "float", "float", "str"]  *** would seem to be the 'Truth'
+                                # by manual observation that the first line should be included as data.  The old
+                                # method would have detected as
+                                # "column_types": ["int", "int", "str", "list"]
+                                first_line_column_types = [guess_column_type(field) for field in fields]
+                                column_types = [None for col in first_line_column_types]
+                            else:
+                                rows.append(fields)
+                                if len(rows) >= GUESS_TYPE_CHUNK_LINES:
+                                    guess_column_types(column_types, rows)
+                                    rows = []
+                        else:
+                            sampled = True
+                    if not reading_sample and max_data_lines is not None and data_lines >= max_data_lines:
                         if dataset_fh.tell() != dataset.get_size():
                             # Clear optional data_lines metadata value
                             data_lines = None  # type: ignore [assignment]
                             # Clear optional comment_lines metadata value; additional comment lines could appear below this point
                             comment_lines = None  # type: ignore [assignment]
+                            sampled = True
                         break
-                    i += 1
+                guess_column_types(column_types, rows)
+                if reading_sample:
+                    # only part of the lines have been read
+                    data_lines = None  # type: ignore [assignment]
+                    comment_lines = None  # type: ignore [assignment]
 
         # we error on the larger number of columns
         # first we pad our column_types by using data from first line
@@ -545,17 +779,36 @@ class Tabular(TabularData):
         for i in range(len(column_types)):
             if column_types[i] is None:
                 if len(first_line_column_types) <= i or first_line_column_types[i] is None:
-                    column_types[i] = default_column_type
+                    column_types[i] = DEFAULT_COLUMN_TYPE
                 else:
                     column_types[i] = first_line_column_types[i]
         # Set the discovered metadata values for the dataset
         dataset.metadata.data_lines = data_lines
         dataset.metadata.comment_lines = comment_lines
         dataset.metadata.column_types = column_types
+        dataset.metadata.column_types_sampled = sampled
         dataset.metadata.columns = len(column_types)
         dataset.metadata.delimiter = "\t"
         if column_names is not None:
             dataset.metadata.column_names = column_names
+        if line_index_interval and dataset.has_data() and compressed_format is None:
+            self._set_line_index(dataset, line_index_interval, kwd.get("metadata_tmp_files_dir"))
+
+    def _set_line_index(
+        self, dataset: DatasetProtocol, interval: int, metadata_tmp_files_dir: Optional[str] = None
+    ) -> None:
+        line_index = build_line_index(dataset.get_file_name(), interval)
+        if len(line_index) <= 2:
+            # not more than interval lines, nothing to gain from an index
+            dataset.metadata.line_index = None
+            return
+        index_file = dataset.metadata.line_index
+        if not index_file:
+            index_file = dataset.metadata.spec["line_index"].param.new_file(
+                dataset=dataset, metadata_tmp_files_dir=metadata_tmp_files_dir
+            )
+        write_line_index(line_index, index_file.get_file_name())
+        dataset.metadata.line_index = index_file
 
     def as_gbrowse_display_file(self, dataset: HasFileName, **kwd) -> Union[FileObjType, str]:
         return open(dataset.get_file_name(), "rb")
@@ -352,6 +352,7 @@ def collect_primary_datasets(job_context: BaseJobContext, output: dict[str, Data
                 dataset_collector(description) for description in output_def.dataset_collector_descriptions
             ]
         filenames = {}
+        new_primary_datasets = []
         for discovered_file in discover_files(
             name, job_context.tool_provided_metadata, dataset_collectors, job_working_directory, outdata
         ):
@@ -417,9 +418,12 @@ def collect_primary_datasets(job_context: BaseJobContext, output: dict[str, Data
             )
             # Associate new dataset with job
             job_context.add_output_dataset_association(f"__new_primary_file_{name}|{designation}__", primary_data)
-            job_context.add_datasets_to_history([primary_data], for_output_dataset=outdata)
+            new_primary_datasets.append(primary_data)
             # Add dataset to return dict
             primary_datasets[name][designation] = primary_data
+        if new_primary_datasets:
+            # Add all datasets of this output at once, their hids are allocated with a single update
+            job_context.add_datasets_to_history(new_primary_datasets, for_output_dataset=outdata)
         if primary_output_assigned:
             outdata.name = new_outdata_name
             outdata.init_meta()
@@ -482,20 +486,24 @@ def walk_over_extra_files(target_dir, extra_file_collector, job_working_director
     def _walk(target_dir, extra_file_collector, job_working_directory, matchable, parent_paths):
         directory = discover_target_directory(target_dir, job_working_directory)
         if os.path.isdir(directory):
-            for filename in os.listdir(directory):
-                path = os.path.join(directory, filename)
-                if os.path.isdir(path):
-                    if extra_file_collector.recurse:
-                        new_parent_paths = parent_paths[:]
-                        new_parent_paths.append(filename)
-                        # The current directory is already validated, so use that as the next job_working_directory when recursing
-                        yield from _walk(
-                            filename, extra_file_collector, directory, matchable, parent_paths=new_parent_paths
+            # scandir streams the listing and mostly tells directories apart without a stat call per file
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    if entry.is_dir():
+                        if extra_file_collector.recurse:
+                            new_parent_paths = parent_paths[:]
+                            new_parent_paths.append(filename)
+                            # The current directory is already validated, so use that as the next job_working_directory when recursing
+                            yield from _walk(
+                                filename, extra_file_collector, directory, matchable, parent_paths=new_parent_paths
+                            )
+                    else:
+                        match = extra_file_collector.match(
+                            matchable, filename, path=entry.path, parent_paths=parent_paths
                         )
-                else:
-                    match = extra_file_collector.match(matchable, filename, path=path, parent_paths=parent_paths)
-                    if match:
-                        yield match
+                        if match:
+                            yield match
 
     yield from extra_file_collector.sort(
         _walk(target_dir, extra_file_collector, job_working_directory, matchable, parent_paths)
@@ -606,6 +614,7 @@ def collect_extra_files(
     dataset: "DatasetInstance",
     job_working_directory: str,
     outputs_to_working_directory: bool = False,
+    max_workers: int = 1,
 ):
     # TODO: should this use compute_environment to determine the extra files path ?
     assert dataset.dataset
@@ -633,6 +642,7 @@ def collect_extra_files(
             src_extra_files_path=temp_file_path,
             primary_data=dataset,
             extra_files_path_name=real_file_name,
+            max_workers=max_workers,
         )
     except Exception as e:
         log.debug("Error in collect_associated_files: %s", unicodify(e))
@@ -91,6 +91,7 @@ from galaxy.objectstore import (
     ObjectStorePopulator,
     serialize_static_object_store_config,
 )
+from galaxy.objectstore._metadata_cache import coalesced_metadata_invalidations
 from galaxy.schema.tasks import ComputeDatasetHashTaskRequest
 from galaxy.structured_app import MinimalManagerApp
 from galaxy.tool_util.deps import requirements
@@ -1520,6 +1521,7 @@ class MinimalJobWrapper(HasResourceParameters):
 
             self.sa_session.add(job)
             self.sa_session.commit()
+            self._request_workflow_scheduling(job)
         else:
             for dataset_assoc in job.output_datasets:
                 dataset = dataset_assoc.dataset
@@ -1959,7 +1961,13 @@ class MinimalJobWrapper(HasResourceParameters):
             dataset.dataset.uuid = context["uuid"]
         self.__update_output(job, dataset)
         if not purged:
-            collect_extra_files(self.object_store, dataset, self.working_directory, self.outputs_to_working_directory)
+            collect_extra_files(
+                self.object_store,
+                dataset,
+                self.working_directory,
+                self.outputs_to_working_directory,
+                max_workers=self.app.config.job_output_upload_workers,
+            )
         if job.states.ERROR == final_job_state:
             dataset.blurb = "error"
             if not implicit_collection_jobs:
@@ -2039,12 +2047,37 @@ class MinimalJobWrapper(HasResourceParameters):
         the output datasets based on stderr and stdout from the command, and
         the contents of the output files.
         """
+        # tell other Galaxy processes about all changed output objects at once
+        with coalesced_metadata_invalidations():
+            return self._finish(
+                tool_stdout,
+                tool_stderr,
+                tool_exit_code=tool_exit_code,
+                job_stdout=job_stdout,
+                job_stderr=job_stderr,
+                check_output_detected_state=check_output_detected_state,
+                remote_metadata_directory=remote_metadata_directory,
+                job_metrics_directory=job_metrics_directory,
+            )
+
+    def _finish(
+        self,
+        tool_stdout,
+        tool_stderr,
+        tool_exit_code=None,
+        job_stdout=None,
+        job_stderr=None,
+        check_output_detected_state=None,
+        remote_metadata_directory=None,
+        job_metrics_directory=None,
+    ):
         finish_timer = self.app.execution_timer_factory.get_timer(
             "internals.galaxy.jobs.job_wrapper_finish", "job_wrapper.finish for job ${job_id} executed"
         )
 
         # default post job setup
         job = self.get_job()
+        phase_timer = self._next_finish_phase(job, None, "collect_outputs")
 
         def fail(message=job.info, exception=None):
             if not isinstance(exception, (AssertionError, MessageException)):
@@ -2125,6 +2158,7 @@ class MinimalJobWrapper(HasResourceParameters):
                         return fail(f"Job {job.id}'s output dataset(s) could not be read")
 
         job_context = ExpressionContext(dict(stdout=tool_stdout, stderr=tool_stderr))
+        phase_timer = self._next_finish_phase(job, phase_timer, "discover_outputs")
         if extended_metadata:
             try:
                 import_options = store.ImportOptions(allow_dataset_object_edit=True, allow_edit=True)
@@ -2167,6 +2201,8 @@ class MinimalJobWrapper(HasResourceParameters):
                     }
                 ]
 
+        phase_timer = self._next_finish_phase(job, phase_timer, "finish_datasets")
+        if not extended_metadata:
             for dataset_assoc in output_dataset_associations:
                 is_discovered_dataset = getattr(dataset_assoc.dataset, "discovered", False)
                 context = self.get_dataset_finish_context(job_context, dataset_assoc)
@@ -2218,6 +2254,7 @@ class MinimalJobWrapper(HasResourceParameters):
             job.exit_code = tool_exit_code
         # custom post process setup
 
+        phase_timer = self._next_finish_phase(job, phase_timer, "set_sizes")
         collected_bytes = 0
         quota_source_info = None
         # Once datasets are collected, set the total dataset size (includes extra files)
@@ -2256,6 +2293,7 @@ class MinimalJobWrapper(HasResourceParameters):
 
         # Certain tools require tasks to be completed after job execution
         # ( this used to be performed in the "exec_after_process" hook, but hooks are deprecated ).
+        phase_timer = self._next_finish_phase(job, phase_timer, "post_process")
         param_dict = self.get_param_dict(job)
         task_wrapper = None
         try:
@@ -2280,6 +2318,7 @@ class MinimalJobWrapper(HasResourceParameters):
 
         self._fix_output_permissions()
 
+        phase_timer = self._next_finish_phase(job, phase_timer, "flush")
         # Empirically, we need to update job.user and
         # job.workflow_invocation_step.workflow_invocation in separate
         # transactions. Best guess as to why is that the workflow_invocation
@@ -2297,6 +2336,7 @@ class MinimalJobWrapper(HasResourceParameters):
             # If job was composed of tasks, don't attempt to recollect statistics
             self._collect_metrics(job, job_metrics_directory)
         self.sa_session.commit()
+        self._request_workflow_scheduling(job)
         if job.state == job.states.ERROR:
             self._report_error()
         elif task_wrapper:
@@ -2306,8 +2346,24 @@ class MinimalJobWrapper(HasResourceParameters):
         cleanup_job = self.cleanup_job
         delete_files = cleanup_job == "always" or (job.state == job.states.OK and cleanup_job == "onsuccess")
         self.cleanup(delete_files=delete_files)
+        log.debug(phase_timer.to_str(job_id=self.job_id, tool_id=job.tool_id))
         log.debug(finish_timer.to_str(job_id=self.job_id, tool_id=job.tool_id))
 
+    def _next_finish_phase(self, job, phase_timer, phase):
+        """Report the time spent in the current phase of ``finish`` and start timing the next one."""
+        if phase_timer is not None:
+            log.debug(phase_timer.to_str(job_id=self.job_id, tool_id=job.tool_id))
+        return self.app.execution_timer_factory.get_timer(
+            f"internals.galaxy.jobs.job_wrapper_finish.{phase}",
+            f"job_wrapper.finish phase {phase} for job ${{job_id}} executed",
+        )
+
+    def _request_workflow_scheduling(self, job):
+        # Workflow invocations waiting on the outputs of this job can make progress now
+        workflow_scheduling_manager = getattr(self.app, "workflow_scheduling_manager", None)
+        if workflow_scheduling_manager is not None:
+            workflow_scheduling_manager.request_scheduling_for_history(job.history_id)
+
     def discover_outputs(self, job, inp_data, out_data, out_collections, final_job_state):
         # Try to just recover input_ext and dbkey from job parameters (used and set in
         # galaxy.tools.actions). Old jobs may have not set these in the job parameters
@@ -2567,6 +2623,8 @@ class MinimalJobWrapper(HasResourceParameters):
             job=job,
             max_metadata_value_size=self.app.config.max_metadata_value_size,
             max_discovered_files=self.app.config.max_discovered_files,
+            metadata_sample_size=self.app.config.metadata_sample_size,
+            line_index_interval=self.app.config.tabular_line_index_interval,
             validate_outputs=self.validate_outputs,
             link_data_only=self.__link_file_check(),
             **kwds,
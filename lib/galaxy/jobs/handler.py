@@ -27,6 +27,7 @@ from sqlalchemy.sql.expression import (
     or_,
     select,
     true,
+    update,
 )
 
 from galaxy import model
@@ -36,6 +37,7 @@ from galaxy.jobs import (
     JobWrapper,
     TaskWrapper,
 )
+from galaxy.jobs.job_counts import JobCountTracker
 from galaxy.jobs.job_destination import JobDestination
 from galaxy.jobs.mapper import JobNotReadyException
 from galaxy.managers.jobs import get_jobs_to_check_at_startup
@@ -265,6 +267,9 @@ class JobHandlerQueue(BaseJobHandlerQueue):
 
         # Initialize structures for handling job limits
         self.__clear_job_count()
+        self.job_count_tracker: Optional[JobCountTracker] = None
+        if self.app.config.cache_user_job_count and self.app.config.cache_user_job_count_reconcile_interval > 0:
+            self.job_count_tracker = JobCountTracker(self.app.config.cache_user_job_count_reconcile_interval)
         # Contains job ids for jobs that are waiting (only use from monitor thread)
         self.waiting_jobs: list[int] = []
         # Contains wrappers of jobs that are limited or ready (so they aren't created unnecessarily/multiple times)
@@ -532,9 +537,12 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 pass
         # Ensure that we get new job counts on each iteration
         self.__clear_job_count()
-        self.__cache_total_job_count_per_destination()
-        self.__cache_user_job_count_per_destination()
-        self.__cache_user_job_count()
+        if self.job_count_tracker is not None:
+            self.__copy_tracked_job_counts()
+        else:
+            self.__cache_total_job_count_per_destination()
+            self.__cache_user_job_count_per_destination()
+            self.__cache_user_job_count()
         # Check resubmit jobs first so that limits of new jobs will still be enforced
         for job in resubmit_jobs:
             log.debug("(%s) Job was resubmitted and is being dispatched immediately", job.id)
@@ -543,9 +551,12 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             if jw.is_ready_for_resubmission(job):
                 self.increase_running_job_count(job.user_id, jw.job_destination.id)
                 self.dispatcher.put(jw)
+        # Jobs of users that are already at their concurrency limit can't be dispatched on this iteration, resolve
+        # them for the whole batch up front so no job wrapper or destination is computed for them.
+        jobs_to_check, new_waiting_jobs = self.__partition_user_limited_jobs(jobs_to_check)
+        ready_job_wrappers: list[JobWrapper] = []
         # Iterate over new and waiting jobs and look for any that are
         # ready to run
-        new_waiting_jobs = []
         for job in jobs_to_check:
             try:
                 # Check the job's dependencies, requeue if they're not done.
@@ -563,8 +574,7 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 elif job_state == JOB_INPUT_DELETED:
                     log.info("(%d) Job unable to run: one or more inputs deleted", job.id)
                 elif job_state == JOB_READY:
-                    self.dispatcher.put(self.job_wrappers.pop(job.id))
-                    log.info("(%d) Job dispatched", job.id)
+                    ready_job_wrappers.append(self.job_wrappers.pop(job.id))
                 elif job_state == JOB_DELETED:
                     log.info("(%d) Job deleted by user while still queued", job.id)
                 elif job_state == JOB_ADMIN_DELETED:
@@ -585,6 +595,15 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                     new_waiting_jobs.append(job.id)
             except Exception:
                 log.exception("failure running job %d", job.id)
+        if ready_job_wrappers:
+            # We record the input dataset versions, now that we know the inputs are ready
+            self.__record_input_dataset_versions([jw.job_id for jw in ready_job_wrappers])
+            for job_wrapper in ready_job_wrappers:
+                try:
+                    self.dispatcher.put(job_wrapper)
+                    log.info("(%d) Job dispatched", job_wrapper.job_id)
+                except Exception:
+                    log.exception("failure running job %d", job_wrapper.job_id)
         # Update the waiting list
         if not self.track_jobs_in_database:
             self.waiting_jobs = new_waiting_jobs
@@ -707,12 +726,46 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         if state == JOB_READY:
             # PASS.  increase usage by one job (if caching) so that multiple jobs aren't dispatched on this queue iteration
             self.increase_running_job_count(job.user_id, job_destination.id)
-            for job_to_input_dataset_association in job.input_datasets:
-                # We record the input dataset version, now that we know the inputs are ready
-                if job_to_input_dataset_association.dataset:
-                    job_to_input_dataset_association.dataset_version = job_to_input_dataset_association.dataset.version
         return state
 
+    def __partition_user_limited_jobs(self, jobs: list[model.Job]) -> tuple[list[model.Job], list[int]]:
+        """
+        Split ``jobs`` into jobs that still need to be checked and ids of jobs owned by registered users that are
+        already at ``registered_user_concurrent_jobs``. Counts for all users in the batch are fetched at once.
+        """
+        limit = self.app.job_config.limits.registered_user_concurrent_jobs
+        if not limit or not self.track_jobs_in_database:
+            # In-memory tracked jobs still need their inputs verified before waiting on limits
+            return jobs, []
+        user_ids = {job.user_id for job in jobs if job.user_id is not None and not job.copied_from_job_id}
+        if not user_ids:
+            return jobs, []
+        user_job_counts = self.get_user_job_counts(user_ids)
+        jobs_to_check = []
+        limited_job_ids = []
+        for job in jobs:
+            if job.user_id in user_ids and user_job_counts.get(job.user_id, 0) >= limit:
+                limited_job_ids.append(job.id)
+            else:
+                jobs_to_check.append(job)
+        if limited_job_ids:
+            log.debug("%d waiting jobs skipped, owners at their concurrent job limit", len(limited_job_ids))
+        return jobs_to_check, limited_job_ids
+
+    def __record_input_dataset_versions(self, job_ids: list[int]) -> None:
+        """
+        Record the current version of all input HDAs of the given jobs in a single statement.
+        """
+        association = model.JobToInputDatasetAssociation
+        hda = model.HistoryDatasetAssociation
+        current_version = select(hda.version).where(hda.id == association.dataset_id).scalar_subquery()
+        self.sa_session.execute(
+            update(association)
+            .where(and_(association.job_id.in_(job_ids), association.dataset_id != null()))
+            .values(dataset_version=current_version)
+            .execution_options(synchronize_session=False)
+        )
+
     def __verify_job_ready(self, job: model.Job, job_wrapper: JobWrapper):
         """Compute job destination and verify job is ready at that
         destination by checking job limits and quota. If this method
@@ -749,41 +802,51 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             state = self.__check_user_jobs(job, job_wrapper)
         # Check total walltime limits
         if state == JOB_READY and "delta" in self.app.job_config.limits.total_walltime:
-            jobs_to_check = self.sa_session.query(model.Job).filter(
-                model.Job.update_time
-                >= datetime.datetime.now() - datetime.timedelta(self.app.job_config.limits.total_walltime["window"]),
-                model.Job.state == "ok",
-            )
-            if job.user_id:
-                jobs_to_check = jobs_to_check.filter(model.Job.user_id == job.user_id)
-            else:
-                jobs_to_check = jobs_to_check.filter(model.Job.session_id == job.session_id)
-            time_spent = datetime.timedelta(0)
-            for job in jobs_to_check:
-                # History is job.state_history
-                started = None
-                finished = None
-                for history in sorted(job.state_history, key=lambda h: h.create_time):
-                    if history.state == "running":
-                        started = history.create_time
-                    elif history.state == "ok":
-                        finished = history.create_time
-
-                if started is not None and finished is not None:
-                    time_spent += finished - started
-                else:
-                    log.warning(
-                        "Unable to calculate time spent for job %s; started: %s, finished: %s",
-                        job.id,
-                        started,
-                        finished,
-                    )
-
-            if time_spent > self.app.job_config.limits.total_walltime["delta"]:
+            if self.__get_total_walltime_spent(job) > self.app.job_config.limits.total_walltime["delta"]:
                 return JOB_USER_OVER_TOTAL_WALLTIME, job_destination
 
         return state, job_destination
 
+    def __get_total_walltime_spent(self, job: model.Job) -> datetime.timedelta:
+        """
+        Sum the walltime of the job owner's finished jobs within the configured window. The result is computed
+        once per user (or session) and handler iteration.
+        """
+        owner_key = ("user", job.user_id) if job.user_id else ("session", job.session_id)
+        if owner_key in self.total_walltime_spent:
+            return self.total_walltime_spent[owner_key]
+        jobs_to_check = self.sa_session.query(model.Job).filter(
+            model.Job.update_time
+            >= datetime.datetime.now() - datetime.timedelta(self.app.job_config.limits.total_walltime["window"]),
+            model.Job.state == "ok",
+        )
+        if job.user_id:
+            jobs_to_check = jobs_to_check.filter(model.Job.user_id == job.user_id)
+        else:
+            jobs_to_check = jobs_to_check.filter(model.Job.session_id == job.session_id)
+        time_spent = datetime.timedelta(0)
+        for finished_job in jobs_to_check:
+            # History is job.state_history
+            started = None
+            finished = None
+            for history in sorted(finished_job.state_history, key=lambda h: h.create_time):
+                if history.state == "running":
+                    started = history.create_time
+                elif history.state == "ok":
+                    finished = history.create_time
+
+            if started is not None and finished is not None:
+                time_spent += finished - started
+            else:
+                log.warning(
+                    "Unable to calculate time spent for job %s; started: %s, finished: %s",
+                    finished_job.id,
+                    started,
+                    finished,
+                )
+        self.total_walltime_spent[owner_key] = time_spent
+        return time_spent
+
     def __verify_in_memory_job_inputs(self, job):
         """Perform the same checks that happen via SQL for in-memory managed
         jobs.
@@ -826,6 +889,7 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         self.user_job_count = None
         self.user_job_count_per_destination = None
         self.total_job_count_per_destination = None
+        self.total_walltime_spent: dict[tuple[str, Optional[int]], datetime.timedelta] = {}
 
     def get_user_job_count(self, user_id):
         # This could have been incremented by a previous job dispatched on this iteration, even if we're not caching
@@ -846,6 +910,38 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 rval += row[0]
         return rval
 
+    def get_user_job_counts(self, user_ids) -> dict[int, int]:
+        """
+        Like ``get_user_job_count`` but for many users at once, using a single query if counts aren't cached.
+        """
+        rval = {user_id: self.user_job_count.get(user_id, 0) for user_id in user_ids}
+        if not self.app.config.cache_user_job_count:
+            result = self.sa_session.execute(
+                select(model.Job.table.c.user_id, func.count(model.Job.table.c.id))
+                .where(
+                    and_(
+                        model.Job.table.c.state.in_(
+                            (model.Job.states.QUEUED, model.Job.states.RUNNING, model.Job.states.RESUBMITTED)
+                        ),
+                        model.Job.table.c.user_id.in_(list(user_ids)),
+                    )
+                )
+                .group_by(model.Job.table.c.user_id)
+            )
+            for user_id, count in result:
+                rval[user_id] += count
+        return rval
+
+    def __copy_tracked_job_counts(self):
+        # Counts are copied since they are incremented for jobs dispatched during this iteration
+        assert self.job_count_tracker is not None
+        self.job_count_tracker.update(self.sa_session)
+        self.user_job_count = dict(self.job_count_tracker.user_job_count)
+        self.user_job_count_per_destination = {
+            user_id: dict(counts) for user_id, counts in self.job_count_tracker.user_job_count_per_destination.items()
+        }
+        self.total_job_count_per_destination = dict(self.job_count_tracker.total_job_count_per_destination)
+
     def __cache_user_job_count(self):
         # Cache the job count if necessary
         if self.user_job_count is None and self.app.config.cache_user_job_count:
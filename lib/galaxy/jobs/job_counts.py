@@ -0,0 +1,105 @@
+"""
+Incrementally maintained counts of dispatched jobs used to enforce job concurrency limits.
+"""
+
+import datetime
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+
+from galaxy import model
+from galaxy.model.orm.now import now
+
+log = logging.getLogger(__name__)
+
+# Job states counted towards ``registered_user_concurrent_jobs``
+USER_COUNTED_STATES = (model.Job.states.QUEUED, model.Job.states.RUNNING, model.Job.states.RESUBMITTED)
+# Job states counted towards the per destination limits
+DESTINATION_COUNTED_STATES = (model.Job.states.QUEUED, model.Job.states.RUNNING)
+# Jobs updated this long before the previous update are read again to tolerate clock skew between processes
+DEFAULT_UPDATE_OVERLAP = datetime.timedelta(seconds=30)
+
+JobCountKey = tuple[str, Optional[int], Optional[str]]
+
+
+class JobCountTracker:
+    """
+    Tracks the number of queued and running jobs per user, per user and destination and per destination.
+
+    Instead of aggregating the whole job table on every handler iteration, only jobs updated since the
+    previous call to :meth:`update` are read and their contribution to the counts is replaced. Applying the
+    same job twice is harmless, so the window of updated jobs overlaps the previous one. A full recount
+    happens every ``reconcile_interval`` seconds to pick up anything missed (e.g. deleted job rows).
+    """
+
+    def __init__(self, reconcile_interval: float, update_overlap: datetime.timedelta = DEFAULT_UPDATE_OVERLAP) -> None:
+        self.reconcile_interval = datetime.timedelta(seconds=reconcile_interval)
+        self.update_overlap = update_overlap
+        self.user_job_count: dict[int, int] = {}
+        self.user_job_count_per_destination: dict[Optional[int], dict[Optional[str], int]] = {}
+        self.total_job_count_per_destination: dict[Optional[str], int] = {}
+        self._counted_jobs: dict[int, JobCountKey] = {}
+        self._last_update: Optional[datetime.datetime] = None
+        self._last_reconcile: Optional[datetime.datetime] = None
+
+    def update(self, session) -> None:
+        """Bring the counts up to date with the job table."""
+        update_time = now()
+        if self._last_reconcile is None or update_time - self._last_reconcile >= self.reconcile_interval:
+            self.reconcile(session, update_time)
+        else:
+            assert self._last_update is not None
+            job_table = model.Job.table
+            stmt = select(job_table.c.id, job_table.c.state, job_table.c.user_id, job_table.c.destination_id).where(
+                job_table.c.update_time >= self._last_update - self.update_overlap
+            )
+            for job_id, state, user_id, destination_id in session.execute(stmt):
+                self.set_job(job_id, state, user_id, destination_id)
+        self._last_update = update_time
+
+    def reconcile(self, session, reconcile_time: Optional[datetime.datetime] = None) -> None:
+        """Recount all queued and running jobs."""
+        reconcile_time = reconcile_time or now()
+        self.user_job_count = {}
+        self.user_job_count_per_destination = {}
+        self.total_job_count_per_destination = {}
+        self._counted_jobs = {}
+        job_table = model.Job.table
+        stmt = select(job_table.c.id, job_table.c.state, job_table.c.user_id, job_table.c.destination_id).where(
+            job_table.c.state.in_(USER_COUNTED_STATES)
+        )
+        for job_id, state, user_id, destination_id in session.execute(stmt):
+            self.set_job(job_id, state, user_id, destination_id)
+        self._last_reconcile = reconcile_time
+        self._last_update = reconcile_time
+        log.debug("Recounted %d dispatched jobs", len(self._counted_jobs))
+
+    def set_job(self, job_id: int, state: str, user_id: Optional[int], destination_id: Optional[str]) -> None:
+        """Replace the contribution of job ``job_id`` to the counts with its current state."""
+        previous = self._counted_jobs.pop(job_id, None)
+        if previous is not None:
+            self._apply(previous, -1)
+        if state in USER_COUNTED_STATES:
+            key = (state, user_id, destination_id)
+            self._counted_jobs[job_id] = key
+            self._apply(key, 1)
+
+    def _apply(self, key: JobCountKey, delta: int) -> None:
+        state, user_id, destination_id = key
+        if user_id is not None:
+            _increment(self.user_job_count, user_id, delta)
+        if state in DESTINATION_COUNTED_STATES:
+            per_destination = self.user_job_count_per_destination.setdefault(user_id, {})
+            _increment(per_destination, destination_id, delta)
+            if not per_destination:
+                del self.user_job_count_per_destination[user_id]
+            _increment(self.total_job_count_per_destination, destination_id, delta)
+
+
+def _increment(counts: dict, key, delta: int) -> None:
+    count = counts.get(key, 0) + delta
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
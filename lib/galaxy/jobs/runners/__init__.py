@@ -100,7 +100,10 @@ class BaseJobRunner:
     runner_name = "BaseJobRunner"
 
     start_methods = ["_init_monitor_thread", "_init_worker_threads"]
-    DEFAULT_SPECS = dict(recheck_missing_job_retries=dict(map=int, valid=lambda x: int(x) >= 0, default=0))
+    DEFAULT_SPECS = dict(
+        recheck_missing_job_retries=dict(map=int, valid=lambda x: int(x) >= 0, default=0),
+        finish_workers=dict(map=int, valid=lambda x: int(x) >= 0, default=0),
+    )
 
     def __init__(self, app: "GalaxyManagerApplication", nworkers: int, **kwargs) -> None:
         """Start the job runner"""
@@ -122,7 +125,7 @@ class BaseJobRunner:
             getattr(self, start_method, lambda: None)()
 
     def _init_worker_threads(self):
-        """Start ``nworkers`` worker threads."""
+        """Start ``nworkers`` worker threads and ``finish_workers`` threads dedicated to finishing jobs."""
         self.work_queue = Queue()
         self.work_threads = []
         log.debug(f"Starting {self.nworkers} {self.runner_name} workers")
@@ -131,24 +134,39 @@ class BaseJobRunner:
             worker.daemon = True
             worker.start()
             self.work_threads.append(worker)
+        # Finishing jobs with many outputs can take long, a pool of its own keeps it from delaying job submission.
+        finish_workers = self.runner_params["finish_workers"]
+        self.finish_queue = Queue() if finish_workers else self.work_queue
+        self.finish_threads = []
+        if finish_workers:
+            log.debug(f"Starting {finish_workers} {self.runner_name} finish workers")
+        for i in range(finish_workers):
+            worker = threading.Thread(
+                name=f"{self.runner_name}.finish_thread-{i}", target=self.run_next, args=(self.finish_queue,)
+            )
+            worker.daemon = True
+            worker.start()
+            self.finish_threads.append(worker)
 
     def _alive_worker_threads(self, cycle=False):
         # yield endlessly as long as there are alive threads if cycle is True
         alive = True
         while alive:
             alive = False
-            for thread in self.work_threads:
+            for thread in self.work_threads + self.finish_threads:
                 if thread.is_alive():
                     if cycle:
                         alive = True
                     yield thread
 
-    def run_next(self):
+    def run_next(self, work_queue: Optional[Queue] = None):
         """Run the next item in the work queue (a job waiting to run)"""
+        if work_queue is None:
+            work_queue = self.work_queue
         while self._should_stop is False:
             with self.app.model.session():  # Create a Session instance and ensure it's closed.
                 try:
-                    method, arg = self.work_queue.get(timeout=1)
+                    method, arg = work_queue.get(timeout=1)
                 except Empty:
                     continue
                 if method is STOP_SIGNAL:
@@ -180,7 +198,7 @@ class BaseJobRunner:
                 except Exception:
                     log.exception(f"({job_id}) Unhandled exception calling {name}")
                     if not isinstance(arg, JobState):
-                        job_state = JobState(job_wrapper=arg, job_destination={})
+                        job_state = JobState(job_wrapper=arg, job_destination=JobDestination())
                     else:
                         job_state = arg
                     if method != self.fail_job:
@@ -226,6 +244,8 @@ class BaseJobRunner:
         self._should_stop = True
         for _ in range(len(self.work_threads)):
             self.work_queue.put((STOP_SIGNAL, None))
+        for _ in range(len(self.finish_threads)):
+            self.finish_queue.put((STOP_SIGNAL, None))
 
         if (join_timeout := self.app.config.monitor_thread_join_timeout) > 0:
             log.info("Waiting up to %d seconds for job worker threads to shutdown...", join_timeout)
@@ -982,7 +1002,7 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
         self._finish_or_resubmit_job(job_state, stdout, stderr, job_id=galaxy_id_tag, external_job_id=external_job_id)
 
     def mark_as_finished(self, job_state):
-        self.work_queue.put((self.finish_job, job_state))
+        self.finish_queue.put((self.finish_job, job_state))
 
     def mark_as_failed(self, job_state):
         self.work_queue.put((self.fail_job, job_state))
@@ -28,6 +28,7 @@ __all__ = ("ShellJobRunner",)
 
 DEFAULT_EMBED_METADATA_IN_JOB = True
 MAX_SUBMIT_RETRY = 3
+MAX_MULTIPLE_STATUS_JOBS = 500
 
 
 class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
@@ -43,6 +44,11 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
         self.cli_interface = CliInterface()
 
+    def shutdown(self):
+        """Attempts to gracefully shut down the monitor thread and close persistent shell sessions"""
+        super().shutdown()
+        self.cli_interface.close()
+
     def get_cli_plugins(self, shell_params, job_params):
         return self.cli_interface.get_plugins(shell_params, job_params)
 
@@ -164,6 +170,9 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         new_watched = []
 
         job_states = self.__get_job_states()
+        missing_job_states = self.__get_missing_job_states(
+            [ajs for ajs in self.watched if ajs.job_id not in job_states]
+        )
 
         for ajs in self.watched:
             external_job_id = ajs.job_id
@@ -173,7 +182,8 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
             if state is None:
                 if ajs.job_wrapper.get_state() == model.Job.states.DELETED:
                     continue
-
+                state = missing_job_states.get(external_job_id, None)
+            if state is None:
                 log.debug(f"({id_tag}/{external_job_id}) job not found in batch state check")
                 shell_params, job_params = self.parse_destination_params(ajs.job_destination.params)
                 shell, job_interface = self.get_cli_plugins(shell_params, job_params)
@@ -203,10 +213,12 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                 external_metadata = not asbool(
                     ajs.job_wrapper.job_destination.params.get("embed_metadata_in_job", DEFAULT_EMBED_METADATA_IN_JOB)
                 )
-                if external_metadata:
-                    self.work_queue.put((self.handle_metadata_externally, ajs))
                 log.debug(f"({id_tag}/{external_job_id}) job execution finished, running job wrapper finish method")
-                self.work_queue.put((self.finish_job, ajs))
+                if external_metadata:
+                    # metadata must be set before the job is finished, do both in the same task
+                    self.finish_queue.put((self.finish_job_with_external_metadata, ajs))
+                else:
+                    self.mark_as_finished(ajs)
             else:
                 new_watched.append(ajs)
         # Replace the watch list with the updated version
@@ -215,6 +227,10 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
     def handle_metadata_externally(self, ajs):
         self._handle_metadata_externally(ajs.job_wrapper, resolve_requirements=True)
 
+    def finish_job_with_external_metadata(self, ajs):
+        self.handle_metadata_externally(ajs)
+        self.finish_job(ajs)
+
     def __handle_job_failure_reasons(self, ajs, external_job_id):
         shell_params, job_params = self.parse_destination_params(ajs.job_destination.params)
         shell, job_interface = self.get_cli_plugins(shell_params, job_params)
@@ -240,28 +256,52 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                 ajs.runner_state = reported_jobstate
                 log.info(logmsg)
 
+    def __group_by_shell(self, watched):
+        """Group jobs of destinations sharing a shell and job plugin, so their states are queried with one command."""
+        groups = {}
+        destination_plugins = {}
+        for ajs in watched:
+            if ajs.job_destination.id not in destination_plugins:
+                shell_params, job_params = self.parse_destination_params(ajs.job_destination.params)
+                shell, job_interface = self.get_cli_plugins(shell_params, job_params)
+                key = (id(shell), job_params.get("plugin"))
+                destination_plugins[ajs.job_destination.id] = (key, shell, job_interface)
+            key, shell, job_interface = destination_plugins[ajs.job_destination.id]
+            if key not in groups:
+                groups[key] = dict(shell=shell, job_interface=job_interface, job_ids=[ajs.job_id])
+            else:
+                groups[key]["job_ids"].append(ajs.job_id)
+        return groups.values()
+
     def __get_job_states(self):
-        job_destinations = {}
         job_states = {}
-        # unique the list of destinations
-        for ajs in self.watched:
-            if ajs.job_destination.id not in job_destinations:
-                job_destinations[ajs.job_destination.id] = dict(
-                    job_destination=ajs.job_destination, job_ids=[ajs.job_id]
-                )
-            else:
-                job_destinations[ajs.job_destination.id]["job_ids"].append(ajs.job_id)
-        # check each destination for the listed job ids
-        for v in job_destinations.values():
-            job_destination = v["job_destination"]
-            job_ids = v["job_ids"]
-            shell_params, job_params = self.parse_destination_params(job_destination.params)
-            shell, job_interface = self.get_cli_plugins(shell_params, job_params)
+        # check each shell for the listed job ids
+        for group in self.__group_by_shell(self.watched):
+            shell, job_interface, job_ids = group["shell"], group["job_interface"], group["job_ids"]
             cmd_out = shell.execute(job_interface.get_status(job_ids))
             assert cmd_out.returncode == 0, cmd_out.stderr
             job_states.update(job_interface.parse_status(cmd_out.stdout, job_ids))
         return job_states
 
+    def __get_missing_job_states(self, watched):
+        """Query jobs missing from the batch state check together, where the job plugin supports it."""
+        job_states = {}
+        for group in self.__group_by_shell(watched):
+            shell, job_interface, job_ids = group["shell"], group["job_interface"], group["job_ids"]
+            for i in range(0, len(job_ids), MAX_MULTIPLE_STATUS_JOBS):
+                chunk = job_ids[i : i + MAX_MULTIPLE_STATUS_JOBS]
+                cmd = job_interface.get_multiple_status(chunk)
+                if cmd is None:
+                    break
+                # Some job managers exit with an error if any of the jobs is unknown but still report the others,
+                # jobs missing from the output fall back to the single state check.
+                cmd_out = shell.execute(cmd)
+                try:
+                    job_states.update(job_interface.parse_multiple_status(cmd_out.stdout, chunk))
+                except Exception:
+                    log.exception("Failed to parse the states of jobs %s", chunk)
+        return job_states
+
     def stop_job(self, job_wrapper):
         """Attempts to delete a dispatched job"""
         job = job_wrapper.get_job()
@@ -116,6 +116,9 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
 
         self.redact_email_in_job_name = self.app.config.redact_email_in_job_name
 
+        # States of the watched jobs fetched in bulk for the current monitor cycle
+        self._cycle_job_states: dict[str, drmaa_JobState] = {}
+
     def url_to_destination(self, url: str) -> JobDestination:
         """Convert a legacy URL to a job destination"""
         if native_spec := url.split("/")[2]:
@@ -275,9 +278,18 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
             if external_metadata:
                 self._handle_metadata_externally(ajs.job_wrapper, resolve_requirements=True)
             if job_state != model.Job.states.DELETED:
-                self.work_queue.put((self.finish_job, ajs))
+                self.mark_as_finished(ajs)
         return None
 
+    def _bulk_job_states(self, external_job_ids: list[str]) -> dict[str, "drmaa_JobState"]:
+        """
+        Return the DRMAA states of many jobs at once, called once per monitor cycle
+        with the ids of all watched jobs. The DRMAA 1.0 API has no bulk status query,
+        so subclasses may override this to ask the DRM directly. Jobs missing from
+        the result are checked one by one with the DRMAA session.
+        """
+        return {}
+
     def check_watched_item_drmaa(self, ajs: DRMAAJobState, new_watched: list[DRMAAJobState]) -> Union[str, None]:
         """
         look at a single watched job, determine its state, and deal with errors
@@ -303,8 +315,12 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
         galaxy_id_tag = ajs.job_wrapper.get_id_tag()
         state = None
         try:
-            assert external_job_id not in (None, "None"), f"({galaxy_id_tag}/{external_job_id}) Invalid job id"
-            state = self.ds.job_status(external_job_id)
+            assert (
+                external_job_id is not None and external_job_id != "None"
+            ), f"({galaxy_id_tag}/{external_job_id}) Invalid job id"
+            state = self._cycle_job_states.get(external_job_id)
+            if state is None:
+                state = self.ds.job_status(external_job_id)
             # Reset exception retries
             for retry_exception in RETRY_EXCEPTIONS_LOWER:
                 setattr(ajs, f"{retry_exception}_retries", 0)
@@ -329,7 +345,7 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
                     return None
             if self.runner_params[state_param] == model.Job.states.OK:
                 log.warning("(%s/%s) job will now be finished OK", galaxy_id_tag, external_job_id)
-                self.work_queue.put((self.finish_job, ajs))
+                self.mark_as_finished(ajs)
             elif self.runner_params[state_param] == model.Job.states.ERROR:
                 log.warning("(%s/%s) job will now be errored", galaxy_id_tag, external_job_id)
                 self.work_queue.put((self.fail_job, ajs))
@@ -360,6 +376,13 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
         """
         assert drmaa is not None
         new_watched: list[DRMAAJobState] = []
+        try:
+            self._cycle_job_states = self._bulk_job_states(
+                [ajs.job_id for ajs in self.watched if ajs.job_id is not None and ajs.job_id != "None"]
+            )
+        except Exception:
+            log.exception("Unable to fetch the states of the watched jobs in bulk, checking each job instead")
+            self._cycle_job_states = {}
         for ajs in self.watched:
             external_job_id = ajs.job_id
             galaxy_id_tag = ajs.job_wrapper.get_id_tag()
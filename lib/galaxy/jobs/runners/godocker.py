@@ -204,7 +204,7 @@ class GodockerJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
             else:
                 self.mark_as_failed(job_state)
             """The function mark_as_finished() executes:
-                        self.work_queue.put((self.finish_job, job_state))
+                        self.finish_queue.put((self.finish_job, job_state))
            *self.finish_job ->
             job_state.job_wrapper.finish( stdout, stderr, exit_code )
             job_state.job_wrapper.reclaim_ownership()
@@ -2,6 +2,7 @@
 Offload jobs to a Kubernetes cluster.
 """
 
+import copy
 import json  # for debugging of API objects
 import logging
 import math
@@ -23,6 +24,15 @@ from galaxy.jobs.runners import (
     AsynchronousJobState,
     JobState,
 )
+from galaxy.jobs.runners.util.pykube_informer import (
+    DEFAULT_WATCH_TIMEOUT_SECONDS,
+    object_label,
+    object_name,
+    ObjectInformer,
+    pykube_list_function,
+    pykube_watch_function,
+    watch_read_timeout,
+)
 from galaxy.jobs.runners.util.pykube_util import (
     deduplicate_entries,
     DEFAULT_INGRESS_API_VERSION,
@@ -53,6 +63,7 @@ from galaxy.jobs.runners.util.pykube_util import (
     Service,
     service_object_dict,
 )
+from galaxy.util import asbool
 from galaxy.util.bytesize import ByteSize
 
 if TYPE_CHECKING:
@@ -81,6 +92,7 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
     """
 
     runner_name = "KubernetesRunner"
+    start_methods = ["_init_informers", *AsynchronousJobRunner.start_methods]
 
     LABEL_START = re.compile("^[A-Za-z0-9]")
     LABEL_END = re.compile("[A-Za-z0-9]$")
@@ -133,6 +145,8 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
             k8s_interactivetools_ingress_class=dict(map=str, default=None),
             k8s_interactivetools_tls_secret=dict(map=str, default=None),
             k8s_ingress_api_version=dict(map=str, default=DEFAULT_INGRESS_API_VERSION),
+            k8s_use_informer=dict(map=asbool, default=False),
+            k8s_informer_watch_timeout=dict(map=int, valid=lambda x: int(x) > 0, default=DEFAULT_WATCH_TIMEOUT_SECONDS),
         )
 
         if "runner_param_specs" not in kwargs:
@@ -149,6 +163,67 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
         self.setup_base_volumes()
 
+        # Local caches of the k8s Jobs and Pods of this handler, kept up to date with list+watch
+        self._job_informer = None
+        self._pod_informer = None
+        if self.runner_params["k8s_use_informer"]:
+            # Watch streams get their own client, so a silently dropped connection times out
+            self._pykube_watch_api = pykube_client_from_dict(
+                self.runner_params, timeout=watch_read_timeout(self.runner_params["k8s_informer_watch_timeout"])
+            )
+            self._job_informer = self.__build_informer("jobs", Job, key=object_name)
+            # k8s labels the pods of a Job with its name
+            self._pod_informer = self.__build_informer("pods", Pod, key=object_label("job-name"))
+
+    def __build_informer(self, name, object_class, key):
+        namespace = self.runner_params["k8s_namespace"]
+        selector = ",".join(f"{label}={value}" for label, value in self.__get_k8s_informer_labels().items())
+        timeout = self.runner_params["k8s_informer_watch_timeout"]
+        return ObjectInformer(
+            f"{self.runner_name}.{name}",
+            pykube_list_function(self._pykube_api, object_class, selector, namespace),
+            pykube_watch_function(self._pykube_watch_api, object_class, selector, namespace, timeout_seconds=timeout),
+            key=key,
+        )
+
+    def _init_informers(self):
+        for informer in (self._job_informer, self._pod_informer):
+            if informer:
+                informer.start()
+
+    def shutdown(self):
+        for informer in (self._job_informer, self._pod_informer):
+            if informer:
+                informer.stop()
+        super().shutdown()
+
+    def __get_k8s_informer_labels(self):
+        """Labels selecting the k8s Jobs and Pods created by this handler."""
+        return {
+            "app.kubernetes.io/instance": self.__produce_k8s_job_prefix(),
+            "app.galaxyproject.org/handler": self.__force_label_conformity(self.app.config.server_name),
+        }
+
+    def __find_k8s_jobs(self, job_name):
+        """Return the k8s Job objects named ``job_name``, from the informer cache if possible."""
+        if self._job_informer and self._job_informer.has_synced:
+            if jobs := self._job_informer.get(job_name):
+                # pykube modifies the objects of the cache when scaling jobs down
+                return copy.deepcopy(jobs)
+        # The informer may not have seen a job that was just created yet
+        return find_job_object_by_name(self._pykube_api, job_name, self.runner_params["k8s_namespace"]).response[
+            "items"
+        ]
+
+    def __find_k8s_pods(self, job_name):
+        """Return the k8s Pod objects of the job ``job_name``, from the informer cache if possible."""
+        if self._pod_informer and self._pod_informer.has_synced:
+            if pods := self._pod_informer.get(job_name):
+                return pods
+        return find_pod_object_by_name(self._pykube_api, job_name, self.runner_params["k8s_namespace"]).response[
+            "items"
+        ]
+
     def setup_base_volumes(self):
         def generate_volumes(pvc_list):
             return [{"name": pvc["name"], "persistentVolumeClaim": {"claimName": pvc["name"]}} for pvc in pvc_list]
@@ -213,6 +288,7 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
         k8s_job_prefix = self.__produce_k8s_job_prefix()
         k8s_job_obj = job_object_dict(self.runner_params, k8s_job_prefix, self.__get_k8s_job_spec(ajs))
+        k8s_job_obj["metadata"]["labels"] = self.__get_k8s_informer_labels()
 
         k8s_job = Job(self._pykube_api, k8s_job_obj)
         try:
@@ -696,10 +772,10 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
     def check_watched_item(self, job_state: AsynchronousJobState) -> Union[AsynchronousJobState, None]:
         """Checks the state of a job already submitted on k8s. Job state is an AsynchronousJobState"""
-        jobs = find_job_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
+        jobs = self.__find_k8s_jobs(job_state.job_id)
 
-        if len(jobs.response["items"]) == 1:
-            k8s_job = Job(self._pykube_api, jobs.response["items"][0])
+        if len(jobs) == 1:
+            k8s_job = Job(self._pykube_api, jobs[0])
             job_destination = job_state.job_wrapper.job_destination
             succeeded = 0
             active = 0
@@ -786,7 +862,7 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
                 return None
 
-        elif len(jobs.response["items"]) == 0:
+        elif len(jobs) == 0:
             if job_state.job_wrapper.get_job().state == model.Job.states.DELETED:
                 if job_state.job_wrapper.cleanup_job in ("always", "onsuccess"):
                     job_state.job_wrapper.cleanup()
@@ -928,12 +1004,12 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         for being out of memory (pod status OOMKilled). If that is the case
         marks the job for resubmission (resubmit logic is part of destinations).
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
-        if not pods.response["items"]:
+        pods = self.__find_k8s_pods(job_state.job_id)
+        if not pods:
             return False
 
         # pod = self._get_pod_for_job(job_state) # this was always None
-        pod = pods.response["items"][0]
+        pod = pods[0]
         if (
             pod
             and "terminated" in pod["status"]["containerStatuses"][0]["state"]
@@ -947,22 +1023,22 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         """
         checks the state of the pod to see if it is running.
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
-        if not pods.response["items"]:
+        pods = self.__find_k8s_pods(job_state.job_id)
+        if not pods:
             return False
 
-        pod = Pod(self._pykube_api, pods.response["items"][0])
+        pod = Pod(self._pykube_api, pods[0])
         return is_pod_running(self._pykube_api, pod, self.runner_params["k8s_namespace"])
 
     def __job_pending_due_to_unschedulable_pod(self, job_state):
         """
         checks the state of the pod to see if it is unschedulable.
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
-        if not pods.response["items"]:
+        pods = self.__find_k8s_pods(job_state.job_id)
+        if not pods:
             return False
 
-        pod = Pod(self._pykube_api, pods.response["items"][0])
+        pod = Pod(self._pykube_api, pods[0])
         return is_pod_unschedulable(self._pykube_api, pod, self.runner_params["k8s_namespace"])
 
     def __job_failed_due_to_unknown_exit_code(self, job_state):
@@ -970,11 +1046,11 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         checks whether the pod exited prematurely due to an unknown exit code (i.e. not an exit code like OOM that
         we can handle). This would mean that the tool failed, but the job should be considered to have succeeded.
         """
-        pods = find_pod_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
-        if not pods.response["items"]:
+        pods = self.__find_k8s_pods(job_state.job_id)
+        if not pods:
             return False
 
-        pod = pods.response["items"][0]
+        pod = pods[0]
         if (
             pod
             and "terminated" in pod["status"]["containerStatuses"][0]["state"]
@@ -1144,17 +1220,17 @@ class KubernetesJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
     def finish_job(self, job_state: AsynchronousJobState) -> None:
         self._handle_metadata_externally(job_state.job_wrapper, resolve_requirements=True)
         super().finish_job(job_state)
-        jobs = find_job_object_by_name(self._pykube_api, job_state.job_id, self.runner_params["k8s_namespace"])
-        if len(jobs.response["items"]) > 1:
+        jobs = self.__find_k8s_jobs(job_state.job_id)
+        if len(jobs) > 1:
             log.warning(
                 "More than one job matches selector: %s. Possible configuration error in job id '%s'",
-                jobs.response["items"],
+                jobs,
                 job_state.job_id,
             )
-        elif len(jobs.response["items"]) == 0:
+        elif len(jobs) == 0:
             log.warning("No k8s job found which matches job id '%s'. Ignoring...", job_state.job_id)
         else:
-            k8s_job = Job(self._pykube_api, jobs.response["items"][0])
+            k8s_job = Job(self._pykube_api, jobs[0])
             if self.__has_guest_ports(job_state.job_wrapper):
                 self.__cleanup_k8s_guest_ports(job_state.job_wrapper, k8s_job)
             # Wrap the k8s job before we put it in the work queue so it can be retried a few times
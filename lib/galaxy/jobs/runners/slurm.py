@@ -4,7 +4,10 @@ SLURM job control via the DRMAA API.
 
 import os
 import time
+from collections import defaultdict
+from collections.abc import Callable
 from typing import (
+    Optional,
     TYPE_CHECKING,
     Union,
 )
@@ -12,6 +15,7 @@ from typing import (
 from galaxy import model
 from galaxy.jobs.runners.drmaa import DRMAAJobRunner
 from galaxy.util import (
+    asbool,
     commands,
     unicodify,
 )
@@ -42,11 +46,133 @@ SLURM_MEMORY_LIMIT_EXCEEDED_PARTIAL_WARNINGS = [
 OUT_OF_MEMORY_MSG = "This job was terminated because it used more memory than it was allocated."
 PROBABLY_OUT_OF_MEMORY_MSG = "This job was cancelled probably because it used more memory than it was allocated."
 
+# Names of the drmaa.JobState constants for the SLURM job states reported by squeue and sacct.
+# COMPLETING is reported as running, so terminal jobs are only completed once SLURM is done
+# with them. States not listed here are checked with DRMAA.
+SLURM_TO_DRMAA_STATES = {
+    "PENDING": "QUEUED_ACTIVE",
+    "CONFIGURING": "QUEUED_ACTIVE",
+    "REQUEUED": "QUEUED_ACTIVE",
+    "REQUEUE_FED": "QUEUED_ACTIVE",
+    "REQUEUE_HOLD": "SYSTEM_ON_HOLD",
+    "RESV_DEL_HOLD": "SYSTEM_ON_HOLD",
+    "RUNNING": "RUNNING",
+    "COMPLETING": "RUNNING",
+    "RESIZING": "RUNNING",
+    "SIGNALING": "RUNNING",
+    "STAGE_OUT": "RUNNING",
+    "STOPPED": "SYSTEM_SUSPENDED",
+    "SUSPENDED": "SYSTEM_SUSPENDED",
+    "COMPLETED": "DONE",
+    "BOOT_FAIL": "FAILED",
+    "CANCELLED": "FAILED",
+    "DEADLINE": "FAILED",
+    "FAILED": "FAILED",
+    "NODE_FAIL": "FAILED",
+    "OUT_OF_MEMORY": "FAILED",
+    "PREEMPTED": "FAILED",
+    "TIMEOUT": "FAILED",
+}
+
+
+def get_slurm_states(
+    job_ids: list[str], chunk_size: int = 1000, execute: Callable[[list[str]], str] = commands.execute
+) -> dict[str, str]:
+    """Return the SLURM states of many jobs, keyed by job id.
+
+    Jobs are looked up with one ``squeue`` call per cluster and chunk of ``chunk_size`` job ids,
+    jobs that already left the queue with one ``sacct`` call. Job ids may use the
+    ``<job id>.<cluster>`` syntax of slurm-drmaa with cluster support. Jobs unknown to SLURM
+    are missing from the result.
+    """
+    jobs_by_cluster: dict[Optional[str], list[tuple[str, str]]] = defaultdict(list)
+    for external_job_id in job_ids:
+        job_id, _, job_cluster = external_job_id.partition(".")
+        jobs_by_cluster[job_cluster or None].append((job_id, external_job_id))
+    states = {}
+    for cluster, jobs in jobs_by_cluster.items():
+        for i in range(0, len(jobs), chunk_size):
+            chunk = dict(jobs[i : i + chunk_size])
+            chunk_states = _squeue_states(list(chunk), cluster, execute)
+            if missing_ids := [job_id for job_id in chunk if job_id not in chunk_states]:
+                chunk_states.update(_sacct_states(missing_ids, cluster, execute))
+            for job_id, state in chunk_states.items():
+                if job_id in chunk:
+                    states[chunk[job_id]] = state
+    return states
+
+
+def _squeue_states(job_ids: list[str], cluster: Optional[str], execute) -> dict[str, str]:
+    cmd = ["squeue", "-h", "-t", "all", "-o", "%i %T"]
+    if cluster:
+        cmd.extend(["-M", cluster])
+    cmd.extend(["-j", ",".join(job_ids)])
+    try:
+        stdout = execute(cmd)
+    except commands.CommandLineException as e:
+        # squeue fails if none of the jobs is known to the controller anymore
+        log.debug("squeue failed, looking up jobs with sacct: %s", unicodify(e.stderr).strip())
+        return {}
+    return _parse_states(stdout, " ")
+
+
+def _sacct_states(job_ids: list[str], cluster: Optional[str], execute) -> dict[str, str]:
+    cmd = ["sacct", "-n", "-X", "-P", "-o", "jobid,state"]
+    if cluster:
+        cmd.extend(["-M", cluster])
+    cmd.extend(["-j", ",".join(job_ids)])
+    try:
+        stdout = execute(cmd)
+    except commands.CommandLineException as e:
+        if e.stderr.strip() == "SLURM accounting storage is disabled":
+            log.warning("SLURM accounting storage is not properly configured, unable to run sacct")
+            return {}
+        raise e
+    return _parse_states(stdout, "|")
+
+
+def _parse_states(stdout: str, separator: str) -> dict[str, str]:
+    states = {}
+    for line in stdout.splitlines():
+        fields = line.strip().split(separator)
+        # squeue prints a "CLUSTER: <name>" line when a cluster is given
+        if len(fields) != 2 or fields[0] == "CLUSTER:" or not fields[1].strip():
+            continue
+        job_id, state = fields
+        # sacct reports e.g. "CANCELLED by 1000" and may add a final '+'
+        states[job_id] = state.split()[0].rstrip("+")
+    return states
+
 
 class SlurmJobRunner(DRMAAJobRunner):
     runner_name = "SlurmRunner"
     restrict_job_name_length = False
 
+    def __init__(self, app, nworkers, **kwargs):
+        runner_param_specs = {
+            "bulk_status": dict(map=asbool, default=False),
+            "bulk_status_chunk_size": dict(map=int, valid=lambda x: int(x) > 0, default=1000),
+        }
+        if "runner_param_specs" not in kwargs:
+            kwargs["runner_param_specs"] = {}
+        kwargs["runner_param_specs"].update(runner_param_specs)
+        super().__init__(app, nworkers, **kwargs)
+        # SLURM states fetched in bulk for the current monitor cycle, used for the post-mortem of failed jobs
+        self._cycle_slurm_states: dict[str, str] = {}
+
+    def _bulk_job_states(self, external_job_ids: list[str]) -> dict[str, str]:
+        if not self.runner_params.bulk_status or not external_job_ids:
+            self._cycle_slurm_states = {}
+            return {}
+        self._cycle_slurm_states = get_slurm_states(
+            external_job_ids, chunk_size=self.runner_params.bulk_status_chunk_size
+        )
+        drmaa_states = {}
+        for external_job_id, slurm_state in self._cycle_slurm_states.items():
+            if drmaa_state_name := SLURM_TO_DRMAA_STATES.get(slurm_state):
+                drmaa_states[external_job_id] = getattr(self.drmaa_job_states, drmaa_state_name)
+        return drmaa_states
+
     def _complete_terminal_job(self, ajs: "DRMAAJobState", drmaa_state: str, **kwargs) -> Union[bool, None]:
         def _get_slurm_state_with_sacct(job_id, cluster):
             cmd = ["sacct", "-n", "-o", "state%-32"]
@@ -105,7 +231,8 @@ class SlurmJobRunner(DRMAAJobRunner):
 
         try:
             if drmaa_state == self.drmaa_job_states.FAILED:
-                slurm_state = _get_slurm_state()
+                assert ajs.job_id is not None
+                slurm_state = self._cycle_slurm_states.pop(ajs.job_id, None) or _get_slurm_state()
                 sleep = 1
                 while slurm_state == "COMPLETING":
                     log.debug(
@@ -1,9 +1,12 @@
 """ """
 
 import json
+import logging
 
 from galaxy.util.plugin_config import plugins_dict
 
+log = logging.getLogger(__name__)
+
 DEFAULT_SHELL_PLUGIN = "LocalShell"
 
 ERROR_MESSAGE_NO_JOB_PLUGIN = "No job plugin parameter found, cannot create CLI job interface"
@@ -22,6 +25,7 @@ class CliInterface:
         self.cli_shells = plugins_dict(f"{module_prefix}.shell", "__name__")
         self.cli_job_interfaces = plugins_dict(f"{module_prefix}.job", "__name__")
         self.active_cli_shells = {}
+        self.active_job_interfaces = {}
 
     def get_plugins(self, shell_params, job_params):
         """
@@ -48,10 +52,24 @@ class CliInterface:
         job_plugin = job_params.get("plugin")
         if not job_plugin:
             raise ValueError(ERROR_MESSAGE_NO_JOB_PLUGIN)
-        job_plugin_class = self.cli_job_interfaces.get(job_plugin)
-        if not job_plugin_class:
-            raise ValueError(ERROR_MESSAGE_NO_SUCH_JOB_PLUGIN % (job_plugin, list(self.cli_job_interfaces.keys())))
-        return job_plugin_class(**job_params)
+        requested_job_settings = json.dumps(job_params, sort_keys=True)
+        if requested_job_settings not in self.active_job_interfaces:
+            job_plugin_class = self.cli_job_interfaces.get(job_plugin)
+            if not job_plugin_class:
+                raise ValueError(ERROR_MESSAGE_NO_SUCH_JOB_PLUGIN % (job_plugin, list(self.cli_job_interfaces.keys())))
+            self.active_job_interfaces[requested_job_settings] = job_plugin_class(**job_params)
+        return self.active_job_interfaces[requested_job_settings]
+
+    def close(self):
+        """
+        Close the persistent sessions of all active shells.
+        """
+        for shell in self.active_cli_shells.values():
+            try:
+                shell.close()
+            except Exception:
+                log.exception("Failed to close shell %s", shell)
+        self.active_cli_shells = {}
 
 
 def split_params(params):
@@ -73,6 +73,21 @@ class BaseJobExec(metaclass=ABCMeta):
         Parse the status of output from get_single_status command.
         """
 
+    def get_multiple_status(self, job_ids):
+        """
+        Return command to get the statuses of the specified jobs, including
+        jobs no longer reported by the get_status command, or None if the job
+        manager can't report them with a single command.
+        """
+        return None
+
+    def parse_multiple_status(self, status: str, job_ids: list[str]) -> dict[str, job_states]:
+        """
+        Parse the statuses of output from get_multiple_status command, jobs
+        missing from the result are checked with get_single_status.
+        """
+        return {}
+
     def get_failure_reason(self, job_id):
         """
         Return the failure reason for the given job_id.
@@ -1,6 +1,7 @@
 import json
 from logging import getLogger
 
+from . import job_states
 from .torque import Torque
 
 log = getLogger(__name__)
@@ -15,17 +16,32 @@ class OpenPBS(Torque):
     def get_single_status(self, job_id):
         return f"qstat -f {job_id}"
 
+    def get_multiple_status(self, job_ids):
+        # -x includes finished jobs
+        return f"qstat -x -f -F json {' '.join(job_ids)}"
+
     def parse_status(self, status, job_ids):
         try:
             data = json.loads(status)
         except Exception:
             log.warning(f"No valid qstat JSON return from `qstat -f -F json`, got the following: {status}")
+            return {}
         rval = {}
         for job_id, job in data.get("Jobs", {}).items():
             if job_id in job_ids:
                 # map PBS job states to Galaxy job states.
-                rval[id] = self._get_job_state(job["job_state"])
+                rval[job_id] = self._get_job_state(job["job_state"])
         return rval
 
+    def parse_multiple_status(self, status, job_ids):
+        # qstat reports unknown job ids on stderr, the JSON still holds the known ones
+        return self.parse_status(status, job_ids)
+
+    def _get_job_state(self, state: str) -> job_states:
+        if state == "F":
+            # finished, only reported by qstat -x
+            return job_states.OK
+        return super()._get_job_state(state)
+
 
 __all__ = ("OpenPBS",)
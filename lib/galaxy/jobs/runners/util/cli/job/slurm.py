@@ -122,6 +122,21 @@ class Slurm(BaseJobExec):
         # else line like "slurm_load_jobs error: Invalid job id specified"
         return job_states.OK
 
+    def get_multiple_status(self, job_ids):
+        if not self.sacct_available:
+            return None
+        return f"sacct -o JobIDRaw,State -P -n -j {','.join(job_ids)}"
+
+    def parse_multiple_status(self, status, job_ids):
+        # Like parse_single_status, jobs known to accounting but no longer on
+        # the cluster have finished and are checked for failures when finishing.
+        rval = {}
+        for line in status.splitlines():
+            splitjobdata = line.split("|")
+            if len(splitjobdata) >= 2 and splitjobdata[0] in job_ids:
+                rval[splitjobdata[0]] = job_states.OK
+        return rval
+
     def _get_job_state(self, state: str) -> str:
         try:
             return {
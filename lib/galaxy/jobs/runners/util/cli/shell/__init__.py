@@ -20,3 +20,8 @@ class BaseShellExec(metaclass=ABCMeta):
         """
         Execute the specified command via defined shell.
         """
+
+    def close(self):  # noqa: B027
+        """
+        Release any persistent session held by this shell, a no-op for shells without one.
+        """
@@ -1,4 +1,9 @@
 import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
 
 import paramiko
@@ -15,6 +20,8 @@ from .local import LocalShell
 log = logging.getLogger(__name__)
 logging.getLogger("paramiko").setLevel(logging.WARNING)  # paramiko logging is very verbose
 
+MASTER_RESTART_INTERVAL = 30
+
 __all__ = ("RemoteShell", "SecureShell", "GlobusSecureShell", "ParamikoShell")
 
 
@@ -29,18 +36,44 @@ class RemoteShell(LocalShell):
         self.sessions = {}
 
     def execute(self, cmd, persist=False, timeout=60):
-        # TODO: implement persistence
+        return super().execute(self._remote_command(cmd, self._command_options()), persist, timeout)
+
+    def _command_options(self):
+        return self.options
+
+    def _remote_command(self, cmd, options):
         fullcmd = [self.rsh]
-        if self.options:
-            fullcmd.extend(self.options)
+        if options:
+            fullcmd.extend(options)
         if self.username:
             fullcmd.extend(["-l", self.username])
-        fullcmd.extend([self.hostname, cmd])
-        return super().execute(fullcmd, persist, timeout)
+        fullcmd.append(self.hostname)
+        if cmd is not None:
+            fullcmd.append(cmd)
+        return fullcmd
 
 
 class SecureShell(RemoteShell):
-    def __init__(self, rsh="ssh", rcp="scp", private_key=None, port=None, strict_host_key_checking=True, **kwargs):
+    """
+    Execute commands with ``ssh``.
+
+    With ``persistent`` set, a master connection is opened on first use and every command is
+    multiplexed over it (OpenSSH ``ControlMaster``), so commands skip the connection setup and
+    authentication. Commands fall back to their own connection while the master is unavailable,
+    a master that exited is restarted by the next command after ``MASTER_RESTART_INTERVAL`` seconds.
+    """
+
+    def __init__(
+        self,
+        rsh="ssh",
+        rcp="scp",
+        private_key=None,
+        port=None,
+        strict_host_key_checking=True,
+        persistent=False,
+        control_path=None,
+        **kwargs,
+    ):
         options = []
         if not string_as_bool(strict_host_key_checking):
             options.extend(["-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null"])
@@ -50,6 +83,58 @@ class SecureShell(RemoteShell):
         if port:
             options.extend(["-p", str(port)])
         super().__init__(rsh=rsh, rcp=rcp, options=options, **kwargs)
+        self.persistent = string_as_bool(persistent)
+        self.control_path = control_path
+        self._control_dir = None
+        self._master = None
+        self._master_started = 0.0
+        self._master_lock = threading.Lock()
+
+    def _command_options(self):
+        if not self.persistent:
+            return self.options
+        return self.options + ["-o", "ControlMaster=no", "-S", self._ensure_master()]
+
+    def close(self):
+        with self._master_lock:
+            if self._master is not None:
+                if self._master.poll() is None:
+                    self._master.terminate()
+                    try:
+                        self._master.wait(timeout=10)
+                    except subprocess.TimeoutExpired:
+                        self._master.kill()
+                self._master = None
+            if self._control_dir is not None:
+                shutil.rmtree(self._control_dir, ignore_errors=True)
+                self._control_dir = None
+
+    def _ensure_master(self):
+        with self._master_lock:
+            if self.control_path is None and self._control_dir is None:
+                self._control_dir = tempfile.mkdtemp(prefix="galaxy-ssh-")
+            control_path = self.control_path or os.path.join(self._control_dir, "control")
+            if self._master is None or (
+                self._master.poll() is not None and time.time() - self._master_started > MASTER_RESTART_INTERVAL
+            ):
+                if self._master is not None:
+                    log.warning(
+                        "SSH master connection to %s exited with code %s, reconnecting",
+                        self.hostname,
+                        self._master.returncode,
+                    )
+                options = self.options + ["-M", "-N", "-o", "ControlPersist=no", "-S", control_path]
+                # The master is owned by this shell, a session of its own keeps it out of the process group
+                # of the commands, which LocalShell waits for and kills on timeout.
+                self._master = subprocess.Popen(
+                    self._remote_command(None, options),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+                self._master_started = time.time()
+            return control_path
 
 
 class ParamikoShell:
@@ -109,6 +194,10 @@ class ParamikoShell:
     def _execute(self, cmd, timeout):
         return self.ssh.exec_command(smart_str(cmd), timeout=timeout)
 
+    def close(self):
+        if self.ssh is not None:
+            self.ssh.close()
+
 
 class GlobusSecureShell(SecureShell):
     def __init__(self, rsh="gsissh", rcp="gsiscp", **kwargs):
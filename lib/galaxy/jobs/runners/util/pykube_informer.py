@@ -0,0 +1,215 @@
+"""Informer-style local caches of Kubernetes objects kept up to date with list+watch.
+
+An :class:`ObjectInformer` lists the objects of one kind matching a label selector once and then
+follows a watch stream from the resource version of that list, so readers look objects up in
+memory instead of querying the API server. The list and watch functions are plain callables,
+:func:`pykube_list_function` and :func:`pykube_watch_function` build them for pykube.
+"""
+
+import logging
+import threading
+from collections.abc import (
+    Callable,
+    Iterable,
+)
+from typing import (
+    Any,
+    Optional,
+)
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+log = logging.getLogger(__name__)
+
+# list_objects() -> (objects, resource version of the list)
+ListFunction = Callable[[], tuple[list[dict[str, Any]], str]]
+# watch_objects(resource_version) -> iterable of (event type, object)
+WatchFunction = Callable[[str], Iterable[tuple[str, dict[str, Any]]]]
+# key of an object for lookups, objects without key are not indexed
+KeyFunction = Callable[[dict[str, Any]], Optional[str]]
+
+DEFAULT_WATCH_TIMEOUT_SECONDS = 300
+# the client gives up on a watch stream that stays silent this long after the server should have closed it
+WATCH_READ_TIMEOUT_MARGIN_SECONDS = 30
+RESOURCE_VERSION_EXPIRED_CODE = 410
+
+
+class ResourceVersionExpired(Exception):
+    """The watch can't be continued from the last resource version, objects have to be listed again."""
+
+
+class WatchTimeout(Exception):
+    """The watch stream stopped delivering data, the connection may have been dropped silently."""
+
+
+def watch_read_timeout(timeout_seconds: int) -> int:
+    """Client read timeout for watch streams that the API server closes after ``timeout_seconds``."""
+    return timeout_seconds + WATCH_READ_TIMEOUT_MARGIN_SECONDS
+
+
+def object_name(obj: dict[str, Any]) -> Optional[str]:
+    return obj["metadata"].get("name")
+
+
+def object_label(label: str) -> KeyFunction:
+    def key(obj: dict[str, Any]) -> Optional[str]:
+        return (obj["metadata"].get("labels") or {}).get(label)
+
+    return key
+
+
+class ObjectInformer:
+    """Cache of the Kubernetes objects of one kind, indexed by ``key``.
+
+    The watch stream is restarted from the last seen resource version when the API server
+    closes it, objects are listed again if that resource version expired, the stream timed out
+    on the client or failed, since events may have been missed.
+    Lookups should fall back to the API server until :attr:`has_synced` and for objects that
+    are not found, since the cache may lag behind objects that were just created.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        list_objects: ListFunction,
+        watch_objects: WatchFunction,
+        key: KeyFunction = object_name,
+        retry_interval: float = 5,
+    ):
+        self.name = name
+        self._list_objects = list_objects
+        self._watch_objects = watch_objects
+        self._key = key
+        self._retry_interval = retry_interval
+        self._objects: dict[str, dict[str, Any]] = {}
+        self._objects_by_key: dict[str, dict[str, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._synced = threading.Event()
+        self._should_stop = threading.Event()
+        self._resource_version: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def has_synced(self) -> bool:
+        return self._synced.is_set()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(name=f"{self.name}.informer_thread", target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._should_stop.set()
+
+    def get(self, key: str) -> list[dict[str, Any]]:
+        """Return the cached objects with ``key``."""
+        with self._lock:
+            return list(self._objects_by_key.get(key, {}).values())
+
+    def run(self) -> None:
+        while not self._should_stop.is_set():
+            try:
+                if self._resource_version is None:
+                    self.sync()
+                self.watch()
+            except ResourceVersionExpired:
+                log.debug("%s watch resource version expired, listing objects again", self.name)
+                self._resource_version = None
+            except WatchTimeout:
+                log.warning("%s watch timed out, listing objects again", self.name)
+                self._resource_version = None
+            except Exception:
+                log.exception("%s informer failed, listing objects again", self.name)
+                self._resource_version = None
+                self._should_stop.wait(self._retry_interval)
+
+    def sync(self) -> None:
+        """List all objects and replace the cache."""
+        objects, resource_version = self._list_objects()
+        with self._lock:
+            self._objects = {}
+            self._objects_by_key = {}
+            for obj in objects:
+                self._store(obj)
+        self._resource_version = resource_version
+        self._synced.set()
+
+    def watch(self) -> None:
+        """Apply the events of one watch stream, starting from the last seen resource version."""
+        assert self._resource_version is not None
+        for event_type, obj in self._watch_objects(self._resource_version):
+            if self._should_stop.is_set():
+                return
+            self.apply_event(event_type, obj)
+
+    def apply_event(self, event_type: str, obj: dict[str, Any]) -> None:
+        if event_type == "ERROR":
+            if obj.get("code") == RESOURCE_VERSION_EXPIRED_CODE:
+                raise ResourceVersionExpired(obj.get("message"))
+            raise Exception(f"{self.name} watch failed: {obj.get('message')}")
+        with self._lock:
+            if event_type in ("ADDED", "MODIFIED"):
+                self._store(obj)
+            elif event_type == "DELETED":
+                self._remove(obj)
+        # BOOKMARK events only carry the resource version
+        self._resource_version = obj["metadata"].get("resourceVersion") or self._resource_version
+
+    def _store(self, obj: dict[str, Any]) -> None:
+        name = obj["metadata"]["name"]
+        self._remove(self._objects.get(name, obj))
+        self._objects[name] = obj
+        key = self._key(obj)
+        if key is not None:
+            self._objects_by_key.setdefault(key, {})[name] = obj
+
+    def _remove(self, obj: dict[str, Any]) -> None:
+        name = obj["metadata"]["name"]
+        stored = self._objects.pop(name, None)
+        key = self._key(stored or obj)
+        if key is not None and key in self._objects_by_key:
+            self._objects_by_key[key].pop(name, None)
+            if not self._objects_by_key[key]:
+                del self._objects_by_key[key]
+
+
+def pykube_list_function(pykube_api, object_class, selector: str, namespace: Optional[str] = None) -> ListFunction:
+    def list_objects():
+        response = object_class.objects(pykube_api).filter(selector=selector, namespace=namespace).response
+        return response.get("items") or [], response["metadata"]["resourceVersion"]
+
+    return list_objects
+
+
+def pykube_watch_function(
+    pykube_api,
+    object_class,
+    selector: str,
+    namespace: Optional[str] = None,
+    timeout_seconds: int = DEFAULT_WATCH_TIMEOUT_SECONDS,
+) -> WatchFunction:
+    """Build a watch function, the read timeout of ``pykube_api`` should exceed ``timeout_seconds``.
+
+    See :func:`watch_read_timeout`.
+    """
+
+    def watch_objects(resource_version):
+        query = object_class.objects(pykube_api).filter(selector=selector, namespace=namespace)
+        params = {"timeoutSeconds": timeout_seconds, "allowWatchBookmarks": "true"}
+        try:
+            for event in query.watch(since=resource_version, params=params):
+                yield event.type, event.object.obj
+        except requests.exceptions.Timeout as e:
+            raise WatchTimeout(str(e))
+        except requests.exceptions.ConnectionError as e:
+            # requests reports read timeouts while streaming the response as connection errors
+            if e.args and isinstance(e.args[0], ReadTimeoutError):
+                raise WatchTimeout(str(e))
+            raise
+        except Exception as e:
+            # pykube raises an HTTPError for Status responses
+            if getattr(e, "code", None) == RESOURCE_VERSION_EXPIRED_CODE:
+                raise ResourceVersionExpired(str(e))
+            raise
+
+    return watch_objects
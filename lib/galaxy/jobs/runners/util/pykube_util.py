@@ -49,16 +49,18 @@ def ensure_pykube():
         raise Exception(K8S_IMPORT_MESSAGE)
 
 
-def pykube_client_from_dict(params):
+def pykube_client_from_dict(params, timeout=None):
+    # pykube applies its default timeout to requests without an explicit timeout
+    kwargs = {} if timeout is None else {"timeout": timeout}
     if "k8s_use_service_account" in params and params["k8s_use_service_account"]:
-        pykube_client = HTTPClient(KubeConfig.from_service_account())
+        pykube_client = HTTPClient(KubeConfig.from_service_account(), **kwargs)
     else:
         config_path = params.get("k8s_config_path")
         if config_path is None:
             config_path = os.environ.get("KUBECONFIG", None)
         if config_path is None:
             config_path = "~/.kube/config"
-        pykube_client = HTTPClient(KubeConfig.from_file(config_path))
+        pykube_client = HTTPClient(KubeConfig.from_file(config_path), **kwargs)
     return pykube_client
 
 
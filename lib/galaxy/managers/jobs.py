@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from collections.abc import Iterable
@@ -29,12 +30,17 @@ from sqlalchemy import (
     null,
     or_,
     true,
+    union,
+    update,
 )
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql import select
 from typing_extensions import TypedDict
 
 from galaxy import model
+from galaxy.config import GalaxyAppConfiguration
 from galaxy.exceptions import (
     ConfigDoesNotAllowException,
     InconsistentDatabase,
@@ -60,6 +66,7 @@ from galaxy.managers.users import UserManager
 from galaxy.model import (
     ImplicitCollectionJobs,
     ImplicitCollectionJobsJobAssociation,
+    ImplicitCollectionJobsStateCount,
     Job,
     JobMetricNumeric,
     JobParameter,
@@ -67,6 +74,7 @@ from galaxy.model import (
     User,
     Workflow,
     WorkflowInvocation,
+    WorkflowInvocationJobStateCount,
     WorkflowInvocationStep,
     WorkflowInvocationToSubworkflowInvocationAssociation,
     WorkflowStep,
@@ -400,6 +408,78 @@ class JobManager:
             return False
 
 
+# Parameters that don't have to match for jobs to be equivalent, see JobSearch.__search
+FINGERPRINT_IGNORED_PARAMETERS = {"chromInfo", "dbkey"}
+
+
+def job_cache_fingerprint(
+    sa_session: galaxy_scoped_session, tool_id: str, tool_version: str, param_dump: dict[str, Any]
+) -> Optional[str]:
+    """Return the job cache fingerprint of running a tool with the JSON-dumped parameters ``param_dump``.
+
+    Equivalent jobs have the same fingerprint: datasets are identified by their ``dataset_id`` and
+    collections by the identifiers and ``dataset_id`` of their datasets, so copies of the inputs
+    match. The reverse isn't true, e.g. metadata and names of inputs aren't fingerprinted.
+    Returns ``None`` if an input can't be identified.
+    """
+
+    def identify(src, id) -> Optional[list]:
+        if not isinstance(id, int):
+            return None
+        if src == "hda":
+            hda = sa_session.get(model.HistoryDatasetAssociation, id)
+            return ["dataset", hda.dataset_id] if hda else None
+        elif src == "ldda":
+            return ["ldda", id]
+        elif src == "hdca":
+            hdca = sa_session.get(model.HistoryDatasetCollectionAssociation, id)
+            return ["collection", sorted(hdca.collection.dataset_identifier_paths())] if hdca else None
+        elif src == "dce":
+            dce = sa_session.get(model.DatasetCollectionElement, id)
+            if dce and dce.hda:
+                return ["dataset", dce.hda.dataset_id]
+            elif dce and dce.child_collection:
+                return ["collection", sorted(dce.child_collection.dataset_identifier_paths())]
+        return None
+
+    def normalize(value):
+        if isinstance(value, dict):
+            if "src" in value and "id" in value:
+                identity = identify(value["src"], value["id"])
+                if identity is None:
+                    raise KeyError(value["src"])
+                return {k: identity if k == "id" else normalize(v) for k, v in value.items()}
+            return {k: normalize(v) for k, v in value.items()}
+        elif isinstance(value, list):
+            return [normalize(v) for v in value]
+        return value
+
+    parameters = {}
+    for name, value in param_dump.items():
+        if name.startswith("__") or name.endswith("|__identifier__") or name in FINGERPRINT_IGNORED_PARAMETERS:
+            continue
+        if value == {"__class__": "RuntimeValue"}:
+            value = None
+        try:
+            parameters[name] = normalize(value)
+        except KeyError:
+            return None
+    fingerprint = json.dumps([tool_id, str(tool_version), parameters], sort_keys=True)
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+
+def job_cache_fingerprint_for_job(sa_session: galaxy_scoped_session, job: Job) -> Optional[str]:
+    """Return the job cache fingerprint of an existing job, see :func:`job_cache_fingerprint`."""
+    if not job.tool_id or job.tool_version is None:
+        return None
+    try:
+        param_dump = {p.name: None if p.value is None else json.loads(p.value) for p in job.parameters}
+    except ValueError:
+        # Parameters of very old jobs aren't always JSON
+        return None
+    return job_cache_fingerprint(sa_session, job.tool_id, job.tool_version, param_dump)
+
+
 class JobSearch:
     """Search for jobs using tool inputs or other jobs"""
 
@@ -412,8 +492,10 @@ class JobSearch:
         dataset_collection_manager: DatasetCollectionManager,
         ldda_manager: LDDAManager,
         id_encoding_helper: IdEncodingHelper,
+        config: GalaxyAppConfiguration,
     ):
         self.sa_session = sa_session
+        self.use_fingerprints = config.enable_job_cache_fingerprints
         self.dialect_name = sa_session.get_bind().dialect.name
         self.use_materialized_hint = self.supports_materialized_hint()
         self.hda_manager = hda_manager
@@ -482,6 +564,9 @@ class JobSearch:
             return key, value
 
         wildcard_param_dump = remap(param_dump, visit=populate_input_data_input_id)
+        fingerprint = None
+        if self.use_fingerprints and tool_version is not None:
+            fingerprint = job_cache_fingerprint(self.sa_session, tool_id, tool_version, param_dump)
         return self.__search(
             tool_id=tool_id,
             tool_version=tool_version,
@@ -492,8 +577,13 @@ class JobSearch:
             wildcard_param_dump=wildcard_param_dump,
             history_id=history_id,
             require_name_match=require_name_match,
+            fingerprint=fingerprint,
         )
 
+    def fingerprint_job(self, job: Job) -> None:
+        """Set the job cache fingerprint of a new job."""
+        job.cache_fingerprint = job_cache_fingerprint_for_job(self.sa_session, job)
+
     def __search(
         self,
         tool_id: str,
@@ -505,6 +595,7 @@ class JobSearch:
         wildcard_param_dump=None,
         history_id: Union[int, None] = None,
         require_name_match: bool = True,
+        fingerprint: Optional[str] = None,
     ):
         search_timer = ExecutionTimer()
 
@@ -524,6 +615,13 @@ class JobSearch:
             return key, value
 
         stmt = select(model.Job.id.label("job_id"))
+        if fingerprint:
+            # Equivalent jobs share the fingerprint, the candidates are then verified below
+            candidate_stmt = select(model.Job.id).where(model.Job.cache_fingerprint == fingerprint).limit(1)
+            if self.sa_session.scalar(candidate_stmt) is None:
+                log.info("No equivalent jobs found by fingerprint %s", search_timer)
+                return None
+            stmt = stmt.where(model.Job.cache_fingerprint == fingerprint)
 
         data_conditions: list = []
 
@@ -1628,82 +1726,153 @@ def get_job_metrics_for_invocation(sa_session: galaxy_scoped_session, invocation
 
 
 def fetch_job_states(sa_session, job_source_ids, job_source_types):
+    """Summarize the job states of jobs, implicit collection jobs and workflow invocations.
+
+    Job states of implicit collection jobs and workflow invocations are read from the job state
+    counters maintained by the triggers of ``galaxy.model.triggers.job_state_counts``, each kind of
+    job source is summarized with a constant number of queries.
+    """
     assert len(job_source_ids) == len(job_source_types)
     job_ids = set()
     implicit_collection_job_ids = set()
-    workflow_invocations_job_sources = {}
-    workflow_invocation_states = (
-        {}
-    )  # should be set before we walk step states to be conservative on whether things are done expanding yet
-
+    workflow_invocation_ids = set()
     for job_source_id, job_source_type in zip(job_source_ids, job_source_types):
         if job_source_type == "Job":
             job_ids.add(job_source_id)
         elif job_source_type == "ImplicitCollectionJobs":
             implicit_collection_job_ids.add(job_source_id)
         elif job_source_type == "WorkflowInvocation":
-            invocation_state = sa_session.get(model.WorkflowInvocation, job_source_id).state
-            workflow_invocation_states[job_source_id] = invocation_state
-            workflow_invocation_job_sources = []
-            for (
-                invocation_step_source_type,
-                invocation_step_source_id,
-                invocation_step_state,
-            ) in invocation_job_source_iter(sa_session, job_source_id):
-                workflow_invocation_job_sources.append(
-                    (invocation_step_source_type, invocation_step_source_id, invocation_step_state)
-                )
-                if invocation_step_source_type == "Job":
-                    job_ids.add(invocation_step_source_id)
-                elif invocation_step_source_type == "ImplicitCollectionJobs":
-                    implicit_collection_job_ids.add(invocation_step_source_id)
-            workflow_invocations_job_sources[job_source_id] = workflow_invocation_job_sources
+            workflow_invocation_ids.add(job_source_id)
         else:
             raise RequestParameterInvalidException(f"Invalid job source type {job_source_type} found.")
 
-    job_summaries = {}
-    implicit_collection_jobs_summaries = {}
+    summaries: dict[str, dict[int, Any]] = {
+        "Job": _summarize_jobs(sa_session, job_ids),
+        "ImplicitCollectionJobs": _summarize_implicit_collection_jobs(sa_session, implicit_collection_job_ids),
+        "WorkflowInvocation": _summarize_invocations(sa_session, workflow_invocation_ids),
+    }
+    return [
+        summaries[job_source_type].get(job_source_id)
+        for job_source_id, job_source_type in zip(job_source_ids, job_source_types)
+    ]
+
+
+def _summarize_jobs(sa_session, job_ids) -> dict[int, "JobsSummary"]:
+    if not job_ids:
+        return {}
+    statement = select(Job.id, Job.state).where(Job.id.in_(job_ids))
+    return {
+        job_id: {"populated_state": "ok", "states": {state: 1}, "model": "Job", "id": job_id}
+        for job_id, state in sa_session.execute(statement)
+    }
+
 
-    for job_id in job_ids:
-        job_summaries[job_id] = summarize_jobs_to_dict(sa_session, sa_session.get(Job, job_id))
-    for implicit_collection_jobs_id in implicit_collection_job_ids:
-        implicit_collection_jobs_summaries[implicit_collection_jobs_id] = summarize_jobs_to_dict(
-            sa_session, sa_session.get(model.ImplicitCollectionJobs, implicit_collection_jobs_id)
+def _summarize_implicit_collection_jobs(sa_session, implicit_collection_jobs_ids) -> dict[int, "JobsSummary"]:
+    if not implicit_collection_jobs_ids:
+        return {}
+    statement = select(ImplicitCollectionJobs.id, ImplicitCollectionJobs.populated_state).where(
+        ImplicitCollectionJobs.id.in_(implicit_collection_jobs_ids)
+    )
+    rval: dict[int, JobsSummary] = {
+        icj_id: {"id": icj_id, "populated_state": populated_state, "model": "ImplicitCollectionJobs", "states": {}}
+        for icj_id, populated_state in sa_session.execute(statement)
+    }
+    populated_ids = [icj_id for icj_id, summary in rval.items() if summary["populated_state"] == "ok"]
+    if populated_ids:
+        count_statement = select(
+            ImplicitCollectionJobsStateCount.implicit_collection_jobs_id,
+            ImplicitCollectionJobsStateCount.state,
+            ImplicitCollectionJobsStateCount.job_count,
+        ).where(
+            ImplicitCollectionJobsStateCount.implicit_collection_jobs_id.in_(populated_ids),
+            ImplicitCollectionJobsStateCount.job_count > 0,
         )
+        for icj_id, state, job_count in sa_session.execute(count_statement):
+            rval[icj_id]["states"][state] = job_count
+    return rval
 
-    rval = []
-    for job_source_id, job_source_type in zip(job_source_ids, job_source_types):
-        if job_source_type == "Job":
-            rval.append(job_summaries[job_source_id])
-        elif job_source_type == "ImplicitCollectionJobs":
-            rval.append(implicit_collection_jobs_summaries[job_source_id])
-        else:
-            invocation_state = workflow_invocation_states[job_source_id]
-            invocation_job_summaries = []
-            invocation_implicit_collection_job_summaries = []
-            invocation_step_states = []
-            for (
-                invocation_step_source_type,
-                invocation_step_source_id,
-                invocation_step_state,
-            ) in workflow_invocations_job_sources[job_source_id]:
-                invocation_step_states.append(invocation_step_state)
-                if invocation_step_source_type == "Job":
-                    invocation_job_summaries.append(job_summaries[invocation_step_source_id])
-                else:
-                    invocation_implicit_collection_job_summaries.append(
-                        implicit_collection_jobs_summaries[invocation_step_source_id]
-                    )
-            rval.append(
-                summarize_invocation_jobs(
-                    job_source_id,
-                    invocation_job_summaries,
-                    invocation_implicit_collection_job_summaries,
-                    invocation_state,
-                    invocation_step_states,
-                )
-            )
 
+def _summarize_invocations(sa_session, invocation_ids) -> dict[int, dict]:
+    if not invocation_ids:
+        return {}
+    statement = select(WorkflowInvocation.id, WorkflowInvocation.state).where(WorkflowInvocation.id.in_(invocation_ids))
+    invocation_states = dict(sa_session.execute(statement).all())
+    if missing_ids := set(invocation_ids) - set(invocation_states):
+        raise ObjectNotFound(f"Workflow invocation {min(missing_ids)} not found.")
+
+    # walk the subworkflow invocations one level at a time
+    step_states = defaultdict(list)
+    step_implicit_collection_jobs_ids = defaultdict(list)
+    subworkflow_invocation_ids = defaultdict(list)
+    visited_ids = set()
+    pending_ids = set(invocation_ids)
+    while pending_ids:
+        visited_ids.update(pending_ids)
+        step_statement = select(
+            WorkflowInvocationStep.workflow_invocation_id,
+            WorkflowInvocationStep.job_id,
+            WorkflowInvocationStep.implicit_collection_jobs_id,
+            WorkflowInvocationStep.state,
+            WorkflowInvocationStep.subworkflow_invocation_id,
+        ).where(WorkflowInvocationStep.workflow_invocation_id.in_(pending_ids))
+        pending_ids = set()
+        for invocation_id, job_id, icj_id, state, subworkflow_invocation_id in sa_session.execute(step_statement):
+            if job_id:
+                step_states[invocation_id].append(state)
+            if icj_id:
+                step_states[invocation_id].append(state)
+                step_implicit_collection_jobs_ids[invocation_id].append(icj_id)
+            if subworkflow_invocation_id:
+                subworkflow_invocation_ids[invocation_id].append(subworkflow_invocation_id)
+                if subworkflow_invocation_id not in visited_ids:
+                    pending_ids.add(subworkflow_invocation_id)
+
+    state_counts: dict[int, dict[str, int]] = defaultdict(dict)
+    count_statement = select(
+        WorkflowInvocationJobStateCount.workflow_invocation_id,
+        WorkflowInvocationJobStateCount.state,
+        WorkflowInvocationJobStateCount.job_count,
+    ).where(
+        WorkflowInvocationJobStateCount.workflow_invocation_id.in_(visited_ids),
+        WorkflowInvocationJobStateCount.job_count > 0,
+    )
+    for invocation_id, state, job_count in sa_session.execute(count_statement):
+        state_counts[invocation_id][state] = job_count
+
+    populated_states: dict[int, str] = {}
+    all_icj_ids = {icj_id for icj_ids in step_implicit_collection_jobs_ids.values() for icj_id in icj_ids}
+    if all_icj_ids:
+        icj_statement = select(ImplicitCollectionJobs.id, ImplicitCollectionJobs.populated_state).where(
+            ImplicitCollectionJobs.id.in_(all_icj_ids)
+        )
+        populated_states = dict(sa_session.execute(icj_statement).all())
+
+    rval = {}
+    for invocation_id in invocation_ids:
+        job_summaries = []
+        implicit_collection_job_summaries: list[dict[str, str]] = []
+        invocation_step_states = []
+        stack = [invocation_id]
+        seen = set()
+        while stack:
+            current_id = stack.pop()
+            if current_id in seen:
+                continue
+            seen.add(current_id)
+            job_summaries.append({"states": state_counts[current_id]})
+            invocation_step_states.extend(step_states[current_id])
+            implicit_collection_job_summaries.extend(
+                {"populated_state": populated_states[icj_id]}
+                for icj_id in step_implicit_collection_jobs_ids[current_id]
+            )
+            stack.extend(subworkflow_invocation_ids[current_id])
+        rval[invocation_id] = summarize_invocation_jobs(
+            invocation_id,
+            job_summaries,
+            implicit_collection_job_summaries,
+            invocation_states[invocation_id],
+            invocation_step_states,
+        )
     return rval
 
 
@@ -1788,21 +1957,128 @@ def summarize_jobs_to_dict(sa_session, jobs_source) -> Optional[JobsSummary]:
             "states": {},
         }
         if populated_state == "ok":
-            # produce state summary...
-            join = model.ImplicitCollectionJobs.table.join(
-                model.ImplicitCollectionJobsJobAssociation.table.join(model.Job)
-            )
-            statement = (
-                select(model.Job.state, func.count())
-                .select_from(join)
-                .where(model.ImplicitCollectionJobs.id == jobs_source.id)
-                .group_by(model.Job.state)
+            # produce state summary from the counters maintained by the job state count triggers
+            statement = select(
+                ImplicitCollectionJobsStateCount.state, ImplicitCollectionJobsStateCount.job_count
+            ).where(
+                ImplicitCollectionJobsStateCount.implicit_collection_jobs_id == jobs_source.id,
+                ImplicitCollectionJobsStateCount.job_count > 0,
             )
             for row in sa_session.execute(statement):
                 rval["states"][row[0]] = row[1]
     return rval
 
 
+def recount_job_state_counts(sa_session: galaxy_scoped_session, since: datetime, batch_size: int = 1000) -> int:
+    """Correct the job state counters of implicit collection jobs and invocations with jobs updated since ``since``.
+
+    The counters are maintained by the triggers of ``galaxy.model.triggers.job_state_counts``, this
+    recounts the jobs of recently active objects in case the counters went out of sync (e.g. after
+    job rows were changed while the triggers were not installed). Returns the number of corrected
+    counters.
+    """
+    updated_job_ids = select(Job.id).where(Job.update_time >= since)
+    icj_ids = sa_session.scalars(
+        select(ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id)
+        .where(
+            ImplicitCollectionJobsJobAssociation.job_id.in_(updated_job_ids),
+            ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id.isnot(None),
+        )
+        .distinct()
+    ).all()
+    invocation_ids = sa_session.scalars(
+        select(WorkflowInvocationStep.workflow_invocation_id)
+        .where(
+            or_(
+                WorkflowInvocationStep.job_id.in_(updated_job_ids),
+                WorkflowInvocationStep.implicit_collection_jobs_id.in_(
+                    select(ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id).where(
+                        ImplicitCollectionJobsJobAssociation.job_id.in_(updated_job_ids)
+                    )
+                ),
+            )
+        )
+        .distinct()
+    ).all()
+
+    corrected = 0
+    for i in range(0, len(icj_ids), batch_size):
+        batch = icj_ids[i : i + batch_size]
+        icj_jobs = (
+            select(
+                ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id.label("key"),
+                ImplicitCollectionJobsJobAssociation.job_id,
+            )
+            .where(ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id.in_(batch))
+            .subquery()
+        )
+        corrected += _correct_state_counts(
+            sa_session, ImplicitCollectionJobsStateCount, "implicit_collection_jobs_id", icj_jobs, batch
+        )
+    for i in range(0, len(invocation_ids), batch_size):
+        batch = invocation_ids[i : i + batch_size]
+        step_jobs = union(
+            select(WorkflowInvocationStep.workflow_invocation_id.label("key"), WorkflowInvocationStep.job_id).where(
+                WorkflowInvocationStep.workflow_invocation_id.in_(batch), WorkflowInvocationStep.job_id.isnot(None)
+            ),
+            select(WorkflowInvocationStep.workflow_invocation_id, ImplicitCollectionJobsJobAssociation.job_id)
+            .join(
+                ImplicitCollectionJobsJobAssociation,
+                ImplicitCollectionJobsJobAssociation.implicit_collection_jobs_id
+                == WorkflowInvocationStep.implicit_collection_jobs_id,
+            )
+            .where(WorkflowInvocationStep.workflow_invocation_id.in_(batch)),
+        ).subquery()
+        corrected += _correct_state_counts(
+            sa_session, WorkflowInvocationJobStateCount, "workflow_invocation_id", step_jobs, batch
+        )
+    return corrected
+
+
+def _correct_state_counts(sa_session, count_class, key_column_name, key_jobs, keys) -> int:
+    """Recount the counters of ``keys`` from ``key_jobs``, a subquery of ``key`` and ``job_id`` columns.
+
+    The counters are not locked. Under READ COMMITTED the recount reads the jobs from the snapshot of
+    its statement, so a job state change committed while it runs may be left out of or counted on
+    top of the count written. That job is recently updated, the next periodic check recounts its
+    counters again (see ``galaxy.model.triggers.job_state_counts``).
+    """
+    key_column = getattr(count_class, key_column_name)
+    job_count = (
+        select(func.count())
+        .select_from(key_jobs)
+        .join(Job, Job.id == key_jobs.c.job_id)
+        .where(key_jobs.c.key == key_column, Job.state == count_class.state)
+        .scalar_subquery()
+    )
+    updated = sa_session.execute(
+        update(count_class)
+        .where(key_column.in_(keys), count_class.job_count != job_count)
+        .values(job_count=job_count)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    missing_counts = (
+        select(key_jobs.c.key, Job.state, func.count())
+        .join(Job, Job.id == key_jobs.c.job_id)
+        .where(
+            Job.state.isnot(None),
+            ~exists().where(key_column == key_jobs.c.key, count_class.state == Job.state),
+        )
+        .group_by(key_jobs.c.key, Job.state)
+    )
+    insert = postgresql_insert if sa_session.get_bind().dialect.name == "postgresql" else sqlite_insert
+    # a trigger may create the counter of a state first, it then counts the job
+    inserted = sa_session.execute(
+        insert(count_class)
+        .from_select([key_column_name, "state", "job_count"], missing_counts)
+        .on_conflict_do_nothing(index_elements=[key_column_name, "state"])
+    ).rowcount
+    sa_session.commit()
+    if updated or inserted:
+        log.warning("Corrected %s %s job state counters", updated + inserted, count_class.__tablename__)
+    return updated + inserted
+
+
 def summarize_job_metrics(trans, job):
     """Produce a dict-ified version of job metrics ready for tabular rendering.
 
@@ -457,6 +457,8 @@ class WorkflowsManager(sharable.SharableModelManager[model.StoredWorkflow], dele
             trans.sa_session.add(workflow_invocation)
 
         trans.sa_session.commit()
+        if cancelled:
+            trans.app.workflow_scheduling_manager.request_scheduling([workflow_invocation])
 
         return workflow_invocation
 
@@ -494,6 +496,7 @@ class WorkflowsManager(sharable.SharableModelManager[model.StoredWorkflow], dele
         workflow_invocation_step.action = performed_action
         trans.sa_session.add(workflow_invocation_step)
         trans.sa_session.commit()
+        trans.app.workflow_scheduling_manager.request_scheduling([workflow_invocation])
         return workflow_invocation_step
 
     def build_invocations_query(
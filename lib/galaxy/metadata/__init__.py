@@ -81,6 +81,8 @@ class MetadataCollectionStrategy(metaclass=abc.ABCMeta):
         include_command=True,
         max_metadata_value_size=0,
         max_discovered_files=None,
+        metadata_sample_size=0,
+        line_index_interval=0,
         validate_outputs: bool = False,
         object_store_conf=None,
         tool=None,
@@ -160,6 +162,8 @@ class PortableDirectoryMetadataGenerator(MetadataCollectionStrategy):
         include_command=True,
         max_metadata_value_size=0,
         max_discovered_files=None,
+        metadata_sample_size=0,
+        line_index_interval=0,
         validate_outputs: bool = False,
         object_store_conf=None,
         tool=None,
@@ -217,6 +221,8 @@ class PortableDirectoryMetadataGenerator(MetadataCollectionStrategy):
             "datatypes_config": datatypes_config,
             "max_metadata_value_size": max_metadata_value_size,
             "max_discovered_files": max_discovered_files,
+            "metadata_sample_size": metadata_sample_size,
+            "line_index_interval": line_index_interval,
             "outputs": outputs,
             "change_datatype_actions": job.get_change_datatype_actions(),
         }
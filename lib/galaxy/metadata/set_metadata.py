@@ -194,6 +194,8 @@ def set_metadata_portable(
     provided_metadata_style = metadata_params.get("provided_metadata_style")
     max_metadata_value_size = metadata_params.get("max_metadata_value_size") or 0
     max_discovered_files = metadata_params.get("max_discovered_files")
+    metadata_sample_size = metadata_params.get("metadata_sample_size") or 0
+    line_index_interval = metadata_params.get("line_index_interval") or 0
     outputs = metadata_params["outputs"]
 
     tool_provided_metadata = load_job_metadata(job_metadata, provided_metadata_style)
@@ -201,6 +203,10 @@ def set_metadata_portable(
     def set_meta(new_dataset_instance, file_dict):
         if not extended_metadata_collection:
             set_meta_kwds["metadata_tmp_files_dir"] = metadata_tmp_files_dir
+        if metadata_sample_size:
+            set_meta_kwds.setdefault("sample_size", metadata_sample_size)
+        if line_index_interval:
+            set_meta_kwds.setdefault("line_index_interval", line_index_interval)
         set_meta_with_tool_provided(
             new_dataset_instance,
             file_dict,
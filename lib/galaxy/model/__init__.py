@@ -17,7 +17,12 @@ import pwd
 import random
 import string
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import (
+    Iterable,
+    Iterator,
+    Sequence,
+)
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import (
     datetime,
@@ -1619,6 +1624,7 @@ class Job(Base, JobLike, UsesCreateAndUpdateTime, Dictifiable, Serializable):
     preferred_object_store_id: Mapped[Optional[str]] = mapped_column(String(255))
     object_store_id_overrides: Mapped[Optional[dict[str, Optional[str]]]] = mapped_column(JSONType)
     tool_request_id: Mapped[Optional[int]] = mapped_column(ForeignKey("tool_request.id"), index=True)
+    cache_fingerprint: Mapped[Optional[str]] = mapped_column(String(64), index=True)
 
     dynamic_tool: Mapped[Optional["DynamicTool"]] = relationship()
     tool_request: Mapped[Optional["ToolRequest"]] = relationship(back_populates="jobs")
@@ -2893,6 +2899,36 @@ class ImplicitCollectionJobsJobAssociation(Base, RepresentById):
     job: Mapped["Job"] = relationship(back_populates="implicit_collection_jobs_association")
 
 
+class ImplicitCollectionJobsStateCount(Base, RepresentById):
+    """Number of jobs of an implicit collection jobs object per state.
+
+    Maintained by the triggers of ``galaxy.model.triggers.job_state_counts``.
+    """
+
+    __tablename__ = "implicit_collection_jobs_state_count"
+    __table_args__ = (UniqueConstraint("implicit_collection_jobs_id", "state"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    implicit_collection_jobs_id: Mapped[int] = mapped_column(ForeignKey("implicit_collection_jobs.id"))
+    state: Mapped[str] = mapped_column(String(64))
+    job_count: Mapped[int] = mapped_column(default=0)
+
+
+class WorkflowInvocationJobStateCount(Base, RepresentById):
+    """Number of jobs of the steps of a workflow invocation per state, excluding subworkflow invocations.
+
+    Maintained by the triggers of ``galaxy.model.triggers.job_state_counts``.
+    """
+
+    __tablename__ = "workflow_invocation_job_state_count"
+    __table_args__ = (UniqueConstraint("workflow_invocation_id", "state"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    workflow_invocation_id: Mapped[int] = mapped_column(ForeignKey("workflow_invocation.id"))
+    state: Mapped[str] = mapped_column(String(64))
+    job_count: Mapped[int] = mapped_column(default=0)
+
+
 class PostJobAction(Base, RepresentById):
     __tablename__ = "post_job_action"
 
@@ -3548,12 +3584,14 @@ class History(Base, HasTags, Dictifiable, UsesAnnotations, HasName, Serializable
         self.user = user
         # Objects to eventually add to history
         self._pending_additions = []
+        self._defer_pending_additions = False
         self._item_by_hid_cache = None
 
     @reconstructor
     def init_on_load(self):
         # Restores properties that are not tracked in the database
         self._pending_additions = []
+        self._defer_pending_additions = False
 
     def stage_addition(self, items):
         history_id = self.id
@@ -3580,7 +3618,23 @@ class History(Base, HasTags, Dictifiable, UsesAnnotations, HasName, Serializable
     def update(self):
         self._update_time = now()
 
+    @contextmanager
+    def defer_pending_additions(self) -> Iterator[None]:
+        """Keep items staged while in this block, even if :meth:`add_pending_items` is called.
+
+        Items staged while creating many jobs (e.g. mapping a tool over a collection) are
+        then added by the next call to :meth:`add_pending_items` after the block, which
+        allocates all their hids with a single update of the history's hid counter.
+        """
+        self._defer_pending_additions = True
+        try:
+            yield
+        finally:
+            self._defer_pending_additions = False
+
     def add_pending_items(self, set_output_hid=True):
+        if self._defer_pending_additions and set_output_hid:
+            return
         # These are assumed to be either copies of existing datasets or new, empty datasets,
         # so we don't need to set the quota.
         self.add_datasets(
@@ -4769,6 +4823,9 @@ class Dataset(Base, StorableObject, Serializable):
         session = object_session(self)
         if not session:
             return
+        if self.id is None:
+            # Not flushed yet (e.g. a dataset being discovered), no collection element in the database references it.
+            return
         dialect_name = session.bind.dialect.name
 
         if dialect_name in ("postgresql", "sqlite"):
@@ -7026,6 +7083,7 @@ class DatasetCollection(Base, Dictifiable, UsesAnnotations, Serializable):
                 ]
             ]
         ] = None,
+        depth: Optional[int] = None,
     ):
         collection_attributes = collection_attributes or ()
         element_attributes = element_attributes or ()
@@ -7054,7 +7112,7 @@ class DatasetCollection(Base, Dictifiable, UsesAnnotations, Serializable):
             .filter(dc.c.id == dataset_collection.id)
         )
 
-        while ":" in depth_collection_type:
+        while ":" in depth_collection_type and (depth is None or nesting_level + 1 < depth):
             nesting_level += 1
             inner_dce = alias(DatasetCollectionElement.__table__)
             inner_dc = alias(DatasetCollection.__table__)
@@ -7310,6 +7368,36 @@ class DatasetCollection(Base, Dictifiable, UsesAnnotations, Serializable):
                     instances.append(instance)
             return instances
 
+    def nested_element_identifiers(self, depth: int) -> Optional[Sequence[Any]]:
+        """Return the ``id_<level>`` and ``element_identifier_<level>`` of the elements of the first ``depth``
+        levels of this collection with a single query, one row per element at the deepest level.
+
+        Elements of empty subcollections are ``None``. Returns ``None`` if the collection isn't persisted.
+        """
+        db_session = object_session(self)
+        if not db_session or not self.id:
+            return None
+        stmt = self._build_nested_collection_attributes_stmt(
+            element_attributes=("id", "element_identifier"), depth=depth
+        )
+        return db_session.execute(stmt).all()
+
+    def dataset_identifier_paths(self) -> list[tuple[tuple[str, ...], Optional[int]]]:
+        """Return the element identifiers of the path to each dataset of this collection and its ``dataset_id``.
+
+        Uses a single query if the collection is persisted.
+        """
+        db_session = object_session(self)
+        if db_session and self.id:
+            stmt = self._build_nested_collection_attributes_stmt(
+                element_attributes=("element_identifier",), hda_attributes=("dataset_id",)
+            )
+            return [(tuple(row[:-1]), row[-1]) for row in db_session.execute(stmt)]
+        return [
+            (tuple(element._identifiers), element.hda.dataset_id if element.hda else None)
+            for element in self.dataset_elements_and_identifiers()
+        ]
+
     @property
     def dataset_elements(self):
         db_session = object_session(self)
@@ -9523,25 +9611,57 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
         return list(sa_session.scalars(stmt))
 
     @staticmethod
-    def poll_active_workflow_ids(engine, scheduler=None, handler=None):
-        and_conditions = [
-            or_(
-                WorkflowInvocation.state == WorkflowInvocation.states.NEW,
-                WorkflowInvocation.state == WorkflowInvocation.states.REQUIRES_MATERIALIZATION,
-                WorkflowInvocation.state == WorkflowInvocation.states.READY,
-                WorkflowInvocation.state == WorkflowInvocation.states.CANCELLING,
-            ),
-        ]
+    def poll_active_workflow_ids(engine, scheduler=None, handler=None, invocation_ids=None):
+        and_conditions = WorkflowInvocation._active_conditions(scheduler, handler, invocation_ids)
+        stmt = select(WorkflowInvocation.id).filter(and_(*and_conditions)).order_by(WorkflowInvocation.id.asc())
+        # Immediately just load all ids into memory so time slicing logic
+        # is relatively intutitive.
+        with engine.connect() as conn:
+            return conn.scalars(stmt).all()
+
+    @staticmethod
+    def poll_active_workflow_ids_and_users(
+        engine, scheduler=None, handler=None, invocation_ids=None
+    ) -> list[tuple[int, Optional[int]]]:
+        """Like ``poll_active_workflow_ids`` but return the id of the invocation's user along with its id."""
+        and_conditions = WorkflowInvocation._active_conditions(scheduler, handler, invocation_ids)
+        stmt = (
+            select(WorkflowInvocation.id, History.user_id)
+            .join(History, WorkflowInvocation.history_id == History.id)
+            .filter(and_(*and_conditions))
+            .order_by(WorkflowInvocation.id.asc())
+        )
+        with engine.connect() as conn:
+            return [(invocation_id, user_id) for invocation_id, user_id in conn.execute(stmt)]
+
+    @staticmethod
+    def _active_conditions(scheduler=None, handler=None, invocation_ids=None):
+        and_conditions = [WorkflowInvocation._active_condition()]
         if scheduler is not None:
             and_conditions.append(WorkflowInvocation.scheduler == scheduler)
         if handler is not None:
             and_conditions.append(WorkflowInvocation.handler == handler)
+        if invocation_ids is not None:
+            and_conditions.append(WorkflowInvocation.id.in_(invocation_ids))
+        return and_conditions
 
-        stmt = select(WorkflowInvocation.id).filter(and_(*and_conditions)).order_by(WorkflowInvocation.id.asc())
-        # Immediately just load all ids into memory so time slicing logic
-        # is relatively intutitive.
+    @staticmethod
+    def poll_active_workflow_handlers_for_history(engine, history_id) -> list[tuple[int, Optional[str]]]:
+        """Return the id and handler of the active invocations writing to history ``history_id``."""
+        stmt = select(WorkflowInvocation.id, WorkflowInvocation.handler).filter(
+            and_(WorkflowInvocation.history_id == history_id, WorkflowInvocation._active_condition())
+        )
         with engine.connect() as conn:
-            return conn.scalars(stmt).all()
+            return [(invocation_id, handler) for invocation_id, handler in conn.execute(stmt)]
+
+    @staticmethod
+    def _active_condition():
+        return or_(
+            WorkflowInvocation.state == WorkflowInvocation.states.NEW,
+            WorkflowInvocation.state == WorkflowInvocation.states.REQUIRES_MATERIALIZATION,
+            WorkflowInvocation.state == WorkflowInvocation.states.READY,
+            WorkflowInvocation.state == WorkflowInvocation.states.CANCELLING,
+        )
 
     def add_output(self, workflow_output, step, output_object):
         if not hasattr(output_object, "history_content_type"):
@@ -76,6 +76,9 @@ class Tree(BaseTree):
 
     @staticmethod
     def for_dataset_collection(dataset_collection, collection_type_description):
+        compact_tree = CompactTree.for_dataset_collection(dataset_collection, collection_type_description)
+        if compact_tree is not None:
+            return compact_tree
         children = []
         columns_metadata = {}
         for element in dataset_collection.elements:
@@ -177,6 +180,200 @@ class Tree(BaseTree):
         return f"Tree[collection_type={self.collection_type_description},children=({','.join(f'{identifier_and_element[0]}={identifier_and_element[1]}' for identifier_and_element in self.children)})]"
 
 
+class CompactTree(Tree):
+    """A :class:`Tree` backed by flat arrays instead of nested child trees.
+
+    ``identifiers[level]`` holds the element identifiers of all nodes at ``level`` in order and the
+    children of node ``i`` at ``level`` are the nodes ``offsets[level][i]:offsets[level][i + 1]`` at
+    ``level + 1``. A ``CompactTree`` is a view on the nodes ``start:end`` at ``level``, child trees
+    are only created when iterating ``children`` and share the arrays of their parent.
+    """
+
+    def __init__(
+        self,
+        identifiers,
+        offsets,
+        collection_type_description,
+        level=0,
+        start=0,
+        end=None,
+        when_values=None,
+        column_definitions=None,
+    ):
+        BaseTree.__init__(self, collection_type_description)
+        self.identifiers = identifiers
+        self.offsets = offsets
+        self.level = level
+        self.start = start
+        self.end = len(identifiers[level]) if end is None else end
+        self.when_values = when_values
+        self.columns_metadata = {}
+        self.column_definitions = column_definitions
+
+    @staticmethod
+    def for_dataset_collection(dataset_collection, collection_type_description):
+        """Load the structure of a persisted collection with a single query, ``None`` if that isn't possible."""
+        nested_element_identifiers = getattr(dataset_collection, "nested_element_identifiers", None)
+        # sample sheets carry columns metadata on their elements, build these the regular way.
+        if nested_element_identifiers is None or "sample_sheet" in dataset_collection.collection_type:
+            return None
+        levels = collection_type_description.collection_type.count(":") + 1
+        rows = nested_element_identifiers(levels)
+        if rows is None:
+            return None
+        return CompactTree.from_rows(
+            rows, levels, collection_type_description, column_definitions=dataset_collection.column_definitions
+        )
+
+    @staticmethod
+    def from_rows(rows, levels, collection_type_description, column_definitions=None):
+        """Build a tree from rows of ``(id_0, element_identifier_0, ..., id_n, element_identifier_n)``.
+
+        Rows must be sorted by element index at every level, elements of empty subcollections are ``None``.
+        """
+        identifiers: list[list[str]] = [[] for _ in range(levels)]
+        starts: list[list[int]] = [[] for _ in range(levels - 1)]
+        last_ids = [None] * levels
+        for row in rows:
+            for level in range(levels):
+                element_id = row[2 * level]
+                if element_id is None:
+                    break
+                if element_id == last_ids[level]:
+                    continue
+                last_ids[level] = element_id
+                for deeper_level in range(level + 1, levels):
+                    last_ids[deeper_level] = None
+                identifiers[level].append(row[2 * level + 1])
+                if level < levels - 1:
+                    starts[level].append(len(identifiers[level + 1]))
+        offsets = [level_starts + [len(identifiers[level + 1])] for level, level_starts in enumerate(starts)]
+        return CompactTree(identifiers, offsets, collection_type_description, column_definitions=column_definitions)
+
+    @property
+    def children(self):
+        identifiers = self.identifiers[self.level]
+        if self.level == len(self.identifiers) - 1:
+            return [(identifiers[i], leaf) for i in range(self.start, self.end)]
+        offsets = self.offsets[self.level]
+        subcollection_type_description = self.collection_type_description.subcollection_type_description()
+        return [
+            (
+                identifiers[i],
+                CompactTree(
+                    self.identifiers,
+                    self.offsets,
+                    subcollection_type_description,
+                    level=self.level + 1,
+                    start=offsets[i],
+                    end=offsets[i + 1],
+                ),
+            )
+            for i in range(self.start, self.end)
+        ]
+
+    @property
+    def is_whole(self):
+        return self.level == 0 and self.start == 0 and self.end == len(self.identifiers[0])
+
+    def __len__(self):
+        start, end = self.start, self.end
+        for offsets in self.offsets[self.level :]:
+            start, end = offsets[start], offsets[end]
+        return end - start
+
+    def can_match(self, other_structure):
+        if (
+            isinstance(other_structure, CompactTree)
+            and self.is_whole
+            and other_structure.is_whole
+            and len(self.identifiers) == len(other_structure.identifiers)
+        ):
+            return (
+                self.collection_type_description.can_match_type(other_structure.collection_type_description)
+                and len(self.identifiers[0]) == len(other_structure.identifiers[0])
+                and self.offsets == other_structure.offsets
+            )
+        return super().can_match(other_structure)
+
+    def multiply(self, other_structure):
+        if other_structure.is_leaf:
+            return self.clone()
+        if not (isinstance(other_structure, CompactTree) and self.is_whole and other_structure.is_whole):
+            return super().multiply(other_structure)
+
+        # every leaf of this tree gets a copy of the other tree's levels
+        new_collection_type = self.collection_type_description.multiply(other_structure.collection_type_description)
+        leaves = len(self.identifiers[-1])
+        other_roots = len(other_structure.identifiers[0])
+        identifiers = self.identifiers + [identifiers * leaves for identifiers in other_structure.identifiers]
+        offsets = self.offsets + [[i * other_roots for i in range(leaves + 1)]]
+        for level, level_offsets in enumerate(other_structure.offsets):
+            size = len(other_structure.identifiers[level + 1])
+            repeated = [offset + i * size for i in range(leaves) for offset in level_offsets[:-1]]
+            repeated.append(leaves * size)
+            offsets.append(repeated)
+        return CompactTree(identifiers, offsets, new_collection_type, column_definitions=self.column_definitions)
+
+    def clone(self):
+        # the arrays are never modified, only the view is copied
+        return CompactTree(
+            self.identifiers,
+            self.offsets,
+            self.collection_type_description,
+            level=self.level,
+            start=self.start,
+            end=self.end,
+            column_definitions=self.column_definitions,
+        )
+
+    def walk_collections(self, hdca_dict):
+        collection_dict = dict_map(lambda hdca: hdca.collection, hdca_dict)
+        elements_dict = self._leaf_elements(collection_dict)
+        if elements_dict is None:
+            yield from self._walk_collections(collection_dict)
+            return
+        when_values = self._leaf_when_values()
+        for index in range(len(self)):
+            yield {name: elements[index] for name, elements in elements_dict.items()}, when_values[index]
+
+    def _leaf_elements(self, collection_dict):
+        """Load the leaf elements of each collection in order with one query per collection if possible."""
+        if not self.is_whole:
+            return None
+        elements_dict = {}
+        for name, collection in collection_dict.items():
+            # only complete collections of the depth of this tree can be walked by leaf
+            if not getattr(collection, "populated", False) or not hasattr(collection, "dataset_elements"):
+                return None
+            if collection.collection_type.count(":") + 1 != len(self.identifiers):
+                return None
+            elements = collection.dataset_elements
+            if len(elements) != len(self):
+                return None
+            elements_dict[name] = elements
+        return elements_dict
+
+    def _leaf_when_values(self):
+        leaves = len(self)
+        if not self.when_values:
+            return [None] * leaves
+        if len(self.when_values) == 1:
+            return self.when_values * leaves
+        # when values are given per top level element
+        top_level_indexes = list(range(len(self.identifiers[0])))
+        for offsets in self.offsets:
+            top_level_indexes = [
+                top_level_index
+                for i, top_level_index in enumerate(top_level_indexes)
+                for _ in range(offsets[i + 1] - offsets[i])
+            ]
+        return [self.when_values[index] for index in top_level_indexes]
+
+    def __str__(self):
+        return f"Compact{super().__str__()}"
+
+
 def tool_output_to_structure(get_sliced_input_collection_structure, tool_output, collections_manager):
     if not tool_output.collection:
         tree = leaf
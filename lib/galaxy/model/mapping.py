@@ -13,6 +13,7 @@ from galaxy.model import (
 from galaxy.model.base import SharedModelMapping
 from galaxy.model.orm.engine_factory import build_engine
 from galaxy.model.security import GalaxyRBACAgent
+from galaxy.model.triggers.job_state_counts import install as install_job_state_count_triggers
 from galaxy.model.triggers.update_audit_table import install as install_timestamp_triggers
 
 if TYPE_CHECKING:
@@ -70,6 +71,7 @@ def init(
 
 def create_additional_database_objects(engine):
     install_timestamp_triggers(engine)
+    install_job_state_count_triggers(engine)
 
 
 def configure_model_mapping(
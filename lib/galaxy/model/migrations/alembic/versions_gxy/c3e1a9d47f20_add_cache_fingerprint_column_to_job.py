@@ -0,0 +1,37 @@
+"""Add cache_fingerprint column to job table
+
+Revision ID: c3e1a9d47f20
+Revises: 312602e3191d
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from galaxy.model.database_object_names import build_index_name
+from galaxy.model.migrations.util import (
+    add_column,
+    create_index,
+    drop_column,
+    drop_index,
+)
+
+# revision identifiers, used by Alembic.
+revision = "c3e1a9d47f20"
+down_revision = "312602e3191d"
+branch_labels = None
+depends_on = None
+
+# database object names used in this revision
+table_name = "job"
+column_name = "cache_fingerprint"
+index_name = build_index_name(table_name, column_name)
+
+
+def upgrade():
+    add_column(table_name, sa.Column(column_name, sa.String(64), nullable=True))
+    create_index(index_name, table_name, [column_name])
+
+
+def downgrade():
+    drop_index(index_name, table_name)
+    drop_column(table_name, column_name)
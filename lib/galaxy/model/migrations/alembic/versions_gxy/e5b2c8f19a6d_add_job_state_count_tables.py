@@ -0,0 +1,98 @@
+"""Add job state count tables for implicit collection jobs and workflow invocations
+
+Revision ID: e5b2c8f19a6d
+Revises: c3e1a9d47f20
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+
+from galaxy.model.database_object_names import build_unique_constraint_name
+from galaxy.model.migrations.util import (
+    create_table,
+    drop_table,
+    transaction,
+)
+from galaxy.model.triggers.job_state_counts import (
+    ICJ_TABLE,
+    install_statements,
+    INVOCATION_TABLE,
+    remove_statements,
+)
+
+# revision identifiers, used by Alembic.
+revision = "e5b2c8f19a6d"
+down_revision = "c3e1a9d47f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with transaction():
+        create_table(
+            ICJ_TABLE,
+            Column("id", Integer, primary_key=True),
+            Column("implicit_collection_jobs_id", Integer, ForeignKey("implicit_collection_jobs.id"), nullable=False),
+            Column("state", String(64), nullable=False),
+            Column("job_count", Integer, nullable=False),
+            UniqueConstraint(
+                "implicit_collection_jobs_id",
+                "state",
+                name=build_unique_constraint_name(ICJ_TABLE, "implicit_collection_jobs_id"),
+            ),
+        )
+        create_table(
+            INVOCATION_TABLE,
+            Column("id", Integer, primary_key=True),
+            Column("workflow_invocation_id", Integer, ForeignKey("workflow_invocation.id"), nullable=False),
+            Column("state", String(64), nullable=False),
+            Column("job_count", Integer, nullable=False),
+            UniqueConstraint(
+                "workflow_invocation_id",
+                "state",
+                name=build_unique_constraint_name(INVOCATION_TABLE, "workflow_invocation_id"),
+            ),
+        )
+        populate_counts()
+        for statement in install_statements(op.get_bind().engine):
+            op.execute(statement)
+
+
+def downgrade():
+    with transaction():
+        for statement in remove_statements(op.get_bind().engine):
+            op.execute(statement)
+        drop_table(INVOCATION_TABLE)
+        drop_table(ICJ_TABLE)
+
+
+def populate_counts():
+    op.execute(f"""
+        INSERT INTO {ICJ_TABLE} (implicit_collection_jobs_id, state, job_count)
+        SELECT a.implicit_collection_jobs_id, job.state, count(*)
+        FROM implicit_collection_jobs_job_association AS a
+        JOIN job ON job.id = a.job_id
+        WHERE a.implicit_collection_jobs_id IS NOT NULL AND job.state IS NOT NULL
+        GROUP BY a.implicit_collection_jobs_id, job.state
+        """)
+    op.execute(f"""
+        INSERT INTO {INVOCATION_TABLE} (workflow_invocation_id, state, job_count)
+        SELECT step_job.workflow_invocation_id, job.state, count(*)
+        FROM (
+            SELECT s.workflow_invocation_id, s.job_id FROM workflow_invocation_step AS s WHERE s.job_id IS NOT NULL
+            UNION
+            SELECT s.workflow_invocation_id, a.job_id FROM workflow_invocation_step AS s
+            JOIN implicit_collection_jobs_job_association AS a
+            ON a.implicit_collection_jobs_id = s.implicit_collection_jobs_id
+        ) AS step_job
+        JOIN job ON job.id = step_job.job_id
+        WHERE job.state IS NOT NULL
+        GROUP BY step_job.workflow_invocation_id, job.state
+        """)
@@ -13,6 +13,8 @@ from collections.abc import (
     Callable,
     Iterable,
 )
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from typing import (
     Any,
     NamedTuple,
@@ -21,11 +23,19 @@ from typing import (
     Union,
 )
 
+from sqlalchemy import select
+from sqlalchemy.orm import (
+    joinedload,
+    selectinload,
+    undefer,
+)
+
 import galaxy.model
 from galaxy import util
 from galaxy.exceptions import RequestParameterInvalidException
 from galaxy.model import LibraryFolder
 from galaxy.model.dataset_collections.builder import BoundCollectionBuilder
+from galaxy.model.metadata import FileParameter
 from galaxy.model.tags import GalaxySessionlessTagHandler
 from galaxy.objectstore import (
     ObjectStore,
@@ -75,6 +85,8 @@ class ModelPersistenceContext(metaclass=abc.ABCMeta):
 
     job_working_directory: str  # TODO: rename
     max_discovered_files = float("inf")
+    # Number of threads moving discovered collection elements to the object store and setting their metadata.
+    discovered_outputs_workers = 1
     discovered_file_count: int
 
     def get_job(self) -> Optional[galaxy.model.Job]:
@@ -452,38 +464,129 @@ class ModelPersistenceContext(metaclass=abc.ABCMeta):
 
         add_datasets_timer = ExecutionTimer()
         self.add_datasets_to_history(element_datasets["datasets"])
-        self.update_object_store_with_datasets(
+        log.debug(
+            "(%s) Add dynamic collection datasets to history for output [%s] %s",
+            self.job_id(),
+            name,
+            add_datasets_timer,
+        )
+        finalize_datasets_timer = ExecutionTimer()
+        self.finalize_datasets(
             datasets=element_datasets["datasets"],
             paths=element_datasets["paths"],
             extra_files=element_datasets["extra_files"],
             output_name=name,
         )
         log.debug(
-            "(%s) Add dynamic collection datasets to history for output [%s] %s",
+            "(%s) Stored and set metadata of dynamic collection datasets for output [%s] %s",
             self.job_id(),
             name,
-            add_datasets_timer,
+            finalize_datasets_timer,
         )
-        self.set_datasets_metadata(datasets=element_datasets["datasets"])
 
     def add_tags_to_datasets(self, datasets, tag_lists):
         if any(tag_lists):
             for dataset, tags in zip(datasets, tag_lists):
                 self.tag_handler.add_tags_from_list(self.user, dataset, tags, flush=False)
 
-    def update_object_store_with_datasets(self, datasets, paths, extra_files, output_name):
+    def load_datasets(self, datasets: list["DatasetInstance"]):
+        """Load what storing and setting metadata needs for datasets already written to the database.
+
+        Dataset rows, metadata columns and (empty) converted dataset collections of the history
+        datasets are loaded with a few queries per chunk instead of lazily for every dataset.
+        """
+        sa_session = self.sa_session
+        if not sa_session:
+            return
+        hda_ids = [
+            dataset.id
+            for dataset in datasets
+            if isinstance(dataset, galaxy.model.HistoryDatasetAssociation) and dataset.id is not None
+        ]
+        for chunk in chunk_iterable(hda_ids, size=DEFAULT_CHUNK_SIZE):
+            stmt = (
+                select(galaxy.model.HistoryDatasetAssociation)
+                .where(galaxy.model.HistoryDatasetAssociation.id.in_(chunk))
+                .options(
+                    undefer(galaxy.model.HistoryDatasetAssociation._metadata),
+                    joinedload(galaxy.model.HistoryDatasetAssociation.dataset),
+                    selectinload(galaxy.model.HistoryDatasetAssociation.implicitly_converted_datasets),  # type: ignore[arg-type]
+                    selectinload(galaxy.model.HistoryDatasetAssociation.implicitly_converted_parent_datasets),  # type: ignore[arg-type]
+                )
+            )
+            sa_session.scalars(stmt).unique().all()
+
+    def finalize_datasets(self, datasets, paths, extra_files, output_name):
+        """Move discovered files to the object store and set size, metadata and peek of their datasets.
+
+        With ``discovered_outputs_workers`` above 1 the files are moved to the object store by a pool
+        of threads, which mostly helps with object stores or file systems with high latency. The
+        threads only do object store I/O, the datasets are changed on the calling thread: the database
+        session is not thread safe. The datasets are written to the database and loaded up front, so
+        that the threads only read attributes already loaded. Datasets with metadata files and datasets
+        the object store would select an object store for are finalized before the threads start.
+        """
         assert self.object_store
-        for dataset, path, extra_file in zip(datasets, paths, extra_files):
-            object_store_id = self.override_object_store_id(output_name)
-            if object_store_id:
-                dataset.dataset.object_store_id = object_store_id
+        object_store_id = self.override_object_store_id(output_name)
+
+        def finalize(dataset, path, extra_file):
+            self.update_object_store_with_dataset(dataset, path, extra_file, object_store_id)
+            self.set_datasets_metadata(datasets=[dataset])
+
+        elements = list(zip(datasets, paths, extra_files))
+        if self.discovered_outputs_workers > 1 and len(elements) > 1:
+            if self.sa_session:
+                self.sa_session.flush()
+            self.load_datasets(datasets)
+            # the distributed object store sets the object store ID of datasets created without one
+            selects_object_store = bool(self.object_store.object_store_ids())
+            threaded = []
+            for element in elements:
+                dataset = element[0]
+                if object_store_id:
+                    dataset.dataset.object_store_id = object_store_id
+                if _has_metadata_files(dataset) or (selects_object_store and dataset.dataset.object_store_id is None):
+                    # creating metadata files adds them to the database session
+                    finalize(*element)
+                else:
+                    threaded.append(element)
+            with ThreadPoolExecutor(max_workers=self.discovered_outputs_workers) as executor:
+                # in a copy of the context, e.g. for coalesced_metadata_invalidations
+                futures = [
+                    executor.submit(copy_context().run, self.store_dataset_files, *element) for element in threaded
+                ]
+                for future in futures:
+                    future.result()
+            for dataset, _, extra_file in threaded:
+                self.set_dataset_size(dataset, extra_file)
+            self.set_datasets_metadata(datasets=[element[0] for element in threaded])
+        else:
+            for i, element in enumerate(elements):
+                finalize(*element)
+                if i == 0:
+                    # Object stores keeping files by id commit the new datasets when storing the first one,
+                    # load what the remaining ones need in bulk then.
+                    self.load_datasets(datasets[1:])
+
+    def update_object_store_with_dataset(self, dataset, path, extra_file, object_store_id):
+        if object_store_id:
+            dataset.dataset.object_store_id = object_store_id
+        self.store_dataset_files(dataset, path, extra_file)
+        self.set_dataset_size(dataset, extra_file)
+
+    def store_dataset_files(self, dataset, path, extra_file):
+        """Move the file and extra files of ``dataset`` to the object store, without changing ``dataset``."""
+        assert self.object_store
+        self.object_store.update_from_file(dataset.dataset, file_name=path, create=True)
+        if extra_file:
+            persist_extra_files(self.object_store, extra_file, dataset)
 
-            self.object_store.update_from_file(dataset.dataset, file_name=path, create=True)
-            if extra_file:
-                persist_extra_files(self.object_store, extra_file, dataset)
-                dataset.set_size()
-            else:
-                dataset.set_size(no_extra_files=True)
+    @staticmethod
+    def set_dataset_size(dataset, extra_file):
+        if extra_file:
+            dataset.set_size()
+        else:
+            dataset.set_size(no_extra_files=True)
 
     @property
     @abc.abstractmethod
@@ -745,6 +848,10 @@ class SessionlessModelPersistenceContext(ModelPersistenceContext):
         """No-op, no job context."""
 
 
+def _has_metadata_files(dataset_instance) -> bool:
+    return any(isinstance(spec.param, FileParameter) for spec in dataset_instance.datatype.metadata_spec.values())
+
+
 def persist_target_to_export_store(
     target_dict: dict[str, Any],
     export_store: "DirectoryModelExportStore",
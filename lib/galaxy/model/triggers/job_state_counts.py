@@ -0,0 +1,222 @@
+"""Triggers maintaining the job state counters of implicit collection jobs and workflow invocations.
+
+``implicit_collection_jobs_state_count`` and ``workflow_invocation_job_state_count`` hold the number
+of jobs per state of an implicit collection jobs object and of the steps of a workflow invocation
+(subworkflow invocations are counted separately). A job is counted once it is associated with the
+implicit collection jobs object or the invocation step, and its counts move along with its state.
+
+Every job of an implicit collection jobs object or invocation updates the same few counter rows, so
+a job state change holds the row lock of its counters until its transaction commits and concurrent
+state changes of jobs of the same object wait for it. This serializes job state updates per object,
+which is cheap as long as Galaxy commits job state changes in short transactions, one job at a time.
+A transaction changing the states of jobs of several objects may deadlock with another one
+updating them in the opposite order, the database then rolls one of them back, counters included.
+Counters going out of sync (e.g. jobs updated while the triggers were not installed) are corrected
+by ``galaxy.managers.jobs.recount_job_state_counts``, run periodically by the
+``check_job_state_counts`` task. The recount does not lock the counters, a job state change racing
+it may leave a counter off again. Each check recounts the objects with jobs updated within twice
+the ``job_state_counts_check_interval``, so the next check corrects that drift.
+"""
+
+from galaxy.model.triggers.update_audit_table import execute_statements
+
+fn_prefix = "fn_job_state_count"
+
+ICJ_TABLE = "implicit_collection_jobs_state_count"
+INVOCATION_TABLE = "workflow_invocation_job_state_count"
+
+# Statements shared by both databases, ``NEW`` and ``OLD`` are the rows of the trigger
+
+JOB_STATE_UPDATE = [
+    f"""
+    INSERT INTO {ICJ_TABLE} (implicit_collection_jobs_id, state, job_count)
+    SELECT a.implicit_collection_jobs_id, NEW.state, 1
+    FROM implicit_collection_jobs_job_association AS a
+    WHERE a.job_id = NEW.id AND a.implicit_collection_jobs_id IS NOT NULL
+    ON CONFLICT (implicit_collection_jobs_id, state)
+    DO UPDATE SET job_count = {ICJ_TABLE}.job_count + EXCLUDED.job_count
+    """,
+    f"""
+    UPDATE {ICJ_TABLE} SET job_count = job_count - 1
+    WHERE state = OLD.state AND implicit_collection_jobs_id IN (
+        SELECT a.implicit_collection_jobs_id FROM implicit_collection_jobs_job_association AS a WHERE a.job_id = NEW.id
+    )
+    """,
+    f"""
+    INSERT INTO {INVOCATION_TABLE} (workflow_invocation_id, state, job_count)
+    SELECT invocation.workflow_invocation_id, NEW.state, 1
+    FROM (
+        SELECT s.workflow_invocation_id FROM workflow_invocation_step AS s WHERE s.job_id = NEW.id
+        UNION
+        SELECT s.workflow_invocation_id FROM workflow_invocation_step AS s
+        JOIN implicit_collection_jobs_job_association AS a
+        ON a.implicit_collection_jobs_id = s.implicit_collection_jobs_id
+        WHERE a.job_id = NEW.id
+    ) AS invocation
+    WHERE true
+    ON CONFLICT (workflow_invocation_id, state)
+    DO UPDATE SET job_count = {INVOCATION_TABLE}.job_count + EXCLUDED.job_count
+    """,
+    f"""
+    UPDATE {INVOCATION_TABLE} SET job_count = job_count - 1
+    WHERE state = OLD.state AND workflow_invocation_id IN (
+        SELECT s.workflow_invocation_id FROM workflow_invocation_step AS s WHERE s.job_id = NEW.id
+        UNION
+        SELECT s.workflow_invocation_id FROM workflow_invocation_step AS s
+        JOIN implicit_collection_jobs_job_association AS a
+        ON a.implicit_collection_jobs_id = s.implicit_collection_jobs_id
+        WHERE a.job_id = NEW.id
+    )
+    """,
+]
+
+ICJ_JOB_INSERT = [
+    f"""
+    INSERT INTO {ICJ_TABLE} (implicit_collection_jobs_id, state, job_count)
+    SELECT NEW.implicit_collection_jobs_id, job.state, 1
+    FROM job
+    WHERE job.id = NEW.job_id AND NEW.implicit_collection_jobs_id IS NOT NULL AND job.state IS NOT NULL
+    ON CONFLICT (implicit_collection_jobs_id, state)
+    DO UPDATE SET job_count = {ICJ_TABLE}.job_count + EXCLUDED.job_count
+    """,
+    f"""
+    INSERT INTO {INVOCATION_TABLE} (workflow_invocation_id, state, job_count)
+    SELECT s.workflow_invocation_id, job.state, 1
+    FROM workflow_invocation_step AS s, job
+    WHERE s.implicit_collection_jobs_id = NEW.implicit_collection_jobs_id
+    AND job.id = NEW.job_id AND job.state IS NOT NULL
+    ON CONFLICT (workflow_invocation_id, state)
+    DO UPDATE SET job_count = {INVOCATION_TABLE}.job_count + EXCLUDED.job_count
+    """,
+]
+
+
+def _invocation_step_statements(job_condition, icj_condition):
+    """Count the job or the jobs of the implicit collection jobs newly set on an invocation step."""
+    return [
+        f"""
+        INSERT INTO {INVOCATION_TABLE} (workflow_invocation_id, state, job_count)
+        SELECT NEW.workflow_invocation_id, job.state, 1
+        FROM job
+        WHERE job.id = NEW.job_id AND job.state IS NOT NULL{job_condition}
+        ON CONFLICT (workflow_invocation_id, state)
+        DO UPDATE SET job_count = {INVOCATION_TABLE}.job_count + EXCLUDED.job_count
+        """,
+        f"""
+        INSERT INTO {INVOCATION_TABLE} (workflow_invocation_id, state, job_count)
+        SELECT NEW.workflow_invocation_id, job.state, count(*)
+        FROM implicit_collection_jobs_job_association AS a
+        JOIN job ON job.id = a.job_id
+        WHERE a.implicit_collection_jobs_id = NEW.implicit_collection_jobs_id AND job.state IS NOT NULL{icj_condition}
+        GROUP BY job.state
+        ON CONFLICT (workflow_invocation_id, state)
+        DO UPDATE SET job_count = {INVOCATION_TABLE}.job_count + EXCLUDED.job_count
+        """,
+    ]
+
+
+STEP_INSERT = _invocation_step_statements("", "")
+# Only count a job or implicit collection jobs object once, when it is set on the step
+STEP_UPDATE = _invocation_step_statements(" AND OLD.job_id IS NULL", " AND OLD.implicit_collection_jobs_id IS NULL")
+
+# (trigger label, operation, table, condition, statements)
+TRIGGERS = [
+    ("job", "UPDATE OF state", "job", "OLD.state IS DISTINCT FROM NEW.state", JOB_STATE_UPDATE),
+    ("icj_job", "INSERT", "implicit_collection_jobs_job_association", None, ICJ_JOB_INSERT),
+    ("step", "INSERT", "workflow_invocation_step", None, STEP_INSERT),
+    (
+        "step",
+        "UPDATE OF job_id, implicit_collection_jobs_id",
+        "workflow_invocation_step",
+        None,
+        STEP_UPDATE,
+    ),
+]
+
+
+def install(engine):
+    """Install job state count triggers"""
+    execute_statements(engine, install_statements(engine))
+
+
+def remove(engine):
+    """Uninstall job state count triggers"""
+    execute_statements(engine, remove_statements(engine))
+
+
+def install_statements(engine):
+    return _postgres_install(engine) if "postgres" in engine.name else _sqlite_install()
+
+
+def remove_statements(engine):
+    return _postgres_remove() if "postgres" in engine.name else _sqlite_remove()
+
+
+def _trigger_name(label, operation):
+    return f"trigger_job_state_count_{label}_a{operation.lower()[0]}r"
+
+
+def _function_name(label, operation):
+    return f"{fn_prefix}_{label}_{operation.split()[0].lower()}"
+
+
+def _postgres_remove():
+    return [
+        f"DROP FUNCTION IF EXISTS {_function_name(label, operation)}() CASCADE;"
+        for label, operation, _, _, _ in TRIGGERS
+    ]
+
+
+def _postgres_install(engine):
+    sql = []
+    version = engine.dialect.server_version_info
+    # See update_audit_table, FUNCTION is only accepted by postgres 11 and later
+    function_keyword = "FUNCTION" if not version or version[0] > 10 else "PROCEDURE"
+    for label, operation, table, condition, statements in TRIGGERS:
+        fn = _function_name(label, operation)
+        body = ";\n".join(statements)
+        sql.append(f"""
+            CREATE OR REPLACE FUNCTION {fn}()
+                RETURNS TRIGGER
+                LANGUAGE 'plpgsql'
+            AS $BODY$
+                BEGIN
+                    {body};
+                    RETURN NULL;
+                END;
+            $BODY$
+            """)
+        trigger_name = _trigger_name(label, operation)
+        when = f"WHEN ({condition})" if condition else ""
+        sql.append(f"DROP TRIGGER IF EXISTS {trigger_name} ON {table};")
+        sql.append(f"""
+            CREATE TRIGGER {trigger_name}
+            AFTER {operation} ON {table}
+            FOR EACH ROW
+            {when}
+            EXECUTE {function_keyword} {fn}();
+            """)
+    return sql
+
+
+def _sqlite_remove():
+    return [f"DROP TRIGGER IF EXISTS {_trigger_name(label, operation)};" for label, operation, _, _, _ in TRIGGERS]
+
+
+def _sqlite_install():
+    sql = _sqlite_remove()
+    for label, operation, table, condition, statements in TRIGGERS:
+        # IS DISTINCT FROM is only available since sqlite 3.39
+        when = f"WHEN {condition.replace('IS DISTINCT FROM', 'IS NOT')}" if condition else ""
+        body = ";\n".join(statements)
+        sql.append(f"""
+            CREATE TRIGGER {_trigger_name(label, operation)}
+                AFTER {operation}
+                ON {table}
+                FOR EACH ROW
+                {when}
+                BEGIN
+                    {body};
+                END;
+            """)
+    return sql
@@ -12,9 +12,11 @@ import random
 import shutil
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Any,
     Dict,
+    IO,
     List,
     NamedTuple,
     Optional,
@@ -53,6 +55,12 @@ from galaxy.util.path import (
     safe_walk,
 )
 from galaxy.util.sleeper import Sleeper
+from ._selection import (
+    BackendSelector,
+    selection_policy,
+    WEIGHTED_POLICY,
+)
+from ._util import statsd_client_for_config
 from .badges import (
     BadgeDict,
     read_badges,
@@ -67,6 +75,7 @@ if TYPE_CHECKING:
         Dataset,
         DatasetInstance,
     )
+    from ._metadata_cache import RemoteMetadataCache
 
 NO_SESSION_ERROR_MESSAGE = (
     "Attempted to 'create' object store entity in configuration with no database session present."
@@ -266,6 +275,35 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def open_data(
+        self,
+        obj,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+    ) -> IO[bytes]:
+        """
+        Open the object with id `obj.id` for reading its bytes.
+
+        Unlike `get_filename` this does not need the whole object to be on local disk,
+        object stores may serve the reads from the remote object.
+
+        If the object does not exist raises `ObjectNotFound`.
+        """
+        return open(
+            self.get_filename(
+                obj,
+                base_dir=base_dir,
+                extra_dir=extra_dir,
+                extra_dir_at_root=extra_dir_at_root,
+                alt_name=alt_name,
+                obj_dir=obj_dir,
+            ),
+            "rb",
+        )
+
     @abc.abstractmethod
     def get_filename(
         self,
@@ -398,6 +436,11 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """Return a list of CacheTargets used by this object store."""
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def remote_metadata_caches(self) -> List["RemoteMetadataCache"]:
+        """Return the caches of remote object existence and size used by this object store."""
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def to_dict(self) -> Dict[str, Any]:
         raise NotImplementedError()
@@ -620,6 +663,28 @@ class BaseObjectStore(ObjectStore):
             obj_dir=obj_dir,
         )
 
+    def open_data(
+        self,
+        obj,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+    ) -> IO[bytes]:
+        return self._invoke(
+            "open_data",
+            obj,
+            base_dir=base_dir,
+            extra_dir=extra_dir,
+            extra_dir_at_root=extra_dir_at_root,
+            alt_name=alt_name,
+            obj_dir=obj_dir,
+        )
+
+    def _open_data(self, obj, **kwargs) -> IO[bytes]:
+        return open(self.get_filename(obj, **kwargs), "rb")
+
     def get_filename(
         self,
         obj,
@@ -699,6 +764,9 @@ class BaseObjectStore(ObjectStore):
     def cache_targets(self) -> List[CacheTarget]:
         return []
 
+    def remote_metadata_caches(self) -> List["RemoteMetadataCache"]:
+        return []
+
     @classmethod
     def parse_private_from_config_xml(clazz, config_xml):
         private = DEFAULT_PRIVATE
@@ -1199,6 +1267,12 @@ class NestedObjectStore(BaseObjectStore):
         # TODO: merge more intelligently - de-duplicate paths and handle conflicting sizes/percents
         return cache_targets
 
+    def remote_metadata_caches(self) -> List["RemoteMetadataCache"]:
+        metadata_caches = []
+        for backend in self.backends.values():
+            metadata_caches.extend(backend.remote_metadata_caches())
+        return metadata_caches
+
     def _empty(self, obj, **kwargs) -> bool:
         """For the first backend that has this `obj`, determine if it is empty."""
         return self._call_method("_empty", obj, True, False, **kwargs)
@@ -1215,6 +1289,10 @@ class NestedObjectStore(BaseObjectStore):
         """For the first backend that has this `obj`, get data from it."""
         return self._call_method("_get_data", obj, ObjectNotFound, True, **kwargs)
 
+    def _open_data(self, obj, **kwargs) -> IO[bytes]:
+        """For the first backend that has this `obj`, open it."""
+        return self._call_method("_open_data", obj, ObjectNotFound, True, **kwargs)
+
     def _get_filename(self, obj, **kwargs) -> str:
         """For the first backend that has this `obj`, get its filename."""
         return self._call_method("_get_filename", obj, ObjectNotFound, True, **kwargs)
@@ -1321,13 +1399,27 @@ def user_object_store_configuration_to_config_dict(object_store_config: ObjectSt
     return dynamic_object_store_as_dict
 
 
+def _expected_size(obj) -> Optional[int]:
+    """Size of ``obj`` if it is already known when it is created (e.g. copied datasets)."""
+    file_size = getattr(obj, "file_size", None)
+    return int(file_size) if file_size else None
+
+
+def _get_store_free_bytes(backend) -> Optional[int]:
+    if isinstance(backend, DiskObjectStore):
+        st = os.statvfs(backend.file_path)
+        return st.f_bavail * st.f_frsize
+    return None
+
+
 class DistributedObjectStore(NestedObjectStore):
     """
     ObjectStore that defers to a list of backends.
 
     When getting objects the first store where the object exists is used.
     When creating objects they are created in a store selected randomly, but
-    with weighting.
+    with weighting. Depending on ``selection_policy`` the weights are scaled
+    by the free space and recent write performance of each backend.
     """
 
     backends: Dict[str, Any]  # BaseObjectStore or ConcreteObjectStore?
@@ -1355,11 +1447,11 @@ class DistributedObjectStore(NestedObjectStore):
         super().__init__(config, config_dict)
         self._quota_source_map = None
         self._device_source_map = None
-        self.weighted_backend_ids = []
-        self.original_weighted_backend_ids = []
+        self.weights: Dict[str, int] = {}
         self.max_percent_full = {}
         self.global_max_percent_full = config_dict.get("global_max_percent_full", 0)
         self.search_for_missing = config_dict.get("search_for_missing", True)
+        self.selection_policy = selection_policy(config_dict)
         random.seed()
 
         user_selection_allowed = []
@@ -1374,19 +1466,19 @@ class DistributedObjectStore(NestedObjectStore):
 
             self.backends[backend_id] = backend
             self.max_percent_full[backend_id] = maxpctfull
+            self.weights[backend_id] = weight
 
-            for _ in range(0, weight):
-                # The simplest way to do weighting: add backend ids to a
-                # sequence the number of times equalling weight, then randomly
-                # choose a backend from that sequence at creation
-                self.weighted_backend_ids.append(backend_id)
-
-        self.original_weighted_backend_ids = self.weighted_backend_ids
+        self.backend_selector = BackendSelector(
+            self.weights, policy=self.selection_policy, statsd_client=statsd_client_for_config(config)
+        )
         self.user_object_store_resolver = user_object_store_resolver
         self.user_selection_allowed = user_selection_allowed
         self.allow_user_selection = bool(user_selection_allowed) or (user_object_store_resolver is not None)
         self.sleeper = None
-        if fsmon and (self.global_max_percent_full or [_ for _ in self.max_percent_full.values() if _ != 0.0]):
+        monitor_usage = self.selection_policy != WEIGHTED_POLICY
+        if fsmon and (
+            monitor_usage or self.global_max_percent_full or [_ for _ in self.max_percent_full.values() if _ != 0.0]
+        ):
             self.sleeper = Sleeper()
             self.filesystem_monitor_thread = threading.Thread(target=self.__filesystem_monitor, args=[self.sleeper])
             self.filesystem_monitor_thread.daemon = True
@@ -1404,6 +1496,7 @@ class DistributedObjectStore(NestedObjectStore):
         config_dict = {
             "search_for_missing": asbool(backends_root.get("search_for_missing", True)),
             "global_max_percent_full": float(backends_root.get("maxpctfull", 0)),
+            "selection_policy": backends_root.get("selection_policy"),
             "backends": backends,
         }
 
@@ -1459,12 +1552,13 @@ class DistributedObjectStore(NestedObjectStore):
         as_dict = super().to_dict()
         as_dict["global_max_percent_full"] = self.global_max_percent_full
         as_dict["search_for_missing"] = self.search_for_missing
+        as_dict["selection_policy"] = self.selection_policy
         backends: List[Dict[str, Any]] = []
         for backend_id, backend in self.backends.items():
             backend_as_dict = backend.to_dict()
             backend_as_dict["id"] = backend_id
             backend_as_dict["max_percent_full"] = self.max_percent_full[backend_id]
-            backend_as_dict["weight"] = len([i for i in self.original_weighted_backend_ids if i == backend_id])
+            backend_as_dict["weight"] = self.weights[backend_id]
             backends.append(backend_as_dict)
         if object_store_uris:
             for user_object_store_uri in object_store_uris:
@@ -1490,25 +1584,59 @@ class DistributedObjectStore(NestedObjectStore):
 
     def __filesystem_monitor(self, sleeper: Sleeper):
         while self.running:
-            new_weighted_backend_ids = self.original_weighted_backend_ids
             for id, backend in self.backends.items():
                 maxpct = self.max_percent_full[id] or self.global_max_percent_full
                 pct = backend.get_store_usage_percent()
-                if pct > maxpct:
-                    new_weighted_backend_ids = [_ for _ in new_weighted_backend_ids if _ != id]
-            self.weighted_backend_ids = new_weighted_backend_ids
+                full = bool(maxpct) and pct > maxpct
+                self.backend_selector.update_usage(id, pct, _get_store_free_bytes(backend), full=full)
             sleeper.sleep(120)  # Test free space every 2 minutes
 
     def _construct_path(self, obj, **kwargs) -> str:
         return self._resolve_backend(obj.object_store_id).construct_path(obj, **kwargs)
 
+    def _update_from_file(
+        self,
+        obj,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+        file_name=None,
+        create: bool = False,
+        preserve_symlinks: bool = False,
+    ) -> None:
+        nbytes = None
+        if file_name and not (preserve_symlinks and os.path.islink(file_name)) and os.path.exists(file_name):
+            nbytes = os.path.getsize(file_name)
+        if create and obj.object_store_id is None and nbytes is not None:
+            # the size of the new object is known, select its backend here and let _create use it
+            try:
+                obj.object_store_id = self.backend_selector.select(nbytes)
+            except IndexError:
+                pass
+        start = time.time()
+        super()._update_from_file(
+            obj,
+            base_dir=base_dir,
+            extra_dir=extra_dir,
+            extra_dir_at_root=extra_dir_at_root,
+            alt_name=alt_name,
+            obj_dir=obj_dir,
+            file_name=file_name,
+            create=create,
+            preserve_symlinks=preserve_symlinks,
+        )
+        if nbytes is not None and obj.object_store_id in self.backends:
+            self.backend_selector.record_write(obj.object_store_id, nbytes, time.time() - start)
+
     def _create(self, obj, **kwargs):
         """The only method in which obj.object_store_id may be None."""
         object_store_id = obj.object_store_id
         if object_store_id is None or not self._exists(obj, **kwargs):
             if object_store_id is None or (object_store_id not in self.backends and "://" not in object_store_id):
                 try:
-                    object_store_id = random.choice(self.weighted_backend_ids)
+                    object_store_id = self.backend_selector.select(_expected_size(obj))
                     obj.object_store_id = object_store_id
                 except IndexError:
                     raise ObjectInvalid(
@@ -2121,13 +2249,16 @@ def persist_extra_files(
     src_extra_files_path: str,
     primary_data: "DatasetInstance",
     extra_files_path_name: Optional[str] = None,
+    max_workers: int = 1,
 ) -> None:
     if not primary_data.dataset.purged and os.path.exists(src_extra_files_path):
         assert primary_data.dataset
         if not extra_files_path_name:
             extra_files_path_name = primary_data.dataset.extra_files_path_name_from(object_store)
         assert extra_files_path_name
-        persist_extra_files_for_dataset(object_store, src_extra_files_path, primary_data.dataset, extra_files_path_name)
+        persist_extra_files_for_dataset(
+            object_store, src_extra_files_path, primary_data.dataset, extra_files_path_name, max_workers=max_workers
+        )
 
 
 def persist_extra_files_for_dataset(
@@ -2135,7 +2266,10 @@ def persist_extra_files_for_dataset(
     src_extra_files_path: str,
     dataset: "Dataset",
     extra_files_path_name: str,
+    max_workers: int = 1,
 ):
+    """Copy the extra files of ``dataset`` to the object store, ``max_workers`` files at a time."""
+    extra_files = []
     for root, _dirs, files in safe_walk(src_extra_files_path):
         extra_dir = os.path.join(extra_files_path_name, os.path.relpath(root, src_extra_files_path))
         extra_dir = os.path.normpath(extra_dir)
@@ -2143,11 +2277,29 @@ def persist_extra_files_for_dataset(
             if not in_directory(f, src_extra_files_path):
                 # Unclear if this can ever happen if we use safe_walk ... probably not ?
                 raise MalformedContents(f"Invalid dataset path: {f}")
-            object_store.update_from_file(
-                dataset,
-                extra_dir=extra_dir,
-                alt_name=f,
-                file_name=os.path.join(root, f),
-                create=True,
-                preserve_symlinks=True,
-            )
+            extra_files.append((extra_dir, f, os.path.join(root, f)))
+
+    def update_from_file(extra_file):
+        extra_dir, alt_name, file_name = extra_file
+        object_store.update_from_file(
+            dataset,
+            extra_dir=extra_dir,
+            alt_name=alt_name,
+            file_name=file_name,
+            create=True,
+            preserve_symlinks=True,
+        )
+
+    if max_workers > 1 and len(extra_files) > 1:
+        # The database session of the dataset must not be used by the worker threads. Persist the first
+        # file on this thread: it loads the expired attributes object stores read to locate the files
+        # (id, uuid, object_store_id) and the distributed object store sets the object_store_id of a
+        # dataset without one. The worker threads then only read attributes already loaded.
+        update_from_file(extra_files[0])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # consume the results to raise the first failure
+            for _ in executor.map(update_from_file, extra_files[1:]):
+                pass
+    else:
+        for extra_file in extra_files:
+            update_from_file(extra_file)
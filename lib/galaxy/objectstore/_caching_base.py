@@ -1,10 +1,15 @@
+import codecs
+import io
 import logging
 import os
 import shutil
 from datetime import datetime
+from functools import partial
 from typing import (
     Any,
     Dict,
+    IO,
+    List,
     Optional,
 )
 
@@ -18,9 +23,21 @@ from galaxy.util import (
     unlink,
 )
 from galaxy.util.path import safe_relpath
-from ._util import fix_permissions
+from ._metadata_cache import RemoteMetadataCache
+from ._transfer import (
+    BlockCache,
+    download_in_parts,
+    RangedReader,
+    RangedTransferConfig,
+)
+from ._util import (
+    fix_permissions,
+    statsd_client_for_config,
+)
 from .caching import (
+    CacheIndex,
     CacheTarget,
+    check_cache_index_path,
     InProcessCacheMonitor,
 )
 
@@ -36,6 +53,11 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
     cache_size: int
     cache_monitor: Optional[InProcessCacheMonitor] = None
     cache_monitor_interval: int
+    cache_eviction_policy: Optional[str] = None
+    _cache_index: Optional[CacheIndex] = None
+    ranged_transfer: RangedTransferConfig = RangedTransferConfig()
+    _block_cache: Optional[BlockCache] = None
+    _remote_metadata_cache: Optional[RemoteMetadataCache] = None
 
     def _ensure_staging_path_writable(self):
         staging_path = self.staging_path
@@ -48,6 +70,8 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             raise Exception(f"Caching object store created with path '{staging_path}' that does not readable")
         if not os.access(staging_path, os.W_OK):
             raise Exception(f"Caching object store created with path '{staging_path}' that does not writable")
+        if self.cache_eviction_policy:
+            check_cache_index_path(staging_path)
 
     def _construct_path(
         self,
@@ -111,6 +135,54 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         cache_path = self._get_cache_path(rel_path)
         return os.path.exists(cache_path)
 
+    @property
+    def cache_index(self) -> Optional[CacheIndex]:
+        if self.cache_eviction_policy and self._cache_index is None:
+            self._cache_index = CacheIndex.for_path(self.staging_path)
+        return self._cache_index
+
+    def _record_cache_access(self, rel_path: str) -> None:
+        cache_index = self.cache_index
+        if cache_index is None:
+            return
+        try:
+            size = self._get_size_in_cache(rel_path)
+        except OSError:
+            return
+        cache_index.touch(rel_path, size)
+
+    @property
+    def remote_metadata_cache(self) -> Optional[RemoteMetadataCache]:
+        ttl = getattr(self.config, "object_store_metadata_cache_ttl", 0)
+        if ttl and ttl > 0 and self._remote_metadata_cache is None:
+            self._remote_metadata_cache = RemoteMetadataCache(
+                self.staging_path, ttl, statsd_client=statsd_client_for_config(self.config)
+            )
+        return self._remote_metadata_cache
+
+    def remote_metadata_caches(self) -> List[RemoteMetadataCache]:
+        metadata_cache = self.remote_metadata_cache
+        return [metadata_cache] if metadata_cache is not None else []
+
+    def _remote_exists(self, rel_path: str) -> bool:
+        metadata_cache = self.remote_metadata_cache
+        if metadata_cache is None:
+            return self._exists_remotely(rel_path)
+        return metadata_cache.exists(rel_path, self._exists_remotely)
+
+    def _remote_size(self, rel_path: str) -> int:
+        metadata_cache = self.remote_metadata_cache
+        if metadata_cache is None:
+            return self._get_remote_size(rel_path)
+        return metadata_cache.size(rel_path, self._get_remote_size)
+
+    def _remote_object_changed(self, rel_path: str, recursive: bool = False) -> None:
+        """Forget cached blocks, existence and size of ``rel_path`` after it was written or deleted."""
+        if self._block_cache is not None and not recursive:
+            self._block_cache.invalidate(rel_path)
+        if self._remote_metadata_cache is not None:
+            self._remote_metadata_cache.invalidate(rel_path, recursive=recursive)
+
     def _pull_into_cache(self, rel_path, **kwargs) -> bool:
         # Ensure the cache directory structure exists (e.g., dataset_#_files/)
         rel_path_dir = os.path.dirname(rel_path)
@@ -120,15 +192,76 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         file_ok = self._download(rel_path)
         if file_ok:
             fix_permissions(self.config, self._get_cache_path(rel_path_dir))
+            self._record_cache_access(rel_path)
         else:
             unlink(self._get_cache_path(rel_path), ignore_errors=True)
         return file_ok
 
+    def _use_ranged_download(self, remote_size: int) -> bool:
+        return self.ranged_transfer.enabled and remote_size > self.ranged_transfer.part_size
+
+    def _ranged_download(self, rel_path: str, remote_size: int) -> bool:
+        """Download ``rel_path`` into the cache with parallel byte-range requests.
+
+        A failed download leaves its completed parts in the cache directory, the next
+        attempt to pull ``rel_path`` resumes from them.
+        """
+        try:
+            download_in_parts(
+                partial(self._read_remote_range, rel_path),
+                remote_size,
+                self._get_cache_path(rel_path),
+                self.ranged_transfer.part_size,
+                self.ranged_transfer.max_concurrency,
+                remote_size=partial(self._get_remote_size, rel_path),
+            )
+            return True
+        except Exception:
+            log.exception("Ranged download of '%s' into cache failed", rel_path)
+        return False
+
+    def _supports_range_reads(self) -> bool:
+        return type(self)._read_remote_range is not CachingConcreteObjectStore._read_remote_range
+
+    @property
+    def block_cache(self) -> BlockCache:
+        if self._block_cache is None:
+            self._block_cache = BlockCache()
+        return self._block_cache
+
+    def _get_data_range(self, rel_path: str, start: int, count: int) -> Optional[str]:
+        """Read ``count`` bytes at ``start`` of a remote object without pulling it into the cache.
+
+        Returns ``None`` if the request covers the whole object, in which case pulling it
+        into the cache is just as cheap and benefits subsequent reads.
+        """
+        remote_size = self._remote_size(rel_path)
+        if remote_size < 0 or (start == 0 and (count < 0 or count >= remote_size)):
+            return None
+        if count < 0 or start + count >= remote_size:
+            # the rest of the object, in one request rather than block by block
+            data = self._read_remote_range(rel_path, start, None) if start < remote_size else b""
+        else:
+            data = self.block_cache.read(
+                partial(self._read_remote_range, rel_path), rel_path, start, count, remote_size
+            )
+        # a multi-byte character may be cut at the end of the range, leave it out
+        return codecs.getincrementaldecoder("utf-8")().decode(data, final=False)
+
     def _get_data(self, obj, start=0, count=-1, **kwargs):
         rel_path = self._construct_path(obj, **kwargs)
         # Check cache first and get file if not there
         if not self._in_cache(rel_path):
+            if self._supports_range_reads():
+                try:
+                    content = self._get_data_range(rel_path, start, count)
+                    if content is not None:
+                        return content
+                except Exception:
+                    log.exception("Range read of '%s' failed, pulling it into cache", rel_path)
             self._pull_into_cache(rel_path, **kwargs)
+        else:
+            self._record_cache_access(rel_path)
         # Read the file content from cache
         data_file = open(self._get_cache_path(rel_path))
         data_file.seek(start)
@@ -136,6 +269,21 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         data_file.close()
         return content
 
+    def _open_data(self, obj, **kwargs) -> IO[bytes]:
+        rel_path = self._construct_path(obj, **kwargs)
+        if not self._in_cache(rel_path) and self._supports_range_reads():
+            try:
+                remote_size = self._remote_size(rel_path)
+            except Exception:
+                log.exception("Could not get the size of '%s', pulling it into cache", rel_path)
+            else:
+                if remote_size >= 0:
+                    reader = RangedReader(
+                        partial(self._read_remote_range, rel_path), self.block_cache, rel_path, remote_size
+                    )
+                    return io.BufferedReader(reader)
+        return open(self._get_filename(obj, **kwargs), "rb")
+
     def _exists(self, obj, **kwargs) -> bool:
         in_cache = exists_remotely = False
         rel_path = self._construct_path(obj, **kwargs)
@@ -149,7 +297,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             return True
 
         in_cache = self._in_cache(rel_path)
-        exists_remotely = self._exists_remotely(rel_path)
+        exists_remotely = self._remote_exists(rel_path)
         dir_only = kwargs.get("dir_only", False)
         base_dir = kwargs.get("base_dir", None)
         if dir_only:
@@ -160,7 +308,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
 
         # TODO: Sync should probably not be done here. Add this to an async upload stack?
         if in_cache and not exists_remotely:
-            self._push_to_storage(rel_path, source_file=self._get_cache_path(rel_path))
+            self._push_and_invalidate(rel_path, source_file=self._get_cache_path(rel_path))
             return True
         elif exists_remotely:
             return True
@@ -194,12 +342,12 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             if not dir_only:
                 rel_path = os.path.join(rel_path, alt_name if alt_name else f"dataset_{self._get_object_id(obj)}.dat")
                 open(os.path.join(self.staging_path, rel_path), "w").close()
-                self._push_to_storage(rel_path, from_string="")
+                self._push_and_invalidate(rel_path, from_string="")
         return self
 
     def _caching_allowed(self, rel_path: str, remote_size: Optional[int] = None) -> bool:
         if remote_size is None:
-            remote_size = self._get_remote_size(rel_path)
+            remote_size = self._remote_size(rel_path)
         if not self.cache_target.fits_in_cache(remote_size):
             log.critical(
                 "File %s is larger (%s bytes) than the configured cache allows (%s). Cannot download.",
@@ -210,6 +358,13 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             return False
         return True
 
+    def _push_and_invalidate(self, rel_path, source_file=None, from_string=None):
+        """Push ``rel_path`` and forget what is cached about it once the remote object has changed."""
+        try:
+            return self._push_to_storage(rel_path, source_file=source_file, from_string=from_string)
+        finally:
+            self._remote_object_changed(rel_path)
+
     def _push_to_storage(self, rel_path, source_file=None, from_string=None):
         source_file = source_file or self._get_cache_path(rel_path)
         if from_string is None and not os.path.exists(source_file):
@@ -227,7 +382,9 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             return True
 
         if from_string is not None:
-            return self._push_string_to_path(rel_path, from_string)
+            success = self._push_string_to_path(rel_path, from_string)
+            self._record_cache_access(rel_path)
+            return success
         else:
             start_time = datetime.now()
             log.debug(
@@ -237,6 +394,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
                 rel_path,
             )
             success = self._push_file_to_path(rel_path, source_file)
+            self._record_cache_access(rel_path)
             end_time = datetime.now()
             log.debug(
                 "Pushed cache file '%s' to blob '%s' (%s bytes transferred in %s sec)",
@@ -263,8 +421,8 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
                 return self._get_size_in_cache(rel_path)
             except OSError as ex:
                 log.info("Could not get size of file '%s' in local cache, will try Azure. Error: %s", rel_path, ex)
-        elif self._exists_remotely(rel_path):
-            return self._get_remote_size(rel_path)
+        elif self._remote_exists(rel_path):
+            return self._remote_size(rel_path)
         log.warning("Did not find dataset '%s', returning 0 for size", rel_path)
         return 0
 
@@ -288,6 +446,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         # always resync the cache. Gotta make sure we're being judicious in out data.extra_files_path
         # calls I think.
         if not dir_only and self._in_cache(rel_path) and os.path.getsize(self._get_cache_path(rel_path)) > 0:
+            self._record_cache_access(rel_path)
             return cache_path
 
         # Check if the file exists in persistent storage and, if it does, pull it into cache
@@ -329,13 +488,23 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             # but requires iterating through each individual key in S3 and deleing it.
             if entire_dir and extra_dir:
                 shutil.rmtree(self._get_cache_path(rel_path), ignore_errors=True)
-                return self._delete_remote_all(rel_path)
+                if self.cache_index is not None:
+                    self.cache_index.remove(rel_path, recursive=True)
+                try:
+                    return self._delete_remote_all(rel_path)
+                finally:
+                    self._remote_object_changed(rel_path, recursive=True)
             else:
                 # Delete from cache first
                 unlink(self._get_cache_path(rel_path), ignore_errors=True)
+                if self.cache_index is not None:
+                    self.cache_index.remove(rel_path)
                 # Delete from S3 as well
-                if self._exists_remotely(rel_path):
-                    return self._delete_existing_remote(rel_path)
+                try:
+                    if self._exists_remotely(rel_path):
+                        return self._delete_existing_remote(rel_path)
+                finally:
+                    self._remote_object_changed(rel_path)
         except OSError:
             log.exception("%s delete error", self._get_filename(obj, **kwargs))
         return False
@@ -363,7 +532,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             else:
                 source_file = self._get_cache_path(rel_path)
 
-            self._push_to_storage(rel_path, source_file)
+            self._push_and_invalidate(rel_path, source_file)
 
         else:
             raise ObjectNotFound(
@@ -376,6 +545,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             self.staging_path,
             self.cache_size,
             0.9,
+            self.cache_eviction_policy,
         )
 
     def _shutdown_cache_monitor(self) -> None:
@@ -394,6 +564,11 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
     def _download(self, rel_path: str) -> bool:
         raise NotImplementedError()
 
+    # Only needed for ranged downloads
+    def _read_remote_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        """Read ``length`` bytes at ``start`` of the remote object, up to its end if ``length`` is ``None``."""
+        raise NotImplementedError()
+
     # Do not need to override these if instead replacing _delete
     def _delete_existing_remote(self, rel_path) -> bool:
         raise NotImplementedError()
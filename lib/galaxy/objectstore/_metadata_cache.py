@@ -0,0 +1,183 @@
+"""Short lived cache of the existence and size of remote objects of caching object stores."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_METADATA_CACHE_SIZE = 10000
+
+PublishInvalidationT = Callable[[str, List[str]], None]
+
+
+class PendingInvalidations:
+    """Invalidations collected by :func:`coalesced_metadata_invalidations` until they are broadcast."""
+
+    def __init__(self):
+        self._rel_paths: Dict[RemoteMetadataCache, Dict[str, None]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, metadata_cache: "RemoteMetadataCache", rel_paths: List[str]) -> None:
+        with self._lock:
+            self._rel_paths.setdefault(metadata_cache, {}).update(dict.fromkeys(rel_paths))
+
+    def publish(self) -> None:
+        with self._lock:
+            rel_paths, self._rel_paths = self._rel_paths, {}
+        for metadata_cache, cache_rel_paths in rel_paths.items():
+            metadata_cache._publish(list(cache_rel_paths))
+
+
+_pending_invalidations: ContextVar[Optional[PendingInvalidations]] = ContextVar(
+    "pending_object_store_metadata_invalidations", default=None
+)
+
+
+@contextmanager
+def coalesced_metadata_invalidations() -> Iterator[None]:
+    """Broadcast the invalidations made in this context in one message per cache when it exits.
+
+    Local entries are still dropped right away. Threads started in the context only take part if
+    they run in a copy of it (see :func:`contextvars.copy_context`).
+    """
+    if _pending_invalidations.get() is not None:
+        yield
+        return
+    pending = PendingInvalidations()
+    token = _pending_invalidations.set(pending)
+    try:
+        yield
+    finally:
+        _pending_invalidations.reset(token)
+        pending.publish()
+
+
+class RemoteMetadata(NamedTuple):
+    expires: float
+    exists: Optional[bool] = None
+    size: Optional[int] = None
+
+
+class RemoteMetadataCache:
+    """Bounded TTL cache of remote existence and size keyed by ``rel_path``.
+
+    Only objects found to exist are cached, a missing object may be created by another process
+    at any time. Entries are dropped after ``ttl`` seconds, when more than ``max_entries`` are
+    cached (least recently used first) and when :meth:`invalidate` is called for their path.
+    Invalidations are passed on to ``publish`` (if set) together with ``cache_key`` so other
+    Galaxy processes can drop their entries of the same object store.
+    """
+
+    def __init__(
+        self,
+        cache_key: str,
+        ttl: float,
+        max_entries: int = DEFAULT_METADATA_CACHE_SIZE,
+        statsd_client=None,
+    ):
+        self.cache_key = cache_key
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.statsd_client = statsd_client
+        self.publish: Optional[PublishInvalidationT] = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, RemoteMetadata] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def exists(self, rel_path: str, load: Callable[[str], bool]) -> bool:
+        entry = self._get(rel_path)
+        if entry is not None and entry.exists is not None:
+            self._count(hit=True)
+            return entry.exists
+        self._count(hit=False)
+        exists = load(rel_path)
+        if exists:
+            self._put(rel_path, exists=exists)
+        return exists
+
+    def size(self, rel_path: str, load: Callable[[str], int]) -> int:
+        entry = self._get(rel_path)
+        if entry is not None and entry.size is not None:
+            self._count(hit=True)
+            return entry.size
+        self._count(hit=False)
+        size = load(rel_path)
+        if size >= 0:
+            self._put(rel_path, exists=True, size=size)
+        return size
+
+    def invalidate(self, rel_path: str, recursive: bool = False) -> None:
+        """Drop what is known about ``rel_path`` here and in other processes.
+
+        Call this once ``rel_path`` has been written or deleted remotely, other processes
+        could otherwise cache the old state again before the change is made.
+        """
+        self.invalidate_local([rel_path], recursive=recursive)
+        rel_paths = [rel_path] if not recursive else [f"{rel_path.rstrip('/')}/"]
+        pending = _pending_invalidations.get()
+        if pending is not None:
+            pending.add(self, rel_paths)
+        else:
+            self._publish(rel_paths)
+
+    def _publish(self, rel_paths: List[str]) -> None:
+        if self.publish is None:
+            return
+        try:
+            self.publish(self.cache_key, rel_paths)
+        except Exception:
+            log.exception("Failed to broadcast invalidation of object store metadata for %s", rel_paths)
+
+    def invalidate_local(self, rel_paths: List[str], recursive: bool = False) -> None:
+        """Drop entries of ``rel_paths``, a path ending with ``/`` drops everything below it."""
+        with self._lock:
+            for rel_path in rel_paths:
+                if recursive or rel_path.endswith("/"):
+                    prefix = f"{rel_path.rstrip('/')}/"
+                    for cached_path in [p for p in self._entries if p == prefix[:-1] or p.startswith(prefix)]:
+                        del self._entries[cached_path]
+                else:
+                    self._entries.pop(rel_path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, rel_path: str) -> Optional[RemoteMetadata]:
+        with self._lock:
+            entry = self._entries.get(rel_path)
+            if entry is None:
+                return None
+            if entry.expires < time.monotonic():
+                del self._entries[rel_path]
+                return None
+            self._entries.move_to_end(rel_path)
+            return entry
+
+    def _put(self, rel_path: str, exists: Optional[bool] = None, size: Optional[int] = None) -> None:
+        with self._lock:
+            self._entries[rel_path] = RemoteMetadata(time.monotonic() + self.ttl, exists, size)
+            self._entries.move_to_end(rel_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.statsd_client:
+            self.statsd_client.incr(f"objectstore.metadata_cache.{'hit' if hit else 'miss'}")
@@ -0,0 +1,253 @@
+"""Backend selection for new objects in the distributed object store."""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+log = logging.getLogger(__name__)
+
+# Backends are sampled according to their configured weight only.
+WEIGHTED_POLICY = "weighted"
+# Weights are scaled by the fraction of free space reported by the backend.
+CAPACITY_POLICY = "capacity"
+# Weights are scaled by free space and by how fast recent writes to the backend were.
+LOAD_POLICY = "load"
+SELECTION_POLICIES = (WEIGHTED_POLICY, CAPACITY_POLICY, LOAD_POLICY)
+DEFAULT_SELECTION_POLICY = WEIGHTED_POLICY
+
+# Smoothing factor of the moving averages of write throughput and latency
+DEFAULT_SMOOTHING = 0.2
+# Rebuild the sampling table from recorded writes at most this often (seconds)
+DEFAULT_REBUILD_INTERVAL = 10.0
+# Bounds of the factor applied to a backend's weight based on its write performance
+MIN_LOAD_FACTOR = 0.1
+MAX_LOAD_FACTOR = 10.0
+
+
+def selection_policy(config_dict) -> str:
+    policy = config_dict.get("selection_policy") or DEFAULT_SELECTION_POLICY
+    if policy not in SELECTION_POLICIES:
+        raise Exception(
+            f"Unknown selection_policy [{policy}] for distributed object store, must be one of {SELECTION_POLICIES}"
+        )
+    return policy
+
+
+class AliasSampler:
+    """Weighted random sampling in constant time using Vose's alias method.
+
+    Building the table is linear in the number of items, drawing a sample costs one
+    random number and one comparison regardless of the weights.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        items = [(item, float(weight)) for item, weight in weights.items() if weight > 0]
+        self.items: List[str] = [item for item, _ in items]
+        n = len(items)
+        self._probability = [1.0] * n
+        self._alias = list(range(n))
+        if not n:
+            return
+        total = sum(weight for _, weight in items)
+        scaled = [weight * n / total for _, weight in items]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self._probability[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # whatever is left over is 1 up to floating point error
+        for i in large + small:
+            self._probability[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng=random) -> str:
+        """Return a random item, raises ``IndexError`` if no item has a positive weight."""
+        if not self.items:
+            raise IndexError("cannot sample from an empty AliasSampler")
+        u = rng.random() * len(self.items)
+        i = int(u)
+        if u - i < self._probability[i]:
+            return self.items[i]
+        return self.items[self._alias[i]]
+
+
+class BackendStats:
+    """What is known about a backend's capacity and recent write performance."""
+
+    def __init__(self) -> None:
+        self.usage_percent: Optional[float] = None
+        self.free_bytes: Optional[int] = None
+        self.throughput: Optional[float] = None  # bytes per second
+        self.latency: Optional[float] = None  # seconds per write
+        self.writes = 0
+
+    def record_write(self, nbytes: int, seconds: float, smoothing: float) -> None:
+        seconds = max(seconds, 1e-6)
+        self.latency = _moving_average(self.latency, seconds, smoothing)
+        if nbytes > 0:
+            self.throughput = _moving_average(self.throughput, nbytes / seconds, smoothing)
+        self.writes += 1
+
+    def expected_write_time(self, expected_size: Optional[int]) -> Optional[float]:
+        if expected_size and self.throughput:
+            return expected_size / self.throughput
+        return self.latency
+
+
+class BackendSelector:
+    """Choose the backend for new objects of a distributed object store.
+
+    The effective weight of a backend is its configured weight, scaled according to
+    ``policy`` by the free space and recent write performance of the backend. Effective
+    weights are kept in an :class:`AliasSampler` that is rebuilt when the filesystem
+    monitor reports new usage and, at most every ``rebuild_interval`` seconds, after
+    writes have been recorded, so a selection does not depend on the number of backends
+    or the magnitude of their weights.
+    """
+
+    def __init__(
+        self,
+        weights: Dict[str, int],
+        policy: str = DEFAULT_SELECTION_POLICY,
+        statsd_client=None,
+        smoothing: float = DEFAULT_SMOOTHING,
+        rebuild_interval: float = DEFAULT_REBUILD_INTERVAL,
+        rng=random,
+    ):
+        self.weights = weights
+        self.policy = policy
+        self.statsd_client = statsd_client
+        self.smoothing = smoothing
+        self.rebuild_interval = rebuild_interval
+        self.rng = rng
+        self.stats: Dict[str, BackendStats] = {backend_id: BackendStats() for backend_id in weights}
+        self.excluded: Set[str] = set()
+        self.placements: Counter = Counter()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_rebuild = 0.0
+        self._sampler = AliasSampler({})
+        self._rebuild()
+
+    def update_usage(
+        self, backend_id: str, usage_percent: Optional[float], free_bytes: Optional[int] = None, full: bool = False
+    ) -> None:
+        """Record the space usage of a backend, ``full`` backends are not selected anymore."""
+        with self._lock:
+            stats = self.stats[backend_id]
+            stats.usage_percent = usage_percent
+            stats.free_bytes = free_bytes
+            if full:
+                self.excluded.add(backend_id)
+            else:
+                self.excluded.discard(backend_id)
+            self._rebuild()
+
+    def record_write(self, backend_id: str, nbytes: int, seconds: float) -> None:
+        """Record that writing ``nbytes`` to ``backend_id`` took ``seconds``."""
+        with self._lock:
+            stats = self.stats.get(backend_id)
+            if stats is None:
+                return
+            stats.record_write(nbytes, seconds, self.smoothing)
+            self._dirty = self.policy == LOAD_POLICY
+        if self.statsd_client:
+            self.statsd_client.timing(f"objectstore.distributed.write.{backend_id}", seconds * 1000.0)
+
+    def select(self, expected_size: Optional[int] = None) -> str:
+        """Return the id of the backend a new object of ``expected_size`` bytes should be placed in.
+
+        Raises ``IndexError`` if there is no backend available for new objects.
+        """
+        with self._lock:
+            if self._dirty and time.time() - self._last_rebuild >= self.rebuild_interval:
+                self._rebuild()
+            sampler = self._sampler
+            if not sampler:
+                raise IndexError("no backend available for new objects")
+            backend_id = sampler.sample(self.rng)
+            if expected_size and not self._fits(backend_id, expected_size):
+                # rare case, sample again among backends known to have room
+                fitting = {
+                    b: w for b, w in self._effective_weights(expected_size).items() if self._fits(b, expected_size)
+                }
+                if fitting:
+                    backend_id = AliasSampler(fitting).sample(self.rng)
+                else:
+                    log.warning(
+                        "No backend reports enough free space for an object of %d bytes, placing it in '%s'",
+                        expected_size,
+                        backend_id,
+                    )
+            self.placements[backend_id] += 1
+        log.debug("Placing new object in backend '%s' (policy: %s)", backend_id, self.policy)
+        if self.statsd_client:
+            self.statsd_client.incr(f"objectstore.distributed.placement.{backend_id}")
+        return backend_id
+
+    def effective_weights(self, expected_size: Optional[int] = None) -> Dict[str, float]:
+        with self._lock:
+            return self._effective_weights(expected_size)
+
+    def _fits(self, backend_id: str, expected_size: int) -> bool:
+        free_bytes = self.stats[backend_id].free_bytes
+        return free_bytes is None or free_bytes >= expected_size
+
+    def _rebuild(self) -> None:
+        self._sampler = AliasSampler(self._effective_weights())
+        self._dirty = False
+        self._last_rebuild = time.time()
+
+    def _effective_weights(self, expected_size: Optional[int] = None) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for backend_id, weight in self.weights.items():
+            if weight <= 0 or backend_id in self.excluded:
+                continue
+            effective_weight = float(weight)
+            stats = self.stats[backend_id]
+            if self.policy in (CAPACITY_POLICY, LOAD_POLICY) and stats.usage_percent is not None:
+                effective_weight *= max(100.0 - stats.usage_percent, 0.0) / 100.0
+            weights[backend_id] = effective_weight
+        if self.policy == LOAD_POLICY:
+            for backend_id, factor in self._load_factors(list(weights), expected_size).items():
+                weights[backend_id] *= factor
+        return weights
+
+    def _load_factors(self, backend_ids: List[str], expected_size: Optional[int]) -> Dict[str, float]:
+        """Relative speed of each backend compared to the average of backends with recorded writes."""
+        write_times: List[Tuple[str, float]] = []
+        for backend_id in backend_ids:
+            write_time = self.stats[backend_id].expected_write_time(expected_size)
+            if write_time:
+                write_times.append((backend_id, write_time))
+        if not write_times:
+            return {}
+        mean_write_time = sum(write_time for _, write_time in write_times) / len(write_times)
+        return {
+            backend_id: min(max(mean_write_time / write_time, MIN_LOAD_FACTOR), MAX_LOAD_FACTOR)
+            for backend_id, write_time in write_times
+        }
+
+
+def _moving_average(current: Optional[float], value: float, smoothing: float) -> float:
+    if current is None:
+        return value
+    return (1.0 - smoothing) * current + smoothing * value
@@ -0,0 +1,269 @@
+"""Chunked downloads and byte-range reads of remote objects for caching object stores."""
+
+import fcntl
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import (
+    as_completed,
+    ThreadPoolExecutor,
+)
+from typing import (
+    Callable,
+    NamedTuple,
+    Optional,
+)
+
+from galaxy.util import unlink
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+DEFAULT_MAX_BLOCKS = 64
+PARTIAL_SUFFIX = ".partial"
+PARTS_SUFFIX = ".parts"
+RANGED_TRANSFER_KEYS = ("ranged_download_part_size", "ranged_download_max_concurrency")
+
+# read_range(start, length) reads up to the end of the object if length is None
+ReadRangeT = Callable[[int, Optional[int]], bytes]
+
+
+class RangedTransferConfig(NamedTuple):
+    part_size: int = DEFAULT_PART_SIZE
+    max_concurrency: int = 0  # values below 2 disable ranged downloads
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 1
+
+    def to_dict(self) -> dict:
+        return {
+            "ranged_download_part_size": self.part_size,
+            "ranged_download_max_concurrency": self.max_concurrency,
+        }
+
+
+def ranged_transfer_config(transfer_dict) -> RangedTransferConfig:
+    part_size = int(transfer_dict.get("ranged_download_part_size") or DEFAULT_PART_SIZE)
+    max_concurrency = int(transfer_dict.get("ranged_download_max_concurrency") or 0)
+    if part_size <= 0:
+        raise Exception(f"ranged_download_part_size must be positive, got {part_size}")
+    return RangedTransferConfig(part_size, max_concurrency)
+
+
+def parse_ranged_transfer_config_dict_from_xml(config_xml) -> dict:
+    transfer_dict = {}
+    transfer_els = config_xml.findall("transfer")
+    if transfer_els:
+        for key in RANGED_TRANSFER_KEYS:
+            value = transfer_els[0].get(key)
+            if value is not None:
+                transfer_dict[key] = value
+    return transfer_dict
+
+
+class RangedDownloadError(Exception):
+    """Raised if a ranged download did not produce the remote object."""
+
+
+def download_in_parts(
+    read_range: ReadRangeT,
+    size: int,
+    destination: str,
+    part_size: int,
+    max_concurrency: int,
+    remote_size: Optional[Callable[[], int]] = None,
+) -> None:
+    """Download ``size`` bytes into ``destination`` by fetching parts of ``part_size`` bytes
+    with ``read_range(start, length)`` from ``max_concurrency`` threads.
+
+    Parts are written into ``<destination>.partial`` and completed parts are recorded in
+    ``<destination>.partial.parts`` so an interrupted download resumes where it stopped. The
+    partial file is locked for the whole download, concurrent downloads of the same
+    destination wait for it and reuse its result. The destination only appears once all
+    parts are present and ``remote_size()``, if given, still reports ``size`` bytes.
+    """
+    partial_path = f"{destination}{PARTIAL_SUFFIX}"
+    parts_path = f"{partial_path}{PARTS_SUFFIX}"
+    fd = _open_locked(partial_path)
+    try:
+        if os.path.exists(destination) and os.path.getsize(destination) == size:
+            # downloaded by whoever held the lock before us
+            os.unlink(partial_path)
+            return
+        num_parts = (size + part_size - 1) // part_size
+        completed = _load_completed_parts(parts_path, size, part_size)
+        if completed and os.fstat(fd).st_size != size:
+            # the parts do not belong to this partial file
+            completed = set()
+        if completed:
+            log.debug("Resuming download of %s, %d of %d parts present", destination, len(completed), num_parts)
+        else:
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, size)
+        lock = threading.Lock()
+
+        def fetch_part(part: int) -> None:
+            start = part * part_size
+            length = min(part_size, size - start)
+            data = read_range(start, length)
+            if len(data) != length:
+                raise RangedDownloadError(
+                    f"Expected {length} bytes at offset {start} of {destination}, got {len(data)}"
+                )
+            os.pwrite(fd, data, start)
+            with lock:
+                completed.add(part)
+                _write_completed_parts(parts_path, size, part_size, completed)
+
+        remaining_parts = [part for part in range(num_parts) if part not in completed]
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="ObjectStoreRangedDownload"
+        ) as executor:
+            for future in as_completed([executor.submit(fetch_part, part) for part in remaining_parts]):
+                future.result()
+
+        current_size = remote_size() if remote_size is not None else size
+        if current_size != size:
+            # the remote object was replaced while downloading it, the parts are useless
+            os.unlink(partial_path)
+            unlink(parts_path, ignore_errors=True)
+            raise RangedDownloadError(f"Remote object of {destination} changed size from {size} to {current_size}")
+        os.replace(partial_path, destination)
+        unlink(parts_path, ignore_errors=True)
+    finally:
+        os.close(fd)
+
+
+def _open_locked(path: str) -> int:
+    """Open ``path`` for writing, creating it if needed, and wait for an exclusive lock on it."""
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.path.samestat(os.fstat(fd), os.stat(path)):
+                return fd
+        except FileNotFoundError:
+            pass
+        # the previous holder renamed or removed the file, lock the current one instead
+        os.close(fd)
+
+
+def _load_completed_parts(parts_path: str, size: int, part_size: int) -> set[int]:
+    if not os.path.exists(parts_path):
+        return set()
+    try:
+        with open(parts_path) as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return set()
+    if state.get("size") != size or state.get("part_size") != part_size:
+        # the remote object or the configuration changed, start over
+        return set()
+    return set(state.get("parts", []))
+
+
+def _write_completed_parts(parts_path: str, size: int, part_size: int, completed: set[int]) -> None:
+    tmp_path = f"{parts_path}.tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump({"size": size, "part_size": part_size, "parts": sorted(completed)}, fh)
+    os.replace(tmp_path, parts_path)
+
+
+class BlockCache:
+    """Thread-safe LRU cache of fixed-size blocks of remote objects.
+
+    Serves small reads (dataset peeks, display chunks) of objects that are not in the
+    object store cache with byte-range requests instead of pulling the whole object.
+    """
+
+    def __init__(self, block_size: int = DEFAULT_BLOCK_SIZE, max_blocks: int = DEFAULT_MAX_BLOCKS):
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self._blocks: OrderedDict[tuple[str, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def read(self, read_range: ReadRangeT, key: str, start: int, count: int, size: int) -> bytes:
+        """Return ``count`` bytes at offset ``start`` of the ``size`` bytes object ``key``."""
+        end = min(start + count, size)
+        if start >= end:
+            return b""
+        chunks = []
+        for block in range(start // self.block_size, (end - 1) // self.block_size + 1):
+            block_start = block * self.block_size
+            data = self._get_block(read_range, key, block, min(self.block_size, size - block_start))
+            chunks.append(data[max(start - block_start, 0) : end - block_start])
+        return b"".join(chunks)
+
+    def _get_block(self, read_range: ReadRangeT, key: str, block: int, length: int) -> bytes:
+        with self._lock:
+            data = self._blocks.get((key, block))
+            if data is not None:
+                self._blocks.move_to_end((key, block))
+                return data
+        data = read_range(block * self.block_size, length)
+        with self._lock:
+            self._blocks[(key, block)] = data
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        return data
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            for cached_key in [cached_key for cached_key in self._blocks if cached_key[0] == key]:
+                del self._blocks[cached_key]
+
+
+class RangedReader(io.RawIOBase):
+    """Seekable, read-only file object of the ``size`` bytes remote object ``key``.
+
+    Reads are served by ``block_cache``. Reading up to the end of the object with ``read()``
+    issues a single open-ended range request instead of one request per block.
+    """
+
+    def __init__(self, read_range: ReadRangeT, block_cache: BlockCache, key: str, size: int):
+        self._read_range = read_range
+        self._block_cache = block_cache
+        self._key = key
+        self._size = size
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        data = self._block_cache.read(self._read_range, self._key, self._position, len(buffer), self._size)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def readall(self) -> bytes:
+        if self._position >= self._size:
+            return b""
+        data = self._read_range(self._position, None)
+        self._position += len(data)
+        return data
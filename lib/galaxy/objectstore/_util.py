@@ -1,3 +1,4 @@
+import logging
 import multiprocessing
 import os
 import subprocess
@@ -7,6 +8,8 @@ from galaxy.util import (
     which,
 )
 
+log = logging.getLogger(__name__)
+
 
 def fix_permissions(config, rel_path: str):
     """Set permissions on rel_path"""
@@ -33,3 +36,23 @@ class UsesAxel:
         ncores = multiprocessing.cpu_count()
         ret_code = subprocess.call(["axel", "-a", "-o", path, "-n", str(ncores), url])
         return ret_code == 0
+
+
+def statsd_client_for_config(config):
+    """Return a statsd client if Galaxy is configured to send metrics to statsd, else ``None``."""
+    statsd_host = getattr(config, "statsd_host", None)
+    if not statsd_host:
+        return None
+    try:
+        from galaxy.web.statsd_client import GalaxyStatsdClient
+
+        return GalaxyStatsdClient(
+            statsd_host,
+            getattr(config, "statsd_port", 8125),
+            getattr(config, "statsd_prefix", "galaxy"),
+            getattr(config, "statsd_influxdb", False),
+            getattr(config, "statsd_mock_calls", False),
+        )
+    except ImportError:
+        log.warning("statsd_host is set but statsd is unavailable, object store metrics are disabled")
+        return None
@@ -8,6 +8,7 @@ from datetime import (
     datetime,
     timedelta,
 )
+from typing import Optional
 
 try:
     from azure.common import AzureHttpError
@@ -20,7 +21,12 @@ except ImportError:
     BlobServiceClient = None  # type: ignore[assignment,unused-ignore,misc]
 
 from ._caching_base import CachingConcreteObjectStore
+from ._transfer import (
+    ranged_transfer_config,
+    RANGED_TRANSFER_KEYS,
+)
 from .caching import (
+    cache_eviction_policy,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -57,6 +63,7 @@ def parse_config_xml(config_xml):
             "max_single_put_size",
             "max_single_get_size",
             "max_block_size",
+            *RANGED_TRANSFER_KEYS,
         ]:
             value = transfer_xml.get(key)
             if transfer_xml.get(key) is not None:
@@ -137,10 +144,12 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
             if value is not None:
                 typed_transfer_dict[key] = int(value)
         self.transfer_dict = typed_transfer_dict
+        self.ranged_transfer = ranged_transfer_config(raw_transfer_dict)
 
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
 
         self._initialize()
 
@@ -166,11 +175,12 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
                 "container": {
                     "name": self.container_name,
                 },
-                "transfer": self.transfer_dict,
+                "transfer": {**self.transfer_dict, **self.ranged_transfer.to_dict()},
                 "cache": {
                     "size": self.cache_size,
                     "path": self.staging_path,
                     "cache_updated_data": self.cache_updated_data,
+                    "eviction_policy": self.cache_eviction_policy,
                 },
             }
         )
@@ -242,8 +252,11 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
         local_destination = self._get_cache_path(rel_path)
         try:
             log.debug("Pulling '%s' into cache to %s", rel_path, local_destination)
-            if not self._caching_allowed(rel_path):
+            remote_size = self._get_remote_size(rel_path)
+            if not self._caching_allowed(rel_path, remote_size):
                 return False
+            elif self._use_ranged_download(remote_size):
+                return self._ranged_download(rel_path, remote_size)
             else:
                 self._download_to_file(rel_path, local_destination)
                 return True
@@ -261,6 +274,9 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
         with open(local_destination, "wb") as f:
             self._blob_client(rel_path).download_blob().download_to_stream(f, **kwd)
 
+    def _read_remote_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        return self._blob_client(rel_path).download_blob(offset=start, length=length).readall()
+
     def _download_directory_into_cache(self, rel_path, cache_path):
         blobs = self._blobs_from(rel_path)
         for blob in blobs:
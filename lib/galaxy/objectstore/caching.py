@@ -2,10 +2,14 @@
 
 import logging
 import os
+import sqlite3
 import threading
 import time
+from contextlib import contextmanager
 from math import inf
 from typing import (
+    Dict,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -24,6 +28,23 @@ log = logging.getLogger(__name__)
 
 ONE_GIGA_BYTE = 1024 * 1024 * 1024
 
+# SQLite file kept at the root of the cache directory tracking the cached files,
+# its journal files share the prefix.
+CACHE_INDEX_FILENAME = ".galaxy_cache_index.sqlite"
+# Rescan the cache directory this often to pick up files that never went through
+# the object store (e.g. written into the cache and never pushed).
+CACHE_INDEX_RESCAN_INTERVAL = 24 * 60 * 60
+# Number of files recorded per write transaction while rescanning the cache directory.
+CACHE_INDEX_RESCAN_BATCH_SIZE = 1000
+# File systems on which SQLite locking is unreliable, the cache index is refused there.
+NETWORK_FILE_SYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs"}
+# Order in which files are evicted for each of the supported eviction policies.
+EVICTION_POLICIES = {
+    "lru": "last_access ASC",
+    "lfu": "access_count ASC, last_access ASC",
+    "size": "size DESC, last_access ASC",
+}
+
 
 FileListT = List[Tuple[time.struct_time, str, int]]
 
@@ -32,6 +53,7 @@ class CacheTarget(NamedTuple):
     path: str
     size: int  # cache size in gigabytes
     limit: float  # cache limit as a percent
+    eviction_policy: Optional[str] = None  # if set, use a CacheIndex with this policy instead of walking the cache
 
     def fits_in_cache(self, bytes: int) -> bool:
         # if we don't have a positive cache size - interpret it as an unbounded
@@ -55,6 +77,9 @@ def check_caches(targets: List[CacheTarget]):
 
 def check_cache(cache_target: CacheTarget):
     """Run a step of the cache monitor."""
+    if cache_target.eviction_policy:
+        _check_cache_with_index(cache_target)
+        return
     total_size, file_list = _get_cache_size_files(cache_target.path)
     # Sort the file list (based on access time)
     file_list.sort()
@@ -76,9 +101,28 @@ def check_cache(cache_target: CacheTarget):
         _clean_cache(file_list, delete_this_much)
 
 
+def _check_cache_with_index(cache_target: CacheTarget):
+    assert cache_target.eviction_policy
+    cache_index = CacheIndex.for_path(cache_target.path)
+    if cache_index.needs_rescan():
+        cache_index.rescan()
+    total_size = cache_index.total_size()
+    cache_limit = cache_target.size * ONE_GIGA_BYTE * cache_target.limit
+    if total_size > cache_limit:
+        log.debug(
+            "Initiating %s cache cleaning: current cache size: %s; clean until smaller than: %s",
+            cache_target.eviction_policy,
+            nice_size(total_size),
+            nice_size(cache_limit),
+        )
+        cache_index.evict(cache_target.eviction_policy, total_size - cache_limit)
+
+
 def reset_cache(cache_target: CacheTarget):
     _, file_list = _get_cache_size_files(cache_target.path)
     _clean_cache(file_list, inf)
+    if os.path.exists(os.path.join(cache_target.path, CACHE_INDEX_FILENAME)):
+        CacheIndex.for_path(cache_target.path).clear()
 
 
 def _clean_cache(file_list: FileListT, delete_this_much: float) -> None:
@@ -115,6 +159,8 @@ def _get_cache_size_files(cache_path) -> Tuple[int, FileListT]:
 
     for dirpath, _, filenames in os.walk(cache_path):
         for filename in filenames:
+            if filename.startswith(CACHE_INDEX_FILENAME):
+                continue
             file_path = os.path.join(dirpath, filename)
             file_size = os.path.getsize(file_path)
             cache_size += file_size
@@ -134,18 +180,29 @@ def parse_caching_config_dict_from_xml(config_xml):
         staging_path = c_xml.get("path", None)
         monitor = c_xml.get("monitor", "auto")
         cache_updated_data = string_as_bool(c_xml.get("cache_updated_data", "True"))
+        eviction_policy = c_xml.get("eviction_policy", None)
 
         cache_dict = {
             "size": cache_size,
             "path": staging_path,
             "monitor": monitor,
             "cache_updated_data": cache_updated_data,
+            "eviction_policy": eviction_policy,
         }
     else:
         cache_dict = {}
     return cache_dict
 
 
+def cache_eviction_policy(cache_dict) -> Optional[str]:
+    eviction_policy = cache_dict.get("eviction_policy") or None
+    if eviction_policy is not None and eviction_policy not in EVICTION_POLICIES:
+        raise Exception(
+            f"Unknown cache eviction_policy '{eviction_policy}', must be one of {', '.join(EVICTION_POLICIES)}"
+        )
+    return eviction_policy
+
+
 def configured_cache_size(config, config_dict) -> int:
     cache_config_dict = config_dict.get("cache") or {}
     cache_size = cache_config_dict.get("size") or config.object_store_cache_size
@@ -175,6 +232,211 @@ def enable_cache_monitor(config, config_dict) -> Tuple[bool, int]:
     return monitor == "inprocess", interval
 
 
+class CacheIndex:
+    """Persistent index of the files in a cache directory.
+
+    The index is a SQLite database at the root of the cache directory shared by
+    all processes using the cache. Object stores record files as they are pulled
+    into, pushed from and read out of the cache, so the cache monitor can compute
+    the cache size and pick files to evict without walking the cache directory.
+
+    SQLite relies on POSIX file locks, which are unreliable on network file systems,
+    so the cache directory must be on a local file system (see :func:`check_cache_index_path`).
+    Use :meth:`for_path` to share one instance, and so one connection per thread, per
+    cache directory.
+    """
+
+    _instances: Dict[str, "CacheIndex"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_path: str):
+        self.cache_path = str(cache_path)
+        self.index_path = os.path.join(self.cache_path, CACHE_INDEX_FILENAME)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_created = False
+
+    @classmethod
+    def for_path(cls, cache_path: str) -> "CacheIndex":
+        cache_path = os.path.abspath(cache_path)
+        with cls._instances_lock:
+            if cache_path not in cls._instances:
+                cls._instances[cache_path] = cls(cache_path)
+            return cls._instances[cache_path]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            with self._schema_lock:
+                if not self._schema_created:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS cache_file (path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                        "last_access REAL NOT NULL, access_count INTEGER NOT NULL)"
+                    )
+                    conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+                    self._schema_created = True
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def touch(self, rel_path: str, size: int) -> None:
+        """Record an access to (or creation of) the cached file at ``rel_path``."""
+        try:
+            self._connect().execute(
+                "INSERT INTO cache_file (path, size, last_access, access_count) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, last_access = excluded.last_access, "
+                "access_count = access_count + 1",
+                (os.path.normpath(rel_path), size, time.time()),
+            )
+        except sqlite3.Error:
+            log.warning("Failed to record access to '%s' in cache index %s", rel_path, self.index_path, exc_info=True)
+
+    def remove(self, rel_path: str, recursive: bool = False) -> None:
+        """Forget the cached file at ``rel_path`` (or everything below it if ``recursive``)."""
+        rel_path = os.path.normpath(rel_path)
+        try:
+            conn = self._connect()
+            if recursive:
+                prefix = f"{rel_path}{os.sep}"
+                conn.execute(
+                    "DELETE FROM cache_file WHERE path = ? OR substr(path, 1, ?) = ?",
+                    (rel_path, len(prefix), prefix),
+                )
+            else:
+                conn.execute("DELETE FROM cache_file WHERE path = ?", (rel_path,))
+        except sqlite3.Error:
+            log.warning("Failed to remove '%s' from cache index %s", rel_path, self.index_path, exc_info=True)
+
+    def total_size(self) -> int:
+        (total_size,) = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM cache_file").fetchone()
+        return total_size
+
+    def needs_rescan(self) -> bool:
+        row = self._connect().execute("SELECT value FROM cache_meta WHERE key = 'last_scan'").fetchone()
+        return row is None or time.time() - row[0] > CACHE_INDEX_RESCAN_INTERVAL
+
+    def rescan(self) -> None:
+        """Synchronize the index with the content of the cache directory.
+
+        Access statistics of known files are preserved, new files are seeded with
+        their access time and files no longer present are dropped. Files are recorded
+        in batches of ``CACHE_INDEX_RESCAN_BATCH_SIZE``, so other processes can update
+        the index while the directory is walked.
+        """
+        scan_start = time.time()
+        conn = self._connect()
+        conn.execute("CREATE TEMPORARY TABLE IF NOT EXISTS scanned_file (path TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM scanned_file")
+        batch: List[Tuple[str, int, float]] = []
+        for dirpath, _, filenames in os.walk(self.cache_path):
+            for filename in filenames:
+                if filename.startswith(CACHE_INDEX_FILENAME):
+                    continue
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                batch.append((os.path.relpath(file_path, self.cache_path), stat.st_size, stat.st_atime))
+                if len(batch) >= CACHE_INDEX_RESCAN_BATCH_SIZE:
+                    self._record_scanned_files(batch)
+                    batch = []
+        self._record_scanned_files(batch)
+        with self._transaction() as conn:
+            # files touched while scanning may not have been seen by the walk
+            conn.execute(
+                "DELETE FROM cache_file WHERE path NOT IN (SELECT path FROM scanned_file) AND last_access < ?",
+                (scan_start,),
+            )
+            conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('last_scan', ?)", (scan_start,))
+        conn.execute("DROP TABLE scanned_file")
+
+    def _record_scanned_files(self, batch: List[Tuple[str, int, float]]) -> None:
+        if not batch:
+            return
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO scanned_file (path) VALUES (?)", [(rel_path,) for rel_path, _, _ in batch]
+            )
+            conn.executemany(
+                "INSERT INTO cache_file (path, size, last_access, access_count) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size",
+                batch,
+            )
+
+    def evict(self, eviction_policy: str, delete_this_much: float) -> None:
+        """Delete cached files in the order defined by ``eviction_policy`` until
+        at least ``delete_this_much`` bytes have been freed."""
+        order_by = EVICTION_POLICIES[eviction_policy]
+        deleted_amount = 0
+        conn = self._connect()
+        # candidates are fetched in pages since deleting rows invalidates open cursors
+        while deleted_amount < delete_this_much:
+            candidates = conn.execute(f"SELECT path, size FROM cache_file ORDER BY {order_by} LIMIT 1000").fetchall()
+            if not candidates:
+                break
+            evicted = []
+            for rel_path, size in candidates:
+                if deleted_amount >= delete_this_much:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_path, rel_path))
+                    deleted_amount += size
+                except FileNotFoundError:
+                    pass
+                evicted.append((rel_path,))
+            with self._transaction() as conn:
+                conn.executemany("DELETE FROM cache_file WHERE path = ?", evicted)
+        log.debug("Cache cleaning done. Total space freed: %s", nice_size(deleted_amount))
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache_file")
+            conn.execute("DELETE FROM cache_meta")
+
+
+def check_cache_index_path(cache_path: str) -> None:
+    """Refuse to keep a cache index in ``cache_path`` if it is on a network file system."""
+    fs_type = _file_system_type(cache_path)
+    if fs_type in NETWORK_FILE_SYSTEMS:
+        raise Exception(
+            f"Cache eviction_policy needs a cache path on a local file system, '{cache_path}' is on {fs_type} "
+            "where the locking of the SQLite cache index is unreliable"
+        )
+
+
+def _file_system_type(path: str) -> Optional[str]:
+    try:
+        with open("/proc/mounts") as fh:
+            mounts = [line.split() for line in fh]
+    except OSError:
+        # not Linux, nothing to check against
+        return None
+    path = os.path.realpath(path)
+    mount_point_length = -1
+    fs_type = None
+    for fields in mounts:
+        if len(fields) < 3:
+            continue
+        # spaces in mount points are escaped as \040
+        mount_point = fields[1].replace("\\040", " ").rstrip("/")
+        if (path == mount_point or path.startswith(f"{mount_point}/")) and len(mount_point) > mount_point_length:
+            mount_point_length = len(mount_point)
+            fs_type = fields[2]
+    return fs_type
+
+
 class InProcessCacheMonitor:
     def __init__(self, cache_target: CacheTarget, interval: int = 30, initial_sleep: Optional[int] = 2):
         # This Event object is initialized to False
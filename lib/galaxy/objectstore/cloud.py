@@ -5,10 +5,21 @@ Object Store plugin for Cloud storage.
 import logging
 import os
 import os.path
+from typing import Optional
 
+import requests
+
+from galaxy.util import DEFAULT_SOCKET_TIMEOUT
 from ._caching_base import CachingConcreteObjectStore
+from ._transfer import (
+    parse_ranged_transfer_config_dict_from_xml,
+    ranged_transfer_config,
+)
 from ._util import UsesAxel
-from .caching import enable_cache_monitor
+from .caching import (
+    cache_eviction_policy,
+    enable_cache_monitor,
+)
 from .s3 import parse_config_xml
 
 try:
@@ -54,6 +65,8 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
+        self.ranged_transfer = ranged_transfer_config(config_dict.get("transfer") or {})
 
         self._initialize()
 
@@ -125,6 +138,7 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
         # such provider-specific configuration is overwritten in the
         # following.
         config = parse_config_xml(config_xml)
+        config["transfer"] = parse_ranged_transfer_config_dict_from_xml(config_xml)
 
         try:
             provider = config_xml.attrib.get("provider")
@@ -202,7 +216,9 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "eviction_policy": self.cache_eviction_policy,
             },
+            "transfer": self.ranged_transfer.to_dict(),
         }
 
     def _get_bucket(self, bucket_name):
@@ -256,6 +272,8 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
             remote_size = key.size
             if not self._caching_allowed(rel_path, remote_size):
                 return False
+            if self._use_ranged_download(remote_size):
+                return self._ranged_download(rel_path, remote_size)
             log.debug("Pulled key '%s' into cache to %s", rel_path, local_destination)
             self._download_to(key, local_destination)
             return True
@@ -263,6 +281,13 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
             log.exception("Problem downloading key '%s' from S3 bucket '%s'", rel_path, self.bucket.name)
         return False
 
+    def _read_remote_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        url = self.bucket.objects.get(rel_path).generate_url(7200)
+        end = "" if length is None else start + length - 1
+        response = requests.get(url, headers={"Range": f"bytes={start}-{end}"}, timeout=DEFAULT_SOCKET_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+
     def _download_directory_into_cache(self, rel_path, cache_path):
         # List objects in the specified cloud folder
         objects = self.bucket.objects.list(prefix=rel_path)
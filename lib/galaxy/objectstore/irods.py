@@ -9,6 +9,7 @@ import ssl
 import threading
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 try:
     import irods
@@ -27,6 +28,11 @@ from galaxy.util import (
     unlink,
 )
 from ._caching_base import CachingConcreteObjectStore
+from ._transfer import (
+    parse_ranged_transfer_config_dict_from_xml,
+    ranged_transfer_config,
+)
+from .caching import cache_eviction_policy
 
 IRODS_IMPORT_MESSAGE = "The Python irods package is required to use this feature, please install it"
 # 1 MB
@@ -104,6 +110,7 @@ def parse_config_xml(config_xml):
         cache_size = float(c_xml[0].get("size", -1))
         staging_path = c_xml[0].get("path", None)
         cache_updated_data = string_as_bool(c_xml[0].get("cache_updated_data", "True"))
+        eviction_policy = c_xml[0].get("eviction_policy", None)
 
         attrs = ("type", "path")
         e_xml = config_xml.findall("extra_dir")
@@ -146,7 +153,9 @@ def parse_config_xml(config_xml):
                 "size": cache_size,
                 "path": staging_path,
                 "cache_updated_data": cache_updated_data,
+                "eviction_policy": eviction_policy,
             },
+            "transfer": parse_ranged_transfer_config_dict_from_xml(config_xml),
             "extra_dirs": extra_dirs,
             "private": CachingConcreteObjectStore.parse_private_from_config_xml(config_xml),
         }
@@ -230,6 +239,8 @@ class IRODSObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_path
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
+        self.ranged_transfer = ranged_transfer_config(config_dict.get("transfer") or {})
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
 
@@ -372,7 +383,9 @@ class IRODSObjectStore(CachingConcreteObjectStore):
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "eviction_policy": self.cache_eviction_policy,
             },
+            "transfer": self.ranged_transfer.to_dict(),
         }
 
     # rel_path is file or folder?
@@ -432,6 +445,10 @@ class IRODSObjectStore(CachingConcreteObjectStore):
         options = {kw.FORCE_FLAG_KW: "", kw.DEST_RESC_NAME_KW: self.resource}
 
         try:
+            if self.ranged_transfer.enabled:
+                data_obj = self.session.data_objects.get(data_object_path, **{kw.DEST_RESC_NAME_KW: self.resource})
+                if self._use_ranged_download(data_obj.size):
+                    return self._ranged_download(rel_path, data_obj.size)
             self.session.data_objects.get(data_object_path, cache_path, **options)
             log.debug("Pulled data object '%s' into cache to %s", rel_path, cache_path)
             return True
@@ -441,6 +458,13 @@ class IRODSObjectStore(CachingConcreteObjectStore):
         finally:
             log.debug("irods_pt _download: %s", ipt_timer)
 
+    def _read_remote_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        data_object_path = f"{self.logical_path}/{rel_path}"
+        options = {kw.DEST_RESC_NAME_KW: self.resource}
+        with self.session.data_objects.open(data_object_path, "r", **options) as data_obj_fp:
+            data_obj_fp.seek(start)
+            return data_obj_fp.read() if length is None else data_obj_fp.read(length)
+
     def _push_to_storage(self, rel_path, source_file=None, from_string=None):
         """
         Push the file pointed to by ``rel_path`` to the iRODS. Extract folder name
@@ -561,6 +585,7 @@ class IRODSObjectStore(CachingConcreteObjectStore):
                     for data_object in data_objects:
                         data_object.unlink(force=True)
 
+                self._remote_object_changed(rel_path, recursive=True)
                 return True
 
             else:
@@ -578,10 +603,10 @@ class IRODSObjectStore(CachingConcreteObjectStore):
                     data_obj = self.session.data_objects.get(data_object_path, **options)
                     # remove object
                     data_obj.unlink(force=True)
-                    return True
                 except (DataObjectDoesNotExist, CollectionDoesNotExist):
                     log.info("Collection or data object (%s) does not exist", data_object_path)
-                    return True
+                self._remote_object_changed(rel_path)
+                return True
         except OSError:
             log.exception("%s delete error", self._get_filename(obj, **kwargs))
         finally:
@@ -21,6 +21,7 @@ from galaxy.util import (
 )
 from ._caching_base import CachingConcreteObjectStore
 from .caching import (
+    cache_eviction_policy,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -113,6 +114,7 @@ class OnedataObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
@@ -160,6 +162,7 @@ class OnedataObjectStore(CachingConcreteObjectStore):
                     "size": self.cache_size,
                     "path": self.staging_path,
                     "cache_updated_data": self.cache_updated_data,
+                    "eviction_policy": self.cache_eviction_policy,
                 },
             }
         )
@@ -34,6 +34,7 @@ from galaxy.util import (
 )
 from ._caching_base import CachingConcreteObjectStore
 from .caching import (
+    cache_eviction_policy,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -329,6 +330,7 @@ class RucioObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
         self.cache_config = cache_dict
         self._initialize()
 
@@ -20,6 +20,7 @@ from galaxy.util import string_as_bool
 from ._caching_base import CachingConcreteObjectStore
 from ._util import UsesAxel
 from .caching import (
+    cache_eviction_policy,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -140,6 +141,7 @@ class CloudConfigMixin:
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -183,6 +185,7 @@ class S3ObjectStore(CachingConcreteObjectStore, CloudConfigMixin, UsesAxel):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
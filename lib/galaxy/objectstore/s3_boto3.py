@@ -6,6 +6,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Optional,
     TYPE_CHECKING,
 )
 
@@ -29,7 +30,12 @@ except ImportError:
 
 from galaxy.util import asbool
 from ._caching_base import CachingConcreteObjectStore
+from ._transfer import (
+    ranged_transfer_config,
+    RANGED_TRANSFER_KEYS,
+)
 from .caching import (
+    cache_eviction_policy,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -99,6 +105,9 @@ def parse_config_xml(config_xml):
                 value = transfer_xml.get(full_key)
                 if transfer_xml.get(full_key) is not None:
                     transfer_dict[full_key] = value
+        for key in RANGED_TRANSFER_KEYS:
+            if transfer_xml.get(key) is not None:
+                transfer_dict[key] = transfer_xml.get(key)
 
         tag, attrs = "extra_dir", ("type", "path")
         extra_dirs = config_xml.findall(tag)
@@ -183,6 +192,7 @@ class S3ObjectStore(CachingConcreteObjectStore):
                 if transfer_value is not None:
                     typed_transfer_dict[full_key] = key_type(transfer_value)
         self.transfer_dict = typed_transfer_dict
+        self.ranged_transfer = ranged_transfer_config(transfer_dict)
 
         self.enable_cache_monitor, self.cache_monitor_interval = enable_cache_monitor(config, config_dict)
 
@@ -200,6 +210,7 @@ class S3ObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.cache_eviction_policy = cache_eviction_policy(cache_dict)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
@@ -280,11 +291,12 @@ class S3ObjectStore(CachingConcreteObjectStore):
                 "endpoint_url": self.endpoint_url,
                 "region": self.region,
             },
-            "transfer": self.transfer_dict,
+            "transfer": {**self.transfer_dict, **self.ranged_transfer.to_dict()},
             "cache": {
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -317,8 +329,11 @@ class S3ObjectStore(CachingConcreteObjectStore):
         local_destination = self._get_cache_path(rel_path)
         try:
             log.debug("Pulling key '%s' into cache to %s", rel_path, local_destination)
-            if not self._caching_allowed(rel_path):
+            remote_size = self._get_remote_size(rel_path)
+            if not self._caching_allowed(rel_path, remote_size):
                 return False
+            if self._use_ranged_download(remote_size):
+                return self._ranged_download(rel_path, remote_size)
             config = self._transfer_config("download")
             self._client.download_file(self.bucket, rel_path, local_destination, Config=config)
             return True
@@ -326,6 +341,11 @@ class S3ObjectStore(CachingConcreteObjectStore):
             log.exception("Failed to download file from S3")
         return False
 
+    def _read_remote_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        end = "" if length is None else start + length - 1
+        response = self._client.get_object(Bucket=self.bucket, Key=rel_path, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
     def _push_string_to_path(self, rel_path: str, from_string: str) -> bool:
         try:
             self._client.put_object(Body=from_string.encode("utf-8"), Bucket=self.bucket, Key=rel_path)
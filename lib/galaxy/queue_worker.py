@@ -265,6 +265,40 @@ def reload_job_rules(app: "MinimalManagerApp", **kwargs):
     log.debug("Job rules reloaded %s", reload_timer)
 
 
+def invalidate_object_store_metadata(app, **kwargs):
+    cache_key = kwargs.get("cache_key")
+    rel_paths = kwargs.get("rel_paths") or []
+    for metadata_cache in app.object_store.remote_metadata_caches():
+        if metadata_cache.cache_key == cache_key:
+            metadata_cache.invalidate_local(rel_paths)
+
+
+def publish_object_store_metadata_invalidations(app) -> None:
+    """Broadcast invalidations of object store metadata caches to the other Galaxy processes."""
+
+    def publish(cache_key, rel_paths):
+        send_control_task(
+            app,
+            "invalidate_object_store_metadata",
+            noop_self=True,
+            kwargs={"cache_key": cache_key, "rel_paths": rel_paths},
+        )
+
+    for metadata_cache in app.object_store.remote_metadata_caches():
+        metadata_cache.publish = publish
+
+
+def schedule_workflow_invocations(app, **kwargs):
+    request_monitor = app.workflow_scheduling_manager.request_monitor
+    if request_monitor is None:
+        return
+    invocation_ids_by_handler = kwargs.get("invocation_ids_by_handler") or {}
+    # invocations without a handler yet are scheduled by whichever handler grabs them
+    invocation_ids = invocation_ids_by_handler.get(app.config.server_name, []) + invocation_ids_by_handler.get("", [])
+    if invocation_ids:
+        request_monitor.request_scheduling(invocation_ids)
+
+
 def reload_core_config(app, **kwargs):
     reload_config_options(app.config)
 
@@ -324,6 +358,8 @@ control_message_to_task = {
     "reconfigure_watcher": reconfigure_watcher,
     "reload_tour": reload_tour,
     "reload_core_config": reload_core_config,
+    "invalidate_object_store_metadata": invalidate_object_store_metadata,
+    "schedule_workflow_invocations": schedule_workflow_invocations,
 }
 
 
@@ -59,7 +59,10 @@ if TYPE_CHECKING:
     from galaxy.tool_shed.galaxy_install.installed_repository_manager import InstalledRepositoryManager
     from galaxy.tool_util.data import ToolDataTableManager
     from galaxy.tools import ToolBox
-    from galaxy.tools.cache import ToolCache
+    from galaxy.tools.cache import (
+        ToolCache,
+        ToolSourceCache,
+    )
     from galaxy.tools.error_reports import ErrorReports
     from galaxy.visualization.genomes import Genomes
 
@@ -175,6 +178,7 @@ class StructuredApp(MinimalManagerApp):
     queue_worker: Any  # 'galaxy.queue_worker.GalaxyQueueWorker'
     data_provider_registry: Any  # 'galaxy.visualization.data_providers.registry.DataProviderRegistry'
     tool_cache: "ToolCache"
+    tool_source_cache: Optional["ToolSourceCache"]
     tool_shed_repository_cache: Optional[ToolShedRepositoryCache]
     watchers: "ConfigWatchers"
     workflow_scheduling_manager: Any  # 'galaxy.workflow.scheduling_manager.WorkflowSchedulingManager'
@@ -1,3 +1,6 @@
+from typing import Optional
+
+from galaxy.util import xml_to_string
 from galaxy.util.xml_macros import (
     imported_macro_paths,
     load,
@@ -10,7 +13,22 @@ load_tool = load
 load_tool_with_refereces = load_with_references
 raw_tool_xml_tree = raw_xml_tree
 
+
+def expand_tool_source(path: str) -> Optional[tuple[str, str, list[str]]]:
+    """Return the ``(path, xml, macro_paths)`` entry of the XML tool at ``path``, or ``None`` if it can't be parsed.
+
+    Used to parse tools in worker processes, which only need to import this module. Errors are reported
+    when the tool is loaded by the toolbox.
+    """
+    try:
+        tree, macro_paths = load_with_references(path)
+    except Exception:
+        return None
+    return path, xml_to_string(tree.getroot()), [str(p) for p in macro_paths or []]
+
+
 __all__ = (
+    "expand_tool_source",
     "imported_macro_paths",
     "load_tool",
     "load_tool_with_refereces",
@@ -3,8 +3,12 @@ import errno
 import logging
 import os
 import string
+import threading
 import time
-from collections import namedtuple
+from collections import (
+    namedtuple,
+    OrderedDict,
+)
 from errno import ENOENT
 from typing import (
     Any,
@@ -197,6 +201,12 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
         # Cache for tool's to_dict calls specific to toolbox. Invalidates on toolbox reload.
         self._tool_to_dict_cache: Dict[str, Dict[str, Any]] = {}
         self._tool_to_dict_cache_admin: Dict[str, Dict[str, Any]] = {}
+        # With lazy_load_tools, tools of the tool config files are registered as lazy tools and the
+        # tools created for them when they are first used are kept here, least recently used first.
+        self._lazy_load_tools = getattr(app.config, "lazy_load_tools", False)
+        self._lazy_tool_cache_size = getattr(app.config, "lazy_tool_cache_size", 1000)
+        self._lazy_tool_cache: OrderedDict[Any, Tool] = OrderedDict()
+        self._lazy_tool_cache_lock = threading.Lock()
         # In-memory dictionary that defines the layout of the tool panel.
         self._tool_panel = ToolPanelElements()
         self._index = 0
@@ -274,6 +284,13 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
     def create_tool(self, config_file: "StrPath", **kwds) -> "Tool":
         raise NotImplementedError()
 
+    def create_lazy_tool(self, config_file: "StrPath", **kwds) -> "Tool":
+        """Return a tool standing in for the tool at ``config_file`` until it is used.
+
+        Toolboxes that can't defer creating tools return the tool itself.
+        """
+        return self.create_tool(config_file, **kwds)
+
     def create_dynamic_tool(self, dynamic_tool: "DynamicTool") -> "Tool":
         raise NotImplementedError()
 
@@ -302,6 +319,9 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
             directory_contents = sorted(os.listdir(config_directory))
             directory_config_files = [config_file for config_file in directory_contents if config_file.endswith(".xml")]
             config_filenames.extend(directory_config_files)
+        self._prefetch_tool_sources(
+            [config_filename for config_filename in config_filenames if self.can_load_config_file(config_filename)]
+        )
         for config_filename in config_filenames:
             if not self.can_load_config_file(config_filename):
                 continue
@@ -320,6 +340,28 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
                 log.exception("Error loading tools defined in config %s", config_filename)
         log.debug("Reading tools from config files finished %s", execution_timer)
 
+    def _prefetch_tool_sources(self, config_filenames: List[str]) -> None:
+        """Hook to parse the tools of ``config_filenames`` before they are loaded one by one."""
+
+    def _tool_files_from_config(self, config_filename: str) -> List[str]:
+        """Return the paths of the tool files listed in a tool config file, including those in sections.
+
+        Tools of ``tool_dir`` items are not listed.
+        """
+        tool_conf_source = get_toolbox_parser(config_filename)
+        tool_path = self.__resolve_tool_path(tool_conf_source.parse_tool_path(), config_filename)
+        template_kwds = self._path_template_kwds()
+        tool_files = []
+        items = list(tool_conf_source.parse_items())
+        while items:
+            item = items.pop()
+            if item.type == "section":
+                items.extend(item.items)
+            elif item.type == "tool" and (path_template := item.get("file")):
+                path = string.Template(path_template).safe_substitute(**template_kwds)
+                tool_files.append(os.path.join(tool_path, path))
+        return tool_files
+
     def _init_tools_from_config(self, config_filename: str) -> None:
         """
         Read the configuration file and load each tool.  The following tags are currently supported:
@@ -409,6 +451,15 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
 
     def panel_has_tool(self, tool: "Tool", panel_view_id: str) -> bool:
         panel_view_rendered = self._tool_panel_view_rendered[panel_view_id]
+        # the panel holds the lazy tool of a tool created for a lazy tool
+        assert tool.id
+        registered_tool = self._tool_versions_by_id.get(tool.id, {}).get(tool.version or None)
+        if (
+            registered_tool is not None
+            and getattr(registered_tool, "is_lazy", False)
+            and self._lazy_tool_cache.get(registered_tool) is tool
+        ):
+            tool = registered_tool
         return panel_view_rendered.has_item_recursive(tool)
 
     def load_dynamic_tool(self, dynamic_tool: "DynamicTool") -> Union["Tool", None]:
@@ -734,6 +785,54 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
         user: Optional["User"] = None,
     ) -> Union[Optional["Tool"], List["Tool"]]:
         """Attempt to locate a tool in the tool box. Note that `exact` only refers to the `tool_id`, not the `tool_version`."""
+        tool = self.find_tool(tool_id, tool_version, tool_uuid, get_all_versions, exact, user)
+        if isinstance(tool, list):
+            return [self._materialize_tool(t) for t in tool]
+        return self._materialize_tool(tool)
+
+    @overload
+    def find_tool(
+        self,
+        tool_id: Optional[str] = None,
+        tool_version: Optional[str] = None,
+        tool_uuid: Optional[Union[UUID, str]] = None,
+        get_all_versions: Literal[False] = False,
+        exact: Optional[bool] = False,
+        user: Optional["User"] = None,
+    ) -> Optional["Tool"]: ...
+
+    @overload
+    def find_tool(
+        self,
+        tool_id: Optional[str] = None,
+        tool_version: Optional[str] = None,
+        tool_uuid: Optional[Union[UUID, str]] = None,
+        get_all_versions: Literal[True] = True,
+        exact: Optional[bool] = False,
+        user: Optional["User"] = None,
+    ) -> List["Tool"]: ...
+
+    @overload
+    def find_tool(
+        self,
+        tool_id: Optional[str] = None,
+        tool_version: Optional[str] = None,
+        tool_uuid: Optional[Union[UUID, str]] = None,
+        get_all_versions: Optional[bool] = False,
+        exact: Optional[bool] = False,
+        user: Optional["User"] = None,
+    ) -> Union[Optional["Tool"], List["Tool"]]: ...
+
+    def find_tool(
+        self,
+        tool_id: Optional[str] = None,
+        tool_version: Optional[str] = None,
+        tool_uuid: Optional[Union[UUID, str]] = None,
+        get_all_versions: Optional[bool] = False,
+        exact: Optional[bool] = False,
+        user: Optional["User"] = None,
+    ) -> Union[Optional["Tool"], List["Tool"]]:
+        """Locate a tool like get_tool does, without creating the tool of a lazy tool."""
         if tool_id is None and tool_uuid is None:
             raise RequestParameterInvalidException("get_tool cannot be called with both tool_id and tool_uuid as None")
         elif tool_uuid:
@@ -832,9 +931,25 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
         user: Optional["User"] = None,
     ):
         return (
-            self.get_tool(tool_id, tool_version=tool_version, tool_uuid=tool_uuid, exact=exact, user=user) is not None
+            self.find_tool(tool_id, tool_version=tool_version, tool_uuid=tool_uuid, exact=exact, user=user) is not None
         )
 
+    def _materialize_tool(self, tool):
+        """Return the tool created for ``tool`` if it is a lazy tool, creating it if it is not cached."""
+        if tool is None or not getattr(tool, "is_lazy", False):
+            return tool
+        with self._lazy_tool_cache_lock:
+            materialized = self._lazy_tool_cache.get(tool)
+            if materialized is not None:
+                self._lazy_tool_cache.move_to_end(tool)
+                return materialized
+        materialized = tool.materialize()
+        with self._lazy_tool_cache_lock:
+            materialized = self._lazy_tool_cache.setdefault(tool, materialized)
+            while len(self._lazy_tool_cache) > self._lazy_tool_cache_size:
+                self._lazy_tool_cache.popitem(last=False)
+        return materialized
+
     def get_unprivileged_tool(self, user: "User", tool_uuid: Union[UUID, str]) -> Optional["Tool"]:
         return None
 
@@ -945,9 +1060,10 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
                         guid=guid,
                         tool_shed_repository=tool_shed_repository,
                         use_cached=False,
+                        lazy=True,
                     )
             if not tool:  # tool was not in cache and is not a tool shed tool.
-                tool = self.load_tool(concrete_path, use_cached=False)
+                tool = self.load_tool(concrete_path, use_cached=False, lazy=True)
             if string_as_bool(item.get("hidden", False)):
                 tool.hidden = True
             key = f"tool_{str(tool.id)}"
@@ -1191,16 +1307,21 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
         guid=None,
         tool_shed_repository=None,
         use_cached: bool = False,
+        lazy: bool = False,
         **kwds,
     ) -> "Tool":
-        """Load a single tool from the file named by `config_file` and return an instance of `Tool`."""
+        """Load a single tool from the file named by `config_file` and return an instance of `Tool`.
+
+        If `lazy` is set and the toolbox is configured with lazy_load_tools, a lazy tool is returned.
+        """
         # Parse XML configuration file and get the root element
         tool: Optional[Tool] = None
         if use_cached:
             tool = self.load_tool_from_cache(config_file)
         if not tool or guid and guid != tool.guid:
+            create_tool = self.create_lazy_tool if lazy and self._lazy_load_tools else self.create_tool
             try:
-                tool = self.create_tool(
+                tool = create_tool(
                     config_file,
                     tool_shed_repository=tool_shed_repository,
                     guid=guid,
@@ -1256,6 +1377,9 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
     def register_tool(self, tool: "Tool") -> None:
         tool_id = tool.id
         assert tool_id
+        if getattr(tool, "is_lazy", False):
+            # lazy tools of the tool cache are reused by the toolboxes built on reload
+            tool.bind(self)  # type: ignore[attr-defined]
         version = tool.version or None
         if tool_id not in self._tool_versions_by_id:
             self._tool_versions_by_id[tool_id] = {version: tool}
@@ -1340,6 +1464,8 @@ class AbstractToolBox(ManagesIntegratedToolPanelMixin):
             tool_cache: Optional[ToolCache] = getattr(self.app, "tool_cache", None)
             if tool_cache:
                 tool_cache.expire_tool(tool_id)
+            with self._lazy_tool_cache_lock:
+                self._lazy_tool_cache.pop(tool, None)
             if remove_from_panel:
                 self._tool_panel.remove_tool(tool_id)
                 if tool_id in self.data_manager_tools:
@@ -6,6 +6,7 @@ import itertools
 import json
 import logging
 import math
+import multiprocessing
 import os
 import re
 import tarfile
@@ -14,6 +15,7 @@ from collections.abc import (
     MutableMapping,
     Sequence,
 )
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import (
     Any,
@@ -74,7 +76,9 @@ from galaxy.tool_util.deps import (
 from galaxy.tool_util.deps.requirements import CredentialsRequirement
 from galaxy.tool_util.fetcher import ToolLocationFetcher
 from galaxy.tool_util.loader import (
+    expand_tool_source,
     imported_macro_paths,
+    load_tool_with_refereces,
     raw_tool_xml_tree,
     template_macro_params,
 )
@@ -141,6 +145,7 @@ from galaxy.tools.actions import (
 from galaxy.tools.actions.data_manager import DataManagerToolAction
 from galaxy.tools.actions.data_source import DataSourceToolAction
 from galaxy.tools.actions.model_operations import ModelOperationToolAction
+from galaxy.tools.cache import ToolSourceCache
 from galaxy.tools.evaluation import global_tool_errors
 from galaxy.tools.execution_helpers import ToolExecutionCache
 from galaxy.tools.imp_exp import JobImportHistoryArchiveWrapper
@@ -188,10 +193,12 @@ from galaxy.tools.parameters.populate_model import populate_model
 from galaxy.tools.parameters.workflow_utils import workflow_building_modes
 from galaxy.tools.parameters.wrapped_json import json_wrap
 from galaxy.util import (
+    ExecutionTimer,
     in_directory,
     listify,
     Params,
     parse_xml_string,
+    parse_xml_string_to_etree,
     rst_to_html,
     string_as_bool,
     unicodify,
@@ -426,9 +433,15 @@ class ToolNotFoundException(Exception):
 
 
 def create_tool_from_source(app, tool_source: ToolSource, config_file: Optional[StrPath] = None, **kwds):
+    ToolClass = get_tool_class(tool_source)
+    tool = ToolClass(config_file, tool_source, app, **kwds)
+    return tool
+
+
+def get_tool_class(tool_source: ToolSource) -> type["Tool"]:
     # Allow specifying a different tool subclass to instantiate
     if tool_source.parse_class() == "GalaxyUserTool":
-        return UserDefinedTool(config_file, tool_source, app, **kwds)
+        return UserDefinedTool
     if (tool_module := tool_source.parse_tool_module()) is not None:
         module, cls = tool_module
         mod = __import__(module, globals(), locals(), [cls])
@@ -443,10 +456,8 @@ def create_tool_from_source(app, tool_source: ToolSource, config_file: Optional[
                 raise ToolLoadError(f"Parsed unrecognized tool type ({tool_type}) from tool")
     else:
         # Normal tool
-        root = getattr(tool_source, "root", None)
         ToolClass = Tool
-    tool = ToolClass(config_file, tool_source, app, **kwds)
-    return tool
+    return ToolClass
 
 
 def create_tool_from_representation(
@@ -604,8 +615,17 @@ class ToolBox(AbstractToolBox):
         tool_source = self.get_expanded_tool_source(config_file)
         return self._create_tool_from_source(tool_source, config_file=config_file, **kwds)
 
+    def create_lazy_tool(self, config_file: StrPath, **kwds) -> "Tool":
+        tool_source = self.get_expanded_tool_source(config_file)
+        if not isinstance(tool_source, XmlToolSource):
+            return self._create_tool_from_source(tool_source, config_file=config_file, **kwds)
+        return cast(Tool, LazyTool(self, config_file, tool_source, **kwds))
+
     def get_expanded_tool_source(self, config_file: StrPath) -> ToolSource:
+        tool_source_cache: Optional[ToolSourceCache] = getattr(self.app, "tool_source_cache", None)
         try:
+            if tool_source_cache and str(config_file).endswith(".xml"):
+                return self._get_cached_tool_source(tool_source_cache, config_file)
             return get_tool_source(
                 config_file,
                 enable_beta_formats=getattr(self.app.config, "enable_beta_tool_formats", False),
@@ -616,6 +636,58 @@ class ToolBox(AbstractToolBox):
             global_tool_errors.add_error(config_file, "Tool XML parsing", e)
             raise e
 
+    def _get_cached_tool_source(self, tool_source_cache: ToolSourceCache, config_file: StrPath) -> XmlToolSource:
+        config_file = str(self.tool_location_fetcher.to_tool_path(config_file))
+        if cached := tool_source_cache.get(config_file):
+            xml, macro_paths = cached
+            xml_tree = parse_xml_string_to_etree(xml, strip_whitespace=False)
+            return XmlToolSource(xml_tree, source_path=config_file, macro_paths=macro_paths)
+        xml_tree, loaded_macro_paths = load_tool_with_refereces(config_file)
+        tool_source = XmlToolSource(xml_tree, source_path=config_file, macro_paths=loaded_macro_paths)
+        tool_source_cache.set(config_file, tool_source.to_string(), tool_source.macro_paths)
+        return tool_source
+
+    def _prefetch_tool_sources(self, config_filenames: list[str]) -> None:
+        """Parse the XML tools missing from the tool source cache in ``tool_loading_processes`` processes.
+
+        Tools already loaded by this process are skipped, parse errors are reported when the tool is loaded.
+        """
+        tool_source_cache: Optional[ToolSourceCache] = getattr(self.app, "tool_source_cache", None)
+        processes = getattr(self.app.config, "tool_loading_processes", 1)
+        if not tool_source_cache or processes <= 1:
+            return
+        execution_timer = ExecutionTimer()
+        tool_files: set[str] = set()
+        for config_filename in config_filenames:
+            try:
+                tool_files.update(self._tool_files_from_config(config_filename))
+            except Exception:
+                # errors are reported when the config file is loaded
+                continue
+        tool_files = {
+            tool_file
+            for tool_file in tool_files
+            if tool_file.endswith(".xml") and self.load_tool_from_cache(tool_file) is None
+        }
+        missing = tool_source_cache.missing(sorted(tool_files))
+        if not missing:
+            return
+        processes = min(processes, len(missing))
+        # Galaxy has started threads by now, forking could copy locks held by them into the workers. Start
+        # the workers from a fresh interpreter instead, they only need galaxy.tool_util.loader to parse tools.
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        mp_context = multiprocessing.get_context(start_method)
+        with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context) as executor:
+            chunksize = max(1, len(missing) // (processes * 4))
+            entries = [entry for entry in executor.map(expand_tool_source, missing, chunksize=chunksize) if entry]
+        tool_source_cache.set_many(entries)
+        log.debug(
+            "Parsed %d tools missing from the tool source cache in %d processes %s",
+            len(missing),
+            processes,
+            execution_timer,
+        )
+
     def _create_tool_from_source(self, tool_source: ToolSource, **kwds):
         return create_tool_from_source(self.app, tool_source, **kwds)
 
@@ -837,6 +909,7 @@ class JobContext(BaseJobContext):
         final_job_state: "JobState",
         max_discovered_files: Optional[int],
         flush_per_n_datasets=None,
+        discovered_outputs_workers=1,
     ):
         self.tool = tool
         self._metadata_source_provider = metadata_source_provider
@@ -850,6 +923,7 @@ class JobContext(BaseJobContext):
         self._object_store = object_store
         self.final_job_state = final_job_state
         self._flush_per_n_datasets = flush_per_n_datasets
+        self.discovered_outputs_workers = discovered_outputs_workers
         self.max_discovered_files = float("inf") if max_discovered_files is None else max_discovered_files
         self.discovered_file_count = 0
         self._tag_handler = None
@@ -1405,13 +1479,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
         # a 'default' will be provided that uses the 'default' handler and
         # 'default' destination.  I thought about moving this to the
         # job_config, but it makes more sense to store here. -nate
-        if self.id:
-            self_ids = [self.id.lower()]
-            if self.old_id and self.old_id != self.id:
-                # Handle toolshed guids
-                self_ids = [self.id.lower(), self.id.lower().rsplit("/", 1)[0], self.old_id.lower()]
-        else:
-            self_ids = []
+        self_ids = _all_tool_ids(self.id, self.old_id)
         self.all_ids = self_ids
 
         # In the toolshed context, there is no job config.
@@ -1438,7 +1506,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
         self.raw_help = None
 
         if self.app.is_webapp:
-            self.raw_help = self.__get_help_with_images(tool_source.parse_help())
+            self.raw_help = self._get_help_with_images(tool_source.parse_help())
             self.parse_tests()
         self.__parse_legacy_features(tool_source)
 
@@ -1976,7 +2044,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
         """
         return biotools_reference(self.xrefs)
 
-    def __get_help_with_images(self, help_content: Optional[HelpContent]) -> Optional[HelpContent]:
+    def _get_help_with_images(self, help_content: Optional[HelpContent]) -> Optional[HelpContent]:
         if help_content and help_content.format == "restructuredtext":
             help_text = help_content.content or ""
             try:
@@ -2013,6 +2081,11 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
     def is_workflow_compatible(self):
         return self._is_workflow_compatible
 
+    @property
+    def _tool_class(self) -> type["Tool"]:
+        # a lazy tool holds the class of the tool it stands in for instead
+        return type(self)
+
     def check_workflow_compatible(self, tool_source):
         """
         Determine if a tool can be used in workflows. External tools and the
@@ -2811,6 +2884,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
             object_store=tool.app.object_store,
             final_job_state=final_job_state,
             flush_per_n_datasets=tool.app.config.flush_per_n_datasets,
+            discovered_outputs_workers=tool.app.config.discovered_outputs_workers,
             max_discovered_files=tool.app.config.max_discovered_files,
         )
         collected = output_collect.collect_primary_datasets(
@@ -2939,6 +3013,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
 
         # Basic information
         tool_dict = self._dictify_view_keys()
+        tool_dict["model_class"] = self._tool_class.__name__
 
         tool_dict["icon"] = self.icon
         tool_dict["edam_operations"] = self.edam_operations
@@ -2967,7 +3042,7 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
         # Add link details.
         if link_details:
             # Add details for creating a hyperlink to the tool.
-            if not isinstance(self, DataSourceTool):
+            if not issubclass(self._tool_class, DataSourceTool):
                 link = self.app.url_for(controller="tool_runner", tool_id=self.id)
             else:
                 link = self.app.url_for(controller="tool_runner", action="data_source_redirect", tool_id=self.id)
@@ -2982,9 +3057,9 @@ class Tool(UsesDictVisibleKeys, ToolParameterBundle):
 
         tool_dict["panel_section_id"], tool_dict["panel_section_name"] = self.get_panel_section()
 
-        tool_class = self.__class__
+        tool_class = self._tool_class
         # FIXME: the Tool class should declare directly, instead of ad hoc inspection
-        regular_form = tool_class == Tool or isinstance(self, (DatabaseOperationTool, InteractiveTool))
+        regular_form = tool_class == Tool or issubclass(tool_class, (DatabaseOperationTool, InteractiveTool))
         tool_dict["form_style"] = "regular" if regular_form else "special"
         if tool_help:
             # create tool help
@@ -4881,6 +4956,146 @@ TOOL_CLASSES: list[type[Tool]] = [
 ]
 tool_types = {tool_class.tool_type: tool_class for tool_class in TOOL_CLASSES}
 
+
+class LazyTool:
+    """Stands in for a tool of the toolbox until it is used, see the ``lazy_load_tools`` option.
+
+    Only what the toolbox needs to register the tool, to build and serialize the tool panel views
+    and to index the tool for tool search is kept when the toolbox is loaded. The tool is created by
+    the toolbox when it is first requested and kept in a cache of ``lazy_tool_cache_size``
+    tools, any other attribute of the lazy tool is read from that tool. Attributes set on the
+    lazy tool by the toolbox (e.g. ``hidden`` or the tool shed attributes of the tool config
+    file) are applied to every tool created for it.
+    """
+
+    is_lazy = True
+    version_object = Tool.version_object
+    lineage = Tool.lineage
+    tool_versions = Tool.tool_versions
+    is_latest_version = Tool.is_latest_version
+    latest_version = Tool.latest_version
+    tool_shed_repository = Tool.tool_shed_repository
+    get_panel_section = Tool.get_panel_section
+    # the tool panel is serialized without creating the tools
+    dict_collection_visible_keys = Tool.dict_collection_visible_keys
+    _dictify_view_keys = Tool._dictify_view_keys
+    to_dict = Tool.to_dict
+    is_workflow_compatible = Tool.is_workflow_compatible
+    help_html = Tool.help_html
+    render_help = Tool.render_help
+
+    def __init__(self, toolbox: "ToolBox", config_file: StrPath, tool_source: ToolSource, **kwds) -> None:
+        app = toolbox.app
+        guid = kwds.get("guid")
+        tool_shed_repository = kwds.get("tool_shed_repository")
+        old_id = tool_source.parse_id()
+        tool_id = guid or old_id
+        if not tool_id:
+            raise Exception(f"Missing tool 'id' for tool at '{tool_source}'")
+        name = tool_source.parse_name()
+        if not name:
+            raise Exception(f"Missing tool 'name' for tool with id '{tool_id}' at '{tool_source}'")
+        profile = parse_profile_version(tool_source)
+        tool_class = get_tool_class(tool_source)
+        all_ids = _all_tool_ids(tool_id, old_id)
+        xrefs: list = []
+        edam_operations = edam_topics = None
+        if biotools_metadata_source := getattr(app, "biotools_metadata_source", None):
+            ontology_data = expand_ontology_data(tool_source, all_ids, biotools_metadata_source)
+            xrefs = ontology_data.xrefs
+            edam_operations = ontology_data.edam_operations
+            edam_topics = ontology_data.edam_topics
+        pages = tool_source.parse_input_pages()
+        target = "galaxy_main"
+        if issubclass(tool_class, DataSourceTool):
+            target = "_top"
+        elif pages.inputs_defined and hasattr(pages, "input_elem"):
+            target = pages.input_elem.get("target", target)
+        uihints: dict[str, str] = {}
+        if hasattr(tool_source, "root") and (uihints_elem := tool_source.root.find("uihints")) is not None:
+            uihints.update(uihints_elem.attrib)
+        self.__dict__.update(
+            _toolbox=toolbox,
+            _create_args=(config_file, kwds),
+            _overrides={},
+            _tool_class=tool_class,
+            app=app,
+            config_file=os.path.realpath(config_file),
+            id=tool_id,
+            old_id=old_id,
+            guid=guid,
+            all_ids=all_ids,
+            name=name,
+            description=tool_source.parse_description(),
+            version=parse_tool_version_with_defaults(tool_id, tool_source, Version(str(profile))),
+            profile=profile,
+            tool_type=tool_class.tool_type,
+            hidden=tool_source.parse_hidden(),
+            require_login=tool_source.parse_require_login(False),
+            labels=[],
+            icon=tool_source.parse_icon(),
+            xrefs=xrefs,
+            edam_operations=edam_operations,
+            edam_topics=edam_topics,
+            uihints=uihints,
+            target=target,
+            has_multiple_pages=len(pages.page_sources) > 1,
+            dynamic_tool=None,
+            tool_shed=tool_shed_repository and tool_shed_repository.tool_shed,
+            repository_name=tool_shed_repository and tool_shed_repository.name,
+            repository_owner=tool_shed_repository and tool_shed_repository.owner,
+            changeset_revision=tool_shed_repository and tool_shed_repository.changeset_revision,
+            installed_changeset_revision=tool_shed_repository and tool_shed_repository.installed_changeset_revision,
+            repository_id=kwds.get("repository_id"),
+            tool_errors=None,
+            _lineage=None,
+            _macro_paths=tool_source.macro_paths,
+        )
+        self.__dict__["_is_workflow_compatible"] = Tool.check_workflow_compatible(cast(Tool, self), tool_source)
+        # indexed by tool search
+        if app.is_webapp:
+            self.__dict__["raw_help"] = Tool._get_help_with_images(cast(Tool, self), tool_source.parse_help())
+        else:
+            self.__dict__["raw_help"] = None
+
+    def __getattr__(self, name):
+        if name.startswith("__") or "_toolbox" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self._toolbox._materialize_tool(self), name)
+
+    def __setattr__(self, name, value) -> None:
+        self.__dict__[name] = value
+        self._overrides[name] = value
+        if (tool := self._toolbox._lazy_tool_cache.get(self)) is not None:
+            setattr(tool, name, value)
+
+    def allow_user_access(self, user, attempting_access=True) -> bool:
+        if self._tool_class.allow_user_access is Tool.allow_user_access:
+            return Tool.allow_user_access(self, user, attempting_access=attempting_access)  # type: ignore[arg-type]
+        return self._toolbox._materialize_tool(self).allow_user_access(user, attempting_access=attempting_access)
+
+    def bind(self, toolbox: "ToolBox") -> None:
+        """Create the tools of this lazy tool with ``toolbox``."""
+        self.__dict__["_toolbox"] = toolbox
+
+    def materialize(self) -> Tool:
+        config_file, kwds = self._create_args
+        # with enable_tool_source_cache the tool source expanded for the lazy tool is read from the cache
+        tool = self._toolbox.create_tool(config_file, **kwds)
+        for name, value in self._overrides.items():
+            setattr(tool, name, value)
+        return tool
+
+
+def _all_tool_ids(tool_id: Optional[str], old_id: Optional[str]) -> list[str]:
+    if not tool_id:
+        return []
+    if old_id and old_id != tool_id:
+        # Handle toolshed guids
+        return [tool_id.lower(), tool_id.lower().rsplit("/", 1)[0], old_id.lower()]
+    return [tool_id.lower()]
+
+
 # ---- Utility classes to be factored out -----------------------------------
 
 
@@ -93,6 +93,10 @@ class ToolAction:
     been converted and validated).
     """
 
+    # Whether all jobs of a map-over can be created before any of them is flushed,
+    # i.e. ``execute`` neither needs database ids nor commits.
+    batch_map_over: bool = False
+
     @abstractmethod
     def execute(
         self,
@@ -135,6 +139,7 @@ class DefaultToolAction(ToolAction):
     """Default tool action is to run an external command"""
 
     produces_real_jobs: bool = True
+    batch_map_over: bool = True
 
     def _collect_input_datasets(
         self,
@@ -740,11 +745,16 @@ class DefaultToolAction(ToolAction):
                 hdca.visible = False
                 hdca.collection.mark_as_populated()
             object_store_populator = ObjectStorePopulator(trans.app, trans.user)
+            # creating the (empty) outputs in the object store requires dataset ids
+            trans.sa_session.flush()
             for data in out_data.values():
                 data.set_skipped(object_store_populator, replace_dataset=False)
         job.preferred_object_store_id = preferred_object_store_id
         self._handle_credentials_context(trans.sa_session, job, credentials_context)
         self._record_inputs(trans, tool, job, incoming, inp_data, inp_dataset_collections)
+        if app.config.enable_job_cache_fingerprints and not completed_job:
+            # Copies of cached jobs are never looked up
+            app.job_search.fingerprint_job(job)
         self._record_outputs(job, out_data, output_collections)
         # execute immediate post job actions and associate post job actions that are to be executed after the job is complete
         if job_callback:
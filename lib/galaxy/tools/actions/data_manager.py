@@ -30,6 +30,8 @@ log = logging.getLogger(__name__)
 class DataManagerToolAction(DefaultToolAction):
     """Tool action used for Data Manager Tools"""
 
+    batch_map_over: bool = False
+
     def execute(
         self,
         tool,
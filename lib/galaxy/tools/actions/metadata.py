@@ -186,6 +186,8 @@ class SetMetadataToolAction(ToolAction):
             include_command=False,
             max_metadata_value_size=app.config.max_metadata_value_size,
             max_discovered_files=app.config.max_discovered_files,
+            metadata_sample_size=app.config.metadata_sample_size,
+            line_index_interval=app.config.tabular_line_index_interval,
             validate_outputs=validate_outputs,
             job=job,
             kwds={"overwrite": overwrite},
@@ -1,5 +1,9 @@
+import json
 import logging
 import os
+import sqlite3
+from collections.abc import Iterable
+from contextlib import closing
 from threading import Lock
 from typing import (
     Optional,
@@ -16,6 +20,8 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+TOOL_SOURCE_CACHE_FILENAME = "tool_sources.sqlite"
+
 
 class ToolCache:
     """
@@ -154,3 +160,84 @@ class ToolHash:
         if self._tool_hash is None:
             self._tool_hash = md5_hash_file(self.path)
         return self._tool_hash
+
+
+class ToolSourceCache:
+    """Persistent cache of the macro expanded XML of tools.
+
+    The cache is a SQLite database in ``cache_dir`` shared by all processes of a node.
+    Entries are keyed by the path of the tool and are only returned while the
+    modification time and size of the tool file and of the macro files it imports
+    are unchanged, so tools edited on disk are parsed again.
+    """
+
+    def __init__(self, cache_dir: "StrPath") -> None:
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache_path = os.path.join(self.cache_dir, TOOL_SOURCE_CACHE_FILENAME)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tool_source ("
+                "path TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, macro_paths TEXT NOT NULL, xml TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.cache_path, timeout=30, isolation_level=None)
+
+    def get(self, path: "StrPath") -> Optional[tuple[str, list[str]]]:
+        """Return the expanded XML and macro paths of the tool at ``path`` if the entry is up to date."""
+        path = str(path)
+        try:
+            with closing(self._connect()) as conn:
+                return self._get(conn, path)
+        except sqlite3.Error:
+            log.warning("Failed to read '%s' from tool source cache %s", path, self.cache_path, exc_info=True)
+            return None
+
+    def missing(self, paths: Iterable["StrPath"]) -> list[str]:
+        """Return the paths of ``paths`` without an up to date entry."""
+        str_paths = [str(path) for path in paths]
+        try:
+            with closing(self._connect()) as conn:
+                return [path for path in str_paths if self._get(conn, path) is None]
+        except sqlite3.Error:
+            log.warning("Failed to read tool source cache %s", self.cache_path, exc_info=True)
+            return str_paths
+
+    def _get(self, conn: sqlite3.Connection, path: str) -> Optional[tuple[str, list[str]]]:
+        row = conn.execute("SELECT fingerprint, macro_paths, xml FROM tool_source WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        fingerprint, macro_paths_json, xml = row
+        macro_paths = json.loads(macro_paths_json)
+        if _fingerprint(path, macro_paths) != fingerprint:
+            return None
+        return xml, macro_paths
+
+    def set(self, path: "StrPath", xml: str, macro_paths: list[str]) -> None:
+        self.set_many([(str(path), xml, macro_paths)])
+
+    def set_many(self, entries: Iterable[tuple[str, str, list[str]]]) -> None:
+        """Store ``(path, xml, macro_paths)`` entries, fingerprinting the files as they are now."""
+        rows = []
+        for path, xml, macro_paths in entries:
+            macro_paths = [str(macro_path) for macro_path in macro_paths]
+            fingerprint = _fingerprint(path, macro_paths)
+            if fingerprint is not None:
+                rows.append((path, fingerprint, json.dumps(macro_paths), xml))
+        if not rows:
+            return
+        try:
+            with closing(self._connect()) as conn:
+                conn.executemany("INSERT OR REPLACE INTO tool_source VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            log.warning("Failed to write %d tools to tool source cache %s", len(rows), self.cache_path, exc_info=True)
+
+
+def _fingerprint(path: str, macro_paths: list[str]) -> Optional[str]:
+    try:
+        stats = [os.stat(p) for p in [path, *macro_paths]]
+    except OSError:
+        return None
+    return json.dumps([[p, s.st_mtime_ns, s.st_size] for p, s in zip([path, *macro_paths], stats)])
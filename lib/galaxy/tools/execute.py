@@ -8,7 +8,11 @@ import collections
 import logging
 import typing
 from abc import abstractmethod
-from collections.abc import Callable
+from collections.abc import (
+    Callable,
+    Iterator,
+)
+from contextlib import contextmanager
 from typing import (
     Any,
     NamedTuple,
@@ -283,19 +287,20 @@ def _execute(
     execution_slice = None
     job_datasets: dict[str, list[model.DatasetInstance]] = {}  # job: list of dataset instances created by job
 
-    for i, execution_slice in enumerate(execution_tracker.new_execution_slices()):
-        if max_num_jobs is not None and jobs_executed >= max_num_jobs:
-            has_remaining_jobs = True
-            break
-        else:
-            slice_params = execution_slice.param_combination
-            if isinstance(slice_params, JobInternalToolState):
-                slice_params = slice_params.input_state
+    with _batched_map_over(trans, history, collection_info is not None and tool_action.batch_map_over):
+        for i, execution_slice in enumerate(execution_tracker.new_execution_slices()):
+            if max_num_jobs is not None and jobs_executed >= max_num_jobs:
+                has_remaining_jobs = True
+                break
+            else:
+                slice_params = execution_slice.param_combination
+                if isinstance(slice_params, JobInternalToolState):
+                    slice_params = slice_params.input_state
 
-            skip = slice_params.pop("__when_value__", None) is False
-            execute_single_job(execution_slice, completed_jobs[i], skip=skip)
-            history = execution_slice.history or history
-            jobs_executed += 1
+                skip = slice_params.pop("__when_value__", None) is False
+                execute_single_job(execution_slice, completed_jobs[i], skip=skip)
+                history = execution_slice.history or history
+                jobs_executed += 1
 
     if execution_slice:
         history.add_pending_items()
@@ -354,6 +359,21 @@ def _execute(
     return execution_tracker
 
 
+@contextmanager
+def _batched_map_over(trans, history: model.History, batch: bool) -> Iterator[None]:
+    """Create the jobs of a map-over without writing anything to the database until the next commit.
+
+    Output hids are allocated for the whole batch at once and the outputs, jobs, job parameters
+    and job input/output associations of all slices are flushed together, so they are written
+    with one multi-row ``INSERT`` per table instead of a few statements per job.
+    """
+    if not batch:
+        yield
+        return
+    with history.defer_pending_additions(), trans.sa_session.no_autoflush:
+        yield
+
+
 class ExecutionSlice:
     job_index: int
     param_combination: ToolStateJobInstancePopulatedT
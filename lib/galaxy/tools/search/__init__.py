@@ -23,12 +23,20 @@ Filters - various filters are available for processing content as the index is
     StemmingFilter removes suffixes from words to create a 'base work' e.g.
     stemming -> stem; opened -> open; philosophy -> philosoph.
 
+With ``tool_search_backend: sqlite`` the Whoosh indexes are replaced by a single
+SQLite FTS5 database shared by all panel views and Galaxy processes of a node.
+Field boosts become BM25 column weights that are applied at query time, so
+changing them does not require rebuilding the index.
+
 """
 
+import json
 import logging
 import os
 import re
 import shutil
+import sqlite3
+from contextlib import closing
 from typing import (
     TYPE_CHECKING,
     Union,
@@ -75,6 +83,25 @@ log = logging.getLogger(__name__)
 CanConvertToFloat = Union[str, int, float]
 CanConvertToInt = Union[str, int, float]
 
+SQLITE_INDEX_FILENAME = "tool_search.sqlite"
+# Increment when the tables below change, outdated indexes are recreated
+SQLITE_INDEX_VERSION = 1
+# Columns of the word index, in the order of the BM25 weights
+SQLITE_TEXT_COLUMNS = (
+    "name",
+    "stub",
+    "section",
+    "edam_operations",
+    "edam_topics",
+    "repository",
+    "owner",
+    "description",
+    "help",
+    "labels",
+)
+# Columns of the trigram index, in the order of the BM25 weights
+SQLITE_NGRAM_COLUMNS = ("id_exact", "name")
+
 
 def get_or_create_index(index_dir: "StrPath", schema: Schema) -> index.FileIndex:
     """Get or create a reference to the index."""
@@ -99,15 +126,25 @@ class ToolBoxSearch:
 
     def __init__(self, toolbox: "ToolBox", index_dir: str, index_help: bool = True) -> None:
         panel_searches: dict[str, ToolPanelViewSearch] = {}
+        config = toolbox.app.config
+        use_sqlite = getattr(config, "tool_search_backend", "whoosh") == "sqlite"
         for panel_view in toolbox.panel_views():
             panel_view_id = panel_view.id
-            panel_index_dir = os.path.join(index_dir, panel_view_id)
-            panel_searches[panel_view_id] = ToolPanelViewSearch(
-                panel_view_id,
-                panel_index_dir,
-                index_help=index_help,
-                config=toolbox.app.config,
-            )
+            if use_sqlite:
+                # All panel views share a single index
+                panel_searches[panel_view_id] = SQLiteToolPanelViewSearch(
+                    panel_view_id,
+                    os.path.join(index_dir, SQLITE_INDEX_FILENAME),
+                    index_help=index_help,
+                    config=config,
+                )
+            else:
+                panel_searches[panel_view_id] = ToolPanelViewSearch(
+                    panel_view_id,
+                    os.path.join(index_dir, panel_view_id),
+                    index_help=index_help,
+                    config=config,
+                )
         self.panel_searches = panel_searches
         # We keep track of how many times the tool index has been rebuilt.
         # We start at -1, so that after the first index the count is at 0,
@@ -263,7 +300,8 @@ class ToolPanelViewSearch:
         tools_to_index: list[Tool] = []
 
         for tool_id in tool_cache._new_tool_ids - self.indexed_tool_ids:
-            tool = toolbox.get_tool(tool_id)
+            # lazy tools hold what is indexed, don't create their tools
+            tool = toolbox.find_tool(tool_id)
             if tool and tool.is_latest_version and toolbox.panel_has_tool(tool, self.panel_view_id):
                 if tool.hidden:
                     # Check if there is an older tool we can return
@@ -372,3 +410,180 @@ class ToolPanelViewSearch:
         )
 
         return [hit["id"] for hit in hits]
+
+
+class SQLiteToolPanelViewSearch(ToolPanelViewSearch):
+    """
+    Support searching tools in a toolbox. This implementation uses a SQLite
+    FTS5 index shared by all panel views and Galaxy processes of a node.
+
+    Documents are stored once per panel view in ``tool_search_document``, the
+    full text tables ``tool_search_text`` (words, stemmed) and
+    ``tool_search_ngram`` (trigrams of the tool ID and name) use the same rowid.
+    """
+
+    def __init__(
+        self,
+        panel_view_id: str,
+        index_path: str,
+        config: GalaxyAppConfiguration,
+        index_help: bool = True,
+    ) -> None:
+        self.rex = analysis.RegexTokenizer()
+        self.index_path = index_path
+        self.panel_view_id = panel_view_id
+        self._index_setup()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+
+    def _index_setup(self) -> None:
+        """Create the tables of the index, recreating an index of an older version."""
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version != SQLITE_INDEX_VERSION:
+                    if version:
+                        log.warning(f"Index at '{self.index_path}' uses outdated schema, creating a new index")
+                    for table in ("tool_search_document", "tool_search_text", "tool_search_ngram"):
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    conn.execute(
+                        "CREATE TABLE tool_search_document ("
+                        "rowid INTEGER PRIMARY KEY, panel_view TEXT NOT NULL, id TEXT NOT NULL, name_exact TEXT, "
+                        "UNIQUE (panel_view, id))"
+                    )
+                    conn.execute("CREATE INDEX ix_tool_search_document_name ON tool_search_document (name_exact)")
+                    conn.execute(
+                        f"CREATE VIRTUAL TABLE tool_search_text USING fts5({', '.join(SQLITE_TEXT_COLUMNS)}, "
+                        "tokenize='porter unicode61')"
+                    )
+                    conn.execute(
+                        f"CREATE VIRTUAL TABLE tool_search_ngram USING fts5({', '.join(SQLITE_NGRAM_COLUMNS)}, "
+                        "tokenize='trigram')"
+                    )
+                    conn.execute(f"PRAGMA user_version = {SQLITE_INDEX_VERSION}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def build_index(self, tool_cache: "ToolCache", toolbox: "ToolBox", index_help: bool = True) -> None:
+        """Prepare search index for tools loaded in toolbox.
+
+        Use `tool_cache` to determine which tools need indexing and which
+        should be removed. Tools already indexed by another process are not
+        indexed again.
+        """
+        log.debug(f"Starting to build toolbox index of panel {self.panel_view_id}.")
+        execution_timer = ExecutionTimer()
+
+        with closing(self._connect()) as conn:
+            self.indexed_tool_ids = {
+                tool_id
+                for (tool_id,) in conn.execute(
+                    "SELECT id FROM tool_search_document WHERE panel_view = ?", (self.panel_view_id,)
+                )
+            }
+            tool_ids_to_remove = self._get_tools_to_remove(tool_cache)
+            tools_to_index = self._get_tool_list(toolbox, tool_cache)
+            docs = [self._create_doc(tool=tool, index_help=index_help) for tool in tools_to_index]
+            docs = [doc for doc in docs if doc]
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Overwrite documents of tools indexed since the IDs were read
+                ids = tool_ids_to_remove + [str(doc["id"]) for doc in docs]
+                rowids = conn.execute(
+                    "SELECT rowid FROM tool_search_document "
+                    "WHERE panel_view = ? AND id IN (SELECT value FROM json_each(?))",
+                    (self.panel_view_id, json.dumps(ids)),
+                ).fetchall()
+                for table in ("tool_search_document", "tool_search_text", "tool_search_ngram"):
+                    conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rowids)
+                for doc in docs:
+                    rowid = conn.execute(
+                        "INSERT INTO tool_search_document (panel_view, id, name_exact) VALUES (?, ?, ?)",
+                        (self.panel_view_id, doc["id"], str(doc["name_exact"]).lower()),
+                    ).lastrowid
+                    conn.execute(
+                        f"INSERT INTO tool_search_text (rowid, {', '.join(SQLITE_TEXT_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * (len(SQLITE_TEXT_COLUMNS) + 1))})",
+                        [rowid] + [_join(doc.get(column, "")) for column in SQLITE_TEXT_COLUMNS],
+                    )
+                    conn.execute(
+                        f"INSERT INTO tool_search_ngram (rowid, {', '.join(SQLITE_NGRAM_COLUMNS)}) VALUES (?, ?, ?)",
+                        [rowid] + [_join(doc.get(column, "")) for column in SQLITE_NGRAM_COLUMNS],
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        log.debug("Toolbox index of panel %s finished %s", self.panel_view_id, execution_timer)
+
+    def search(
+        self,
+        q: str,
+        config: GalaxyAppConfiguration,
+    ) -> list[str]:
+        """Perform search on the shared index, ranking tools by their BM25 scores."""
+        words = q.split()
+        if not words:
+            return []
+        name_boost = float(config.tool_name_boost)
+        section_boost = float(config.tool_section_boost)
+        text_weights = [
+            0.0 if config.tool_enable_ngram_search else name_boost,
+            float(config.tool_stub_boost),
+            section_boost,
+            section_boost,
+            section_boost,
+            section_boost,
+            section_boost,
+            float(config.tool_description_boost),
+            float(config.tool_help_boost),
+            float(config.tool_label_boost),
+        ]
+        # Tool IDs are always matched by trigrams, names only with ngram search
+        ngram_columns = ["id_exact"]
+        ngram_weights = [float(config.tool_id_boost) * config.tool_name_exact_multiplier, 0.0]
+        if config.tool_enable_ngram_search:
+            ngram_columns.append("name")
+            ngram_weights[1] = name_boost * config.tool_ngram_factor
+
+        selects = [
+            f"SELECT rowid, -bm25(tool_search_text, {', '.join('?' * len(text_weights))}) AS score "
+            "FROM tool_search_text WHERE tool_search_text MATCH ?",
+            "SELECT rowid, ? AS score FROM tool_search_document WHERE name_exact = ?",
+        ]
+        params: list[Union[str, float]] = [*text_weights, " OR ".join(_quote(word) for word in words)]
+        params += [name_boost * config.tool_name_exact_multiplier, q.strip().lower()]
+        # The trigram tokenizer cannot match terms shorter than 3 characters
+        ngram_words = [word for word in words if len(word) >= 3]
+        if ngram_words:
+            selects.append(
+                "SELECT rowid, -bm25(tool_search_ngram, ?, ?) AS score "
+                "FROM tool_search_ngram WHERE tool_search_ngram MATCH ?"
+            )
+            ngram_query = " OR ".join(_quote(word) for word in ngram_words)
+            params += [*ngram_weights, f"{{{' '.join(ngram_columns)}}} : ({ngram_query})"]
+        sql = (
+            f"SELECT document.id FROM ({' UNION ALL '.join(selects)}) AS hit "
+            "JOIN tool_search_document AS document ON document.rowid = hit.rowid "
+            "WHERE document.panel_view = ? GROUP BY document.rowid ORDER BY SUM(hit.score) DESC, document.id"
+        )
+        params.append(self.panel_view_id)
+        with closing(self._connect()) as conn:
+            return [tool_id for (tool_id,) in conn.execute(sql, params)]
+
+
+def _quote(word: str) -> str:
+    """Quote a word of a query, tokens of the word are then matched as a phrase."""
+    return '"{}"'.format(word.replace('"', '""'))
+
+
+def _join(value: Union[str, list[str]]) -> str:
+    return " ".join(value) if isinstance(value, list) else value
@@ -187,6 +187,7 @@ class WorkflowsService(ServiceBase):
             self._create_landing_request_association(trans, payload.landing_uuid, invocations)
 
         trans.sa_session.commit()
+        trans.app.workflow_scheduling_manager.request_scheduling(invocations)
         encoded_invocations = [WorkflowInvocationResponse(**invocation.to_dict()) for invocation in invocations]
         if is_batch:
             return encoded_invocations
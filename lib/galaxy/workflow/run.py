@@ -1,4 +1,5 @@
 import logging
+import time
 import uuid
 from collections.abc import MutableMapping
 from typing import (
@@ -68,8 +69,10 @@ def schedule(
     workflow: "Workflow",
     workflow_run_config: WorkflowRunConfig,
     workflow_invocation: WorkflowInvocation,
-) -> tuple[WorkflowOutputsType, WorkflowInvocation]:
-    return __invoke(trans, workflow, workflow_run_config, workflow_invocation)
+) -> bool:
+    """Schedule ``workflow_invocation``, return whether more of it can be scheduled right away."""
+    _, _, more_work_remains = __invoke(trans, workflow, workflow_run_config, workflow_invocation)
+    return more_work_remains
 
 
 def __invoke(
@@ -78,7 +81,7 @@ def __invoke(
     workflow_run_config: WorkflowRunConfig,
     workflow_invocation: Optional[WorkflowInvocation] = None,
     populate_state: bool = False,
-) -> tuple[WorkflowOutputsType, WorkflowInvocation]:
+) -> tuple[WorkflowOutputsType, WorkflowInvocation, bool]:
     """Run the supplied workflow in the supplied target_history."""
     if populate_state:
         modules.populate_module_and_state(
@@ -122,7 +125,7 @@ def __invoke(
     trans.sa_session.add(workflow_invocation)
     trans.sa_session.commit()
 
-    return outputs, workflow_invocation
+    return outputs, workflow_invocation, invoker.more_work_remains
 
 
 def queue_invoke(
@@ -192,11 +195,14 @@ class WorkflowInvoker:
                 jobs_per_scheduling_iteration=getattr(
                     trans.app.config, "maximum_workflow_jobs_per_scheduling_iteration", -1
                 ),
+                scheduling_time_budget=getattr(trans.app.config, "workflow_scheduling_time_budget", -1),
                 copy_inputs_to_history=workflow_run_config.copy_inputs_to_history,
                 use_cached_job=workflow_run_config.use_cached_job,
                 replacement_dict=workflow_run_config.replacement_dict,
             )
         self.progress = progress
+        # set by invoke if it stopped early or steps are left with jobs to schedule
+        self.more_work_remains = False
 
     def invoke(self) -> dict[int, Any]:
         workflow_invocation = self.workflow_invocation
@@ -223,7 +229,9 @@ class WorkflowInvoker:
 
         remaining_steps = self.progress.remaining_steps()
         delayed_steps = False
+        partially_scheduled_steps = False
         max_jobs_per_iteration_reached = False
+        steps_invoked = 0
 
         # Pre-populate outputs for all input steps so subworkflows can access them
         for step in self.workflow_invocation.workflow.steps:
@@ -235,6 +243,12 @@ class WorkflowInvoker:
             if max_jobs_to_schedule is not None and max_jobs_to_schedule <= 0:
                 max_jobs_per_iteration_reached = True
                 break
+            # always make some progress, even if a single step takes longer than the budget
+            if steps_invoked and self.progress.scheduling_time_budget_exhausted:
+                log.debug(f"Scheduling time budget of workflow invocation [{workflow_invocation.id}] exhausted")
+                max_jobs_per_iteration_reached = True
+                break
+            steps_invoked += 1
             step_delayed = False
             step_timer = ExecutionTimer()
             try:
@@ -248,10 +262,12 @@ class WorkflowInvoker:
                     workflow_invocation_step.state = "new"
 
                     workflow_invocation.steps.append(workflow_invocation_step)
+                    self.progress.add_step_invocation(workflow_invocation_step)
 
+                self.progress.check_connected_steps_not_delayed(step)
                 incomplete_or_none = self._invoke_step(workflow_invocation_step)
                 if incomplete_or_none is False:
-                    step_delayed = delayed_steps = True
+                    step_delayed = delayed_steps = partially_scheduled_steps = True
                     workflow_invocation_step.state = "ready"
                     self.progress.mark_step_outputs_delayed(step, why="Not all jobs scheduled for state.")
                 else:
@@ -312,6 +328,7 @@ class WorkflowInvoker:
         else:
             state = model.WorkflowInvocation.states.SCHEDULED
         workflow_invocation.set_state(state)
+        self.more_work_remains = partially_scheduled_steps or max_jobs_per_iteration_reached
 
         # All jobs ran successfully, so we can save now
         self.trans.sa_session.add(workflow_invocation)
@@ -331,7 +348,7 @@ class WorkflowInvoker:
                 self.__check_implicitly_dependent_step(output_id, step.id)
 
     def __check_implicitly_dependent_step(self, output_id: int, step_id: int):
-        step_invocation = self.workflow_invocation.step_invocation_for_step_id(output_id)
+        step_invocation = self.progress.step_invocation_for_step_id(output_id)
 
         # No steps created yet - have to delay evaluation.
         if not step_invocation:
@@ -373,6 +390,9 @@ class WorkflowInvoker:
 
 
 STEP_OUTPUT_DELAYED = object()
+# Outputs of scheduled steps of these types are only recovered once a step connected to them needs them,
+# other steps (inputs, pauses) are recovered on every pass because recovering them has side effects.
+DEFERRED_RECOVERY_STEP_TYPES = ("tool", "subworkflow")
 
 
 class ModuleInjector(Protocol):
@@ -396,6 +416,7 @@ class WorkflowProgress:
         module_injector: ModuleInjector,
         param_map: dict[int, dict[str, Any]],
         jobs_per_scheduling_iteration: int = -1,
+        scheduling_time_budget: float = -1,
         copy_inputs_to_history: bool = False,
         use_cached_job: bool = False,
         replacement_dict: Optional[dict[str, str]] = None,
@@ -409,6 +430,8 @@ class WorkflowProgress:
         self.param_map = param_map
         self.jobs_per_scheduling_iteration = jobs_per_scheduling_iteration
         self.jobs_scheduled_this_iteration = 0
+        self.scheduling_time_budget = scheduling_time_budget
+        self.scheduling_started = time.monotonic()
         self.copy_inputs_to_history = copy_inputs_to_history
         self.use_cached_job = use_cached_job
         self.replacement_dict = replacement_dict or {}
@@ -416,6 +439,8 @@ class WorkflowProgress:
         self.subworkflow_collection_info = subworkflow_collection_info
         self.subworkflow_structure = subworkflow_collection_info.structure if subworkflow_collection_info else None
         self.when_values = when_values
+        self._step_invocations_by_id: Optional[dict[int, WorkflowInvocationStep]] = None
+        self._deferred_recoveries: dict[int, tuple[WorkflowInvocationStep, Any]] = {}
 
     @property
     def maximum_jobs_to_schedule_or_none(self) -> Optional[int]:
@@ -424,41 +449,89 @@ class WorkflowProgress:
         else:
             return None
 
+    @property
+    def scheduling_time_budget_exhausted(self) -> bool:
+        if self.scheduling_time_budget > 0:
+            return time.monotonic() - self.scheduling_started >= self.scheduling_time_budget
+        else:
+            return False
+
     def record_executed_job_count(self, job_count: int) -> None:
         self.jobs_scheduled_this_iteration += job_count
 
     def remaining_steps(
         self,
     ) -> list[tuple["WorkflowStep", Optional[WorkflowInvocationStep]]]:
+        """Return the steps left to schedule, in order, with their invocation step if one exists.
+
+        The persisted invocation steps are the scheduling cursor of the invocation: runtime state
+        is only computed for steps that are not scheduled yet, and the outputs of scheduled tool
+        and subworkflow steps are only recovered when a step that is connected to them is invoked.
+        """
         # Previously computed and persisted step states.
         step_states = self.workflow_invocation.step_states_by_step_id()
         steps = self.workflow_invocation.workflow.steps
 
-        # TODO: Wouldn't a generator be much better here so we don't have to reason about
-        # steps we are no where near ready to schedule?
         remaining_steps = []
-        step_invocations_by_id = self.workflow_invocation.step_invocations_by_step_id()
+        step_invocations_by_id = self._step_invocations()
         self.module_injector.inject_all(self.workflow_invocation.workflow, param_map=self.param_map)
         for step in steps:
             step_id = step.id
-            step_args = self.param_map.get(step_id, {})
-            self.module_injector.compute_runtime_state(step, step_args=step_args)
             if step_id not in step_states:
                 # Can this ever happen?
                 public_message = f"Workflow invocation has no step state for step {step.order_index + 1}"
                 log.error(f"{public_message}. State is known for these step ids: {list(step_states.keys())}.")
                 raise MessageException(public_message)
             runtime_state = step_states[step_id].value
-            assert step.module
-            step.state = step.module.decode_runtime_state(step, runtime_state)
 
             invocation_step = step_invocations_by_id.get(step_id, None)
-            if invocation_step and invocation_step.state == "scheduled":
+            scheduled = invocation_step is not None and invocation_step.state == "scheduled"
+            if scheduled and step.type in DEFERRED_RECOVERY_STEP_TYPES:
+                assert invocation_step
+                self._deferred_recoveries[step_id] = (invocation_step, runtime_state)
+                continue
+            self._compute_runtime_state(step, runtime_state)
+            if scheduled:
+                assert invocation_step
                 self._recover_mapping(invocation_step)
             else:
                 remaining_steps.append((step, invocation_step))
         return remaining_steps
 
+    def step_invocation_for_step_id(self, step_id: int) -> Optional[WorkflowInvocationStep]:
+        return self._step_invocations().get(step_id)
+
+    def add_step_invocation(self, invocation_step: WorkflowInvocationStep) -> None:
+        self._step_invocations()[invocation_step.workflow_step.id] = invocation_step
+
+    def check_connected_steps_not_delayed(self, step: "WorkflowStep") -> None:
+        """Delay ``step`` without invoking it if a step it takes data from was delayed during this pass."""
+        for connection in step.input_connections:
+            if connection.non_data_connection:
+                continue
+            output_step_id = connection.output_step.id
+            if self.outputs.get(output_step_id) is STEP_OUTPUT_DELAYED:
+                delayed_why = f"dependent step [{output_step_id}] delayed, so this step must be delayed"
+                raise modules.DelayedWorkflowEvaluation(why=delayed_why)
+
+    def _step_invocations(self) -> dict[int, WorkflowInvocationStep]:
+        if self._step_invocations_by_id is None:
+            self._step_invocations_by_id = self.workflow_invocation.step_invocations_by_step_id()
+        return self._step_invocations_by_id
+
+    def _compute_runtime_state(self, step: "WorkflowStep", runtime_state: Any) -> None:
+        step_args = self.param_map.get(step.id, {})
+        self.module_injector.compute_runtime_state(step, step_args=step_args)
+        assert step.module
+        step.state = step.module.decode_runtime_state(step, runtime_state)
+
+    def _recover_deferred_mapping(self, step_id: int) -> None:
+        deferred = self._deferred_recoveries.pop(step_id, None)
+        if deferred is not None:
+            invocation_step, runtime_state = deferred
+            self._compute_runtime_state(invocation_step.workflow_step, runtime_state)
+            self._recover_mapping(invocation_step)
+
     def replacement_for_input(self, trans, step: "WorkflowStep", input_dict: dict[str, Any]):
         replacement: Union[
             NoReplacement,
@@ -502,6 +575,7 @@ class WorkflowProgress:
     def replacement_for_connection(self, connection: "WorkflowStepConnection", is_data: bool = True):
         output_step_id = connection.output_step.id
         output_name = connection.output_name
+        self._recover_deferred_mapping(output_step_id)
         if output_step_id not in self.outputs:
             raise modules.FailWorkflowEvaluation(
                 why=InvocationFailureOutputNotFound(
@@ -591,6 +665,7 @@ class WorkflowProgress:
     def get_replacement_workflow_output(self, workflow_output: "WorkflowOutput"):
         step = workflow_output.workflow_step
         output_name = workflow_output.output_name
+        self._recover_deferred_mapping(step.id)
         step_outputs = self.outputs[step.id]
         if step_outputs is STEP_OUTPUT_DELAYED:
             delayed_why = f"depends on workflow output [{output_name}] but that output has not been created yet"
@@ -711,11 +786,9 @@ class WorkflowProgress:
             return
 
         # Check if step already executed - if so, skip pre-population
-        step_invocations = self.workflow_invocation.step_invocations_by_step_id()
-        if step.id in step_invocations:
-            invocation_step = step_invocations[step.id]
-            if invocation_step.state == "scheduled":
-                return
+        invocation_step = self.step_invocation_for_step_id(step.id)
+        if invocation_step is not None and invocation_step.state == "scheduled":
+            return
 
         # Determine output value from inputs_by_step_id or default
         outputs = {}
@@ -36,7 +36,8 @@ class WorkflowSchedulingPlugin(metaclass=ABCMeta):
 class ActiveWorkflowSchedulingPlugin(WorkflowSchedulingPlugin, metaclass=ABCMeta):
     @abstractmethod
     def schedule(self, workflow_invocation):
-        """Optionally return one or more commands to instrument job. These
-        commands will be executed on the compute server prior to the job
-        running.
+        """Schedule what can be scheduled of ``workflow_invocation``. Return
+        ``True`` if more of it can be scheduled right away, e.g. because the
+        scheduling pass was cut short, so the invocation is scheduled again
+        without waiting for outputs of its jobs.
         """
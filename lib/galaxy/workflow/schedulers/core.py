@@ -31,14 +31,14 @@ class CoreWorkflowSchedulingPlugin(ActiveWorkflowSchedulingPlugin):
     def shutdown(self):
         pass
 
-    def schedule(self, workflow_invocation: "WorkflowInvocation") -> None:
+    def schedule(self, workflow_invocation: "WorkflowInvocation") -> bool:
         workflow = workflow_invocation.workflow
         history = workflow_invocation.history
         request_context = context.WorkRequestContext(
             app=self.app, history=history, user=history.user
         )  # trans-like object not tied to a web-thread.
         workflow_run_config = run_request.workflow_request_to_run_config(workflow_invocation)
-        run.schedule(
+        return run.schedule(
             trans=request_context,
             workflow=workflow,
             workflow_run_config=workflow_run_config,
@@ -1,9 +1,14 @@
 import os
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import (
     datetime,
     timedelta,
 )
 from functools import partial
+from itertools import zip_longest
 from typing import (
     Optional,
     TYPE_CHECKING,
@@ -61,6 +66,19 @@ EXCEPTION_MESSAGE_DUPLICATE_SCHEDULERS = (
 EXCEPTION_MESSAGE_SERIALIZE = "Parallelization is not desired but handler assignment methods are non-deterministic. Set DB_PREASSIGN in workflow_schedulers_conf.xml."
 
 
+def round_robin_by_user(invocations: Iterable[tuple[int, Optional[int]]]) -> list[int]:
+    """Order invocation ids so that users take turns, the invocations of each user oldest first."""
+    invocation_ids_by_user: dict[Optional[int], list[int]] = {}
+    for invocation_id, user_id in invocations:
+        invocation_ids_by_user.setdefault(user_id, []).append(invocation_id)
+    return [
+        invocation_id
+        for turn in zip_longest(*invocation_ids_by_user.values())
+        for invocation_id in turn
+        if invocation_id is not None
+    ]
+
+
 class WorkflowSchedulingManager(ConfiguresHandlers):
     """A workflow scheduling manager based loosely on pattern established by
     ``galaxy.manager.JobManager``. Only schedules workflows on handler
@@ -199,6 +217,41 @@ class WorkflowSchedulingManager(ConfiguresHandlers):
 
         return workflow_invocation
 
+    def request_scheduling(self, workflow_invocations: Iterable[model.WorkflowInvocation]) -> None:
+        """Ask the handlers of ``workflow_invocations`` to schedule them without waiting for the next poll.
+
+        Does nothing unless ``workflow_scheduling_events`` is enabled, the invocations must have been committed.
+        """
+        if not self.app.config.workflow_scheduling_events:
+            return
+        self.__send_scheduling_request((wi.id, wi.handler) for wi in workflow_invocations)
+
+    def request_scheduling_for_history(self, history_id: Optional[int]) -> None:
+        """Ask for the active invocations of a history to be scheduled, e.g. after one of its jobs finished."""
+        if not self.app.config.workflow_scheduling_events or history_id is None:
+            return
+        self.__send_scheduling_request(
+            model.WorkflowInvocation.poll_active_workflow_handlers_for_history(self.app.model.engine, history_id)
+        )
+
+    def __send_scheduling_request(self, invocation_handlers: Iterable[tuple[int, Optional[str]]]) -> None:
+        invocation_ids_by_handler: dict[str, list[int]] = {}
+        for invocation_id, handler in invocation_handlers:
+            invocation_ids_by_handler.setdefault(handler or "", []).append(invocation_id)
+        if not invocation_ids_by_handler:
+            return
+        # celery workers and scripts have no control queue, their invocations are picked up by the fallback poll
+        queue_worker = getattr(self.app, "queue_worker", None)
+        if queue_worker is None:
+            return
+        try:
+            queue_worker.send_control_task(
+                "schedule_workflow_invocations",
+                kwargs={"invocation_ids_by_handler": invocation_ids_by_handler},
+            )
+        except Exception:
+            log.exception("Failed to request scheduling of workflow invocations %s", invocation_ids_by_handler)
+
     def __start_schedulers(self):
         for workflow_scheduler in self.workflow_schedulers.values():
             workflow_scheduler.startup(self.app)
@@ -316,6 +369,22 @@ class WorkflowRequestMonitor(Monitors):
         )
         self.invocation_grabber = None
         self.update_time_tracking_dict: dict[int, datetime] = {}
+        # invocations to schedule on the next iteration when scheduling events are enabled
+        self._requested_invocation_ids: set[int] = set()
+        self._requested_lock = threading.Lock()
+        self._scheduling_requested = threading.Event()
+        # all active invocations are polled on the first iteration
+        self._last_full_poll = float("-inf")
+        # invocations submitted to the worker pool, an invocation is only ever scheduled by one worker,
+        # mapped to whether it has to be scheduled again once its worker is done
+        self.worker_pool: Optional[ThreadPoolExecutor] = None
+        self._invocations_being_scheduled: dict[int, bool] = {}
+        self._being_scheduled_lock = threading.Lock()
+        if app.config.workflow_scheduling_workers > 1:
+            self.worker_pool = ThreadPoolExecutor(
+                max_workers=app.config.workflow_scheduling_workers,
+                thread_name_prefix="WorkflowRequestMonitor.worker",
+            )
         backfill_seconds = (
             min(app.config.maximum_workflow_invocation_duration, DEFAULT_SCHEDULER_BACKFILL_SECONDS)
             if app.config.maximum_workflow_invocation_duration > 0
@@ -359,6 +428,12 @@ class WorkflowRequestMonitor(Monitors):
                 do_schedule = True
             return do_schedule
 
+    def request_scheduling(self, invocation_ids: Iterable[int]) -> None:
+        """Schedule ``invocation_ids`` on the next iteration and wake up the monitor thread."""
+        with self._requested_lock:
+            self._requested_invocation_ids.update(invocation_ids)
+            self._scheduling_requested.set()
+
     def __monitor(self):
         to_monitor = self.workflow_scheduling_manager.active_workflow_schedulers
         while self.monitor_running:
@@ -370,24 +445,90 @@ class WorkflowRequestMonitor(Monitors):
                     "internal.galaxy.workflows.scheduling_manager.monitor_step",
                     "Workflow scheduling manager monitor step complete.",
                 )
+                requested_invocation_ids = self.__requested_invocation_ids()
                 for workflow_scheduler_id, workflow_scheduler in to_monitor.items():
                     if not self.monitor_running:
                         return
 
-                    self.__schedule(workflow_scheduler_id, workflow_scheduler)
+                    self.__schedule(workflow_scheduler_id, workflow_scheduler, requested_invocation_ids)
                 log.trace(monitor_step_timer.to_str())
             except Exception:
                 log.exception("An exception occured scheduling while scheduling workflows")
+            self.__wait_for_next_iteration()
+
+    def __requested_invocation_ids(self) -> Optional[set[int]]:
+        """Return the invocations to schedule in this iteration, ``None`` meaning all active invocations."""
+        if not self.app.config.workflow_scheduling_events:
+            return None
+        with self._requested_lock:
+            invocation_ids = self._requested_invocation_ids
+            self._requested_invocation_ids = set()
+            self._scheduling_requested.clear()
+        now = time.monotonic()
+        fallback_sleep = self.app.config.workflow_monitor_fallback_sleep
+        if now - self._last_full_poll >= fallback_sleep:
+            self._last_full_poll = now
+            return None
+        return invocation_ids
+
+    def __wait_for_next_iteration(self) -> None:
+        if not self.app.config.workflow_scheduling_events:
             self._monitor_sleep(self.app.config.workflow_monitor_sleep)
-
-    def __schedule(self, workflow_scheduler_id, workflow_scheduler):
-        invocation_ids = self.__active_invocation_ids(workflow_scheduler_id)
+            return
+        timeout = self.app.config.workflow_monitor_fallback_sleep - (time.monotonic() - self._last_full_poll)
+        # shutdown() sets the event after stopping the monitor, a wait started after that returns right away
+        if timeout > 0 and self.monitor_running:
+            self._scheduling_requested.wait(timeout)
+
+    def __schedule(self, workflow_scheduler_id, workflow_scheduler, requested_invocation_ids=None):
+        if requested_invocation_ids is not None and not requested_invocation_ids:
+            return
+        invocation_ids = self.__active_invocation_ids(workflow_scheduler_id, requested_invocation_ids)
         for invocation_id in invocation_ids:
-            log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
-            self.__attempt_schedule(invocation_id, workflow_scheduler)
+            if self.worker_pool is None:
+                log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
+                if self.__attempt_schedule(invocation_id, workflow_scheduler) is None:
+                    self.__request_more_scheduling(invocation_id)
+            elif self.__claim_invocation(invocation_id, requested=requested_invocation_ids is not None):
+                queued_timer = self.app.execution_timer_factory.get_timer(
+                    "internal.galaxy.workflows.scheduling_manager.invocation_queued",
+                    "Workflow invocation [${invocation_id}] waited for a scheduling worker.",
+                )
+                self.worker_pool.submit(
+                    self.__schedule_claimed_invocation, invocation_id, workflow_scheduler, queued_timer
+                )
             if not self.monitor_running:
                 return
 
+    def __request_more_scheduling(self, invocation_id):
+        # more work can be done right away (materialized inputs, partially executed steps)
+        if self.app.config.workflow_scheduling_events:
+            self.request_scheduling([invocation_id])
+
+    def __claim_invocation(self, invocation_id, requested: bool) -> bool:
+        with self._being_scheduled_lock:
+            if invocation_id in self._invocations_being_scheduled:
+                # a scheduling request received while scheduling may be about work the worker already missed
+                self._invocations_being_scheduled[invocation_id] |= requested
+                return False
+            self._invocations_being_scheduled[invocation_id] = False
+            return True
+
+    def __schedule_claimed_invocation(self, invocation_id, workflow_scheduler, queued_timer):
+        more_scheduling = False
+        try:
+            log.debug(queued_timer.to_str(invocation_id=invocation_id))
+            if self.monitor_running:
+                log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
+                more_scheduling = self.__attempt_schedule(invocation_id, workflow_scheduler) is None
+        except Exception:
+            log.exception("An exception occured while scheduling workflow invocation [%s]", invocation_id)
+        finally:
+            with self._being_scheduled_lock:
+                more_scheduling |= self._invocations_being_scheduled.pop(invocation_id, False)
+        if more_scheduling:
+            self.__request_more_scheduling(invocation_id)
+
     def __attempt_materialize(self, workflow_invocation: model.WorkflowInvocation, session: Session) -> bool:
         try:
             inputs_to_materialize = workflow_invocation.inputs_requiring_materialization()
@@ -458,8 +599,21 @@ class WorkflowRequestMonitor(Monitors):
                             return False
                 if self.ready_to_schedule_more(workflow_invocation):
                     self.update_time_tracking_dict[invocation_id] = datetime.now()
-                    workflow_scheduler.schedule(workflow_invocation)
-                    log.debug("Workflow invocation [%s] scheduled", invocation_id)
+                    schedule_timer = self.app.execution_timer_factory.get_timer(
+                        "internal.galaxy.workflows.scheduling_manager.schedule_invocation",
+                        "Workflow invocation [${invocation_id}] scheduling pass complete.",
+                    )
+                    more_work_remains = workflow_scheduler.schedule(workflow_invocation)
+                    time_budget = self.app.config.workflow_scheduling_time_budget
+                    log.debug(
+                        schedule_timer.to_str(
+                            invocation_id=invocation_id,
+                            time_budget_exhausted=time_budget > 0 and schedule_timer.elapsed >= time_budget,
+                        )
+                    )
+                    if more_work_remains and workflow_invocation.active:
+                        # the scheduling pass stopped early or jobs are left to create for a step
+                        return None
             except Exception:
                 self.update_time_tracking_dict.pop(invocation_id, None)
                 # TODO: eventually fail this - or fail it right away?
@@ -469,16 +623,24 @@ class WorkflowRequestMonitor(Monitors):
         # A workflow was obtained and scheduled...
         return True
 
-    def __active_invocation_ids(self, scheduler_id):
+    def __active_invocation_ids(self, scheduler_id, invocation_ids=None):
         handler = self.app.config.server_name
-        return model.WorkflowInvocation.poll_active_workflow_ids(
-            self.app.model.engine,
-            scheduler=scheduler_id,
-            handler=handler,
+        return round_robin_by_user(
+            model.WorkflowInvocation.poll_active_workflow_ids_and_users(
+                self.app.model.engine,
+                scheduler=scheduler_id,
+                handler=handler,
+                invocation_ids=invocation_ids,
+            )
         )
 
     def start(self):
         self.monitor_thread.start()
 
     def shutdown(self):
+        self.stop_monitoring()
+        # wake up the monitor thread waiting for scheduling requests before joining it
+        self._scheduling_requested.set()
         self.shutdown_monitor()
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,77 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from galaxy_test.base.populators import (
+    DatasetCollectionPopulator,
+    DatasetPopulator,
+)
+from ._framework import PerformanceTestCase
+
+log = logging.getLogger(__name__)
+
+# Comma separated sizes of the lists to map over, e.g. 1000,10000,100000
+GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZES_DEFAULT = "1000"
+GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZES = [
+    int(size)
+    for size in os.environ.get(
+        "GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZES", GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZES_DEFAULT
+    ).split(",")
+]
+
+
+class TestMapOverPerformance(PerformanceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dataset_populator = DatasetPopulator(self.galaxy_interactor)
+        self.dataset_collection_populator = DatasetCollectionPopulator(self.galaxy_interactor)
+
+    def test_map_over_list(self):
+        for size in GALAXY_TEST_PERFORMANCE_MAP_OVER_SIZES:
+            with self.dataset_populator.test_history() as history_id:
+                hdca_id = self._create_list(history_id, size)
+                inputs = {"input1": {"batch": True, "values": [{"src": "hdca", "id": hdca_id}]}}
+                with self._count_statements() as statements:
+                    start = time.perf_counter()
+                    response = self.dataset_populator.run_tool_raw("cat1", inputs, history_id)
+                    elapsed = time.perf_counter() - start
+                self._assert_status_code_is(response, 200)
+                assert len(response.json()["jobs"]) == size
+                counted = f", {statements[0]} SQL statements" if statements else ""
+                log.info("Mapped cat1 over a list of %s elements in %.2f s%s", size, elapsed, counted)
+
+    def _create_list(self, history_id: str, size: int) -> str:
+        # the same dataset is used for every element, creating the list is not what is measured
+        hda_id = self.dataset_populator.new_dataset(history_id, content="1\t2\t3", wait=True)["id"]
+        element_identifiers = [{"name": f"element{i}", "src": "hda", "id": hda_id} for i in range(size)]
+        response = self.dataset_collection_populator.create_nested_collection(
+            history_id, collection_type="list", element_identifiers=element_identifiers
+        )
+        self._assert_status_code_is(response, 200)
+        return response.json()["id"]
+
+    @contextmanager
+    def _count_statements(self):
+        """Count SQL statements executed by an embedded Galaxy server, yields an empty list otherwise.
+
+        All statements are counted, including those of job handlers picking up the new jobs.
+        """
+        statements: list[int] = []
+        if self._test_driver is None or self._test_driver.app is None:
+            yield statements
+            return
+        engine = self._test_driver.app.model.engine
+        count = [0]
+
+        def after_cursor_execute(*args):
+            count[0] += 1
+
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "after_cursor_execute", after_cursor_execute)
+            statements.append(count[0])
@@ -0,0 +1,129 @@
+import logging
+import os
+import time
+from contextlib import (
+    contextmanager,
+    ExitStack,
+)
+from unittest import mock
+
+from galaxy_test.base.populators import WorkflowPopulator
+from ._framework import PerformanceTestCase
+
+log = logging.getLogger(__name__)
+
+GALAXY_TEST_PERFORMANCE_TIMEOUT_DEFAULT = 5000
+GALAXY_TEST_PERFORMANCE_TIMEOUT = int(
+    os.environ.get("GALAXY_TEST_PERFORMANCE_TIMEOUT", GALAXY_TEST_PERFORMANCE_TIMEOUT_DEFAULT)
+)
+GALAXY_TEST_PERFORMANCE_COLLECTION_SIZE_DEFAULT = 4
+GALAXY_TEST_PERFORMANCE_COLLECTION_SIZE = int(
+    os.environ.get("GALAXY_TEST_PERFORMANCE_COLLECTION_SIZE", GALAXY_TEST_PERFORMANCE_COLLECTION_SIZE_DEFAULT)
+)
+# Comma separated numbers of chained steps of the invocations to schedule, e.g. 10,100,300
+GALAXY_TEST_PERFORMANCE_SCHEDULING_DEPTHS_DEFAULT = "10,50"
+GALAXY_TEST_PERFORMANCE_SCHEDULING_DEPTHS = [
+    int(depth)
+    for depth in os.environ.get(
+        "GALAXY_TEST_PERFORMANCE_SCHEDULING_DEPTHS", GALAXY_TEST_PERFORMANCE_SCHEDULING_DEPTHS_DEFAULT
+    ).split(",")
+]
+GALAXY_TEST_PERFORMANCE_EVENTS_DEPTH = int(os.environ.get("GALAXY_TEST_PERFORMANCE_EVENTS_DEPTH", 50))
+
+
+class TestWorkflowSchedulingPerformance(PerformanceTestCase):
+    framework_tool_and_types = True
+
+    def setUp(self):
+        super().setUp()
+        self.workflow_populator = WorkflowPopulator(self.galaxy_interactor)
+
+    def test_scheduling_pass_latency(self):
+        for depth in GALAXY_TEST_PERFORMANCE_SCHEDULING_DEPTHS:
+            workflow_yaml = self.workflow_populator.scaling_workflow_yaml(
+                workflow_type="simple",
+                collection_size=GALAXY_TEST_PERFORMANCE_COLLECTION_SIZE,
+                workflow_depth=depth,
+            )
+            with self._record_scheduling_passes() as passes:
+                start = time.perf_counter()
+                run_summary = self.workflow_populator.run_workflow(workflow_yaml, test_data={}, wait=False)
+                self.workflow_populator.wait_for_workflow(
+                    run_summary.workflow_id,
+                    run_summary.invocation_id,
+                    run_summary.history_id,
+                    assert_ok=True,
+                    timeout=GALAXY_TEST_PERFORMANCE_TIMEOUT,
+                )
+                elapsed = time.perf_counter() - start
+            summary = f"Scheduled and ran {depth} chained steps in {elapsed:.2f} s"
+            if passes:
+                summary += (
+                    f", {len(passes)} scheduling passes, mean {sum(passes) / len(passes) * 1000:.1f} ms,"
+                    f" max {max(passes) * 1000:.1f} ms"
+                )
+            log.info(summary)
+
+    def test_scheduling_events_latency(self):
+        """Compare the end-to-end latency of a chained workflow with and without workflow scheduling events.
+
+        Toggling the option requires an embedded Galaxy server, the configured mode is measured otherwise.
+        """
+        workflow_yaml = self.workflow_populator.scaling_workflow_yaml(
+            workflow_type="simple",
+            collection_size=1,
+            workflow_depth=GALAXY_TEST_PERFORMANCE_EVENTS_DEPTH,
+        )
+        for events in (False, True):
+            with self._workflow_scheduling_events(events) as configured:
+                start = time.perf_counter()
+                run_summary = self.workflow_populator.run_workflow(workflow_yaml, test_data={}, wait=False)
+                self.workflow_populator.wait_for_workflow(
+                    run_summary.workflow_id,
+                    run_summary.invocation_id,
+                    run_summary.history_id,
+                    assert_ok=True,
+                    timeout=GALAXY_TEST_PERFORMANCE_TIMEOUT,
+                )
+                elapsed = time.perf_counter() - start
+            mode = "with" if configured else "without"
+            log.info(
+                "Ran %s chained steps %s scheduling events in %.2f s",
+                GALAXY_TEST_PERFORMANCE_EVENTS_DEPTH,
+                mode,
+                elapsed,
+            )
+            if configured is None:
+                break
+
+    @contextmanager
+    def _workflow_scheduling_events(self, enabled: bool):
+        """Set ``workflow_scheduling_events`` of an embedded Galaxy server, yields ``None`` otherwise."""
+        if self._test_driver is None or self._test_driver.app is None:
+            yield None
+            return
+        config = self._test_driver.app.config
+        with mock.patch.object(config, "workflow_scheduling_events", enabled):
+            yield enabled
+
+    @contextmanager
+    def _record_scheduling_passes(self):
+        """Record the duration of scheduling passes of an embedded Galaxy server, yields an empty list otherwise."""
+        passes: list[float] = []
+        if self._test_driver is None or self._test_driver.app is None:
+            yield passes
+            return
+        schedulers = self._test_driver.app.workflow_scheduling_manager.active_workflow_schedulers.values()
+        with ExitStack() as stack:
+            for scheduler in schedulers:
+                schedule = scheduler.schedule
+
+                def timed_schedule(workflow_invocation, schedule=schedule):
+                    start = time.perf_counter()
+                    try:
+                        return schedule(workflow_invocation)
+                    finally:
+                        passes.append(time.perf_counter() - start)
+
+                stack.enter_context(mock.patch.object(scheduler, "schedule", timed_schedule))
+            yield passes
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Set the job cache fingerprint of existing jobs.
+
+Jobs created before ``enable_job_cache_fingerprints`` was set have no fingerprint and are not found
+by the job cache until this script has been run. Only original (not copied) jobs in states the job
+cache can return are fingerprinted. The script can be interrupted and run again, it continues with
+the jobs that don't have a fingerprint yet.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from sqlalchemy import select
+
+import galaxy.config
+from galaxy import model
+from galaxy.managers.jobs import job_cache_fingerprint_for_job
+from galaxy.model.mapping import init_models_from_config
+from galaxy.objectstore import build_object_store_from_config
+from galaxy.util.script import (
+    app_properties_from_args,
+    populate_config_args,
+)
+
+JOB_STATES = (
+    model.Job.states.NEW,
+    model.Job.states.QUEUED,
+    model.Job.states.WAITING,
+    model.Job.states.RUNNING,
+    model.Job.states.OK,
+    model.Job.states.SKIPPED,
+)
+
+
+def init(args):
+    app_properties = app_properties_from_args(args)
+    config = galaxy.config.Configuration(**app_properties)
+    object_store = build_object_store_from_config(config)
+    sa_session = init_models_from_config(config, object_store=object_store).context
+    return sa_session, object_store
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="number of jobs fingerprinted per transaction")
+    parser.add_argument(
+        "--dry-run", action="store_true", default=False, help="count the jobs to fingerprint without changing them"
+    )
+    populate_config_args(parser)
+    args = parser.parse_args(argv)
+
+    print("Loading Galaxy model...")
+    sa_session, object_store = init(args)
+    conditions = (
+        model.Job.cache_fingerprint.is_(None),
+        model.Job.tool_id.isnot(None),
+        model.Job.copied_from_job_id.is_(None),
+        model.Job.state.in_(JOB_STATES),
+    )
+    last_id = 0
+    fingerprinted = skipped = 0
+    while True:
+        job_ids = sa_session.scalars(
+            select(model.Job.id)
+            .where(model.Job.id > last_id, *conditions)
+            .order_by(model.Job.id)
+            .limit(args.batch_size)
+        ).all()
+        if not job_ids:
+            break
+        last_id = job_ids[-1]
+        if not args.dry_run:
+            for job in sa_session.scalars(select(model.Job).where(model.Job.id.in_(job_ids))):
+                job.cache_fingerprint = job_cache_fingerprint_for_job(sa_session, job)
+                if job.cache_fingerprint is None:
+                    skipped += 1
+            sa_session.commit()
+            sa_session.expunge_all()
+        fingerprinted += len(job_ids)
+        print(f"\rProcessed {fingerprinted} jobs", end=" ")
+        sys.stdout.flush()
+    print(f"\rProcessed {fingerprinted} jobs, {skipped} could not be fingerprinted")
+    object_store.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare the memory and time used by nested and compact collection structures.
+
+Builds the structure of a generated ``list:list:paired`` collection with ``--leaves`` datasets
+as nested ``Tree`` objects (from in-memory elements, like the ORM path without the queries) and
+as a ``CompactTree`` (from the rows returned by the single nested query), then times matching the
+structure against itself, multiplying it by a ``paired`` structure and counting its leaves.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from itertools import count
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.model.dataset_collections.structure import (
+    CompactTree,
+    Tree,
+)
+from galaxy.model.dataset_collections.type_description import CollectionTypeDescriptionFactory
+from galaxy.util.bunch import Bunch
+
+COLLECTION_TYPE = "list:list:paired"
+
+
+def generate(leaves, inner_size):
+    """Return the collection as nested elements and as rows of the nested element identifier query."""
+    ids = count(1)
+    outer_size = max(leaves // (2 * inner_size), 1)
+    rows = []
+    outer_elements = []
+    for i in range(outer_size):
+        outer_id = next(ids)
+        inner_elements = []
+        for j in range(inner_size):
+            inner_id = next(ids)
+            pair = []
+            for identifier in ("forward", "reverse"):
+                pair_id = next(ids)
+                pair.append(Bunch(element_identifier=identifier, child_collection=None, columns=None))
+                rows.append((outer_id, f"outer{i}", inner_id, f"inner{j}", pair_id, identifier))
+            paired = Bunch(elements=pair, column_definitions=None)
+            inner_elements.append(Bunch(element_identifier=f"inner{j}", child_collection=paired, columns=None))
+        inner = Bunch(elements=inner_elements, column_definitions=None)
+        outer_elements.append(Bunch(element_identifier=f"outer{i}", child_collection=inner, columns=None))
+    return Bunch(elements=outer_elements, column_definitions=None, collection_type=COLLECTION_TYPE), rows
+
+
+def measure(name, build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    structure = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name + ':':8} built in {elapsed:6.2f} s, peak memory {peak / 1024**2:8.1f} MB")
+    return structure
+
+
+def time_operations(name, structure, paired_structure):
+    timings = []
+    for operation, function in (
+        ("match", lambda: structure.can_match(structure.clone())),
+        ("multiply", lambda: structure.multiply(paired_structure)),
+        ("len", lambda: len(structure)),
+    ):
+        start = time.perf_counter()
+        function()
+        timings.append(f"{operation} {time.perf_counter() - start:6.3f} s")
+    print(f"{name + ':':8} {', '.join(timings)}")
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--leaves", type=int, default=100000, help="number of datasets in the collection")
+    arg_parser.add_argument("--inner-size", type=int, default=10, help="number of pairs in each inner list")
+    args = arg_parser.parse_args(argv)
+
+    factory = CollectionTypeDescriptionFactory(None)
+    collection_type_description = factory.for_collection_type(COLLECTION_TYPE)
+    paired_type_description = factory.for_collection_type("paired")
+    collection, rows = generate(args.leaves, args.inner_size)
+    paired_rows = [(1, "forward"), (2, "reverse")]
+    pair = [Bunch(element_identifier=identifier, child_collection=None, columns=None) for _, identifier in paired_rows]
+    print(f"{COLLECTION_TYPE} collection with {len(rows)} datasets")
+
+    nested = measure("nested", lambda: Tree.for_dataset_collection(collection, collection_type_description))
+    compact = measure("compact", lambda: CompactTree.from_rows(rows, 3, collection_type_description))
+    paired = CompactTree.from_rows(paired_rows, 1, paired_type_description)
+    nested_paired = Tree.for_dataset_collection(Bunch(elements=pair, column_definitions=None), paired_type_description)
+    time_operations("nested", nested, nested_paired)
+    time_operations("compact", compact, paired)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Time discovering the files a job wrote into an output collection.
+
+Writes ``--files`` small tabular files into a job working directory, then discovers them into
+a list collection the way a job handler finishing the job does (``JobContext.find_files`` and
+``JobContext.populate_collection_elements``) once for every number of ``--workers``. Prints the
+time taken to list the files and to create, store and set the metadata of the datasets, and the
+number of SQL statements executed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from sqlalchemy import event
+
+from galaxy import model
+from galaxy.job_execution.output_collect import dataset_collector
+from galaxy.model.dataset_collections.builder import BoundCollectionBuilder
+from galaxy.model.unittest_utils import (
+    GalaxyDataTestApp,
+    GalaxyDataTestConfig,
+)
+from galaxy.schema.schema import JobState
+from galaxy.tool_util.parser.output_collection_def import FilePatternDatasetCollectionDescription
+from galaxy.tool_util.provided_metadata import NullToolProvidedMetadata
+from galaxy.tools import JobContext
+from galaxy.util.bunch import Bunch
+
+
+class PermissionProvider:
+    permissions = None
+
+    def set_default_hda_permissions(self, primary_data):
+        pass
+
+    def copy_dataset_permissions(self, init_from, primary_data):
+        pass
+
+
+def discover(app, job_working_directory, files, workers, flush_per_n_datasets):
+    sa_session = app.model.context
+    user = model.User(email="discovery@example.com", password="password")
+    job = model.Job()
+    job.history = model.History(name="discovery", user=user)
+    collection = model.DatasetCollection(collection_type="list", populated=False)
+    sa_session.add_all([job, collection])
+    sa_session.commit()
+
+    job_context = JobContext(
+        Bunch(app=app, sa_session=sa_session),  # type: ignore[arg-type]
+        NullToolProvidedMetadata(),
+        job,
+        job_working_directory,
+        PermissionProvider(),
+        None,
+        "?",
+        app.object_store,
+        JobState.OK,
+        max_discovered_files=None,
+        flush_per_n_datasets=flush_per_n_datasets,
+        discovered_outputs_workers=workers,
+    )
+    statements = [0]
+
+    def after_cursor_execute(*args):
+        statements[0] += 1
+
+    event.listen(app.model.engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        start = time.perf_counter()
+        description = FilePatternDatasetCollectionDescription(pattern="__name__", ext="tabular")
+        discovered_files = job_context.find_files("output", collection, [dataset_collector(description)])
+        listed = time.perf_counter()
+        collection_builder = BoundCollectionBuilder(collection)
+        job_context.populate_collection_elements(
+            collection, collection_builder, discovered_files, name="output", final_job_state=JobState.OK
+        )
+        collection_builder.populate()
+        sa_session.commit()
+        finished = time.perf_counter()
+    finally:
+        event.remove(app.model.engine, "after_cursor_execute", after_cursor_execute)
+    assert collection.element_count == files
+    print(
+        f"{workers:2d} workers: listed in {listed - start:6.2f} s, populated in {finished - listed:7.2f} s, "
+        f"{statements[0]} SQL statements"
+    )
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--files", type=int, default=10000, help="number of files the job wrote")
+    arg_parser.add_argument("--lines", type=int, default=100, help="number of lines in every file")
+    arg_parser.add_argument("--workers", default="1,4", help="comma separated numbers of workers to compare")
+    arg_parser.add_argument("--flush-per-n-datasets", type=int, default=1000)
+    arg_parser.add_argument(
+        "--store-by", choices=["uuid", "id"], default="uuid", help="how the object store keeps files"
+    )
+    arg_parser.add_argument("--database-connection", help="database to use, an in-memory SQLite database by default")
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as job_working_directory:
+        content = "".join(f"chr1\t{i}\t{i + 100}\tfeature{i}\t0.5\n" for i in range(args.lines))
+        for i in range(args.files):
+            with open(os.path.join(job_working_directory, f"element_{i:06d}.tabular"), "w") as fh:
+                fh.write(content)
+        for workers in (int(workers) for workers in args.workers.split(",")):
+            kwd = {"database_connection": args.database_connection} if args.database_connection else {}
+            config = GalaxyDataTestConfig(**kwd)
+            config.object_store_store_by = args.store_by
+            app = GalaxyDataTestApp(config=config)
+            discover(app, job_working_directory, args.files, workers, args.flush_per_n_datasets)
+
+
+if __name__ == "__main__":
+    main()
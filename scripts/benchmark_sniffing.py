@@ -0,0 +1,55 @@
+"""Compare datatype sniffing strategies on a directory of files (test-data by default).
+
+Sniffs every file with the plain sniff order, with the registry's sniffer index and with
+guess_ext_many using several processes, prints the time taken by each and checks that
+all strategies guessed the same extensions.
+"""
+
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.datatypes.registry import example_datatype_registry_for_sample
+from galaxy.datatypes.sniff import (
+    guess_ext,
+    guess_ext_many,
+)
+
+DEFAULT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "test-data"))
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("directory", nargs="?", default=DEFAULT_DIRECTORY)
+    arg_parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--repeat", type=int, default=1, help="sniff every file this many times")
+    args = arg_parser.parse_args(argv)
+
+    paths: list[str] = []
+    for root, _, names in os.walk(args.directory):
+        paths.extend(os.path.join(root, name) for name in names if not name.startswith("."))
+    paths = sorted(paths) * args.repeat
+    registry = example_datatype_registry_for_sample()
+
+    start = time.perf_counter()
+    expected = [guess_ext(path, registry.sniff_order) for path in paths]
+    print(f"sniff order:       {time.perf_counter() - start:8.2f} s for {len(paths)} files")
+
+    strategies = {
+        "sniffer index": lambda: [guess_ext(path, registry.sniffer_index) for path in paths],
+        f"{args.processes} processes": lambda: guess_ext_many(paths, registry.sniffer_index, processes=args.processes),
+    }
+    for name, strategy in strategies.items():
+        start = time.perf_counter()
+        guessed = strategy()
+        print(f"{name + ':':18} {time.perf_counter() - start:8.2f} s")
+        mismatches = [(path, e, g) for path, e, g in zip(paths, expected, guessed) if e != g]
+        for path, e, g in mismatches:
+            print(f"  {path}: {g} instead of {e}")
+
+
+if __name__ == "__main__":
+    main()
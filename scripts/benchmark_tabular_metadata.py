@@ -0,0 +1,76 @@
+"""Compare the time taken to set the metadata of a tabular dataset with and without sampling.
+
+Sets the metadata of the given file (or of a generated BED-like file) by reading all lines,
+by reading the first 100000 lines (the default) and by reading a sample of ``--sample-size``
+bytes, then prints the time taken and the column types found by each strategy.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.datatypes.tabular import Tabular
+from galaxy.util.bunch import Bunch
+
+
+class FileDataset:
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.metadata = Bunch()
+
+    def get_file_name(self, sync_cache=True):
+        return self.file_name
+
+    def get_size(self):
+        return os.path.getsize(self.file_name)
+
+    def has_data(self):
+        return self.get_size() > 0
+
+
+def generate(path, lines, seed):
+    rng = random.Random(seed)
+    with open(path, "w") as fh:
+        for i in range(lines):
+            start = rng.randint(0, 10**9)
+            end = start + rng.randint(1, 5000)
+            fh.write(f"chr{rng.randint(1, 22)}\t{start}\t{end}\tfeature{i}\t{rng.random():.4f}\t+\n")
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("path", nargs="?", help="tabular file, a file is generated if not given")
+    arg_parser.add_argument("--lines", type=int, default=5000000, help="number of lines of the generated file")
+    arg_parser.add_argument("--sample-size", type=int, default=16 * 1024 * 1024, help="bytes to sample")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmp_dir, "generated.tabular")
+            generate(path, args.lines, args.seed)
+        print(f"{path}: {os.path.getsize(path) / 1024**2:.1f} MB")
+        strategies = {
+            "all lines": {"max_data_lines": None},
+            "first lines": {},
+            "sample": {"sample_size": args.sample_size},
+        }
+        for name, kwds in strategies.items():
+            dataset = FileDataset(path)
+            start = time.perf_counter()
+            Tabular().set_meta(dataset, **kwds)  # type: ignore[arg-type]
+            metadata = dataset.metadata
+            print(
+                f"{name + ':':13} {time.perf_counter() - start:8.2f} s, column types: {metadata.column_types}, "
+                f"data lines: {metadata.data_lines}, sampled: {metadata.column_types_sampled}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare the rebuild time and query latency of the Whoosh and SQLite toolbox search backends.
+
+Generates ``--tools`` tools with random names, descriptions and help texts, then times building
+the index of a panel view from scratch, updating the index after ``--changed`` tools were
+replaced (an incremental update driven by the tool cache), opening and updating the existing
+index like another Galaxy process of the node and the latency of ``--queries`` searches.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from typing import Any
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.tools.search import (
+    SQLITE_INDEX_FILENAME,
+    SQLiteToolPanelViewSearch,
+    ToolPanelViewSearch,
+)
+from galaxy.util.bunch import Bunch
+
+# Defaults of config_schema.yml, standing in for the Galaxy configuration
+CONFIG: Any = Bunch(
+    tool_name_boost=20.0,
+    tool_name_exact_multiplier=10.0,
+    tool_id_boost=20.0,
+    tool_section_boost=3.0,
+    tool_description_boost=8.0,
+    tool_label_boost=1.0,
+    tool_stub_boost=2.0,
+    tool_help_boost=1.0,
+    tool_help_bm25f_k1=0.5,
+    tool_enable_ngram_search=True,
+    tool_ngram_minsize=3,
+    tool_ngram_maxsize=4,
+    tool_ngram_factor=0.2,
+)
+
+WORDS = (
+    "align assemble annotate bam bed call collapse compute convert count coverage dataset extract fasta fastq "
+    "filter genome group histogram interval join map merge metagenome mpileup peak plot quality read reference "
+    "rna sam sequence sort split statistics subsample summarize table taxonomy transcript trim variant vcf"
+).split()
+
+
+class ToolCache:
+    """The parts of ``galaxy.tools.cache.ToolCache`` used to build the index."""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self._tool_paths_by_id = dict.fromkeys(tools)
+        self._new_tool_ids = set(tools)
+        self._removed_tool_ids = set()
+
+    def get_tool_by_id(self, tool_id):
+        return self.tools.get(tool_id)
+
+    def replace(self, tool_ids, rng):
+        for tool_id in tool_ids:
+            del self.tools[tool_id]
+            del self._tool_paths_by_id[tool_id]
+            new_tool = generate_tool(f"{tool_id}_new", rng)
+            self.tools[new_tool.id] = new_tool
+            self._tool_paths_by_id[new_tool.id] = None
+        self._removed_tool_ids = set(tool_ids)
+        self._new_tool_ids = {f"{tool_id}_new" for tool_id in tool_ids}
+
+
+def generate_tool(tool_id, rng):
+    section = " ".join(rng.sample(WORDS, 2))
+    return Bunch(
+        id=tool_id,
+        name=" ".join(rng.sample(WORDS, 3)),
+        description=" ".join(rng.sample(WORDS, 6)),
+        raw_help=" ".join(rng.choices(WORDS, k=200)),
+        tool_type="default",
+        guid=None,
+        labels=[],
+        edam_operations=[],
+        edam_topics=[],
+        repository_name=None,
+        repository_owner=None,
+        hidden=False,
+        lineage=None,
+        is_latest_version=True,
+        latest_version=None,
+        get_panel_section=lambda: (None, section),
+    )
+
+
+def timed(name, function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{name:24} {elapsed:8.2f} s")
+
+
+def benchmark(name, create_search, tool_cache, toolbox, queries, changed, rng):
+    print(f"{name}:")
+    search = create_search()
+    timed("build", lambda: search.build_index(tool_cache, toolbox))
+    tool_cache.replace(rng.sample(sorted(tool_cache.tools), changed), rng)
+    timed(f"update ({changed} tools)", lambda: search.build_index(tool_cache, toolbox))
+    tool_cache._new_tool_ids = set(tool_cache.tools)
+    timed("open (another process)", lambda: create_search().build_index(tool_cache, toolbox))
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search.search(query, CONFIG)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(
+        f"{'query latency':24} median {statistics.median(latencies) * 1000:6.2f} ms,"
+        f" p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms"
+    )
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--tools", type=int, default=5000, help="number of generated tools")
+    arg_parser.add_argument("--changed", type=int, default=50, help="number of tools replaced between builds")
+    arg_parser.add_argument("--queries", type=int, default=200, help="number of searches")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(args.queries)]
+    print(f"{args.tools} tools, {args.queries} queries")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, create_search in (
+            ("whoosh", lambda: ToolPanelViewSearch("default", os.path.join(tmp_dir, "whoosh"), CONFIG)),
+            (
+                "sqlite",
+                lambda: SQLiteToolPanelViewSearch("default", os.path.join(tmp_dir, SQLITE_INDEX_FILENAME), CONFIG),
+            ),
+        ):
+            tools = {f"tool_{i}": generate_tool(f"tool_{i}", rng) for i in range(args.tools)}
+            tool_cache = ToolCache(tools)
+            toolbox = Bunch(get_tool=tool_cache.get_tool_by_id, panel_has_tool=lambda tool, panel_view_id: True)
+            benchmark(name, create_search, tool_cache, toolbox, queries, args.changed, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare the time taken to parse a large directory of tools with and without the tool source cache.
+
+Generates ``--tools`` tools importing a shared macro file (or uses the XML files of a given
+directory), then times expanding the macros of every tool in this process (like loading the
+toolbox without the cache), filling an empty tool source cache with ``--processes`` worker
+processes (the first start with ``tool_loading_processes``) and reading every tool back from
+the filled cache (any later start).
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "lib")))
+
+from galaxy.tool_util.loader import (
+    expand_tool_source,
+    load_tool_with_refereces,
+)
+from galaxy.tools.cache import ToolSourceCache
+from galaxy.util import parse_xml_string_to_etree
+
+MACRO_COUNT = 50
+
+TOOL_TEMPLATE = """<tool id="benchmark_{index}" name="Benchmark {index}" version="@TOOL_VERSION@">
+    <macros>
+        <import>macros.xml</import>
+    </macros>
+    <expand macro="requirements"/>
+    <command>echo {index} > '$output'</command>
+    <inputs>
+{inputs}
+    </inputs>
+    <outputs>
+        <data name="output" format="txt"/>
+    </outputs>
+</tool>
+"""
+
+
+def generate(directory, tools):
+    macros = ['    <token name="@TOOL_VERSION@">1.0</token>']
+    macros.append(
+        '    <xml name="requirements"><requirements>'
+        '<requirement type="package" version="@TOOL_VERSION@">coreutils</requirement>'
+        "</requirements></xml>"
+    )
+    for i in range(MACRO_COUNT):
+        macros.append(
+            f'    <xml name="param_{i}"><param name="param_{i}" type="integer" value="{i}" label="Parameter {i}"/></xml>'
+        )
+    with open(os.path.join(directory, "macros.xml"), "w") as fh:
+        fh.write("<macros>\n{}\n</macros>\n".format("\n".join(macros)))
+    inputs = "\n".join(f'        <expand macro="param_{i}"/>' for i in range(MACRO_COUNT))
+    paths = []
+    for index in range(tools):
+        path = os.path.join(directory, f"tool_{index}.xml")
+        with open(path, "w") as fh:
+            fh.write(TOOL_TEMPLATE.format(index=index, inputs=inputs))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    arg_parser = ArgumentParser(description=__doc__)
+    arg_parser.add_argument("directory", nargs="?", help="directory of tools, tools are generated if not given")
+    arg_parser.add_argument("--tools", type=int, default=5000, help="number of generated tools")
+    arg_parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.directory:
+            paths: list[str] = []
+            for root, _, names in os.walk(args.directory):
+                paths.extend(os.path.join(root, name) for name in names if name.endswith(".xml"))
+            paths.sort()
+        else:
+            paths = generate(tmp_dir, args.tools)
+        print(f"{len(paths)} tools")
+
+        start = time.perf_counter()
+        for path in paths:
+            try:
+                load_tool_with_refereces(path)
+            except Exception:
+                pass
+        print(f"{'no cache:':22} {time.perf_counter() - start:8.2f} s")
+
+        cache = ToolSourceCache(os.path.join(tmp_dir, "cache"))
+        start = time.perf_counter()
+        processes = min(args.processes, len(paths))
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("fork")) as executor:
+            chunksize = max(1, len(paths) // (processes * 4))
+            entries = [entry for entry in executor.map(expand_tool_source, paths, chunksize=chunksize) if entry]
+        cache.set_many(entries)
+        print(f"{f'fill ({processes} processes):':22} {time.perf_counter() - start:8.2f} s")
+
+        start = time.perf_counter()
+        for path in paths:
+            if cached := cache.get(path):
+                parse_xml_string_to_etree(cached[0], strip_whitespace=False)
+        print(f"{'cached:':22} {time.perf_counter() - start:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Compare distributed object store selection policies on a synthetic workload.
+
+Each backend has a capacity, an initial usage, a write throughput and a per write
+latency. Objects with log-normally distributed sizes are placed one after the other,
+the simulated filesystem monitor reports usage every ``--monitor-every`` objects.
+For each policy the final usage of every backend, the number of objects placed in a
+backend without room for them, the mean simulated write time and the mean cost of a
+selection are printed.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(1, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, "lib")))
+
+from galaxy.objectstore._selection import (
+    BackendSelector,
+    SELECTION_POLICIES,
+)
+
+GB = 1024**3
+MB = 1024**2
+
+# id: (weight, capacity, initially used, throughput in bytes/s, latency in s)
+DEFAULT_BACKENDS = {
+    "big_slow": (3, 1000 * GB, 700 * GB, 100 * MB, 0.05),
+    "small_fast": (1, 200 * GB, 20 * GB, 800 * MB, 0.005),
+    "medium": (2, 500 * GB, 100 * GB, 300 * MB, 0.02),
+}
+
+
+def simulate(policy, backends, num_objects, mean_size, monitor_every, seed):
+    rng = random.Random(seed)
+    selector = BackendSelector(
+        {backend_id: b[0] for backend_id, b in backends.items()}, policy=policy, rebuild_interval=0, rng=rng
+    )
+    used = {backend_id: b[2] for backend_id, b in backends.items()}
+
+    def report_usage():
+        for backend_id, (_, capacity, _, _, _) in backends.items():
+            selector.update_usage(backend_id, 100.0 * used[backend_id] / capacity, capacity - used[backend_id])
+
+    report_usage()
+    overflows = 0
+    total_write_time = 0.0
+    selection_time = 0.0
+    for i in range(num_objects):
+        size = int(rng.lognormvariate(0, 1.5) * mean_size)
+        start = time.perf_counter()
+        backend_id = selector.select(size)
+        selection_time += time.perf_counter() - start
+        _, capacity, _, throughput, latency = backends[backend_id]
+        if used[backend_id] + size > capacity:
+            overflows += 1
+        used[backend_id] += size
+        write_time = latency * rng.uniform(0.5, 1.5) + size / throughput
+        total_write_time += write_time
+        selector.record_write(backend_id, size, write_time)
+        if (i + 1) % monitor_every == 0:
+            report_usage()
+    return used, overflows, total_write_time / num_objects, selection_time / num_objects
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100000, help="number of objects to place")
+    parser.add_argument("--mean-size", type=int, default=5 * MB, help="scale of the object size distribution")
+    parser.add_argument("--monitor-every", type=int, default=1000, help="objects placed between usage reports")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    for policy in SELECTION_POLICIES:
+        used, overflows, mean_write_time, mean_selection_time = simulate(
+            policy, DEFAULT_BACKENDS, args.objects, args.mean_size, args.monitor_every, args.seed
+        )
+        print(f"policy: {policy}")
+        for backend_id, (_, capacity, _, _, _) in DEFAULT_BACKENDS.items():
+            print(f"  {backend_id:12} {100.0 * used[backend_id] / capacity:6.1f}% used")
+        print(f"  objects placed without room: {overflows}")
+        print(f"  mean write time: {mean_write_time * 1000:.2f} ms")
+        print(f"  mean selection time: {mean_selection_time * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
 import os
 import tempfile
+import threading
 from typing import (
     cast,
     TYPE_CHECKING,
 )
 
+import pytest
+from sqlalchemy import event
+
 from galaxy import model
+from galaxy.exceptions import ObjectInvalid
 from galaxy.job_execution.output_collect import dataset_collector
 from galaxy.model.dataset_collections import builder
+from galaxy.model.store import discover
+from galaxy.objectstore._metadata_cache import (
+    _pending_invalidations,
+    coalesced_metadata_invalidations,
+)
 from galaxy.schema.schema import JobState
 from galaxy.tool_util.parser.output_collection_def import FilePatternDatasetCollectionDescription
 from galaxy.tool_util.provided_metadata import NullToolProvidedMetadata
@@ -40,17 +50,17 @@ class MockTool:
         self.sa_session = app.model.context
 
 
+FILENAMES = [f"datasets_{i}.txt" for i in range(10)]
+
+
 def setup_data(job_working_directory):
-    for i in range(10):
-        with open(os.path.join(job_working_directory, f"datasets_{i}.txt"), "w") as out:
+    for i, filename in enumerate(FILENAMES):
+        with open(os.path.join(job_working_directory, filename), "w") as out:
             out.write(str(i))
 
 
-def test_job_context_discover_outputs_flushes_once(mocker):
-    app = _mock_app()
+def _job_context(app, discovered_outputs_workers):
     sa_session = app.model.context
-    # mocker is a pytest-mock fixture
-
     u = model.User(email="collection@example.com", password="password")
     h = model.History(name="Test History", user=u)
 
@@ -67,10 +77,7 @@ def test_job_context_discover_outputs_flushes_once(mocker):
     object_store = app.object_store
     input_dbkey = "?"
     final_job_state = JobState.OK
-    collection_description = FilePatternDatasetCollectionDescription(pattern="__name__")
-    collection = model.DatasetCollection(collection_type="list", populated=False)
-    sa_session.add(collection)
-    job_context = JobContext(
+    return JobContext(
         tool,
         tool_provided_metadata,
         job,
@@ -81,13 +88,19 @@ def test_job_context_discover_outputs_flushes_once(mocker):
         object_store,
         final_job_state,
         max_discovered_files=100,
+        discovered_outputs_workers=discovered_outputs_workers,
     )
+
+
+def _populate_collection(job_context, sa_session):
+    collection_description = FilePatternDatasetCollectionDescription(pattern="__name__")
+    collection = model.DatasetCollection(collection_type="list", populated=False)
+    sa_session.add(collection)
     collection_builder = builder.BoundCollectionBuilder(collection)
     dataset_collectors = [dataset_collector(collection_description)]
     output_name = "output"
     filenames = job_context.find_files(output_name, collection, dataset_collectors)
     assert len(filenames) == 10
-    spy = mocker.spy(sa_session, "commit")
     job_context.populate_collection_elements(
         collection,
         collection_builder,
@@ -97,7 +110,67 @@ def test_job_context_discover_outputs_flushes_once(mocker):
         final_job_state=job_context.final_job_state,
     )
     collection_builder.populate()
+    return collection
+
+
+@pytest.mark.parametrize("discovered_outputs_workers", [1, 4])
+def test_job_context_discover_outputs_flushes_once(mocker, discovered_outputs_workers):
+    app = _mock_app()
+    sa_session = app.model.context
+    job_context = _job_context(app, discovered_outputs_workers)
+    # mocker is a pytest-mock fixture
+    spy = mocker.spy(sa_session, "commit")
+    new_datasets_per_flush = []
+
+    @event.listens_for(sa_session(), "before_flush")
+    def count_new_datasets(session, flush_context, instances):
+        new_datasets_per_flush.append(sum(isinstance(obj, model.Dataset) for obj in session.new))
+
+    collection = _populate_collection(job_context, sa_session)
     assert spy.call_count == 0
     sa_session.commit()
+    event.remove(sa_session(), "before_flush", count_new_datasets)
     assert len(collection.dataset_instances) == 10
-    assert collection.dataset_instances[0].dataset.file_size == 1
+    # all discovered datasets are written by a single flush, which the database dialect can batch
+    assert [count for count in new_datasets_per_flush if count] == [10]
+    assert all(hda.dataset.file_size == 1 for hda in collection.dataset_instances)
+
+
+def test_job_context_finalizes_datasets_on_calling_thread(mocker):
+    app = _mock_app()
+    sa_session = app.model.context
+    job_context = _job_context(app, 4)
+    calling_thread = threading.current_thread()
+    events = []
+    update_from_file = app.object_store.update_from_file
+
+    def store(dataset, file_name, **kwd):
+        name = os.path.basename(file_name)
+        events.append(("store", name, threading.current_thread() is calling_thread))
+        # worker threads run in a copy of the context of the calling thread
+        assert _pending_invalidations.get() is not None
+        if name == "datasets_7.txt":
+            raise ObjectInvalid("push failed")
+        return update_from_file(dataset, file_name=file_name, **kwd)
+
+    def set_datasets_metadata(datasets, datasets_attributes=None):
+        assert threading.current_thread() is calling_thread
+        events.extend(("metadata", dataset.name, True) for dataset in datasets)
+
+    # datasets 0 and 1 have metadata files
+    mocker.patch.object(app.object_store, "update_from_file", side_effect=store)
+    mocker.patch.object(job_context, "set_datasets_metadata", side_effect=set_datasets_metadata)
+    mocker.patch.object(discover, "_has_metadata_files", side_effect=lambda dataset: dataset.name in FILENAMES[:2])
+    with pytest.raises(ObjectInvalid, match="push failed"), coalesced_metadata_invalidations():
+        _populate_collection(job_context, sa_session)
+
+    # datasets with metadata files are finalized on the calling thread before the other files are stored
+    assert events[:4] == [
+        ("store", "datasets_0.txt", True),
+        ("metadata", "datasets_0.txt", True),
+        ("store", "datasets_1.txt", True),
+        ("metadata", "datasets_1.txt", True),
+    ]
+    threaded = events[4:]
+    assert sorted(name for _, name, _ in threaded) == FILENAMES[2:]
+    assert all(event == "store" and not on_calling_thread for event, _, on_calling_thread in threaded)
@@ -0,0 +1,81 @@
+import datetime
+
+from galaxy.jobs.job_counts import JobCountTracker
+from galaxy.model import Job
+from galaxy.model.unittest_utils import GalaxyDataTestApp
+
+
+def create_job(app: GalaxyDataTestApp, user_id=None, state="new", destination_id=None):
+    job = Job()
+    job.user_id = user_id
+    job.state = state
+    job.destination_id = destination_id
+    app.model.session.add(job)
+    app.model.session.commit()
+    return job
+
+
+def set_job_state(app: GalaxyDataTestApp, job: Job, state: str):
+    job.state = state
+    app.model.session.add(job)
+    app.model.session.commit()
+
+
+def test_reconcile_counts_dispatched_jobs():
+    app = GalaxyDataTestApp()
+    create_job(app, user_id=1, state="queued", destination_id="local")
+    create_job(app, user_id=1, state="running", destination_id="slurm")
+    create_job(app, user_id=1, state="resubmitted", destination_id="slurm")
+    create_job(app, user_id=2, state="running", destination_id="local")
+    create_job(app, user_id=2, state="ok", destination_id="local")
+    create_job(app, user_id=2, state="new")
+
+    tracker = JobCountTracker(reconcile_interval=300)
+    tracker.update(app.model.session)
+
+    assert tracker.user_job_count == {1: 3, 2: 1}
+    assert tracker.user_job_count_per_destination == {1: {"local": 1, "slurm": 1}, 2: {"local": 1}}
+    assert tracker.total_job_count_per_destination == {"local": 2, "slurm": 1}
+
+
+def test_update_applies_state_changes():
+    app = GalaxyDataTestApp()
+    running_job = create_job(app, user_id=1, state="running", destination_id="local")
+    new_job = create_job(app, user_id=1, state="new")
+
+    tracker = JobCountTracker(reconcile_interval=300)
+    tracker.update(app.model.session)
+    assert tracker.user_job_count == {1: 1}
+
+    new_job.destination_id = "local"
+    set_job_state(app, new_job, "queued")
+    set_job_state(app, running_job, "ok")
+    tracker.update(app.model.session)
+    assert tracker.user_job_count == {1: 1}
+    assert tracker.total_job_count_per_destination == {"local": 1}
+
+    set_job_state(app, new_job, "error")
+    tracker.update(app.model.session)
+    # applying the overlapping window again must not change the counts
+    tracker.update(app.model.session)
+    assert tracker.user_job_count == {}
+    assert tracker.user_job_count_per_destination == {}
+    assert tracker.total_job_count_per_destination == {}
+
+
+def test_update_reconciles_after_interval(mocker):
+    app = GalaxyDataTestApp()
+    start = datetime.datetime(2024, 1, 1)
+    mock_now = mocker.patch("galaxy.jobs.job_counts.now", return_value=start)
+    tracker = JobCountTracker(reconcile_interval=300)
+    tracker.update(app.model.session)
+    # pretend a running job was never seen by an incremental update
+    tracker.set_job(42, "running", 3, "local")
+    assert tracker.user_job_count == {3: 1}
+    mock_now.return_value = start + datetime.timedelta(seconds=299)
+    tracker.update(app.model.session)
+    # incremental updates only read jobs updated since the previous update
+    assert tracker.user_job_count == {3: 1}
+    mock_now.return_value = start + datetime.timedelta(seconds=300)
+    tracker.update(app.model.session)
+    assert tracker.user_job_count == {}
@@ -0,0 +1,243 @@
+import threading
+from unittest import mock
+
+import pytest
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+from galaxy import model
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.job_destination import JobDestination
+from galaxy.jobs.runners import AsynchronousJobState
+from galaxy.jobs.runners.util.pykube_informer import (
+    object_label,
+    ObjectInformer,
+    pykube_watch_function,
+    ResourceVersionExpired,
+    WatchTimeout,
+)
+
+
+class FakeApiServer:
+    """Stand-in for the k8s API server that replays recorded watch events.
+
+    Each change bumps the resource version, watches started from a resource version older than
+    ``compacted_version`` fail like an API server that compacted its event history.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.events = []
+        self.resource_version = 0
+        self.compacted_version = 0
+        self.list_calls = 0
+        self.watch_calls = 0
+
+    def _change(self, event_type, name, labels=None, phase=None, status=None):
+        self.resource_version += 1
+        if status is None:
+            status = {"phase": phase} if phase else {}
+        obj = {
+            "metadata": {"name": name, "labels": labels or {}, "resourceVersion": str(self.resource_version)},
+            "status": status,
+        }
+        if event_type == "DELETED":
+            self.objects.pop(name)
+        else:
+            self.objects[name] = obj
+        self.events.append((self.resource_version, event_type, obj))
+
+    def add(self, name, **kwd):
+        self._change("ADDED", name, **kwd)
+
+    def modify(self, name, **kwd):
+        self._change("MODIFIED", name, **kwd)
+
+    def delete(self, name):
+        self._change("DELETED", name, labels=self.objects[name]["metadata"]["labels"])
+
+    def list_objects(self):
+        self.list_calls += 1
+        return list(self.objects.values()), str(self.resource_version)
+
+    def watch_objects(self, resource_version):
+        self.watch_calls += 1
+        if int(resource_version) < self.compacted_version:
+            yield "ERROR", {"kind": "Status", "code": 410, "message": "too old resource version"}
+            return
+        for version, event_type, obj in self.events:
+            if version > int(resource_version):
+                yield event_type, obj
+
+
+def _informer(api_server, **kwd):
+    return ObjectInformer("test", api_server.list_objects, api_server.watch_objects, **kwd)
+
+
+def test_list_then_watch():
+    api_server = FakeApiServer()
+    api_server.add("job-1", phase="Pending")
+    informer = _informer(api_server)
+    informer.sync()
+    assert informer.has_synced
+    assert informer.get("job-1")[0]["status"]["phase"] == "Pending"
+
+    api_server.modify("job-1", phase="Running")
+    api_server.add("job-2", phase="Pending")
+    informer.watch()
+    assert informer.get("job-1")[0]["status"]["phase"] == "Running"
+    assert informer.get("job-2")[0]["status"]["phase"] == "Pending"
+
+    api_server.delete("job-1")
+    informer.watch()
+    assert informer.get("job-1") == []
+    assert api_server.list_calls == 1
+
+
+def test_watch_resumes_from_last_resource_version():
+    api_server = FakeApiServer()
+    informer = _informer(api_server)
+    informer.sync()
+    for i in range(1000):
+        api_server.add(f"job-{i}", phase="Pending")
+    informer.watch()
+    for i in range(1000):
+        api_server.modify(f"job-{i}", phase="Succeeded")
+    informer.watch()
+    assert all(informer.get(f"job-{i}")[0]["status"]["phase"] == "Succeeded" for i in range(1000))
+    assert api_server.list_calls == 1
+
+
+def test_expired_resource_version():
+    api_server = FakeApiServer()
+    api_server.add("job-1", phase="Pending")
+    informer = _informer(api_server)
+    informer.sync()
+    api_server.modify("job-1", phase="Running")
+    api_server.compacted_version = api_server.resource_version + 1
+    with pytest.raises(ResourceVersionExpired):
+        informer.watch()
+    informer.sync()
+    assert informer.get("job-1")[0]["status"]["phase"] == "Running"
+
+
+def test_index_by_label():
+    api_server = FakeApiServer()
+    api_server.add("pod-a", labels={"job-name": "job-1"}, phase="Failed")
+    api_server.add("pod-b", labels={"job-name": "job-1"}, phase="Running")
+    api_server.add("pod-c", labels={"job-name": "job-2"}, phase="Pending")
+    informer = _informer(api_server, key=object_label("job-name"))
+    informer.sync()
+    assert sorted(pod["metadata"]["name"] for pod in informer.get("job-1")) == ["pod-a", "pod-b"]
+
+    api_server.delete("pod-a")
+    informer.watch()
+    assert [pod["metadata"]["name"] for pod in informer.get("job-1")] == ["pod-b"]
+    assert [pod["metadata"]["name"] for pod in informer.get("job-2")] == ["pod-c"]
+
+
+def test_informer_thread():
+    api_server = FakeApiServer()
+    api_server.add("job-1", phase="Pending")
+    watched = threading.Event()
+    watch_objects = api_server.watch_objects
+
+    def watch_once(resource_version):
+        yield from watch_objects(resource_version)
+        watched.set()
+
+    informer = ObjectInformer("test", api_server.list_objects, watch_once, retry_interval=0.01)
+    informer.start()
+    try:
+        assert watched.wait(5)
+        assert informer.has_synced
+        assert informer.get("job-1")
+    finally:
+        informer.stop()
+
+
+def test_watch_timeout_lists_objects_again():
+    api_server = FakeApiServer()
+    api_server.add("job-1", phase="Pending")
+    relisted = threading.Event()
+    list_objects = api_server.list_objects
+
+    def list_and_notify():
+        objects = list_objects()
+        if api_server.list_calls == 2:
+            relisted.set()
+        return objects
+
+    def dropped_watch(resource_version):
+        if api_server.watch_calls == 0:
+            # the connection dropped silently, so the watch never sees this change
+            api_server.watch_calls += 1
+            api_server.modify("job-1", phase="Running")
+            raise WatchTimeout("read timed out")
+        yield from api_server.watch_objects(resource_version)
+
+    informer = ObjectInformer("test", list_and_notify, dropped_watch, retry_interval=0.01)
+    informer.start()
+    try:
+        assert relisted.wait(5)
+        assert informer.get("job-1")[0]["status"]["phase"] == "Running"
+    finally:
+        informer.stop()
+
+
+def test_pykube_watch_read_timeout():
+    object_class = mock.Mock()
+    query = object_class.objects.return_value.filter.return_value
+    query.watch.side_effect = requests.exceptions.ConnectionError(
+        ReadTimeoutError(mock.Mock(), "/api/v1/pods", "Read timed out.")
+    )
+    watch_objects = pykube_watch_function(mock.Mock(), object_class, "app=galaxy", timeout_seconds=60)
+    with pytest.raises(WatchTimeout):
+        list(watch_objects("1"))
+    assert query.watch.call_args.kwargs["params"]["timeoutSeconds"] == 60
+
+
+def test_kubernetes_runner_checks_jobs_in_informer_cache(mocker):
+    pytest.importorskip("pykube")
+    from galaxy.jobs.runners import kubernetes
+
+    api_servers = {"Job": FakeApiServer(), "Pod": FakeApiServer()}
+    mocker.patch.object(kubernetes, "pykube_client_from_dict")
+    mocker.patch.object(
+        kubernetes, "pykube_list_function", side_effect=lambda api, cls, *args: api_servers[cls.kind].list_objects
+    )
+    mocker.patch.object(
+        kubernetes,
+        "pykube_watch_function",
+        side_effect=lambda api, cls, *args, **kwd: api_servers[cls.kind].watch_objects,
+    )
+    find_job = mocker.patch.object(kubernetes, "find_job_object_by_name")
+    find_pod = mocker.patch.object(kubernetes, "find_pod_object_by_name")
+    runner = kubernetes.KubernetesJobRunner(MockApp(), 1, k8s_use_informer=True)
+    assert runner._job_informer and runner._pod_informer
+    mark_as_finished = mocker.patch.object(runner, "mark_as_finished")
+
+    jobs, pods = api_servers["Job"], api_servers["Pod"]
+    jobs.add("gxy-1", status={"active": 1})
+    pods.add("gxy-1-abcde", labels={"job-name": "gxy-1"}, phase="Pending")
+    runner._job_informer.sync()
+    runner._pod_informer.sync()
+    job_wrapper = mock.Mock(job_destination=JobDestination())
+    job_wrapper.get_state.return_value = model.Job.states.QUEUED
+    job_state = AsynchronousJobState(job_wrapper, JobDestination(), job_id="gxy-1")
+    assert runner.check_watched_item(job_state) is job_state
+    job_wrapper.change_state.assert_not_called()
+
+    pods.modify("gxy-1-abcde", labels={"job-name": "gxy-1"}, phase="Running")
+    runner._pod_informer.watch()
+    assert runner.check_watched_item(job_state) is job_state
+    assert job_state.running
+    job_wrapper.change_state.assert_called_once_with(model.Job.states.RUNNING)
+
+    jobs.modify("gxy-1", status={"succeeded": 1})
+    runner._job_informer.watch()
+    assert runner.check_watched_item(job_state) is None
+    mark_as_finished.assert_called_once_with(job_state)
+    # the job state was only read from the caches
+    find_job.assert_not_called()
+    find_pod.assert_not_called()
@@ -0,0 +1,195 @@
+import os
+import queue
+import stat
+
+from galaxy import model
+from galaxy.jobs.job_destination import JobDestination
+from galaxy.jobs.runners import AsynchronousJobState
+from galaxy.jobs.runners.cli import ShellJobRunner
+from galaxy.jobs.runners.util.cli import CliInterface
+from galaxy.jobs.runners.util.cli.job.pbs import OpenPBS
+from galaxy.jobs.runners.util.cli.shell.rsh import SecureShell
+from galaxy.util.bunch import Bunch
+
+# Stand-in commands log every invocation, so tests count the processes spawned by the runner.
+FAKE_COMMAND = """#!/bin/sh
+echo "$(basename "$0") $*" >> {log}
+cat {output}
+"""
+
+FAKE_SSH = """#!/bin/sh
+echo "$*" >> {log}
+case " $* " in *" -M "*) exec sleep 60;; esac
+for last; do :; done
+exec sh -c "$last"
+"""
+
+
+def _write_script(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def _read_calls(log):
+    if not os.path.exists(log):
+        return []
+    with open(log) as f:
+        return f.read().splitlines()
+
+
+class FakeJobWrapper:
+    def __init__(self, job_id, job_destination, working_directory):
+        self.app = Bunch(config=Bunch(redact_email_in_job_name=True))
+        self.job_id = job_id
+        self.tool = Bunch(old_id="cat1")
+        self.job_destination = job_destination
+        self.working_directory = working_directory
+        self.state = model.Job.states.QUEUED
+
+    def get_id_tag(self):
+        return str(self.job_id)
+
+    def get_state(self):
+        return self.state
+
+    def change_state(self, state):
+        self.state = state
+
+
+def _runner():
+    runner = ShellJobRunner.__new__(ShellJobRunner)
+    runner.cli_interface = CliInterface()
+    runner.work_queue = runner.finish_queue = queue.Queue()
+    runner.watched = []
+    return runner
+
+
+def test_slurm_states_queried_once_per_shell(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "calls.log"
+    (tmp_path / "squeue.out").write_text("JOBID ST\n100 R\n101 PD\n")
+    (tmp_path / "sacct.out").write_text(
+        "102|COMPLETED\n102.batch|COMPLETED\n103|FAILED\n104|COMPLETED\n105|OUT_OF_MEMORY\n"
+    )
+    for command in ("squeue", "sacct"):
+        _write_script(bin_dir / command, FAKE_COMMAND.format(log=log, output=tmp_path / f"{command}.out"))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    runner = _runner()
+    # destinations sharing the shell and job plugin are queried together
+    destinations = [
+        JobDestination(id=f"slurm_{partition}", params={"job_plugin": "Slurm", "job_partition": partition})
+        for partition in ("short", "long")
+    ]
+    for i, external_job_id in enumerate(["100", "101", "102", "103", "104", "105"]):
+        job_wrapper = FakeJobWrapper(i, destinations[i % 2], str(tmp_path))
+        runner.watched.append(
+            AsynchronousJobState(
+                job_wrapper=job_wrapper,  # type: ignore[arg-type]
+                job_destination=destinations[i % 2],
+                files_dir=str(tmp_path),
+                job_id=external_job_id,
+            )
+        )
+
+    runner.check_watched_items()
+
+    # one squeue for the queued jobs and one sacct for all jobs that left the queue
+    calls = _read_calls(log)
+    assert [call.split()[0] for call in calls] == ["squeue", "sacct"]
+    assert calls[1].endswith("-j 102,103,104,105")
+    assert sorted(ajs.job_id for ajs in runner.watched) == ["100", "101"]
+    assert runner.watched[0].job_wrapper.get_state() == model.Job.states.RUNNING
+    assert runner.watched[1].job_wrapper.get_state() == model.Job.states.QUEUED
+    finished = []
+    while not runner.work_queue.empty():
+        method, ajs = runner.work_queue.get()
+        assert method == runner.finish_job
+        finished.append(ajs.job_id)
+    assert finished == ["102", "103", "104", "105"]
+
+    # job interfaces are reused between monitor cycles
+    assert len(runner.cli_interface.active_job_interfaces) == 2
+    runner.check_watched_items()
+    assert len(_read_calls(log)) == 3
+
+
+def test_external_metadata_set_before_finishing(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "calls.log"
+    (tmp_path / "squeue.out").write_text("JOBID ST\n")
+    (tmp_path / "sacct.out").write_text("100|COMPLETED\n")
+    for command in ("squeue", "sacct"):
+        _write_script(bin_dir / command, FAKE_COMMAND.format(log=log, output=tmp_path / f"{command}.out"))
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    runner = _runner()
+    runner.finish_queue = queue.Queue()
+    destination = JobDestination(id="slurm", params={"job_plugin": "Slurm", "embed_metadata_in_job": "False"})
+    runner.watched.append(
+        AsynchronousJobState(
+            job_wrapper=FakeJobWrapper(0, destination, str(tmp_path)),  # type: ignore[arg-type]
+            job_destination=destination,
+            files_dir=str(tmp_path),
+            job_id="100",
+        )
+    )
+    runner.check_watched_items()
+
+    # a finish worker can't finish the job while a work thread sets its metadata
+    assert runner.work_queue.empty()
+    method, ajs = runner.finish_queue.get_nowait()
+    assert method == runner.finish_job_with_external_metadata
+    assert runner.finish_queue.empty()
+    steps = []
+    monkeypatch.setattr(runner, "handle_metadata_externally", lambda ajs: steps.append("metadata"))
+    monkeypatch.setattr(runner, "finish_job", lambda ajs: steps.append("finish"))
+    method(ajs)
+    assert steps == ["metadata", "finish"]
+
+
+def test_openpbs_parse_status():
+    job_interface = OpenPBS()
+    status = '{"Jobs": {"1.pbs": {"job_state": "R"}, "2.pbs": {"job_state": "F"}, "3.pbs": {"job_state": "Q"}}}'
+    assert job_interface.parse_multiple_status(status, ["1.pbs", "2.pbs"]) == {
+        "1.pbs": model.Job.states.RUNNING,
+        "2.pbs": model.Job.states.OK,
+    }
+    assert job_interface.parse_status("qstat: not JSON", ["1.pbs"]) == {}
+
+
+def test_secure_shell_persistent_session(tmp_path):
+    log = tmp_path / "ssh.log"
+    fake_ssh = tmp_path / "ssh"
+    _write_script(fake_ssh, FAKE_SSH.format(log=log))
+    shell = SecureShell(rsh=str(fake_ssh), hostname="localhost", persistent=True)
+    try:
+        for _ in range(3):
+            assert shell.execute("echo hello").stdout == "hello\n"
+        master = shell._master
+        assert master is not None and master.poll() is None
+    finally:
+        shell.close()
+    assert master.poll() is not None
+
+    calls = _read_calls(log)
+    masters = [call for call in calls if " -M " in f" {call} "]
+    commands = [call for call in calls if call not in masters]
+    assert len(masters) == 1
+    assert len(commands) == 3
+    control_path = masters[0].split(" -S ")[1].split()[0]
+    assert all(f"-o ControlMaster=no -S {control_path}" in command for command in commands)
+    assert not os.path.exists(os.path.dirname(control_path))
+
+
+def test_secure_shell_without_persistent_session(tmp_path):
+    log = tmp_path / "ssh.log"
+    fake_ssh = tmp_path / "ssh"
+    _write_script(fake_ssh, FAKE_SSH.format(log=log))
+    shell = SecureShell(rsh=str(fake_ssh), hostname="localhost")
+    assert shell.execute("echo hello").stdout == "hello\n"
+    assert shell._master is None
+    assert "ControlMaster" not in _read_calls(log)[0]
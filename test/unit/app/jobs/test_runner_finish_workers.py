@@ -0,0 +1,101 @@
+import threading
+from queue import Queue
+from typing import Optional
+from unittest import mock
+
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.job_destination import JobDestination
+from galaxy.jobs.runners import (
+    AsynchronousJobRunner,
+    BaseJobRunner,
+    JobState,
+)
+from galaxy.util.bunch import Bunch
+
+
+class FinishRecordingJobRunner(AsynchronousJobRunner):
+    runner_name = "FinishRecordingRunner"
+
+    def __init__(self, app, nworkers, **kwargs):
+        super().__init__(app, nworkers, **kwargs)
+        self.finished: Queue = Queue()
+        self.release_finish = threading.Event()
+        self.release_finish.set()
+        self.finish_error: Optional[Exception] = None
+
+    def finish_job(self, job_state):
+        self.release_finish.wait(5)
+        if self.finish_error:
+            raise self.finish_error
+        self.finished.put((job_state, threading.current_thread().name))
+
+
+def _job_state():
+    return Bunch(job_wrapper=Bunch(_job_io=None))
+
+
+def _runner(**kwargs):
+    runner = FinishRecordingJobRunner(MockApp(), 1, **kwargs)
+    runner._init_worker_threads()
+    return runner
+
+
+def test_finish_on_worker_threads_by_default():
+    runner = _runner()
+    try:
+        assert runner.finish_threads == []
+        assert runner.finish_queue is runner.work_queue
+        runner.mark_as_finished(_job_state())
+        _, thread_name = runner.finished.get(timeout=5)
+        assert thread_name == "FinishRecordingRunner.work_thread-0"
+    finally:
+        BaseJobRunner.shutdown(runner)
+
+
+def test_finish_workers():
+    runner = _runner(finish_workers="2")
+    try:
+        assert len(runner.finish_threads) == 2
+        job_state = _job_state()
+        runner.mark_as_finished(job_state)
+        finished_job_state, thread_name = runner.finished.get(timeout=5)
+        assert finished_job_state is job_state
+        assert thread_name.startswith("FinishRecordingRunner.finish_thread-")
+    finally:
+        BaseJobRunner.shutdown(runner)
+    assert not any(thread.is_alive() for thread in runner.finish_threads)
+
+
+def test_finishing_jobs_do_not_block_workers():
+    runner = _runner(finish_workers="1")
+    try:
+        runner.release_finish.clear()
+        runner.mark_as_finished(_job_state())
+        queued = threading.Event()
+        runner.work_queue.put((lambda job_state: queued.set(), _job_state()))
+        # the worker thread is free while the job is finishing
+        assert queued.wait(5)
+        assert runner.finished.empty()
+        runner.release_finish.set()
+        runner.finished.get(timeout=5)
+    finally:
+        BaseJobRunner.shutdown(runner)
+
+
+def test_finish_worker_failure_fails_job():
+    runner = _runner(finish_workers="1")
+    try:
+        runner.finish_error = Exception("collecting the outputs failed")
+        job_wrapper = mock.Mock(_job_io=None)
+        failed = threading.Event()
+        job_wrapper.fail.side_effect = lambda *args, **kwargs: failed.set()
+        job_state = JobState(job_wrapper=job_wrapper, job_destination=JobDestination())
+        job_state.stop_job = False
+        runner.mark_as_finished(job_state)
+        # the finish worker hands the job over to the work threads to fail it
+        assert failed.wait(5)
+        job_wrapper.fail.assert_called_once()
+        assert job_wrapper.fail.call_args.args == ("Job failed",)
+        assert runner.finished.empty()
+    finally:
+        BaseJobRunner.shutdown(runner)
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from galaxy.jobs.runners.slurm import (
+    get_slurm_states,
+    SLURM_TO_DRMAA_STATES,
+)
+from galaxy.util import commands
+
+QUEUE_STATES = ["PENDING", "RUNNING", "COMPLETING", "SUSPENDED"]
+FINISHED_STATES = ["COMPLETED", "FAILED", "CANCELLED", "TIMEOUT", "OUT_OF_MEMORY", "NODE_FAIL"]
+
+
+class FakeSlurm:
+    """Answers ``squeue`` and ``sacct`` calls for simulated jobs of one or more clusters.
+
+    Jobs in ``queue`` are still known to the controller, ``accounting`` holds finished jobs
+    that only ``sacct`` reports.
+    """
+
+    def __init__(self):
+        self.queue: dict[tuple, str] = {}
+        self.accounting: dict[tuple, str] = {}
+        self.calls: list[list[str]] = []
+
+    def add_jobs(self, count, cluster=None, rng=None):
+        rng = rng or random.Random(0)
+        job_ids = []
+        for i in range(count):
+            job_id = str(1000 + len(self.queue) + len(self.accounting) + i)
+            if rng.random() < 0.5:
+                self.queue[(cluster, job_id)] = rng.choice(QUEUE_STATES)
+            else:
+                state = rng.choice(FINISHED_STATES)
+                self.accounting[(cluster, job_id)] = f"{state} by 1000" if state == "CANCELLED" else state
+            job_ids.append(f"{job_id}.{cluster}" if cluster else job_id)
+        return job_ids
+
+    def expected_state(self, external_job_id):
+        job_id, _, cluster = external_job_id.partition(".")
+        key = (cluster or None, job_id)
+        if key in self.queue:
+            return self.queue[key]
+        return self.accounting[key].split()[0]
+
+    def execute(self, cmd):
+        self.calls.append(cmd)
+        cluster = cmd[cmd.index("-M") + 1] if "-M" in cmd else None
+        job_ids = cmd[cmd.index("-j") + 1].split(",")
+        if cmd[0] == "squeue":
+            lines = [
+                f"{job_id} {self.queue[(cluster, job_id)]}" for job_id in job_ids if (cluster, job_id) in self.queue
+            ]
+            if not lines:
+                raise commands.CommandLineException(
+                    " ".join(cmd), "", "slurm_load_jobs error: Invalid job id specified\n", 1
+                )
+            if cluster:
+                lines.insert(0, f"CLUSTER: {cluster}")
+        else:
+            assert cmd[0] == "sacct"
+            lines = [
+                f"{job_id}|{self.accounting[(cluster, job_id)]}"
+                for job_id in job_ids
+                if (cluster, job_id) in self.accounting
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def test_get_slurm_states_of_many_jobs():
+    slurm = FakeSlurm()
+    job_ids = slurm.add_jobs(5000)
+    states = get_slurm_states(job_ids, chunk_size=1000, execute=slurm.execute)
+    assert states == {job_id: slurm.expected_state(job_id) for job_id in job_ids}
+    # one squeue and one sacct call per chunk of jobs
+    assert len(slurm.calls) == 10
+
+
+def test_get_slurm_states_of_clusters():
+    slurm = FakeSlurm()
+    job_ids = slurm.add_jobs(300, cluster="cluster1") + slurm.add_jobs(300, cluster="cluster2")
+    states = get_slurm_states(job_ids, execute=slurm.execute)
+    assert states == {job_id: slurm.expected_state(job_id) for job_id in job_ids}
+    assert all("-M" in cmd for cmd in slurm.calls)
+    assert len(slurm.calls) == 4
+
+
+def test_get_slurm_states_skips_sacct_if_all_jobs_are_queued():
+    slurm = FakeSlurm()
+    slurm.queue = {(None, str(i)): "PENDING" for i in range(10)}
+    states = get_slurm_states([str(i) for i in range(10)], execute=slurm.execute)
+    assert set(states.values()) == {"PENDING"}
+    assert [cmd[0] for cmd in slurm.calls] == ["squeue"]
+
+
+def test_get_slurm_states_omits_unknown_jobs():
+    slurm = FakeSlurm()
+    job_ids = slurm.add_jobs(10)
+    states = get_slurm_states(job_ids + ["99999"], execute=slurm.execute)
+    assert "99999" not in states
+    assert len(states) == 10
+
+
+@pytest.mark.parametrize("state", QUEUE_STATES + FINISHED_STATES)
+def test_simulated_states_map_to_drmaa_states(state):
+    assert state in SLURM_TO_DRMAA_STATES
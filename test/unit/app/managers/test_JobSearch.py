@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from galaxy.managers.jobs import (
+    job_cache_fingerprint,
+    job_cache_fingerprint_for_job,
+)
+from galaxy.model import (
+    DatasetCollection,
+    DatasetCollectionElement,
+    HistoryDatasetAssociation,
+    HistoryDatasetCollectionAssociation,
+    Job,
+)
+from galaxy.model.unittest_utils import GalaxyDataTestApp
+
+
+@pytest.fixture
+def sa_session():
+    return GalaxyDataTestApp().model.session
+
+
+def _hda(sa_session, dataset=None):
+    hda = HistoryDatasetAssociation(sa_session=sa_session, create_dataset=dataset is None, name="input")
+    if dataset is not None:
+        hda.dataset = dataset
+    sa_session.add(hda)
+    return hda
+
+
+def _hdca(sa_session, hdas):
+    collection = DatasetCollection(collection_type="list")
+    for i, (identifier, hda) in enumerate(hdas):
+        DatasetCollectionElement(collection=collection, element=hda, element_index=i, element_identifier=identifier)
+    hdca = HistoryDatasetCollectionAssociation(collection=collection)
+    sa_session.add(hdca)
+    return hdca
+
+
+def _fingerprint(sa_session, param_dump, tool_version="1.0"):
+    return job_cache_fingerprint(sa_session, "cat1", tool_version, param_dump)
+
+
+def test_fingerprint_matches_copied_dataset(sa_session):
+    hda = _hda(sa_session)
+    sa_session.commit()
+    copy = _hda(sa_session, dataset=hda.dataset)
+    other = _hda(sa_session)
+    sa_session.commit()
+
+    def dump(hda_id):
+        return {"input1": {"values": [{"src": "hda", "id": hda_id}]}, "lines": "10"}
+
+    assert _fingerprint(sa_session, dump(hda.id)) == _fingerprint(sa_session, dump(copy.id))
+    assert _fingerprint(sa_session, dump(hda.id)) != _fingerprint(sa_session, dump(other.id))
+    assert _fingerprint(sa_session, dump(hda.id)) != _fingerprint(sa_session, dump(hda.id), tool_version="2.0")
+
+
+def test_fingerprint_ignores_identifiers_and_dbkey(sa_session):
+    hda = _hda(sa_session)
+    sa_session.commit()
+    param_dump = {"input1": {"values": [{"src": "hda", "id": hda.id}]}, "lines": "10"}
+    extended = dict(
+        param_dump,
+        **{"input1|__identifier__": "forward", "dbkey": "hg19", "__use_cached_job__": True},
+    )
+    assert _fingerprint(sa_session, param_dump) == _fingerprint(sa_session, extended)
+    assert _fingerprint(sa_session, param_dump) != _fingerprint(sa_session, dict(param_dump, lines="20"))
+
+
+def test_fingerprint_matches_collection_with_same_datasets(sa_session):
+    hda1, hda2 = _hda(sa_session), _hda(sa_session)
+    sa_session.commit()
+    hdca = _hdca(sa_session, [("a", hda1), ("b", hda2)])
+    copied_elements = _hdca(
+        sa_session, [("a", _hda(sa_session, dataset=hda1.dataset)), ("b", _hda(sa_session, dataset=hda2.dataset))]
+    )
+    renamed_elements = _hdca(sa_session, [("b", hda1), ("a", hda2)])
+    sa_session.commit()
+
+    def dump(hdca_id):
+        return {"input1": {"values": [{"src": "hdca", "id": hdca_id}]}}
+
+    assert _fingerprint(sa_session, dump(hdca.id)) == _fingerprint(sa_session, dump(copied_elements.id))
+    assert _fingerprint(sa_session, dump(hdca.id)) != _fingerprint(sa_session, dump(renamed_elements.id))
+
+
+def test_fingerprint_for_job(sa_session):
+    hda = _hda(sa_session)
+    sa_session.commit()
+    param_dump = {"input1": {"values": [{"src": "hda", "id": hda.id}]}, "lines": "10"}
+    job = Job()
+    job.tool_id = "cat1"
+    job.tool_version = "1.0"
+    for name, value in param_dump.items():
+        job.add_parameter(name, json.dumps(value, sort_keys=True))
+    job.add_parameter("chromInfo", json.dumps("/path/to/?.len"))
+    assert job_cache_fingerprint_for_job(sa_session, job) == _fingerprint(sa_session, param_dump)
+
+
+def test_no_fingerprint_for_unknown_inputs(sa_session):
+    assert _fingerprint(sa_session, {"input1": {"values": [{"src": "hda", "id": 12345}]}}) is None
+    assert _fingerprint(sa_session, {"input1": {"values": [{"src": "url", "id": "https://example.org"}]}}) is None
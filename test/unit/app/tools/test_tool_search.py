@@ -0,0 +1,132 @@
+import os
+import sqlite3
+from contextlib import closing
+
+from galaxy.app_unittest_utils.toolbox_support import BaseToolBoxTestCase
+from galaxy.tools.search import (
+    SQLITE_INDEX_FILENAME,
+    ToolBoxSearch,
+)
+
+TOOL_TEMPLATE = """<tool id="{tool_id}" name="{name}" version="1.0">
+    <description>{description}</description>
+    <command>echo</command>
+    <inputs />
+    <outputs />
+    <help>{help}</help>
+</tool>
+"""
+
+TOOLS = [
+    ("fastqc", "FastQC", "read quality reports", "Reports the quality of sequencing reads."),
+    ("bowtie2", "Bowtie2", "map reads against a reference genome", "Aligns sequencing reads."),
+    ("cut_columns", "Cut", "columns from a table", "Selects columns of a tabular file."),
+    ("filter_lines", "Filter", "data on any column using simple expressions", "Removes rows of a table."),
+]
+
+SEARCH_CONFIG = dict(
+    tool_name_boost=20.0,
+    tool_name_exact_multiplier=10.0,
+    tool_id_boost=20.0,
+    tool_section_boost=3.0,
+    tool_description_boost=8.0,
+    tool_label_boost=1.0,
+    tool_stub_boost=2.0,
+    tool_help_boost=1.0,
+    tool_help_bm25f_k1=0.5,
+    tool_enable_ngram_search=True,
+    tool_ngram_minsize=3,
+    tool_ngram_maxsize=4,
+    tool_ngram_factor=0.2,
+)
+
+
+class BaseToolSearchTestCase(BaseToolBoxTestCase):
+    backend = "whoosh"
+
+    def setUp(self):
+        super().setUp()
+        for key, value in SEARCH_CONFIG.items():
+            setattr(self.app.config, key, value)
+        self.app.config.tool_search_backend = self.backend  # type: ignore[attr-defined]
+        elems = []
+        for tool_id, name, description, help in TOOLS:
+            filename = f"{tool_id}.xml"
+            with open(os.path.join(self.test_directory, filename), "w") as out:
+                out.write(TOOL_TEMPLATE.format(tool_id=tool_id, name=name, description=description, help=help))
+            elems.append(f'<tool file="{filename}" />')
+        self._add_config(f"""<toolbox><section id="ngs" name="NGS">{"".join(elems)}</section></toolbox>""")
+        self.index_dir = os.path.join(self.test_directory, "tool_search_index")
+
+    def _build_search(self) -> ToolBoxSearch:
+        toolbox_search = ToolBoxSearch(self.toolbox, self.index_dir)
+        toolbox_search.build_index(self.app.tool_cache, self.toolbox)
+        return toolbox_search
+
+    def _search(self, toolbox_search: ToolBoxSearch, q: str) -> list[str]:
+        return toolbox_search.search(q, "default", self.app.config)
+
+
+class TestWhooshToolSearch(BaseToolSearchTestCase):
+    def test_search(self):
+        toolbox_search = self._build_search()
+        assert self._search(toolbox_search, "fastqc")[0] == "fastqc"
+        assert self._search(toolbox_search, "bowtie")[0] == "bowtie2"
+
+
+class TestSQLiteToolSearch(BaseToolSearchTestCase):
+    backend = "sqlite"
+
+    def test_build_index(self):
+        self._build_search()
+        with closing(sqlite3.connect(os.path.join(self.index_dir, SQLITE_INDEX_FILENAME))) as conn:
+            indexed = conn.execute("SELECT panel_view, id, name_exact FROM tool_search_document").fetchall()
+            assert sorted(indexed) == sorted(("default", tool_id, name.lower()) for tool_id, name, _, _ in TOOLS)
+            for table in ("tool_search_text", "tool_search_ngram"):
+                assert conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0] == len(TOOLS)
+            (section,) = conn.execute(
+                "SELECT text.section FROM tool_search_text AS text "
+                "JOIN tool_search_document AS document ON document.rowid = text.rowid WHERE document.id = 'fastqc'"
+            ).fetchone()
+            assert section == "NGS"
+
+    def test_build_index_again_does_not_duplicate_documents(self):
+        self._build_search()
+        self._build_search()
+        with closing(sqlite3.connect(os.path.join(self.index_dir, SQLITE_INDEX_FILENAME))) as conn:
+            assert conn.execute("SELECT count(*) FROM tool_search_document").fetchone()[0] == len(TOOLS)
+            assert conn.execute("SELECT count(*) FROM tool_search_text").fetchone()[0] == len(TOOLS)
+
+    def test_ranking_matches_whoosh(self):
+        toolbox_search = self._build_search()
+        self.app.config.tool_search_backend = "whoosh"  # type: ignore[attr-defined]
+        whoosh_search = ToolBoxSearch(self.toolbox, os.path.join(self.test_directory, "whoosh_index"))
+        whoosh_search.build_index(self.app.tool_cache, self.toolbox)
+        for q in ("fastqc", "bowtie", "Cut", "filter", "quality", "columns"):
+            assert self._search(toolbox_search, q)[0] == self._search(whoosh_search, q)[0], q
+
+    def test_exact_name_ranked_first(self):
+        toolbox_search = self._build_search()
+        # "cut" is also a prefix of the "cut_columns" ID and "columns" in the description of two tools
+        assert self._search(toolbox_search, "cut")[0] == "cut_columns"
+        assert self._search(toolbox_search, "Filter")[0] == "filter_lines"
+
+    def test_stemmed_words_match(self):
+        toolbox_search = self._build_search()
+        assert "bowtie2" in self._search(toolbox_search, "mapping")
+
+    def test_no_words(self):
+        toolbox_search = self._build_search()
+        assert self._search(toolbox_search, "  ") == []
+
+    def test_query_syntax_is_escaped(self):
+        toolbox_search = self._build_search()
+        # FTS5 operators and special characters are matched as text instead of raising syntax errors
+        for q in ('"', "*", "-", "NEAR", "NEAR(fastqc bowtie2)", "AND", "OR NOT", "^", "{name}:", "(fastqc"):
+            self._search(toolbox_search, q)
+        assert set(self._search(toolbox_search, "fastqc NEAR bowtie2")) == {"fastqc", "bowtie2"}
+        assert self._search(toolbox_search, 'fastqc"')[0] == "fastqc"
+        assert self._search(toolbox_search, '"fastqc"')[0] == "fastqc"
+        assert self._search(toolbox_search, "-fastqc")[0] == "fastqc"
+        assert self._search(toolbox_search, "fastqc*")[0] == "fastqc"
+        assert self._search(toolbox_search, "NEAR") == []
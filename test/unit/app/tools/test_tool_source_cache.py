@@ -0,0 +1,84 @@
+import os
+
+from galaxy.tool_util.loader import expand_tool_source
+from galaxy.tools.cache import ToolSourceCache
+
+MACROS = """<macros>
+    <token name="@VERSION@">1.0</token>
+    <xml name="requirements">
+        <requirements>
+            <requirement type="package" version="@VERSION@">seqtk</requirement>
+        </requirements>
+    </xml>
+</macros>
+"""
+
+TOOL = """<tool id="cached" name="Cached" version="@VERSION@">
+    <macros>
+        <import>macros.xml</import>
+    </macros>
+    <expand macro="requirements"/>
+    <command>seqtk</command>
+</tool>
+"""
+
+
+def _write_tool(tmp_path):
+    (tmp_path / "macros.xml").write_text(MACROS)
+    tool_path = tmp_path / "tool.xml"
+    tool_path.write_text(TOOL)
+    return str(tool_path)
+
+
+def test_expand_tool_source(tmp_path):
+    tool_path = _write_tool(tmp_path)
+    entry = expand_tool_source(tool_path)
+    assert entry is not None
+    path, xml, macro_paths = entry
+    assert path == tool_path
+    assert 'version="1.0"' in xml
+    assert "<requirement" in xml
+    assert macro_paths == [str(tmp_path / "macros.xml")]
+
+
+def test_expand_tool_source_invalid(tmp_path):
+    tool_path = tmp_path / "tool.xml"
+    tool_path.write_text("<tool")
+    assert expand_tool_source(str(tool_path)) is None
+
+
+def test_cache_hit(tmp_path):
+    tool_path = _write_tool(tmp_path)
+    cache = ToolSourceCache(tmp_path / "cache")
+    assert cache.get(tool_path) is None
+    assert cache.missing([tool_path]) == [tool_path]
+    entry = expand_tool_source(tool_path)
+    assert entry
+    cache.set_many([entry])
+    assert cache.get(tool_path) == (entry[1], entry[2])
+    assert cache.missing([tool_path]) == []
+    # entries are shared with other processes through the database
+    assert ToolSourceCache(tmp_path / "cache").get(tool_path) == (entry[1], entry[2])
+
+
+def test_cache_invalidated_by_macro_change(tmp_path):
+    tool_path = _write_tool(tmp_path)
+    cache = ToolSourceCache(tmp_path / "cache")
+    entry = expand_tool_source(tool_path)
+    assert entry
+    cache.set_many([entry])
+    macros_path = tmp_path / "macros.xml"
+    macros_path.write_text(MACROS.replace("1.0", "1.1"))
+    stat = os.stat(macros_path)
+    os.utime(macros_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.get(tool_path) is None
+
+
+def test_cache_invalidated_by_removed_tool(tmp_path):
+    tool_path = _write_tool(tmp_path)
+    cache = ToolSourceCache(tmp_path / "cache")
+    entry = expand_tool_source(tool_path)
+    assert entry
+    cache.set_many([entry])
+    os.remove(tool_path)
+    assert cache.get(tool_path) is None
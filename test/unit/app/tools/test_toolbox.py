@@ -14,6 +14,20 @@ from galaxy.tool_util.unittest_utils.sample_data import (
 
 log = logging.getLogger(__name__)
 
+DATA_SOURCE_TOOL_CONTENTS = """<tool id="data_source_tool" name="Data Source" version="1.0" tool_type="data_source">
+    <description>from a remote site</description>
+    <uihints minwidth="800"/>
+    <command>echo</command>
+    <inputs action="https://example.org/data" check_values="false" method="get">
+        <display>go to the remote site</display>
+    </inputs>
+    <outputs>
+        <data name="output" format="txt" />
+    </outputs>
+    <help>**Help**</help>
+</tool>
+"""
+
 
 class TestToolBox(BaseToolBoxTestCase):
     def test_load_file(self):
@@ -433,3 +447,79 @@ class TestToolBox(BaseToolBoxTestCase):
         default_tool = self.toolbox.get_tool("test_tool")
         assert default_tool.id == "test_tool"
         assert default_tool.version == "0.2"
+
+
+class TestLazyToolBox(BaseToolBoxTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app.config.lazy_load_tools = True  # type: ignore[attr-defined]
+        self.app.config.lazy_tool_cache_size = 1  # type: ignore[attr-defined]
+
+    def test_tools_created_on_first_use(self):
+        self._init_tool(filename="tool_v01.xml", version="0.1")
+        self._init_tool(filename="tool_v02.xml", version="0.2")
+        self._add_config("""<toolbox><tool file="tool_v01.xml" /><tool file="tool_v02.xml" /></toolbox>""")
+        toolbox = self.toolbox
+        assert not toolbox._lazy_tool_cache
+        panel_tool = toolbox._tool_panel["tool_test_tool"]
+        assert panel_tool.is_lazy
+        assert panel_tool.version == "0.2"
+        assert not toolbox._lazy_tool_cache
+
+        tool = toolbox.get_tool("test_tool")
+        assert not getattr(tool, "is_lazy", False)
+        assert tool.version == "0.2"
+        assert tool.lineage is panel_tool.lineage
+        assert toolbox.panel_has_tool(tool, "default")
+        assert toolbox.get_tool("test_tool") is tool
+        # lazy tools compare and hash by identity
+        assert panel_tool != tool
+        assert len({panel_tool, tool}) == 2
+
+    def test_least_recently_used_tool_dropped(self):
+        self._init_tool(filename="tool_v01.xml", version="0.1")
+        self._init_tool(filename="tool_v02.xml", version="0.2")
+        self._add_config("""<toolbox><tool file="tool_v01.xml" /><tool file="tool_v02.xml" /></toolbox>""")
+        toolbox = self.toolbox
+        tool_v02 = toolbox.get_tool("test_tool", tool_version="0.2")
+        tool_v01 = toolbox.get_tool("test_tool", tool_version="0.1")
+        assert tool_v01.version == "0.1"
+        assert len(toolbox._lazy_tool_cache) == 1
+        recreated_tool_v02 = toolbox.get_tool("test_tool", tool_version="0.2")
+        assert recreated_tool_v02 is not tool_v02
+        assert recreated_tool_v02.version == "0.2"
+
+    def test_search_fields_read_without_creating_tool(self):
+        self._init_tool(filename="tool_v01.xml", version="0.1")
+        self._add_config("""<toolbox><section id="t" name="T"><tool file="tool_v01.xml" /></section></toolbox>""")
+        toolbox = self.toolbox
+        tool = toolbox.find_tool("test_tool")
+        assert tool.is_lazy
+        assert tool.get_panel_section() == ("t", "T")
+        assert "raw_help" in tool.__dict__
+        assert tool.repository_id is None
+        assert toolbox.panel_has_tool(tool, "default")
+        assert not toolbox._lazy_tool_cache
+
+    def test_panel_serialized_without_creating_tools(self):
+        self._init_tool(filename="tool_v01.xml", version="0.1")
+        self._init_tool(filename="data_source.xml", tool_contents=DATA_SOURCE_TOOL_CONTENTS)
+        self._add_config(
+            """<toolbox><section id="t" name="T"><tool file="tool_v01.xml" /><tool file="data_source.xml" />"""
+            """</section></toolbox>"""
+        )
+        toolbox = self.toolbox
+        for trans in (mock_trans(), mock_trans(is_admin=True)):
+            (section,) = toolbox.to_dict(trans)
+            assert [tool_dict["id"] for tool_dict in section["elems"]] == ["test_tool", "data_source_tool"]
+            assert toolbox.to_dict(trans, tool_help=True)
+            assert not toolbox._lazy_tool_cache
+            for tool_dict in section["elems"]:
+                tool = toolbox._materialize_tool(toolbox.find_tool(tool_dict["id"]))
+                assert tool_dict == tool.to_dict(trans, link_details=True)
+            toolbox._lazy_tool_cache.clear()
+        data_source_dict = section["elems"][1]
+        assert data_source_dict["target"] == "_top"
+        assert data_source_dict["min_width"] == "800"
+        assert data_source_dict["form_style"] == "special"
+        assert not data_source_dict["is_workflow_compatible"]
@@ -1,5 +1,14 @@
-from galaxy.model.dataset_collections.structure import get_structure
+import pytest
+
+from galaxy import model
+from galaxy.model import mapping
+from galaxy.model.dataset_collections.structure import (
+    CompactTree,
+    get_structure,
+    Tree,
+)
 from galaxy.model.dataset_collections.type_description import CollectionTypeDescriptionFactory
+from galaxy.util.bunch import Bunch
 from .test_matching import (
     list_of_lists_instance,
     list_of_paired_and_unpaired_instance,
@@ -72,3 +81,162 @@ def test_get_structure_list_of_lists_over_single_datasests():
     assert len(tree.children) == 2
     assert tree.children[0][0] == "outer1"
     assert not tree.children[0][1].is_leaf
+
+
+def list_paired_rows():
+    return [
+        (row_id * 10, f"data{row_id}", row_id * 10 + pair_index, identifier)
+        for row_id in (1, 2, 3)
+        for pair_index, identifier in enumerate(("left", "right"))
+    ]
+
+
+def test_compact_tree_from_rows():
+    tree = CompactTree.from_rows(list_paired_rows(), 2, factory.for_collection_type("list:paired"))
+    assert len(tree) == 6
+    assert [identifier for identifier, _ in tree.children] == ["data1", "data2", "data3"]
+    pair = tree.children[1][1]
+    assert pair.collection_type_description.collection_type == "paired"
+    assert [identifier for identifier, _ in pair.children] == ["left", "right"]
+    assert pair.children[0][1].is_leaf
+
+
+def test_compact_tree_empty_subcollection():
+    rows = [(1, "outer1", None, None), (2, "outer2", 3, "inner1")]
+    tree = CompactTree.from_rows(rows, 2, factory.for_collection_type("list:list"))
+    assert len(tree) == 1
+    assert len(tree.children[0][1].children) == 0
+    assert [identifier for identifier, _ in tree.children[1][1].children] == ["inner1"]
+
+
+def test_compact_tree_matches_nested_tree():
+    list_paired_type_description = factory.for_collection_type("list:paired")
+    compact = CompactTree.from_rows(list_paired_rows(), 2, list_paired_type_description)
+    nested = get_structure(list_paired_instance(), list_paired_type_description)
+    assert compact.can_match(nested)
+    assert nested.can_match(compact)
+    assert compact.can_match(compact.clone())
+    shorter = CompactTree.from_rows(list_paired_rows()[:4], 2, list_paired_type_description)
+    assert not compact.can_match(shorter)
+
+
+def test_compact_tree_multiply():
+    compact = CompactTree.from_rows(list_paired_rows(), 2, factory.for_collection_type("list:paired"))
+    paired = CompactTree.from_rows([(1, "forward"), (2, "reverse")], 1, factory.for_collection_type("paired"))
+    multiplied = compact.multiply(paired)
+    assert multiplied.collection_type_description.collection_type == "list:paired:paired"
+    assert len(multiplied) == 12
+    inner = multiplied.children[2][1].children[1][1]
+    assert [identifier for identifier, _ in inner.children] == ["forward", "reverse"]
+
+
+PAIR = [("forward", None), ("reverse", None)]
+LIST_PAIRED = [(f"sample{i}", PAIR) for i in range(3)]
+LIST_LIST_PAIRED = [("outer1", LIST_PAIRED[:2]), ("outer2", []), ("outer3", LIST_PAIRED[2:])]
+
+
+@pytest.fixture(scope="module")
+def sa_session():
+    return mapping.init("/tmp", "sqlite:///:memory:", create_tables=True).session
+
+
+def persisted_collection(sa_session, collection_type, elements):
+    """Persist a collection of ``(element_identifier, subcollection elements or None for a dataset)``."""
+    collection = model.DatasetCollection(collection_type=collection_type)
+    for element_index, (element_identifier, subcollection_elements) in enumerate(elements):
+        if subcollection_elements is None:
+            element = model.HistoryDatasetAssociation(extension="txt", create_dataset=True, sa_session=sa_session)
+        else:
+            subcollection_type = collection_type.split(":", 1)[1]
+            element = persisted_collection(sa_session, subcollection_type, subcollection_elements)
+        model.DatasetCollectionElement(
+            collection=collection, element=element, element_identifier=element_identifier, element_index=element_index
+        )
+    sa_session.add(collection)
+    sa_session.flush()
+    return collection
+
+
+def orm_element_rows(collection, depth):
+    """The rows ``nested_element_identifiers`` should return, built by walking the elements with the ORM."""
+    rows = []
+    for element in collection.elements:
+        row = (element.id, element.element_identifier)
+        if depth == 1:
+            rows.append(row)
+        else:
+            rows.extend(row + child_row for child_row in orm_element_rows(element.child_collection, depth - 1))
+            if not element.child_collection.elements:
+                rows.append(row + (None, None) * (depth - 1))
+    return rows
+
+
+def compact_tree(collection):
+    tree = Tree.for_dataset_collection(collection, factory.for_collection_type(collection.collection_type))
+    assert isinstance(tree, CompactTree)
+    return tree
+
+
+@pytest.mark.parametrize(
+    "collection_type,elements", [("list:paired", LIST_PAIRED), ("list:list:paired", LIST_LIST_PAIRED)]
+)
+def test_nested_element_identifiers(sa_session, collection_type, elements):
+    collection = persisted_collection(sa_session, collection_type, elements)
+    levels = collection_type.count(":") + 1
+    for depth in range(1, levels + 1):
+        assert [tuple(row) for row in collection.nested_element_identifiers(depth)] == orm_element_rows(
+            collection, depth
+        )
+
+
+def test_nested_element_identifiers_not_persisted():
+    assert model.DatasetCollection(collection_type="list:paired").nested_element_identifiers(2) is None
+
+
+@pytest.mark.parametrize(
+    "collection_type,elements", [("list:paired", LIST_PAIRED), ("list:list:paired", LIST_LIST_PAIRED)]
+)
+def test_compact_tree_walk_collections_matches_nested_walk(sa_session, collection_type, elements):
+    collection1 = persisted_collection(sa_session, collection_type, elements)
+    collection2 = persisted_collection(sa_session, collection_type, elements)
+    tree = compact_tree(collection1)
+    collection_dict = {"input1": collection1, "input2": collection2}
+    nested_walk = list(tree._walk_collections(collection_dict))
+    assert len(nested_walk) == len(tree) == 6
+
+    leaf_elements = tree._leaf_elements(collection_dict)
+    assert leaf_elements is not None
+    for name in collection_dict:
+        assert leaf_elements[name] == [elements[name] for elements, _ in nested_walk]
+    hdca_dict = {name: Bunch(collection=collection) for name, collection in collection_dict.items()}
+    assert list(tree.walk_collections(hdca_dict)) == nested_walk
+
+
+def test_compact_tree_walk_collections_of_unpopulated_collection(sa_session):
+    collection = persisted_collection(sa_session, "list:paired", LIST_PAIRED)
+    tree = compact_tree(collection)
+    unpopulated = persisted_collection(sa_session, "list:paired", LIST_PAIRED)
+    unpopulated.populated_state = model.DatasetCollection.populated_states.NEW
+    collection_dict = {"input1": collection, "input2": unpopulated}
+    assert tree._leaf_elements(collection_dict) is None
+    hdca_dict = {name: Bunch(collection=collection) for name, collection in collection_dict.items()}
+    assert list(tree.walk_collections(hdca_dict)) == list(tree._walk_collections(collection_dict))
+
+
+@pytest.mark.parametrize(
+    "collection_type,elements,when_values",
+    [
+        ("list:paired", LIST_PAIRED, [True, False, True]),
+        ("list:list:paired", LIST_LIST_PAIRED, [False, True, True]),
+        ("list:paired", LIST_PAIRED, [False]),
+        ("list:paired", LIST_PAIRED, None),
+    ],
+)
+def test_compact_tree_when_values_match_nested_walk(sa_session, collection_type, elements, when_values):
+    collection = persisted_collection(sa_session, collection_type, elements)
+    tree = compact_tree(collection)
+    # mapping over a conditionally executed step gives one when value per element of the mapped over collection
+    tree.when_values = when_values
+    nested_walk = list(tree._walk_collections({"input": collection}))
+    assert tree._leaf_when_values() == [when_value for _, when_value in nested_walk]
+    assert list(tree.walk_collections({"input": Bunch(collection=collection)})) == nested_walk
@@ -7,9 +7,25 @@ from galaxy.datatypes.sniff import (
     convert_newlines,
     convert_newlines_sep2tabs,
     convert_sep2tabs,
+    FilePrefix,
+    get_headers,
     get_test_fname,
+    guess_ext,
+    guess_ext_many,
 )
 
+SNIFF_TEST_FILES = [
+    "1.bam",
+    "1.fastqsanger.gz",
+    "1.psl",
+    "complete.bed",
+    "empty.txt",
+    "interval.interval",
+    "megablast_xml_parser_test1.blastxml",
+    "test.gff",
+    "test_tab.bed",
+]
+
 
 def assert_converts_to_1234_convert_sep2tabs(content, expected="1\t2\n3\t4\n"):
     with tempfile.NamedTemporaryFile(delete=False, mode="w") as tf:
@@ -109,3 +125,26 @@ def test_infer_from_filename():
     assert datatypes_registry.get_datatype_from_filename("mycool.fq").file_ext == "fastqsanger"
     assert datatypes_registry.get_datatype_from_filename("mycool.fq.gz").file_ext == "fastqsanger.gz"
     assert datatypes_registry.get_datatype_from_filename("mycool.fastq").file_ext == "fastqsanger"
+
+
+def test_sniffer_index_matches_sniff_order():
+    datatypes_registry = example_datatype_registry_for_sample()
+    for fname in SNIFF_TEST_FILES:
+        path = get_test_fname(fname)
+        assert guess_ext(path, datatypes_registry.sniffer_index) == guess_ext(path, datatypes_registry.sniff_order)
+
+
+def test_guess_ext_many():
+    datatypes_registry = example_datatype_registry_for_sample()
+    paths = [get_test_fname(fname) for fname in SNIFF_TEST_FILES]
+    expected = [guess_ext(path, datatypes_registry.sniff_order) for path in paths]
+    assert guess_ext_many(paths, datatypes_registry.sniffer_index, processes=2) == expected
+    assert guess_ext_many(paths, datatypes_registry.sniffer_index, processes=1) == expected
+
+
+def test_file_prefix_headers_are_not_shared():
+    file_prefix = FilePrefix(get_test_fname("complete.bed"))
+    headers = get_headers(file_prefix, "\t")
+    headers[0][0] = "changed"
+    assert get_headers(file_prefix, "\t")[0][0] == "chr7"
+    assert get_headers(file_prefix, "\t") == get_headers(get_test_fname("complete.bed"), "\t")
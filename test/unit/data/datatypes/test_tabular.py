@@ -1,10 +1,21 @@
+import io
+import json
 import tempfile
 
 from galaxy.datatypes.tabular import (
+    build_line_index,
+    iter_sampled_lines,
+    line_offset,
     MAX_DATA_LINES,
     Tabular,
+    widen_column_type,
+    write_line_index,
+)
+from galaxy.util.bunch import Bunch
+from .util import (
+    MockDataset,
+    MockMetadata,
 )
-from .util import MockDataset
 
 
 def test_tabular_set_meta_large_file():
@@ -112,3 +123,94 @@ def test_tabular_column_types_override():
         assert dataset.metadata.columns == 6
         assert dataset.metadata.delimiter == "\t"
         assert not hasattr(dataset.metadata, "column_names")
+
+
+def test_tabular_set_meta_sampled():
+    """
+    a file larger than sample_size is only read in blocks spread over the file,
+    column types are still updated by the last lines of the file
+    """
+    with tempfile.NamedTemporaryFile(mode="w") as test_file:
+        test_file.write("name\tvalue\n")
+        for i in range(MAX_DATA_LINES + 1):
+            test_file.write(f"A\t{i}\n")
+        test_file.write("B\t1.5\n")
+        test_file.flush()
+        dataset = MockDataset(id=1)
+        dataset.set_file_name(test_file.name)
+        Tabular().set_meta(dataset, sample_size=64 * 1024)  # type: ignore [arg-type]
+        assert dataset.metadata.data_lines is None
+        assert dataset.metadata.comment_lines is None
+        assert dataset.metadata.column_types == ["str", "float"]
+        assert dataset.metadata.column_types_sampled is True
+        assert dataset.metadata.columns == 2
+
+        dataset = MockDataset(id=1)
+        dataset.set_file_name(test_file.name)
+        Tabular().set_meta(dataset, max_data_lines=None)  # type: ignore [arg-type]
+        assert dataset.metadata.data_lines == MAX_DATA_LINES + 3
+        assert dataset.metadata.column_types == ["str", "float"]
+        assert dataset.metadata.column_types_sampled is False
+
+
+def test_iter_sampled_lines():
+    with tempfile.NamedTemporaryFile(mode="w") as test_file:
+        lines = [f"line {i}\n" for i in range(10000)]
+        test_file.write("".join(lines))
+        test_file.flush()
+        file_size = sum(len(line) for line in lines)
+        sampled_lines = list(iter_sampled_lines(test_file.name, file_size, 4096, block_size=512))
+        assert sampled_lines == list(iter_sampled_lines(test_file.name, file_size, 4096, block_size=512))
+        assert sampled_lines[0] == lines[0]
+        assert sampled_lines[-1] == lines[-1]
+        # only complete lines in file order
+        assert set(sampled_lines) <= set(lines)
+        assert sampled_lines == sorted(sampled_lines, key=lines.index)
+        assert 3000 < sum(len(line) for line in sampled_lines) <= 4096
+
+
+def test_widen_column_type():
+    assert widen_column_type(None, ["", "1", "-2"]) == "int"
+    assert widen_column_type("int", ["1", "2.5", "NA"]) == "float"
+    assert widen_column_type("float", ["1", "1,2"]) == "list"
+    assert widen_column_type("list", ["1", "x", "1,2"]) == "str"
+    assert widen_column_type("int", ["1_000"]) == "str"
+    assert widen_column_type("float", ["", "3"]) == "float"
+
+
+def test_line_index():
+    with tempfile.NamedTemporaryFile(mode="w") as test_file, tempfile.NamedTemporaryFile() as index_file:
+        lines = [f"{i}\t{'x' * (i % 7)}\n" for i in range(1000)]
+        test_file.write("".join(lines))
+        test_file.flush()
+        offsets = [sum(len(line) for line in lines[:i]) for i in range(len(lines) + 1)]
+        line_index = build_line_index(test_file.name, 100, block_size=64)
+        assert list(line_index) == [100] + offsets[:-1:100]
+        write_line_index(line_index, index_file.name)
+        for line in (0, 1, 99, 100, 101, 555, 999, 1000, 2000):
+            expected = offsets[min(line, len(lines))]
+            assert line_offset(test_file.name, line, index_file.name) == expected
+            assert line_offset(test_file.name, line) == expected
+
+
+def test_get_chunk_reads_through_object_store():
+    content = "".join(f"{i}\tfeature{i}\n" for i in range(100)).encode()
+
+    class ObjectStore:
+        def open_data(self, dataset):
+            return io.BytesIO(content)
+
+    class UncachedDataset(MockDataset):
+        def get_file_name(self, sync_cache=True):
+            raise AssertionError("the file must not be pulled into the cache")
+
+    dataset = UncachedDataset(1)
+    dataset.dataset = Bunch(object_store=ObjectStore(), external_filename=None)
+    dataset.metadata = MockMetadata(line_index=None)
+    trans = Bunch(app=Bunch(config=Bunch(display_chunk_size=20)))
+    tabular = Tabular()
+    offset = tabular.get_row_offset(dataset, 50)  # type: ignore [arg-type]
+    assert offset == content.index(b"50\t")
+    chunk = json.loads(tabular.get_chunk(trans, dataset, offset))
+    assert chunk["ck_data"] == "50\tfeature50\n51\tfeature51"
+    assert chunk["offset"] == content.index(b"52\t")
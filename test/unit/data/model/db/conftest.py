@@ -13,6 +13,7 @@ from sqlalchemy.orm import Session
 
 from galaxy import model as m
 from galaxy.datatypes.registry import Registry as DatatypesRegistry
+from galaxy.model.triggers.job_state_counts import install as install_job_state_count_triggers
 from galaxy.model.triggers.update_audit_table import install as install_timestamp_triggers
 from .. import MockObjectStore
 
@@ -48,6 +49,7 @@ def init_database(engine: "Engine") -> None:
     """Create database objects."""
     m.mapper_registry.metadata.create_all(engine)
     install_timestamp_triggers(engine)
+    install_job_state_count_triggers(engine)
 
 
 @pytest.fixture(autouse=True, scope="module")
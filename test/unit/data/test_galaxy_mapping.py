@@ -1,10 +1,15 @@
 import os
 import random
+import threading
 import uuid
-from tempfile import NamedTemporaryFile
+from tempfile import (
+    NamedTemporaryFile,
+    TemporaryDirectory,
+)
 
 import pytest
 from sqlalchemy import (
+    event,
     inspect,
     select,
 )
@@ -20,7 +25,12 @@ from galaxy.model.orm.util import (
 )
 from galaxy.model.security import GalaxyRBACAgent
 from galaxy.model.unittest_utils.utils import random_email
-from galaxy.objectstore import QuotaSourceMap
+from galaxy.objectstore import (
+    persist_extra_files_for_dataset,
+    QuotaSourceMap,
+)
+from galaxy.objectstore.examples import get_example
+from galaxy.objectstore.unittest_utils import Config as TestConfig
 from galaxy.util.unittest import TestCase
 
 datatypes_registry = galaxy.datatypes.registry.Registry()
@@ -641,6 +651,32 @@ class TestMappings(BaseModelTestCase):
             security_agent.make_dataset_public(d1.dataset)
         assert model.CANNOT_SHARE_PRIVATE_DATASET_MESSAGE in str(exec_info.value)
 
+    def test_persist_extra_files_uses_session_on_calling_thread(self):
+        dataset = model.Dataset(state=model.Dataset.states.NEW)
+        self.persist(dataset)
+        assert "id" not in inspect(dataset).dict
+        orm_threads = []
+
+        def record_thread(*args):
+            orm_threads.append(threading.current_thread())
+
+        event.listen(self.model.engine, "before_cursor_execute", record_thread)
+        event.listen(model.Dataset.object_store_id, "set", record_thread)
+        try:
+            with TestConfig(get_example("distributed_disk.yml")) as (_, object_store), TemporaryDirectory() as extra:
+                for i in range(20):
+                    with open(os.path.join(extra, f"file_{i}.txt"), "w") as f:
+                        f.write(str(i))
+                persist_extra_files_for_dataset(object_store, extra, dataset, "extra", max_workers=4)
+                assert dataset.object_store_id in object_store.backends
+                assert len(os.listdir(object_store.get_filename(dataset, extra_dir="extra", dir_only=True))) == 20
+        finally:
+            event.remove(self.model.engine, "before_cursor_execute", record_thread)
+            event.remove(model.Dataset.object_store_id, "set", record_thread)
+        # the dataset was loaded and its object store set, on this thread only
+        assert len(orm_threads) >= 2
+        assert set(orm_threads) == {threading.current_thread()}
+
     def _three_users(self, suffix):
         email_from = f"user_{suffix}e1@example.com"
         email_to = f"user_{suffix}e2@example.com"
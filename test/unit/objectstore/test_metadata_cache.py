@@ -0,0 +1,103 @@
+import time
+
+from galaxy.objectstore._metadata_cache import (
+    coalesced_metadata_invalidations,
+    RemoteMetadataCache,
+)
+
+
+class FakeRemote:
+    def __init__(self):
+        self.sizes = {"000/dataset_1.dat": 10}
+        self.calls = 0
+
+    def exists(self, rel_path: str) -> bool:
+        self.calls += 1
+        return rel_path in self.sizes
+
+    def size(self, rel_path: str) -> int:
+        self.calls += 1
+        return self.sizes.get(rel_path, -1)
+
+
+def test_metadata_cache_hits_and_misses():
+    remote = FakeRemote()
+    metadata_cache = RemoteMetadataCache("staging", ttl=60)
+    assert metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    assert metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    assert metadata_cache.size("000/dataset_1.dat", remote.size) == 10
+    assert metadata_cache.size("000/dataset_1.dat", remote.size) == 10
+    assert remote.calls == 2
+    assert (metadata_cache.hits, metadata_cache.misses) == (2, 2)
+
+
+def test_metadata_cache_does_not_cache_missing_objects():
+    remote = FakeRemote()
+    metadata_cache = RemoteMetadataCache("staging", ttl=60)
+    assert not metadata_cache.exists("000/dataset_2.dat", remote.exists)
+    assert metadata_cache.size("000/dataset_2.dat", remote.size) == -1
+    remote.sizes["000/dataset_2.dat"] = 5
+    assert metadata_cache.exists("000/dataset_2.dat", remote.exists)
+    assert metadata_cache.size("000/dataset_2.dat", remote.size) == 5
+    assert remote.calls == 4
+
+
+def test_metadata_cache_expires():
+    remote = FakeRemote()
+    metadata_cache = RemoteMetadataCache("staging", ttl=0.01)
+    metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    time.sleep(0.02)
+    metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    assert remote.calls == 2
+
+
+def test_metadata_cache_is_bounded():
+    remote = FakeRemote()
+    metadata_cache = RemoteMetadataCache("staging", ttl=60, max_entries=2)
+    for i in range(3):
+        metadata_cache.exists(f"000/dataset_{i}.dat", remote.exists)
+    metadata_cache.exists("000/dataset_0.dat", remote.exists)
+    assert remote.calls == 4
+
+
+def test_metadata_cache_invalidate_publishes():
+    remote = FakeRemote()
+    published = []
+    metadata_cache = RemoteMetadataCache("staging", ttl=60)
+    metadata_cache.publish = lambda cache_key, rel_paths: published.append((cache_key, rel_paths))
+    metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    metadata_cache.exists("000/dataset_1_files/a.txt", remote.exists)
+    metadata_cache.invalidate("000/dataset_1.dat")
+    metadata_cache.invalidate("000/dataset_1_files", recursive=True)
+    assert published == [("staging", ["000/dataset_1.dat"]), ("staging", ["000/dataset_1_files/"])]
+
+    metadata_cache.exists("000/dataset_1.dat", remote.exists)
+    metadata_cache.exists("000/dataset_1_files/a.txt", remote.exists)
+    assert remote.calls == 4
+
+
+def test_metadata_cache_invalidate_local_from_other_process():
+    remote = FakeRemote()
+    metadata_cache = RemoteMetadataCache("staging", ttl=60)
+    metadata_cache.size("000/dataset_1.dat", remote.size)
+    remote.sizes["000/dataset_1.dat"] = 20
+    metadata_cache.invalidate_local(["000/dataset_1.dat"])
+    assert metadata_cache.size("000/dataset_1.dat", remote.size) == 20
+
+
+def test_metadata_cache_coalesces_invalidations():
+    remote = FakeRemote()
+    published = []
+    metadata_cache = RemoteMetadataCache("staging", ttl=60)
+    metadata_cache.publish = lambda cache_key, rel_paths: published.append((cache_key, rel_paths))
+    with coalesced_metadata_invalidations():
+        metadata_cache.exists("000/dataset_1.dat", remote.exists)
+        metadata_cache.invalidate("000/dataset_1.dat")
+        # dropped locally right away, broadcast when the context exits
+        metadata_cache.exists("000/dataset_1.dat", remote.exists)
+        assert remote.calls == 2
+        with coalesced_metadata_invalidations():
+            metadata_cache.invalidate("000/dataset_1.dat")
+            metadata_cache.invalidate("000/dataset_1_files", recursive=True)
+        assert published == []
+    assert published == [("staging", ["000/dataset_1.dat", "000/dataset_1_files/"])]
@@ -1,11 +1,14 @@
 import os
+import random
 import shutil
+import threading
 import time
 from functools import wraps
 from tempfile import (
     mkdtemp,
     mkstemp,
 )
+from typing import Optional
 from unittest.mock import patch
 from uuid import uuid4
 
@@ -13,9 +16,21 @@ import pytest
 from requests import get
 
 from galaxy.exceptions import ObjectInvalid
-from galaxy.objectstore import persist_extra_files_for_dataset
+from galaxy.objectstore import (
+    caching,
+    persist_extra_files_for_dataset,
+)
+from galaxy.objectstore._metadata_cache import (
+    coalesced_metadata_invalidations,
+    RemoteMetadataCache,
+)
+from galaxy.objectstore._selection import (
+    AliasSampler,
+    BackendSelector,
+)
 from galaxy.objectstore.azure_blob import AzureBlobObjectStore
 from galaxy.objectstore.caching import (
+    CacheIndex,
     CacheTarget,
     check_cache,
     InProcessCacheMonitor,
@@ -118,6 +133,10 @@ def test_disk_store():
             data = object_store.get_data(hello_world_dataset, start=1, count=6)
             assert data == "ello W"
 
+            with object_store.open_data(hello_world_dataset) as fh:
+                fh.seek(6)
+                assert fh.read() == b"World!"
+
             # Test Size
 
             # Test absent and empty datasets yield size of 0.
@@ -148,6 +167,30 @@ def test_disk_store():
             assert not os.path.exists(to_delete_real_path)
 
 
+def test_disk_store_persist_extra_files_concurrently(tmp_path):
+    with TestConfig(DISK_TEST_CONFIG_YAML) as (directory, object_store):
+        extra_files_dataset = MockDataset(7)
+        object_store.create(extra_files_dataset)
+        extra = tmp_path / "extra"
+        for i in range(50):
+            subdir = extra / f"dir_{i % 5}"
+            subdir.mkdir(parents=True, exist_ok=True)
+            (subdir / f"file_{i}.txt").write_text(f"value {i}")
+
+        persist_extra_files_for_dataset(
+            object_store,
+            str(extra),
+            extra_files_dataset,  # type: ignore[arg-type,unused-ignore]
+            extra_files_dataset._extra_files_rel_path,
+            max_workers=8,
+        )
+
+        extra_path = _extra_file_path(object_store, extra_files_dataset)
+        for i in range(50):
+            with open(os.path.join(extra_path, f"dir_{i % 5}", f"file_{i}.txt")) as f:
+                assert f.read() == f"value {i}"
+
+
 DISK_TEST_CONFIG_BY_UUID_YAML = """
 type: disk
 files_dir: "${temp_directory}/files1"
@@ -514,6 +557,59 @@ def test_distributed_store_with_cache_targets():
             assert len(object_store.cache_targets()) == 2
 
 
+def test_distributed_store_selection_policy():
+    config_str = DISTRIBUTED_TEST_CONFIG_YAML.replace(
+        "type: distributed\n", "type: distributed\nselection_policy: capacity\n", 1
+    )
+    with TestConfig(config_str) as (_, object_store):
+        as_dict = object_store.to_dict()
+        assert as_dict["selection_policy"] == "capacity"
+        assert [backend["weight"] for backend in as_dict["backends"]] == [2, 1]
+
+        # files1 is nearly full, new datasets go to files2
+        object_store.backend_selector.update_usage("files1", 99.9)
+        object_store.backend_selector.update_usage("files2", 10.0)
+        persisted_ids = []
+        for i in range(20):
+            dataset = MockDataset(100 + i)
+            object_store.create(dataset)
+            persisted_ids.append(dataset.object_store_id)
+        assert persisted_ids.count("files2") > persisted_ids.count("files1")
+        assert sum(object_store.backend_selector.placements.values()) == 20
+
+
+def test_alias_sampler():
+    sampler = AliasSampler({"a": 3, "b": 1, "c": 0})
+    assert len(sampler) == 2
+    rng = random.Random(1)
+    samples = [sampler.sample(rng) for _ in range(4000)]
+    assert "c" not in samples
+    assert 2700 < samples.count("a") < 3300
+
+    with pytest.raises(IndexError):
+        AliasSampler({"a": 0}).sample()
+
+
+def test_backend_selector_excludes_full_and_small_backends():
+    selector = BackendSelector({"big": 1, "small": 1}, policy="capacity", rng=random.Random(1))
+    selector.update_usage("big", 50.0, free_bytes=1000)
+    selector.update_usage("small", 50.0, free_bytes=10)
+    assert {selector.select(100) for _ in range(50)} == {"big"}
+    selector.update_usage("big", 95.0, free_bytes=1000, full=True)
+    assert {selector.select() for _ in range(50)} == {"small"}
+    selector.update_usage("small", 95.0, free_bytes=10, full=True)
+    with pytest.raises(IndexError):
+        selector.select()
+
+
+def test_backend_selector_load_policy_prefers_fast_backends():
+    selector = BackendSelector({"fast": 1, "slow": 1}, policy="load", rebuild_interval=0)
+    selector.record_write("fast", 1000, 0.01)
+    selector.record_write("slow", 1000, 1.0)
+    weights = selector.effective_weights(1000)
+    assert weights["fast"] > weights["slow"]
+
+
 HIERARCHICAL_MUST_HAVE_UNIFIED_QUOTA_SOURCE = """<?xml version="1.0"?>
 <object_store type="hierarchical" private="true">
     <backends>
@@ -652,6 +748,76 @@ def test_config_parse_s3_with_default_cache():
             assert object_store.staging_path == directory.global_config.object_store_cache_path
 
 
+class FakeRemoteObject:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.requested_ranges: list[tuple[int, Optional[int]]] = []
+
+    def read_range(self, rel_path: str, start: int, length: Optional[int]) -> bytes:
+        self.requested_ranges.append((start, length))
+        end = None if length is None else start + length
+        return self.content[start:end]
+
+
+@patch_object_stores_to_skip_initialize
+def test_caching_store_reads_uncached_objects_with_ranges(tmp_path):
+    content = b"".join(b"line %d\n" % i for i in range(300000))
+    remote = FakeRemoteObject(content)
+    with TestConfig(get_example("boto3_simple.yml")) as (_, object_store):
+        object_store.staging_path = str(tmp_path)
+        object_store._read_remote_range = remote.read_range
+        object_store._get_remote_size = lambda rel_path: len(content)
+        dataset = MockDataset(1)
+        block_size = object_store.block_cache.block_size
+        with object_store.open_data(dataset) as fh:
+            fh.seek(block_size + 10)
+            assert fh.read(20) == content[block_size + 10 : block_size + 30]
+            assert remote.requested_ranges == [(block_size, block_size)]
+            # reading up to the end is a single open-ended request
+            assert fh.read() == content[block_size + 30 :]
+            assert len(remote.requested_ranges) == 2
+            assert remote.requested_ranges[-1][1] is None
+        remote.requested_ranges.clear()
+        assert object_store.get_data(dataset, start=len(content) - 8) == content[-8:].decode()
+        assert remote.requested_ranges == [(len(content) - 8, None)]
+        # nothing was pulled into the cache
+        assert os.listdir(tmp_path) == []
+
+
+@patch_object_stores_to_skip_initialize
+def test_caching_store_broadcasts_metadata_invalidations_after_push(tmp_path):
+    remote_sizes: dict[str, int] = {}
+    published = []
+
+    def push_string(rel_path, from_string):
+        remote_sizes[rel_path] = len(from_string)
+        return True
+
+    def push_file(rel_path, source_file):
+        remote_sizes[rel_path] = os.path.getsize(source_file)
+        return True
+
+    source_file = tmp_path / "source.txt"
+    source_file.write_text("moo\n")
+    with TestConfig(get_example("boto3_simple.yml")) as (_, object_store):
+        object_store.staging_path = str(tmp_path / "cache")
+        object_store._exists_remotely = lambda rel_path: rel_path in remote_sizes
+        object_store._get_remote_size = lambda rel_path: remote_sizes.get(rel_path, -1)
+        object_store._push_string_to_path = push_string
+        object_store._push_file_to_path = push_file
+        metadata_cache = RemoteMetadataCache(object_store.staging_path, ttl=60)
+        # record what the remote store holds when other processes are told to forget it
+        metadata_cache.publish = lambda cache_key, rel_paths: published.append((rel_paths, dict(remote_sizes)))
+        object_store._remote_metadata_cache = metadata_cache
+        dataset = MockDataset(1)
+        with coalesced_metadata_invalidations():
+            object_store.update_from_file(dataset, file_name=str(source_file), create=True)
+            assert published == []
+        rel_path = object_store._construct_path(dataset)
+        assert published == [([rel_path], {rel_path: 4})]
+        assert metadata_cache.size(rel_path, object_store._get_remote_size) == 4
+
+
 @patch_object_stores_to_skip_initialize
 def test_config_parse_boto3():
     for config_str in [get_example("boto3_simple.xml"), get_example("boto3_simple.yml")]:
@@ -966,6 +1132,104 @@ def test_check_cache_sanity(tmp_path):
     assert not path.exists()
 
 
+def _write_cache_file(cache_dir, name, size):
+    path = cache_dir / name
+    path.write_bytes(b"0" * size)
+    return path
+
+
+def test_check_cache_with_index_lru(tmp_path):
+    cache_dir = tmp_path
+    paths = [_write_cache_file(cache_dir, f"a_file_{i}", 100) for i in range(3)]
+    cache_index = CacheIndex(cache_dir)
+    cache_index.rescan()
+    for name in ["a_file_1", "a_file_2", "a_file_0"]:
+        cache_index.touch(name, 100)
+    assert cache_index.total_size() == 300
+    # allows for two of the files
+    cache_target = CacheTarget(cache_dir, 1, 250 / (1024 * 1024 * 1024), "lru")
+    check_cache(cache_target)
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+    assert cache_index.total_size() == 200
+
+
+def test_check_cache_with_index_lfu_and_size(tmp_path):
+    cache_dir = tmp_path
+    small_path = _write_cache_file(cache_dir, "small", 10)
+    big_path = _write_cache_file(cache_dir, "big", 1000)
+    cache_index = CacheIndex(cache_dir)
+    cache_index.rescan()
+    for _ in range(3):
+        cache_index.touch("small", 10)
+    cache_index.touch("big", 1000)
+
+    check_cache(CacheTarget(cache_dir, 1, 1005 / (1024 * 1024 * 1024), "size"))
+    assert small_path.exists()
+    assert not big_path.exists()
+
+    big_path = _write_cache_file(cache_dir, "big", 1000)
+    for _ in range(5):
+        cache_index.touch("big", 1000)
+    check_cache(CacheTarget(cache_dir, 1, 1005 / (1024 * 1024 * 1024), "lfu"))
+    assert not small_path.exists()
+    assert big_path.exists()
+
+
+def test_cache_index_rescan_drops_missing_files(tmp_path):
+    cache_dir = tmp_path
+    path = _write_cache_file(cache_dir, "a_file_0", 100)
+    cache_index = CacheIndex(cache_dir)
+    cache_index.rescan()
+    assert cache_index.total_size() == 100
+    path.unlink()
+    (cache_dir / "000").mkdir()
+    _write_cache_file(cache_dir / "000", "dataset_1.dat", 10)
+    cache_index.rescan()
+    assert cache_index.total_size() == 10
+    cache_index.remove("000", recursive=True)
+    assert cache_index.total_size() == 0
+
+
+def test_cache_index_rescan_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(caching, "CACHE_INDEX_RESCAN_BATCH_SIZE", 2)
+    cache_dir = tmp_path
+    for i in range(5):
+        _write_cache_file(cache_dir, f"a_file_{i}", 10)
+    cache_index = CacheIndex.for_path(cache_dir)
+    cache_index.rescan()
+    assert cache_index.total_size() == 50
+    assert not cache_index.needs_rescan()
+
+
+def test_cache_index_connection_per_thread(tmp_path):
+    cache_index = CacheIndex.for_path(tmp_path)
+    assert CacheIndex.for_path(str(tmp_path)) is cache_index
+    assert cache_index._connect() is cache_index._connect()
+    connections = []
+
+    def touch(i):
+        connections.append(cache_index._connect())
+        cache_index.touch(f"a_file_{i}", 10)
+
+    threads = [threading.Thread(target=touch, args=(i,)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(conn) for conn in connections}) == 3
+    assert cache_index._connect() not in connections
+    assert cache_index.total_size() == 30
+
+
+def test_cache_index_refuses_network_file_systems(tmp_path, monkeypatch):
+    caching.check_cache_index_path(str(tmp_path))
+    monkeypatch.setattr(caching, "_file_system_type", lambda path: "nfs4")
+    with pytest.raises(Exception, match="local file system"):
+        caching.check_cache_index_path(str(tmp_path))
+
+
 def test_fits_in_cache_check(tmp_path):
     cache_dir = tmp_path
     big_cache_target = CacheTarget(cache_dir, 1, 0.2)
@@ -1034,6 +1298,10 @@ def verify_caching_object_store_functionality(tmp_path, object_store, check_get_
     data = object_store.get_data(hello_world_dataset_2, start=1, count=6)
     assert data == "ello W"
     reset_cache(object_store.cache_target)
+    with object_store.open_data(hello_world_dataset_2) as fh:
+        fh.seek(6)
+        assert fh.read() == b"World!"
+    reset_cache(object_store.cache_target)
     path = object_store.get_filename(hello_world_dataset_2)
     assert open(path).read() == "Hello World!"
 
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import pytest
+
+from galaxy.objectstore._transfer import (
+    BlockCache,
+    download_in_parts,
+    PARTIAL_SUFFIX,
+    ranged_transfer_config,
+    RangedDownloadError,
+)
+
+CONTENT = bytes(range(256)) * 40
+
+
+class FakeRemote:
+    def __init__(self, content: bytes, fail_at_offset=None, delay=0.0):
+        self.content = content
+        self.fail_at_offset = fail_at_offset
+        self.delay = delay
+        self.requested_offsets: list[int] = []
+
+    def read_range(self, start: int, length: Optional[int]) -> bytes:
+        if start == self.fail_at_offset:
+            raise ConnectionResetError("connection reset")
+        time.sleep(self.delay)
+        self.requested_offsets.append(start)
+        end = None if length is None else start + length
+        return self.content[start:end]
+
+
+def test_download_in_parts(tmp_path):
+    destination = str(tmp_path / "dataset_1.dat")
+    remote = FakeRemote(CONTENT)
+    download_in_parts(remote.read_range, len(CONTENT), destination, 1000, 4)
+    with open(destination, "rb") as fh:
+        assert fh.read() == CONTENT
+    assert sorted(remote.requested_offsets) == list(range(0, len(CONTENT), 1000))
+    assert os.listdir(tmp_path) == ["dataset_1.dat"]
+
+
+def test_download_in_parts_resumes(tmp_path):
+    destination = str(tmp_path / "dataset_1.dat")
+    failing_remote = FakeRemote(CONTENT, fail_at_offset=5000)
+    with pytest.raises(ConnectionResetError):
+        download_in_parts(failing_remote.read_range, len(CONTENT), destination, 1000, 1)
+    assert not os.path.exists(destination)
+    assert os.path.exists(f"{destination}{PARTIAL_SUFFIX}")
+
+    remote = FakeRemote(CONTENT)
+    download_in_parts(remote.read_range, len(CONTENT), destination, 1000, 2)
+    with open(destination, "rb") as fh:
+        assert fh.read() == CONTENT
+    # only parts not downloaded by the failed attempt are requested again
+    assert 0 not in remote.requested_offsets
+    assert 5000 in remote.requested_offsets
+
+
+def test_download_in_parts_short_read(tmp_path):
+    destination = str(tmp_path / "dataset_1.dat")
+    remote = FakeRemote(CONTENT[:-10])
+    with pytest.raises(RangedDownloadError):
+        download_in_parts(remote.read_range, len(CONTENT), destination, 1000, 2)
+    assert not os.path.exists(destination)
+
+
+def test_download_in_parts_remote_changed(tmp_path):
+    destination = str(tmp_path / "dataset_1.dat")
+    remote = FakeRemote(CONTENT)
+    with pytest.raises(RangedDownloadError):
+        download_in_parts(remote.read_range, len(CONTENT), destination, 1000, 2, remote_size=lambda: len(CONTENT) + 1)
+    assert os.listdir(tmp_path) == []
+
+
+def test_concurrent_downloads_in_parts(tmp_path):
+    destination = str(tmp_path / "dataset_1.dat")
+    remote = FakeRemote(CONTENT, delay=0.01)
+    errors = []
+
+    def download():
+        try:
+            download_in_parts(remote.read_range, len(CONTENT), destination, 1000, 2, remote_size=lambda: len(CONTENT))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=download) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    with open(destination, "rb") as fh:
+        assert fh.read() == CONTENT
+    # the downloads waiting for the lock reuse the finished destination
+    assert sorted(remote.requested_offsets) == list(range(0, len(CONTENT), 1000))
+    assert os.listdir(tmp_path) == ["dataset_1.dat"]
+
+
+def test_ranged_transfer_config():
+    assert not ranged_transfer_config({}).enabled
+    config = ranged_transfer_config({"ranged_download_part_size": "1024", "ranged_download_max_concurrency": "8"})
+    assert config.enabled
+    assert config.part_size == 1024
+    assert ranged_transfer_config(config.to_dict()) == config
+
+
+def test_block_cache_reads_ranges():
+    remote = FakeRemote(CONTENT)
+    block_cache = BlockCache(block_size=1000, max_blocks=2)
+    assert block_cache.read(remote.read_range, "a", 10, 20, len(CONTENT)) == CONTENT[10:30]
+    assert block_cache.read(remote.read_range, "a", 990, 20, len(CONTENT)) == CONTENT[990:1010]
+    assert remote.requested_offsets == [0, 1000]
+    # reads past the end of the object are truncated
+    assert block_cache.read(remote.read_range, "a", len(CONTENT) - 5, 20, len(CONTENT)) == CONTENT[-5:]
+    assert block_cache.read(remote.read_range, "a", len(CONTENT), 20, len(CONTENT)) == b""
+    # block 0 was evicted to make room for the last block
+    block_cache.read(remote.read_range, "a", 0, 10, len(CONTENT))
+    assert remote.requested_offsets == [0, 1000, 10000, 0]
+
+
+def test_block_cache_invalidate():
+    remote = FakeRemote(CONTENT)
+    block_cache = BlockCache(block_size=1000)
+    block_cache.read(remote.read_range, "a", 0, 10, len(CONTENT))
+    block_cache.invalidate("a")
+    block_cache.read(remote.read_range, "a", 0, 10, len(CONTENT))
+    assert remote.requested_offsets == [0, 0]
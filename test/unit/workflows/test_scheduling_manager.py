@@ -0,0 +1,170 @@
+import threading
+import time
+from contextlib import nullcontext
+from unittest import mock
+
+from galaxy import model
+from galaxy.util import StructuredExecutionTimer
+from galaxy.util.bunch import Bunch
+from galaxy.workflow.scheduling_manager import (
+    round_robin_by_user,
+    WorkflowRequestMonitor,
+)
+
+
+def test_round_robin_by_user():
+    invocations = [(1, 10), (2, 10), (3, 10), (4, 20), (5, None), (6, 20)]
+    assert round_robin_by_user(invocations) == [1, 4, 5, 2, 6, 3]
+
+
+def test_round_robin_by_user_empty():
+    assert round_robin_by_user([]) == []
+
+
+class MockInvocation:
+    states = model.WorkflowInvocation.states
+
+    def __init__(self, invocation_id):
+        self.id = invocation_id
+        self.state = self.states.READY
+        self.active = True
+
+
+def _monitor(workers=1):
+    invocations: dict[int, MockInvocation] = {}
+    session = Bunch(get=lambda model_class, invocation_id: invocations[invocation_id])
+    config = Bunch(
+        workflow_scheduling_workers=workers,
+        workflow_scheduling_events=True,
+        workflow_scheduling_time_budget=-1,
+        workflow_scheduling_separate_materialization_iteration=False,
+        workflow_monitor_sleep=1,
+        workflow_monitor_fallback_sleep=30,
+        maximum_workflow_invocation_duration=-1,
+        history_local_serial_workflow_scheduling=False,
+        monitor_thread_join_timeout=1,
+    )
+    app = Bunch(
+        config=config,
+        job_config=Bunch(self_handler_tags=[]),
+        execution_timer_factory=Bunch(get_timer=StructuredExecutionTimer),
+        model=Bunch(context=lambda: nullcontext(session)),
+    )
+    manager = Bunch(default_handler_id="main", handler_assignment_methods=None, handler_max_grab=None)
+    monitor = WorkflowRequestMonitor(app, manager)  # type: ignore[arg-type]
+
+    def schedule(workflow_scheduler, invocation_ids, requested=True):
+        for invocation_id in invocation_ids:
+            invocations.setdefault(invocation_id, MockInvocation(invocation_id))
+        with mock.patch.object(
+            monitor, "_WorkflowRequestMonitor__active_invocation_ids", lambda scheduler_id, ids=None: invocation_ids
+        ):
+            monitor._WorkflowRequestMonitor__schedule(  # type: ignore[attr-defined]
+                "core", workflow_scheduler, set(invocation_ids) if requested else None
+            )
+
+    return monitor, schedule
+
+
+def test_schedule_requests_more_scheduling_if_more_work_remains():
+    monitor, schedule = _monitor()
+    workflow_scheduler = mock.Mock()
+    workflow_scheduler.schedule.return_value = True
+    schedule(workflow_scheduler, [1])
+    assert monitor._requested_invocation_ids == {1}
+
+    workflow_scheduler.schedule.return_value = False
+    schedule(workflow_scheduler, [2])
+    assert monitor._requested_invocation_ids == {1}
+
+
+def test_worker_pool_schedules_claimed_invocations_once():
+    monitor, schedule = _monitor(workers=2)
+    started = threading.Event()
+    release = threading.Event()
+    scheduled_on = []
+
+    def blocking_schedule(workflow_invocation):
+        scheduled_on.append(threading.current_thread().name)
+        started.set()
+        assert release.wait(10)
+        return False
+
+    workflow_scheduler = mock.Mock()
+    workflow_scheduler.schedule.side_effect = blocking_schedule
+    try:
+        schedule(workflow_scheduler, [1])
+        assert started.wait(10)
+        # requested again while its worker is busy, it is not submitted twice but remembered
+        schedule(workflow_scheduler, [1])
+        assert monitor._invocations_being_scheduled == {1: True}
+        assert monitor._requested_invocation_ids == set()
+        release.set()
+        _wait_for(lambda: not monitor._invocations_being_scheduled)
+        assert monitor._requested_invocation_ids == {1}
+        assert workflow_scheduler.schedule.call_count == 1
+        assert scheduled_on[0].startswith("WorkflowRequestMonitor.worker")
+    finally:
+        release.set()
+        monitor.worker_pool.shutdown(wait=True)
+
+
+def test_worker_pool_polled_invocation_is_not_requested_again():
+    monitor, schedule = _monitor(workers=2)
+    workflow_scheduler = mock.Mock()
+    workflow_scheduler.schedule.return_value = False
+    try:
+        schedule(workflow_scheduler, [1], requested=False)
+        _wait_for(lambda: workflow_scheduler.schedule.call_count == 1 and not monitor._invocations_being_scheduled)
+        assert monitor._requested_invocation_ids == set()
+    finally:
+        monitor.worker_pool.shutdown(wait=True)
+
+
+def test_worker_pool_requests_scheduling_after_budget_stop():
+    monitor, schedule = _monitor(workers=2)
+    monitor.app.config.workflow_scheduling_time_budget = 0.01
+    workflow_scheduler = mock.Mock()
+    # what the core scheduler returns when the invoker stopped on the time budget
+    workflow_scheduler.schedule.return_value = True
+    try:
+        schedule(workflow_scheduler, [1], requested=False)
+        _wait_for(lambda: monitor._requested_invocation_ids == {1})
+        assert not monitor._invocations_being_scheduled
+    finally:
+        monitor.worker_pool.shutdown(wait=True)
+
+
+def test_worker_pool_releases_invocation_on_error():
+    monitor, schedule = _monitor(workers=2)
+    workflow_scheduler = mock.Mock()
+    workflow_scheduler.schedule.side_effect = Exception("scheduling failed")
+    try:
+        schedule(workflow_scheduler, [1])
+        _wait_for(lambda: workflow_scheduler.schedule.call_count == 1 and not monitor._invocations_being_scheduled)
+        workflow_scheduler.schedule.side_effect = None
+        workflow_scheduler.schedule.return_value = False
+        schedule(workflow_scheduler, [1])
+        _wait_for(lambda: workflow_scheduler.schedule.call_count == 2)
+    finally:
+        monitor.worker_pool.shutdown(wait=True)
+
+
+def test_shutdown_wakes_up_monitor_waiting_for_scheduling_events():
+    monitor, _ = _monitor()
+    monitor.monitor_join_sleep = 10
+    monitor.workflow_scheduling_manager.active_workflow_schedulers = {}
+    monitor.start()
+    # the first iteration polls all invocations, the monitor then waits for events up to the fallback sleep
+    _wait_for(lambda: monitor._last_full_poll > float("-inf"))
+    start = time.monotonic()
+    monitor.shutdown()
+    assert time.monotonic() - start < 5
+    assert not monitor.monitor_thread.is_alive()
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
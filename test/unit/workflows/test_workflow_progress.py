@@ -1,7 +1,10 @@
 from typing import cast
 
+import pytest
+
 from galaxy import model
 from galaxy.util.unittest import TestCase
+from galaxy.workflow.modules import DelayedWorkflowEvaluation
 from galaxy.workflow.run import (
     ModuleInjector,
     WorkflowProgress,
@@ -178,6 +181,40 @@ class TestWorkflowProgress(TestCase):
         replacement = progress.replacement_for_input(None, self._step(4), step_dict)
         assert replacement is hda3
 
+    def test_remaining_steps_recovers_scheduled_tool_steps_on_demand(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        hda3 = model.HistoryDatasetAssociation()
+        self._set_previous_progress(
+            [
+                (100, {"output": model.HistoryDatasetAssociation()}),
+                (101, {"output": model.HistoryDatasetAssociation()}),
+                (102, {"out_file1": hda3}),
+                (103, {"out_file1": model.HistoryDatasetAssociation()}),
+                (104, UNSCHEDULED_STEP),
+            ]
+        )
+        progress = self._new_workflow_progress()
+        progress.remaining_steps()
+        assert 100 in progress.outputs
+        assert 102 not in progress.outputs
+        step_dict = {
+            "name": "input1",
+            "input_type": "dataset",
+            "multiple": False,
+        }
+        assert progress.replacement_for_input(None, self._step(4), step_dict) is hda3
+        assert progress.outputs[102] == {"out_file1": hda3}
+        # nothing is connected to step 103
+        assert 103 not in progress.outputs
+
+    def test_check_connected_steps_not_delayed(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        progress = self._new_workflow_progress()
+        progress.mark_step_outputs_delayed(self._step(2))
+        with pytest.raises(DelayedWorkflowEvaluation):
+            progress.check_connected_steps_not_delayed(self._step(4))
+        progress.check_connected_steps_not_delayed(self._step(3))
+
     # TODO: Replace multiple true HDA with HDCA
     # TODO: Test explicit delay
     # TODO: Test cancel on collection invalid